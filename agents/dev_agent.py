@@ -20,6 +20,10 @@ from utils.llm_setup import ask_llm_streaming, ask_llm, LLMError
 from utils.documentation_generator import DocumentationGenerator
 from utils.test_generator import TestGenerator
 from utils.code_modifier import CodeModifier, ModificationResult
+from utils.blob_store import get_blob_store
+from utils.tracing import traced, span, task_attributes
+from utils.budget_manager import budget_stage, get_budget_manager
+from utils.cancellation import PLAN, cancel_scope, get_cancellation_registry
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -208,8 +212,9 @@ class DevAgent:
             # Add plan context to task for better LLM understanding
             enhanced_task = self._enhance_task_with_context(task)
 
-            # Execute the task
-            completed_task = await self.execute_task(enhanced_task)
+            # Execute the task (cancelled with its plan on pause/emergency stop)
+            with cancel_scope(plan=self.plan_context.get('id'), task=task.id):
+                completed_task = await self.execute_task(enhanced_task)
 
             # Mark as completed
             self.completed_tasks.add(task.id)
@@ -221,6 +226,12 @@ class DevAgent:
             # Check if the entire plan is now complete and needs consolidation
             await self._check_plan_completion_and_consolidate()
 
+        except asyncio.CancelledError:
+            # Torn down by pause/emergency stop; requeue so resume restarts it
+            logger.info(f"🛑 Dev Agent: Task {task.id} cancelled")
+            self.in_progress_tasks.discard(task.id)
+            self.task_queue.insert(0, task)
+
         except Exception as e:
             logger.error(f"Dev Agent: Failed to execute task {task.id}: {e}", exc_info=True)
             self.in_progress_tasks.discard(task.id)
@@ -373,8 +384,11 @@ Current Task: {len(self.completed_tasks) + 1} of {len(self.pending_tasks)}
         }
 
     async def pause_processing(self):
-        """Pause task processing."""
+        """Pause task processing, cancelling in-flight tasks (they are requeued for resume)."""
         self.is_processing_active = False
+        await get_cancellation_registry().cancel_and_wait(
+            PLAN, self.plan_context.get('id'), "paused", remember=False
+        )
         await self.websocket_manager.broadcast_message({
             "agent_id": self.agent_id,
             "type": "processing_paused",
@@ -550,6 +564,7 @@ Your code should be immediately deployable to production environments, with clea
 - Build incrementally on the existing foundation
 Please provide a complete, production-ready implementation that follows enterprise-grade software development practices."""
 
+    @traced("dev.generate_code", task_attributes)
     async def _stream_code_from_llm(self, task: Task) -> str:
         """
         Calls the LLM in streaming mode for code generation,
@@ -708,6 +723,8 @@ Please provide a complete, production-ready implementation that follows enterpri
             'documentation': '\n\n'.join(documentation_parts).strip()
         }
 
+    @traced("dev.execute_task", task_attributes)
+    @budget_stage("dev")
     async def execute_task(self, task: Task) -> Task:
         """
         Executes a single development task, streaming LLM response to UI.
@@ -767,7 +784,11 @@ Please provide a complete, production-ready implementation that follows enterpri
                     "timestamp": datetime.now().isoformat()
                 })
 
-            # Save each code file separately, preserving directory structure
+            # Save each code file separately, preserving directory structure.
+            # Bodies go to the blob store; the plan directory gets copy-on-write
+            # clones because QA fixes edit these files in place.
+            blob_store = get_blob_store()
+            output_manifest = {}
             saved_files = []
             file_count = 0
             for filename, file_info in code_files.items():
@@ -785,7 +806,10 @@ Please provide a complete, production-ready implementation that follows enterpri
                 code_file.parent.mkdir(parents=True, exist_ok=True)
                 
                 try:
-                    code_file.write_text(code_content, encoding="utf-8")
+                    with span("dev.write_file", attributes={"file": filename, "bytes": len(code_content)}):
+                        content_hash = blob_store.put(code_content)
+                        blob_store.materialize_file(content_hash, code_file, mode="reflink")
+                    output_manifest[filename] = content_hash
                     saved_files.append(filename)
                     file_count += 1
                     logger.info(f"Dev Agent: Saved code file {filename} for task {task.id} ({file_count}/{len(code_files)})")
@@ -833,6 +857,7 @@ Please provide a complete, production-ready implementation that follows enterpri
                     })
             if not saved_files:
                 raise ValueError("No code files were generated or saved.")
+            blob_store.write_manifest(f"dev_outputs/{task_dir.name}", output_manifest)
 
             # Save task metadata
             metadata = {
@@ -920,6 +945,8 @@ Please provide a complete, production-ready implementation that follows enterpri
             })
             return task
     
+    @traced("dev.generate_docs", task_attributes)
+    @budget_stage("docs")
     async def _generate_task_documentation(
         self, 
         task: Task, 
@@ -937,6 +964,10 @@ Please provide a complete, production-ready implementation that follows enterpri
         Returns:
             Dictionary of documentation filename -> content
         """
+        if get_budget_manager().is_degraded():
+            logger.warning(f"💸 Dev Agent: Budget nearly exhausted, skipping documentation for '{task.title}'")
+            return {}
+
         logger.info(f"Dev Agent: Generating documentation for task '{task.title}'")
         
         try:
@@ -1025,6 +1056,8 @@ Please provide a complete, production-ready implementation that follows enterpri
             # Return empty dict on failure - don't fail the entire task
             return {}
     
+    @traced("dev.generate_tests", task_attributes)
+    @budget_stage("tests")
     async def _generate_task_tests(
         self, 
         task: Task, 
@@ -1042,6 +1075,10 @@ Please provide a complete, production-ready implementation that follows enterpri
         Returns:
             Dictionary of test filename -> content
         """
+        if get_budget_manager().is_degraded():
+            logger.warning(f"💸 Dev Agent: Budget nearly exhausted, skipping test generation for '{task.title}'")
+            return {}
+
         logger.info(f"Dev Agent: Generating tests for task '{task.title}'")
         
         try:
@@ -1720,6 +1757,12 @@ Please provide a complete, production-ready implementation that follows enterpri
         
         self.is_processing_active = False
         
+        # Tear down in-flight generations and any pipeline work for the plan
+        cancelled = await get_cancellation_registry().cancel_and_wait(
+            PLAN, self.plan_context.get('id'), "emergency stop"
+        )
+        logger.warning(f"🛑 Dev Agent: Cancelled {cancelled} in-flight task(s)")
+        
         # Clear all queues
         self.task_queue.clear()
         
@@ -1745,6 +1788,8 @@ Please provide a complete, production-ready implementation that follows enterpri
                 f"queued={len(self.task_queue)}, "
                 f"active={self.is_processing_active})")
 
+    @traced("dev.fix_qa_issues", task_attributes)
+    @budget_stage("fix")
     async def handle_qa_feedback(self, task: Task, issues: List[Dict]) -> Task:
         """
         Handle feedback from QA Agent and fix the reported issues.
@@ -22,6 +22,7 @@ from models.enums import TaskStatus
 from parse.websocket_manager import WebSocketManager
 from utils.llm_setup import ask_llm, LLMError
 from utils.cache_manager import load_cached_content, save_cached_content
+from utils.blob_store import get_blob_store
 
 # Configure structured logging
 logging.basicConfig(
@@ -711,6 +712,7 @@ primary_region = "iad"
         docs_dir.mkdir(exist_ok=True)
         
         # Copy files with intelligent placement
+        blob_store = get_blob_store()
         for plan_dir in plan_dirs:
             for file_path in plan_dir.rglob("*"):
                 if not file_path.is_file():
@@ -732,8 +734,8 @@ primary_region = "iad"
 
                 rel_path = file_path.relative_to(plan_dir)
                 target_path = target_dir / rel_path
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(file_path, target_path)
+                # Copy-on-write clone of the deduplicated blob where the filesystem allows
+                blob_store.import_file(file_path, target_path, mode="reflink")
 
     async def _generate_readme(self, task: Task):
         """Generate comprehensive README using LLM, reusing cached output when possible."""
@@ -1,5 +1,6 @@
 import uuid
 import json
+import asyncio
 import logging
 import hashlib
 from datetime import datetime
@@ -14,6 +15,7 @@ from models.task import Task
 from models.plan import Plan
 from models.enums import TaskStatus
 from models.project_context import ProjectContext, ProjectType, ProjectStatus, Modification
+from models.lazy_codebase import codebase_hash
 from parse.websocket_manager import WebSocketManager
 from parse.plan_parser import PlanParser
 from config import GENERATED_CODE_ROOT  # Keep this import
@@ -21,8 +23,11 @@ from agents.prompt_templates import PM_SYSTEM_PROMPT
 from utils.llm_setup import ask_llm, LLMError
 from utils.cache_manager import load_cached_content, save_cached_content, delete_cached_content
 from utils.toon_parser import TOONParser
-from utils.project_context_store import ProjectContextStore
-from utils.template_library import TemplateLibrary
+from utils.stores import get_shared_project_store, get_shared_template_library
+from utils.blob_store import get_blob_store
+from utils.codebase_versions import SnapshotStore, SnapshotUpdate, snapshot_manifest_prefix
+from utils.tracing import traced, bind_trace
+from utils.budget_manager import budget_stage
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
@@ -30,18 +35,17 @@ logger = logging.getLogger(__name__)
 
 
 class PlannerAgent:
-    def __init__(self, websocket_manager: WebSocketManager = None):
+    def __init__(self, websocket_manager: WebSocketManager = None, context_store=None, template_library=None):
         self.agent_id = "pm_agent"
         self.websocket_manager = websocket_manager if websocket_manager is not None else WebSocketManager()
         self.current_plan = None
         self.planning_history = []
         
-        # Initialize ProjectContextStore for project state management
-        self.context_store = ProjectContextStore()
+        # Project store and template library (backend from PROJECT_STORE_BACKEND);
+        # the shared ones are only created on first use
+        self._context_store = context_store
+        self._template_library = template_library
         self.current_project_context = None
-        
-        # Initialize TemplateLibrary for template-based project creation
-        self.template_library = TemplateLibrary()
 
         # Use the imported GENERATED_CODE_ROOT as the base for all agent-specific directories
         self.generated_code_root = GENERATED_CODE_ROOT
@@ -62,6 +66,26 @@ class PlannerAgent:
             # This is a critical error, but we'll allow the app to try to continue.
             # File operations will likely fail if directories aren't writable.
 
+    @property
+    def context_store(self):
+        if self._context_store is None:
+            self._context_store = get_shared_project_store()
+        return self._context_store
+
+    @context_store.setter
+    def context_store(self, store):
+        self._context_store = store
+
+    @property
+    def template_library(self):
+        if self._template_library is None:
+            self._template_library = get_shared_template_library()
+        return self._template_library
+
+    @template_library.setter
+    def template_library(self, library):
+        self._template_library = library
+
     def _get_system_prompt(self) -> str:
         return PM_SYSTEM_PROMPT
 
@@ -69,6 +93,8 @@ class PlannerAgent:
         """Constructs a clean prompt containing only the user's project requirements."""
         return f"Project Requirements:\n{user_input}"
 
+    @traced("pm.generate_plan")
+    @budget_stage("plan")
     async def _get_raw_plan_from_llm(self, user_input: str, websocket: WebSocket):
         """Fetch the raw plan string, using cache when available."""
         system_prompt = self._get_system_prompt()
@@ -222,6 +248,7 @@ class PlannerAgent:
             
         logger.info("✨ PM Agent: Automatic cleanup completed - ready for new user request")
 
+    @traced("pm.create_plan")
     async def create_plan_and_stream_tasks(self, user_input: str, websocket: WebSocket):
         """
         Generates a comprehensive plan from user input, streams LLM output,
@@ -235,6 +262,7 @@ class PlannerAgent:
         self._cleanup_all_outputs()
 
         plan_id = str(uuid.uuid4())  # Generate a unique ID for this planning session
+        bind_trace(plan_id)  # Dev/QA/deploy spans for this plan join the same trace
 
         # Notify the start of the planning process to the specific client
         await self.websocket_manager.send_personal_message({
@@ -695,19 +723,21 @@ class PlannerAgent:
         except Exception as e:
             logger.error(f"Error saving project context: {e}", exc_info=True)
     
-    async def load_project_context(self, project_id: str, websocket: WebSocket = None) -> Optional[ProjectContext]:
+    async def load_project_context(self, project_id: str, websocket: WebSocket = None,
+                                   lazy: bool = False) -> Optional[ProjectContext]:
         """
         Load an existing project context for modification.
         
         Args:
             project_id: ID of the project to load
             websocket: Optional websocket for sending status messages
+            lazy: Load file bodies on demand instead of up front
             
         Returns:
             ProjectContext if found, None otherwise
         """
         try:
-            context = await self.context_store.load_context(project_id)
+            context = await self.context_store.load_context(project_id, lazy=lazy)
             
             if context:
                 self.current_project_context = context
@@ -921,24 +951,79 @@ class PlannerAgent:
             "status": "pending_approval"
         }
     
+    # ========================================================================
+    # Codebase Snapshots
+    # ========================================================================
+    
+    def _snapshot_store(self) -> SnapshotStore:
+        """
+        Snapshots live in the project store's own object store if it has one
+        (PostgresProjectStore), else in the blob store that holds the
+        project's file bodies.
+        """
+        snapshot_objects = getattr(self.context_store, "snapshot_objects", None)
+        if snapshot_objects is not None:
+            return SnapshotStore(snapshot_objects())
+        return SnapshotStore(getattr(self.context_store, "blob_store", None) or get_blob_store())
+    
+    @staticmethod
+    def _retain_snapshot(snapshots: SnapshotStore, project_id: str, update: SnapshotUpdate) -> None:
+        """Keep the objects a snapshot added alive until the project is deleted."""
+        name = f"{snapshot_manifest_prefix(project_id)}/{update.root}"
+        if update.objects and snapshots.objects.get_manifest(name) is None:
+            snapshots.objects.write_manifest(name, {h: h for h in update.objects})
+    
+    def _snapshot_codebase(self, context: ProjectContext, snapshots: SnapshotStore) -> str:
+        """
+        Root hash of a context's current codebase, writing its snapshot if it is new.
+        
+        Uses the stored content hashes, so a lazy codebase loads no bodies
+        unless the object store lacks them.
+        """
+        codebase = context.codebase
+        hashes = {path: codebase_hash(codebase, path) for path in codebase}
+        root = snapshots.root_of(hashes)
+        if any(root in (m.snapshot, m.base_snapshot) for m in context.modifications):
+            return root
+        
+        for path, content_hash in hashes.items():
+            if not snapshots.objects.exists(content_hash):
+                snapshots.objects.put(codebase[path])
+        self._retain_snapshot(snapshots, context.id, snapshots.write_tree(hashes))
+        return root
+    
+    @staticmethod
+    def _apply_file_changes(context: ProjectContext, changes: Dict[str, Optional[str]]) -> None:
+        for path, content in changes.items():
+            if content is None:
+                if path in context.codebase:
+                    del context.codebase[path]
+            else:
+                context.codebase[path] = content
+    
     async def apply_modification_plan(
         self,
         project_id: str,
         plan_id: str,
         websocket: WebSocket,
-        approved_by: str = "user"
+        approved_by: str = "user",
+        changes: Optional[Dict[str, Optional[str]]] = None
     ) -> bool:
         """
         Apply an approved modification plan to the project.
         
         This method should be called after the user has reviewed and approved
-        the modification plan.
+        the modification plan. The codebase before and after is recorded as
+        a snapshot (utils.codebase_versions) on the modification, so it can
+        be diffed, inspected or rolled back later without full copies.
         
         Args:
             project_id: ID of the project
             plan_id: ID of the modification plan to apply
             websocket: WebSocket connection for updates
             approved_by: Who approved the modification
+            changes: File changes of the plan (path -> new content, or None
+                     to delete the file)
             
         Returns:
             bool: True if successful, False otherwise
@@ -954,27 +1039,31 @@ class PlannerAgent:
             "timestamp": datetime.now().isoformat()
         }, websocket)
         
-        # Load project context
-        context = await self.load_project_context(project_id, websocket)
+        # Load project context (only changed files need their bodies)
+        context = await self.load_project_context(project_id, websocket, lazy=True)
         if not context:
             return False
         
-        # In a full implementation, this would:
-        # 1. Load the modification plan from storage
-        # 2. Apply each change to the codebase
-        # 3. Run tests to verify changes
-        # 4. Update project context with modifications
-        # 5. Save updated context
-        
-        # For now, we'll track the modification in the project history
         try:
+            changes = changes or {}
+            snapshots = self._snapshot_store()
+            base_snapshot = await asyncio.to_thread(self._snapshot_codebase, context, snapshots)
+            snapshot = base_snapshot
+            if changes:
+                update = await asyncio.to_thread(snapshots.update, base_snapshot, changes)
+                await asyncio.to_thread(self._retain_snapshot, snapshots, project_id, update)
+                self._apply_file_changes(context, changes)
+                snapshot = update.root
+            
             modification = Modification(
                 id=plan_id,
                 timestamp=datetime.utcnow(),
                 description=f"Applied modification plan {plan_id}",
-                affected_files=[],  # Would be populated from the plan
+                affected_files=sorted(changes),
                 requested_by=approved_by,
-                status="applied"
+                status="applied",
+                base_snapshot=base_snapshot,
+                snapshot=snapshot
             )
             
             context.modifications.append(modification)
@@ -1016,6 +1105,92 @@ class PlannerAgent:
             }, websocket)
             return False
     
+    async def rollback_modification(
+        self,
+        project_id: str,
+        modification_id: str,
+        websocket: WebSocket = None,
+        requested_by: str = "user"
+    ) -> bool:
+        """
+        Restore the codebase to its state before a modification.
+        
+        Only the files that differ between the current snapshot and the
+        modification's base snapshot are rewritten. The rollback is itself
+        recorded as a modification, so it can be rolled back too.
+        
+        Args:
+            project_id: ID of the project
+            modification_id: ID of the modification to roll back
+            websocket: Optional websocket for sending status messages
+            requested_by: Who requested the rollback
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        context = await self.load_project_context(project_id, websocket, lazy=True)
+        if not context:
+            return False
+        
+        target = next((m for m in context.modifications if m.id == modification_id), None)
+        if target is None or target.base_snapshot is None:
+            logger.warning(f"No snapshot recorded for modification {modification_id} of {project_id}")
+            return False
+        
+        try:
+            snapshots = self._snapshot_store()
+            current = await asyncio.to_thread(self._snapshot_codebase, context, snapshots)
+            changes = await asyncio.to_thread(snapshots.changes_between, current, target.base_snapshot)
+            self._apply_file_changes(context, changes)
+            
+            target.status = "rolled_back"
+            context.modifications.append(Modification(
+                id=f"{modification_id}_rollback_{len(context.modifications)}",
+                timestamp=datetime.utcnow(),
+                description=f"Rolled back modification {modification_id}",
+                affected_files=sorted(changes),
+                requested_by=requested_by,
+                status="applied",
+                base_snapshot=current,
+                snapshot=target.base_snapshot
+            ))
+            context.updated_at = datetime.utcnow()
+            success = await self.context_store.save_context(context)
+            
+            if success and websocket:
+                await self.websocket_manager.send_personal_message({
+                    "agent_id": self.agent_id,
+                    "type": "modification_rolled_back",
+                    "project_id": project_id,
+                    "modification_id": modification_id,
+                    "affected_files": sorted(changes),
+                    "message": f"Rolled back modification {modification_id}",
+                    "timestamp": datetime.now().isoformat()
+                }, websocket)
+            logger.info(f"Rolled back modification {modification_id} of {project_id} ({len(changes)} files)")
+            return success
+            
+        except Exception as e:
+            logger.error(f"Error rolling back modification {modification_id}: {e}", exc_info=True)
+            return False
+    
+    async def get_codebase_at(self, project_id: str, modification_id: str) -> Optional[Dict[str, str]]:
+        """
+        Get the codebase as it was right after a modification.
+        
+        Args:
+            project_id: ID of the project
+            modification_id: ID of the modification
+            
+        Returns:
+            file path -> content, or None if no snapshot was recorded
+        """
+        context = await self.context_store.load_context(project_id, lazy=True)
+        target = next((m for m in context.modifications if m.id == modification_id), None) if context else None
+        if target is None or target.snapshot is None:
+            return None
+        return await asyncio.to_thread(self._snapshot_store().files, target.snapshot)
+    
     async def get_modification_history(self, project_id: str) -> List[Dict]:
         """
         Get the modification history for a project.
@@ -1026,7 +1201,7 @@ class PlannerAgent:
         Returns:
             List of modification records
         """
-        context = await self.context_store.load_context(project_id)
+        context = await self.context_store.load_context(project_id, lazy=True)
         
         if not context:
             return []
@@ -1038,7 +1213,8 @@ class PlannerAgent:
                 "description": mod.description,
                 "affected_files": mod.affected_files,
                 "requested_by": mod.requested_by,
-                "status": mod.status
+                "status": mod.status,
+                "snapshot": mod.snapshot
             }
             for mod in context.modifications
         ]
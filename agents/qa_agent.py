@@ -5,13 +5,12 @@ import json
 import tempfile
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, TypedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, TypedDict
 from datetime import datetime
 
-# LangGraph imports
-from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+if TYPE_CHECKING:
+    # LangGraph/LangChain are imported on first use (slow to import)
+    from langgraph.graph import StateGraph
 
 from models.task import Task
 from models.enums import TaskStatus
@@ -19,11 +18,42 @@ from parse.websocket_manager import WebSocketManager
 from utils.llm_setup import ask_llm, LLMError
 from utils.cache_manager import load_cached_content, save_cached_content
 from utils.qa_config import QAConfig
+from utils.tracing import traced, task_attributes
+from utils.budget_manager import budget_stage, get_budget_manager, DEGRADED_MODEL
 from config import DEV_OUTPUT_DIR
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+async def _run_process(args: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    """
+    Run a subprocess without blocking the event loop.
+
+    The process is killed on timeout and when the calling task is cancelled
+    (e.g. the plan is stopped or the client disconnects).
+
+    Raises:
+        subprocess.TimeoutExpired: If the process exceeds timeout
+        FileNotFoundError: If the executable is missing
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        async with asyncio.timeout(timeout):
+            stdout, stderr = await process.communicate()
+    except (TimeoutError, asyncio.CancelledError) as e:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        if isinstance(e, TimeoutError):
+            raise subprocess.TimeoutExpired(args, timeout)
+        raise
+    return subprocess.CompletedProcess(
+        args, process.returncode,
+        stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    )
+
 class QAState(TypedDict):
     """State for the QA workflow."""
     task: Task
@@ -33,7 +63,7 @@ class QAState(TypedDict):
     fix_attempts: int
     max_fix_attempts: int
     current_file: str
-    messages: List[BaseMessage]
+    messages: List[Any]  # langchain_core BaseMessage objects
     qa_status: str  # 'testing', 'fixing', 'completed', 'failed'
 
 class CodeIssue(TypedDict):
@@ -53,10 +83,19 @@ class QAAgent:
         self.agent_id = "qa_agent"
         self.websocket_manager = websocket_manager
         self.qa_config = QAConfig.from_env()
-        self.workflow = self._create_workflow()
-        
-    def _create_workflow(self) -> StateGraph:
+        self._workflow = None
+    
+    @property
+    def workflow(self):
+        """Compiled LangGraph workflow (built on first use)."""
+        if self._workflow is None:
+            self._workflow = self._create_workflow()
+        return self._workflow
+        
+    def _create_workflow(self) -> "StateGraph":
         """Create the LangGraph workflow for QA testing and fixing."""
+        from langgraph.graph import StateGraph, END
+        
         workflow = StateGraph(QAState)
         
         # Add nodes
@@ -96,20 +135,29 @@ class QAAgent:
         
         return workflow.compile()
 
+    @traced("qa.execute_task", task_attributes)
+    @budget_stage("qa")
     async def execute_task(self, task: Task) -> Task:
         """
         Execute QA workflow based on configured mode (fast or deep).
+
+        Deep mode falls back to fast mode when the QA budget is nearly spent.
         """
+        mode = self.qa_config.mode
+        if mode != "fast" and get_budget_manager().is_degraded():
+            logger.warning(f"💸 QA Agent: Budget nearly exhausted, using fast mode for task {task.id}")
+            mode = "fast"
+
         await self.websocket_manager.broadcast_message({
             "agent_id": self.agent_id,
             "type": "qa_start",
             "task_id": task.id,
-            "message": f"🧪 QA Agent: Starting {self.qa_config.mode.upper()} mode testing for '{task.title}'",
+            "message": f"🧪 QA Agent: Starting {mode.upper()} mode testing for '{task.title}'",
             "timestamp": datetime.now().isoformat()
         })
 
         try:
-            if self.qa_config.mode == "fast":
+            if mode == "fast":
                 return await self._fast_qa_mode(task)
             else:
                 return await self._deep_qa_mode(task)
@@ -134,6 +182,8 @@ class QAAgent:
         """
         all_passed = True
         all_issues = []
+        # Near the budget limit, only syntax checks are run (zero tokens)
+        syntax_only = get_budget_manager().is_degraded()
 
         try:
             async with asyncio.timeout(self.qa_config.fast_timeout):
@@ -154,7 +204,7 @@ class QAAgent:
                     })
 
                     # Pre-screen: skip LLM for simple files (30-50% token savings)
-                    if not self._needs_llm_review(filename, content):
+                    if syntax_only or not self._needs_llm_review(filename, content):
                         # Just syntax check (zero tokens)
                         syntax_result = await self._check_syntax(filename, content)
                         issues = [] if syntax_result["passed"] else [{
@@ -213,6 +263,7 @@ class QAAgent:
             })
             return task
 
+    @traced("qa.review_file", lambda self, task, filename, *a, **k: {"task.id": task.id, "file": filename})
     async def _review_single_file(self, task: Task, filename: str, code_content: str) -> Dict:
         """Performs LLM logic review on a single file with function-level optimization."""
         
@@ -363,6 +414,7 @@ JSON: {{"passed": bool, "issues": [...]}}"""
         return '\n'.join(result)
 
 
+    @traced("qa.logic_review", task_attributes)
     async def _llm_logic_review(self, task: Task, code_files: Dict[str, str]) -> Dict:
         """
         Single LLM call for logic review with AGGRESSIVE truncation to avoid token limits.
@@ -503,6 +555,8 @@ Be concise. Focus on critical issues only."""
                     "timestamp": datetime.now().isoformat()
                 })
                 
+                from langchain_core.messages import HumanMessage
+                
                 # Use existing LangGraph workflow with reduced max attempts
                 initial_state: QAState = {
                     "task": task,
@@ -678,6 +732,7 @@ Be concise. Focus on critical issues only."""
             raise FileNotFoundError(f"No Python files found in {task_dir}")
         
         state["code_files"] = code_files
+        from langchain_core.messages import AIMessage
         state["messages"].append(AIMessage(content=f"Loaded {len(code_files)} code files"))
         
         await self.websocket_manager.broadcast_message({
@@ -1097,6 +1152,10 @@ Be concise. Focus on critical issues only."""
     def _select_model_for_task(self, task_type: str, code_length: int) -> str:
         """Choose the cheapest model that can handle the task."""
         
+        # Cheapest model for everything when the budget is nearly spent
+        if get_budget_manager().is_degraded():
+            return DEGRADED_MODEL
+        
         # Ultra-cheap for simple checks
         if task_type == "syntax_review" and code_length < 1000:
             return "gemini-1.5-flash-8b"  # 4x cheaper
@@ -1199,12 +1258,7 @@ Be concise. Focus on critical issues only."""
                 f.write(code_content)
                 temp_path = f.name
             
-            result = subprocess.run(
-                ["flake8", temp_path, "--max-line-length=100"], 
-                capture_output=True, 
-                text=True, 
-                check=False
-            )
+            result = await _run_process(["flake8", temp_path, "--max-line-length=100"])
             
             Path(temp_path).unlink()  # Clean up temp file
             
@@ -1227,12 +1281,9 @@ Be concise. Focus on critical issues only."""
                 temp_path = f.name
             
             # Try to execute the code in a subprocess to catch runtime errors
-            result = subprocess.run(
+            result = await _run_process(
                 [sys.executable, "-c", f"exec(open('{temp_path}').read())"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                check=False
+                timeout=10
             )
             
             Path(temp_path).unlink()  # Clean up temp file
@@ -1247,6 +1298,7 @@ Be concise. Focus on critical issues only."""
         except Exception as e:
             return {"passed": False, "error": f"Runtime check failed: {str(e)}"}
 
+    @traced("qa.run_tests", lambda self, filename, *a, **k: {"file": filename})
     async def _run_generated_tests(self, filename: str, code_content: str, task: Task) -> Dict:
         """Generate and run unit tests for the code."""
         try:
@@ -1267,12 +1319,9 @@ Be concise. Focus on critical issues only."""
                 code_path = f.name
             
             # Run pytest on the test file
-            result = subprocess.run(
+            result = await _run_process(
                 [sys.executable, "-m", "pytest", test_path, "-v"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                check=False
+                timeout=30
             )
             
             # Clean up temp files
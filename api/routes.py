@@ -8,19 +8,21 @@ This module implements REST API endpoints for:
 - Documentation retrieval
 """
 
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, HTTPException, Query, Body, Depends
 from fastapi.responses import JSONResponse
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 import logging
 
 from models.project_context import ProjectContext, ProjectType, ProjectStatus
+from models.lazy_codebase import LazyCodebase
 from models.modification_plan import ModificationPlan, ModificationStatus
 from models.template import ProjectTemplate
-from utils.project_context_store import ProjectContextStore
 from utils.modification_analyzer import ModificationAnalyzer
 from utils.modification_plan_generator import ModificationPlanGenerator
-from utils.template_library import TemplateLibrary
+from utils.stores import get_shared_project_store, get_shared_template_library
+from utils.pagination import Page
+from utils.project_history import event_to_dict
 from utils.documentation_generator import DocumentationGenerator
 from parse.websocket_manager import WebSocketManager
 
@@ -32,11 +34,10 @@ modification_router = APIRouter(prefix="/api", tags=["modifications"])
 template_router = APIRouter(prefix="/api/templates", tags=["templates"])
 documentation_router = APIRouter(prefix="/api", tags=["documentation"])
 
-# Initialize services
-project_store = ProjectContextStore()
+# Initialize services (project store and template library are injected
+# per request, see utils.stores)
 modification_analyzer = ModificationAnalyzer()
 modification_plan_generator = ModificationPlanGenerator()
-template_library = TemplateLibrary()
 documentation_generator = DocumentationGenerator()
 
 # WebSocket manager for real-time events (will be set by main app)
@@ -62,7 +63,8 @@ async def create_project(
     name: str = Body(..., description="Project name"),
     description: str = Body("", description="Project description"),
     project_type: str = Body("other", description="Project type"),
-    owner_id: str = Body("default_user", description="Owner user ID")
+    owner_id: str = Body("default_user", description="Owner user ID"),
+    project_store=Depends(get_shared_project_store)
 ) -> Dict[str, Any]:
     """
     Create a new project.
@@ -116,61 +118,73 @@ async def list_projects(
     owner_id: str = Query("default_user", description="Filter by owner ID"),
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(50, ge=1, le=100, description="Maximum number of projects to return"),
-    offset: int = Query(0, ge=0, description="Number of projects to skip")
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    project_store=Depends(get_shared_project_store)
 ) -> Dict[str, Any]:
     """
     List user's projects with optional filtering.
     
-    Returns a paginated list of projects owned by the specified user.
+    Returns one page of the projects owned by the specified user, most
+    recently updated first. Pass pagination.next_cursor back as cursor to
+    get the next page.
     
     **Requirements**: 1.1, 2.1
     """
     try:
-        # Get all projects for user
-        projects = await project_store.list_contexts(owner_id=owner_id)
-        
-        # Filter by status if provided
+        # Validate status filter
+        status_enum = None
         if status:
             try:
                 status_enum = ProjectStatus(status)
-                projects = [p for p in projects if p.status == status_enum]
             except ValueError:
                 raise HTTPException(
                     status_code=400,
                     detail=f"Invalid status. Must be one of: {[s.value for s in ProjectStatus]}"
                 )
         
-        # Apply pagination
-        total = len(projects)
-        projects = projects[offset:offset + limit]
+        # Filter and paginate in the store
+        try:
+            page = await project_store.list_contexts_page(
+                owner_id=owner_id, status=status_enum, limit=limit, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         return {
             "success": True,
-            "projects": [p.to_dict() for p in projects],
+            # Listings carry metadata only; files come from GET /api/projects/{id}
+            "projects": [p.to_dict(include_codebase=False) for p in page.items],
             "pagination": {
-                "total": total,
                 "limit": limit,
-                "offset": offset,
-                "has_more": offset + limit < total
+                "next_cursor": page.next_cursor,
+                "has_more": page.next_cursor is not None
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error listing projects: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @project_router.get("/{project_id}")
-async def get_project(project_id: str) -> Dict[str, Any]:
+async def get_project(
+    project_id: str,
+    include_codebase: bool = Query(True, description="Include file contents (otherwise paths and sizes only)"),
+    project_store=Depends(get_shared_project_store)
+) -> Dict[str, Any]:
     """
     Get project details by ID.
     
     Returns complete project context including codebase, history, and metrics.
+    With include_codebase=false, file bodies are not read and the response
+    lists file paths and sizes instead.
     
     **Requirements**: 1.1, 2.1
     """
     try:
-        project = await project_store.load_context(project_id)
+        project = await project_store.load_context(project_id, lazy=not include_codebase)
         
         if not project:
             raise HTTPException(
@@ -178,9 +192,20 @@ async def get_project(project_id: str) -> Dict[str, Any]:
                 detail=f"Project '{project_id}' not found"
             )
         
+        if include_codebase:
+            return {
+                "success": True,
+                "project": project.to_dict()
+            }
+        
+        project_data = project.to_dict(include_codebase=False)
+        project_data["files"] = (
+            project.codebase.sizes() if isinstance(project.codebase, LazyCodebase)
+            else {path: len(content.encode("utf-8")) for path, content in project.codebase.items()}
+        )
         return {
             "success": True,
-            "project": project.to_dict()
+            "project": project_data
         }
         
     except HTTPException:
@@ -197,7 +222,8 @@ async def update_project(
     description: Optional[str] = Body(None),
     status: Optional[str] = Body(None),
     environment_vars: Optional[Dict[str, str]] = Body(None),
-    deployment_config: Optional[Dict[str, Any]] = Body(None)
+    deployment_config: Optional[Dict[str, Any]] = Body(None),
+    project_store=Depends(get_shared_project_store)
 ) -> Dict[str, Any]:
     """
     Update project details.
@@ -274,7 +300,7 @@ async def update_project(
 
 
 @project_router.delete("/{project_id}")
-async def delete_project(project_id: str) -> Dict[str, Any]:
+async def delete_project(project_id: str, project_store=Depends(get_shared_project_store)) -> Dict[str, Any]:
     """
     Delete a project.
     
@@ -284,7 +310,7 @@ async def delete_project(project_id: str) -> Dict[str, Any]:
     """
     try:
         # Check if project exists
-        project = await project_store.load_context(project_id)
+        project = await project_store.load_context(project_id, lazy=True)
         
         if not project:
             raise HTTPException(
@@ -330,7 +356,8 @@ async def delete_project(project_id: str) -> Dict[str, Any]:
 async def request_modification(
     project_id: str,
     request: str = Body(..., description="Natural language modification request"),
-    requested_by: str = Body("default_user", description="User requesting modification")
+    requested_by: str = Body("default_user", description="User requesting modification"),
+    project_store=Depends(get_shared_project_store)
 ) -> Dict[str, Any]:
     """
     Request a modification to an existing project.
@@ -379,59 +406,62 @@ async def request_modification(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _history_page(
+    project_store,
+    project_id: str,
+    kind: Optional[str],
+    status: Optional[str],
+    limit: int,
+    cursor: Optional[str]
+) -> Page:
+    """One page of project history from the store (400 on bad filters/cursor, 404 if missing)."""
+    try:
+        page = await project_store.list_history_page(
+            project_id, kind=kind, status=status, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if page is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Project '{project_id}' not found"
+        )
+    return page
+
+
 @modification_router.get("/projects/{project_id}/modifications")
 async def list_modifications(
     project_id: str,
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    project_store=Depends(get_shared_project_store)
 ) -> Dict[str, Any]:
     """
     List modifications for a project.
     
-    Returns all modification requests and their current status.
+    Returns one page of modification requests and their current status,
+    most recent first.
     
     **Requirements**: 2.1, 2.2, 2.3
     """
     try:
-        # Load project
-        project = await project_store.load_context(project_id)
+        page = await _history_page(project_store, project_id, "modification", status, limit, cursor)
         
-        if not project:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Project '{project_id}' not found"
-            )
-        
-        # Get modifications
-        modifications = project.modifications
-        
-        # Filter by status if provided
-        if status:
-            modifications = [m for m in modifications if m.status == status]
-        
-        # Apply pagination
-        total = len(modifications)
-        modifications = modifications[offset:offset + limit]
+        modifications = []
+        for m in page.items:
+            entry = event_to_dict(m)
+            del entry["type"]
+            modifications.append(entry)
         
         return {
             "success": True,
-            "modifications": [
-                {
-                    "id": m.id,
-                    "timestamp": m.timestamp.isoformat(),
-                    "description": m.description,
-                    "affected_files": m.affected_files,
-                    "requested_by": m.requested_by,
-                    "status": m.status
-                }
-                for m in modifications
-            ],
+            "modifications": modifications,
             "pagination": {
-                "total": total,
                 "limit": limit,
-                "offset": offset,
-                "has_more": offset + limit < total
+                "next_cursor": page.next_cursor,
+                "has_more": page.next_cursor is not None
             }
         }
         
@@ -445,59 +475,32 @@ async def list_modifications(
 @modification_router.get("/projects/{project_id}/history")
 async def get_project_history(
     project_id: str,
-    limit: int = Query(100, ge=1, le=500)
+    kind: Optional[str] = Query(None, description="Filter by event type (modification or deployment)"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    project_store=Depends(get_shared_project_store)
 ) -> Dict[str, Any]:
     """
-    Get complete project history.
+    Get project history.
     
-    Returns all modifications and deployments in chronological order.
+    Returns one page of modifications and deployments, most recent first.
     
     **Requirements**: 2.1, 2.2, 2.3
     """
     try:
-        # Load project
-        project = await project_store.load_context(project_id)
-        
-        if not project:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Project '{project_id}' not found"
-            )
-        
-        # Combine modifications and deployments
-        history = []
-        
-        for mod in project.modifications:
-            history.append({
-                "type": "modification",
-                "id": mod.id,
-                "timestamp": mod.timestamp.isoformat(),
-                "description": mod.description,
-                "affected_files": mod.affected_files,
-                "requested_by": mod.requested_by,
-                "status": mod.status
-            })
-        
-        for dep in project.deployments:
-            history.append({
-                "type": "deployment",
-                "id": dep.id,
-                "timestamp": dep.timestamp.isoformat(),
-                "environment": dep.environment,
-                "platform": dep.platform,
-                "url": dep.url,
-                "status": dep.status
-            })
-        
-        # Sort by timestamp (most recent first)
-        history.sort(key=lambda x: x["timestamp"], reverse=True)
-        history = history[:limit]
+        page = await _history_page(project_store, project_id, kind, None, limit, cursor)
+        history = [event_to_dict(event) for event in page.items]
         
         return {
             "success": True,
             "project_id": project_id,
             "history": history,
-            "total_events": len(history)
+            "total_events": len(history),
+            "pagination": {
+                "limit": limit,
+                "next_cursor": page.next_cursor,
+                "has_more": page.next_cursor is not None
+            }
         }
         
     except HTTPException:
@@ -579,7 +582,8 @@ async def list_templates(
     category: Optional[str] = Query(None, description="Filter by category"),
     complexity: Optional[str] = Query(None, description="Filter by complexity"),
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    template_library=Depends(get_shared_template_library)
 ) -> Dict[str, Any]:
     """
     List available project templates.
@@ -621,7 +625,7 @@ async def list_templates(
 
 
 @template_router.get("/{template_id}")
-async def get_template(template_id: str) -> Dict[str, Any]:
+async def get_template(template_id: str, template_library=Depends(get_shared_template_library)) -> Dict[str, Any]:
     """
     Get template details by ID.
     
@@ -660,7 +664,8 @@ async def create_template(
     optional_vars: List[str] = Body(default=[]),
     tech_stack: List[str] = Body(default=[]),
     complexity: str = Body("medium"),
-    author: str = Body("default_user")
+    author: str = Body("default_user"),
+    template_library=Depends(get_shared_template_library)
 ) -> Dict[str, Any]:
     """
     Create a custom project template.
@@ -705,7 +710,9 @@ async def create_project_from_template(
     template_id: str = Body(..., description="Template ID to use"),
     project_name: str = Body(..., description="Name for new project"),
     variables: Dict[str, str] = Body(default={}, description="Template variables"),
-    owner_id: str = Body("default_user", description="Owner user ID")
+    owner_id: str = Body("default_user", description="Owner user ID"),
+    project_store=Depends(get_shared_project_store),
+    template_library=Depends(get_shared_template_library)
 ) -> Dict[str, Any]:
     """
     Create a new project from a template.
@@ -771,7 +778,7 @@ async def create_project_from_template(
 # ============================================================================
 
 @documentation_router.get("/projects/{project_id}/docs")
-async def get_all_documentation(project_id: str) -> Dict[str, Any]:
+async def get_all_documentation(project_id: str, project_store=Depends(get_shared_project_store)) -> Dict[str, Any]:
     """
     Get all documentation for a project.
     
@@ -780,8 +787,8 @@ async def get_all_documentation(project_id: str) -> Dict[str, Any]:
     **Requirements**: 1.1, 1.2, 1.3, 1.4
     """
     try:
-        # Load project
-        project = await project_store.load_context(project_id)
+        # Load project, then only the documentation files
+        project = await project_store.load_context(project_id, lazy=True)
         
         if not project:
             raise HTTPException(
@@ -792,6 +799,8 @@ async def get_all_documentation(project_id: str) -> Dict[str, Any]:
         # Extract documentation files from codebase
         docs = {}
         doc_files = ["README.md", "API.md", "USER_GUIDE.md", "DEPLOYMENT.md"]
+        if isinstance(project.codebase, LazyCodebase):
+            await project.codebase.prefetch(doc_files)
         
         for doc_file in doc_files:
             if doc_file in project.codebase:
@@ -812,18 +821,20 @@ async def get_all_documentation(project_id: str) -> Dict[str, Any]:
 
 
 @documentation_router.get("/projects/{project_id}/docs/readme")
-async def get_readme(project_id: str) -> Dict[str, Any]:
+async def get_readme(project_id: str, project_store=Depends(get_shared_project_store)) -> Dict[str, Any]:
     """
     Get README documentation.
     
     **Requirements**: 1.1
     """
     try:
-        project = await project_store.load_context(project_id)
+        project = await project_store.load_context(project_id, lazy=True)
         
         if not project:
             raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
         
+        if isinstance(project.codebase, LazyCodebase):
+            await project.codebase.prefetch(["README.md"])
         readme = project.codebase.get("README.md", "")
         
         if not readme:
@@ -844,18 +855,20 @@ async def get_readme(project_id: str) -> Dict[str, Any]:
 
 
 @documentation_router.get("/projects/{project_id}/docs/api")
-async def get_api_docs(project_id: str) -> Dict[str, Any]:
+async def get_api_docs(project_id: str, project_store=Depends(get_shared_project_store)) -> Dict[str, Any]:
     """
     Get API documentation.
     
     **Requirements**: 1.2
     """
     try:
-        project = await project_store.load_context(project_id)
+        project = await project_store.load_context(project_id, lazy=True)
         
         if not project:
             raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
         
+        if isinstance(project.codebase, LazyCodebase):
+            await project.codebase.prefetch(["API.md"])
         api_docs = project.codebase.get("API.md", "")
         
         if not api_docs:
@@ -876,18 +889,20 @@ async def get_api_docs(project_id: str) -> Dict[str, Any]:
 
 
 @documentation_router.get("/projects/{project_id}/docs/user-guide")
-async def get_user_guide(project_id: str) -> Dict[str, Any]:
+async def get_user_guide(project_id: str, project_store=Depends(get_shared_project_store)) -> Dict[str, Any]:
     """
     Get user guide documentation.
     
     **Requirements**: 1.4
     """
     try:
-        project = await project_store.load_context(project_id)
+        project = await project_store.load_context(project_id, lazy=True)
         
         if not project:
             raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
         
+        if isinstance(project.codebase, LazyCodebase):
+            await project.codebase.prefetch(["USER_GUIDE.md"])
         user_guide = project.codebase.get("USER_GUIDE.md", "")
         
         if not user_guide:
@@ -910,7 +925,8 @@ async def get_user_guide(project_id: str) -> Dict[str, Any]:
 @documentation_router.post("/projects/{project_id}/docs/regenerate", status_code=202)
 async def regenerate_documentation(
     project_id: str,
-    doc_types: List[str] = Body(default=["readme", "api", "user_guide", "deployment"])
+    doc_types: List[str] = Body(default=["readme", "api", "user_guide", "deployment"]),
+    project_store=Depends(get_shared_project_store)
 ) -> Dict[str, Any]:
     """
     Regenerate documentation for a project.
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the agent pipeline.
+
+Run against the LLM simulator (utils/llm_simulator.py), so results are
+reproducible without network access.
+"""
@@ -0,0 +1,410 @@
+"""
+Micro-benchmarks for the CPU-bound pure-Python hot paths.
+
+Each case runs one operation against generated inputs of increasing size
+(10 to 10,000 tasks/files/entries, 1 KB to 1 MB responses) and reports:
+- ops/sec (best of several timed runs) and time per op
+- allocations per op (tracemalloc peak and net bytes)
+- the scaling exponent between the two largest sizes, flagged as a
+  blow-up when it exceeds the case's expected complexity
+
+Sizes whose predicted time per op exceeds --budget are skipped instead of
+hanging the run. Results can be saved as a baseline and later runs compared
+against it; a regression beyond --tolerance exits non-zero.
+
+Usage:
+    python -m benchmarks.micro_benchmarks
+    python -m benchmarks.micro_benchmarks --cases toon,dependency --max-size 1000
+    python -m benchmarks.micro_benchmarks --save-baseline benchmarks/micro_baseline.json
+    python -m benchmarks.micro_benchmarks --compare benchmarks/micro_baseline.json
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import itertools
+import platform
+import tempfile
+import contextlib
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.pipeline_benchmark import synthetic_plan, write_report, _git_commit
+
+logger = logging.getLogger(__name__)
+
+TASK_SIZES = [10, 100, 1000, 10000]
+BYTE_SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024]
+
+
+@dataclass
+class MicroCase:
+    """
+    One micro-benchmark.
+
+    `setup(size)` builds the input for a size (untimed) and returns the
+    zero-argument operation to time, or a context manager yielding it when
+    the input holds resources (temporary directories) to release after the
+    size is measured. `expected_exponent` is the complexity the operation
+    should have in `size` (0 = O(1), 1 = O(n)).
+    """
+    name: str
+    unit: str
+    sizes: List[int]
+    expected_exponent: float
+    setup: Callable[[int], Any]
+
+    @contextlib.contextmanager
+    def prepared(self, size: int) -> Iterator[Callable[[], Any]]:
+        """The operation for a size; resources held by its setup are released on exit."""
+        op = self.setup(size)
+        if isinstance(op, contextlib.AbstractContextManager):
+            with op as prepared_op:
+                yield prepared_op
+        else:
+            yield op
+
+
+# ============================================================================
+# Input Generators
+# ============================================================================
+
+def llm_response(size: int, seed: int = 0) -> str:
+    """A dev-agent style response of about `size` bytes: prose and fenced code blocks."""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    index = 0
+    while length < size:
+        lines = "\n".join(
+            f"    value_{j} = compute_{rng.randint(0, 999)}(value_{j - 1 if j else 0})"
+            for j in range(rng.randint(5, 30))
+        )
+        part = (
+            f"Module {index} handles part of the feature.\n\n"
+            f"```python\n# src/module_{index:05d}.py\ndef handler_{index}():\n{lines}\n```\n\n"
+        )
+        parts.append(part)
+        length += len(part)
+        index += 1
+    return "".join(parts)
+
+
+def template_text(size: int, variable_count: int = 20) -> str:
+    """About `size` bytes of template text with a {{placeholder}} on every line."""
+    lines = []
+    length = 0
+    for i in itertools.count():
+        if length >= size:
+            break
+        line = f"line {i}: configure {{{{var_{i % variable_count}}}}} for the service\n"
+        lines.append(line)
+        length += len(line)
+    return "".join(lines)
+
+
+# ============================================================================
+# Cases
+# ============================================================================
+
+def _toon_parse(size: int) -> Callable[[], Any]:
+    from utils.toon_parser import TOONParser
+    text = TOONParser.serialize_plan_to_toon(synthetic_plan("bench", size, "random"))
+    return lambda: TOONParser.parse_toon_to_dict(text)
+
+
+def _toon_serialize(size: int) -> Callable[[], Any]:
+    from utils.toon_parser import TOONParser
+    plan = synthetic_plan("bench", size, "random")
+    return lambda: TOONParser.serialize_plan_to_toon(plan)
+
+
+def _extract_code_blocks(size: int) -> Callable[[], Any]:
+    from agents.dev_agent import DevAgent
+    agent = object.__new__(DevAgent)  # the parser needs no agent state
+    text = llm_response(size)
+    return lambda: agent._extract_code_blocks(text)
+
+
+def _dependency_build(size: int) -> Callable[[], Any]:
+    from utils.dependency_analyzer import DependencyAnalyzer
+    tasks = synthetic_plan("bench", size, "random")["tasks"]
+    return lambda: DependencyAnalyzer().build_dependency_graph(tasks)
+
+
+def _built_analyzer(size: int):
+    from utils.dependency_analyzer import DependencyAnalyzer
+    analyzer = DependencyAnalyzer()
+    analyzer.build_dependency_graph(synthetic_plan("bench", size, "random")["tasks"])
+    return analyzer
+
+
+def _dependency_sort(size: int) -> Callable[[], Any]:
+    return _built_analyzer(size).topological_sort
+
+
+def _critical_path(size: int) -> Callable[[], Any]:
+    return _built_analyzer(size).analyze_critical_path
+
+
+def _result_cache(size: int) -> Callable[[], Any]:
+    from utils.enhanced_components import ResultCache
+    cache = ResultCache(max_size=size)
+    for i in range(size):
+        cache.set({"title": f"task {i}"}, {"status": "completed"})
+    counter = itertools.count()
+
+    def op():
+        task = {"title": f"new task {next(counter)}"}
+        cache.set(task, {"status": "completed"})
+        return cache.get(task)
+    return op
+
+
+def _metrics_record(size: int) -> Callable[[], Any]:
+    from utils.metrics_stream import MetricsCollector, Metric, MetricType
+    collector = MetricsCollector()
+    for i in range(size):
+        collector.record(Metric(MetricType.PERFORMANCE, datetime.now(), {"latency": i % 100 / 10}))
+    metric = Metric(MetricType.PERFORMANCE, datetime.now(), {"latency": 1.5, "success_count": 1})
+    return lambda: collector.record(metric)
+
+
+@contextlib.contextmanager
+def _substitute_variables(size: int) -> Iterator[Callable[[], Any]]:
+    from utils.template_library import TemplateLibrary
+    with tempfile.TemporaryDirectory(prefix="micro-bench-") as storage_root:
+        library = TemplateLibrary(storage_root=storage_root)
+        text = template_text(size)
+        variables = {f"var_{i}": f"value-{i}" for i in range(20)}
+        yield lambda: library._substitute_variables(text, variables)
+
+
+CASES = [
+    MicroCase("toon.parse_toon_to_dict", "tasks", TASK_SIZES, 1.0, _toon_parse),
+    MicroCase("toon.serialize_plan_to_toon", "tasks", TASK_SIZES, 1.0, _toon_serialize),
+    MicroCase("dev_agent.extract_code_blocks", "bytes", BYTE_SIZES, 1.0, _extract_code_blocks),
+    MicroCase("dependency.build_dependency_graph", "tasks", TASK_SIZES, 1.0, _dependency_build),
+    MicroCase("dependency.topological_sort", "tasks", TASK_SIZES, 1.0, _dependency_sort),
+    MicroCase("dependency.analyze_critical_path", "tasks", TASK_SIZES, 1.0, _critical_path),
+    MicroCase("result_cache.set_get_at_capacity", "entries", TASK_SIZES, 0.0, _result_cache),
+    MicroCase("metrics.record", "recorded", TASK_SIZES, 0.0, _metrics_record),
+    MicroCase("template.substitute_variables", "bytes", BYTE_SIZES, 1.0, _substitute_variables),
+]
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+def time_op(op: Callable[[], Any], min_time: float = 0.2, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Time an operation, timeit-style.
+
+    Each of `repeat` runs loops the operation until it takes at least
+    `min_time`; the best run's time per op is reported. A single call slower
+    than `min_time` is run once only.
+    """
+    start = time.perf_counter()
+    op()
+    first = time.perf_counter() - start
+    if first >= min_time:
+        return {"iterations": 1, "time_per_op": first, "ops_per_sec": 1 / first if first else None}
+
+    loops = max(1, int(min_time / max(first, 1e-9)))
+    best = first
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return {"iterations": loops * repeat + 1, "time_per_op": best, "ops_per_sec": 1 / best if best else None}
+
+
+def measure_allocations(op: Callable[[], Any]) -> Dict[str, int]:
+    """Peak and net bytes allocated by one call (tracemalloc)."""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = op()
+        after, peak = tracemalloc.get_traced_memory()
+        del result
+        return {"alloc_peak_bytes": max(0, peak - before), "alloc_net_bytes": after - before}
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def scaling_exponent(results: List[Dict[str, Any]]) -> Optional[float]:
+    """Log-log slope of time per op between the two largest measured sizes."""
+    measured = [r for r in results if r.get("time_per_op")]
+    if len(measured) < 2:
+        return None
+    low, high = measured[-2], measured[-1]
+    return round(
+        math.log(high["time_per_op"] / low["time_per_op"]) / math.log(high["size"] / low["size"]), 2
+    )
+
+
+def run_case(case: MicroCase, sizes: Optional[List[int]] = None, min_time: float = 0.2,
+             budget: float = 5.0, exponent_slack: float = 0.5) -> Dict[str, Any]:
+    """
+    Run a case over its sizes, smallest first.
+
+    A size is skipped when the time per op predicted from the previous size
+    (at the observed or expected exponent, whichever is worse) exceeds
+    `budget` seconds, so a super-linear case reports its blow-up instead of
+    running for hours.
+    """
+    results: List[Dict[str, Any]] = []
+    for size in sizes or case.sizes:
+        measured = [r for r in results if r.get("time_per_op")]
+        if measured:
+            exponent = max(scaling_exponent(results) or 0.0, case.expected_exponent)
+            predicted = measured[-1]["time_per_op"] * (size / measured[-1]["size"]) ** exponent
+            if predicted > budget:
+                results.append({"size": size, "skipped": f"predicted {predicted:.1f}s per op exceeds budget"})
+                continue
+        try:
+            with case.prepared(size) as op:
+                result = {"size": size, **time_op(op, min_time=min_time)}
+                result.update(measure_allocations(op))
+        except Exception as e:  # e.g. RecursionError on deep graphs
+            result = {"size": size, "error": f"{type(e).__name__}: {e}"[:200]}
+        results.append(result)
+        logger.info(f"⏱️ {case.name}[{size}]: {result}")
+
+    exponent = scaling_exponent(results)
+    return {
+        "name": case.name,
+        "unit": case.unit,
+        "expected_exponent": case.expected_exponent,
+        "exponent": exponent,
+        "blowup": bool(
+            any("skipped" in r or "error" in r for r in results)
+            or (exponent is not None and exponent > case.expected_exponent + exponent_slack)
+        ),
+        "results": results
+    }
+
+
+# ============================================================================
+# Baselines
+# ============================================================================
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    """
+    Compare ops/sec per (case, size) against a baseline report.
+
+    Returns one entry per size present in both, with `regression` set when
+    throughput dropped by more than `tolerance` (a fraction).
+    """
+    base = {
+        (case["name"], r["size"]): r["ops_per_sec"]
+        for case in baseline.get("cases", []) for r in case["results"] if r.get("ops_per_sec")
+    }
+    comparison = []
+    for case in report["cases"]:
+        for r in case["results"]:
+            before = base.get((case["name"], r["size"]))
+            if not before:
+                continue
+            after = r.get("ops_per_sec") or 0.0
+            ratio = after / before
+            comparison.append({
+                "name": case["name"], "size": r["size"],
+                "baseline_ops_per_sec": before, "ops_per_sec": after,
+                "ratio": round(ratio, 3), "regression": ratio < 1 - tolerance
+            })
+    return comparison
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the selected cases and collect the report."""
+    cases = [c for c in CASES if not args.cases or any(c.name.startswith(p) for p in args.cases)]
+    results = []
+    for case in cases:
+        sizes = [s for s in case.sizes if s <= args.max_size] if case.unit != "bytes" else case.sizes
+        results.append(run_case(case, sizes, min_time=args.min_time, budget=args.budget,
+                                exponent_slack=args.exponent_slack))
+
+    return {
+        "benchmark": "micro",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"cases": args.cases, "max_size": args.max_size, "min_time": args.min_time,
+                   "budget": args.budget},
+        "cases": results
+    }
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for pure-Python hot paths")
+    parser.add_argument("--cases", default="", type=lambda v: [c for c in v.split(",") if c],
+                        help="Comma-separated case name prefixes (default: all)")
+    parser.add_argument("--max-size", default=max(TASK_SIZES), type=int,
+                        help="Largest task/entry count to run")
+    parser.add_argument("--min-time", default=0.2, type=float, help="Minimum seconds per timed run")
+    parser.add_argument("--budget", default=5.0, type=float,
+                        help="Skip sizes predicted to take longer than this per op (seconds)")
+    parser.add_argument("--exponent-slack", default=0.5, type=float,
+                        help="Flag a blow-up when the exponent exceeds the expected one by this")
+    parser.add_argument("--compare", help="Baseline report to compare against")
+    parser.add_argument("--tolerance", default=0.25, type=float,
+                        help="Allowed ops/sec drop versus the baseline (fraction)")
+    parser.add_argument("--save-baseline", help="Write this run's report as a baseline")
+    parser.add_argument("--output", help="Write JSON here (.jsonl appends one line per run; default stdout)")
+    parser.add_argument("--log-level", default="WARNING", help="Logging level")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point; returns 1 when a baseline comparison finds a regression."""
+    args = parse_args(argv)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    logging.basicConfig(level=args.log_level.upper())
+
+    report = run_benchmark(args)
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = compare_to_baseline(report, json.load(f), args.tolerance)
+        regressions = [c for c in report["comparison"] if c["regression"]]
+    if args.save_baseline:
+        write_report(report, args.save_baseline)
+    write_report(report, args.output)
+
+    for case in report["cases"]:
+        if case["blowup"]:
+            logger.warning(
+                f"⚠️ {case['name']}: scaling exponent {case['exponent']} "
+                f"(expected {case['expected_exponent']})"
+            )
+    for regression in regressions:
+        logger.warning(
+            f"⚠️ Regression: {regression['name']}[{regression['size']}] "
+            f"{regression['ops_per_sec']:.1f} ops/s vs {regression['baseline_ops_per_sec']:.1f} baseline"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,500 @@
+"""
+End-to-end pipeline throughput benchmark.
+
+Drives the Phase 2 path (EnhancedPipelineManager.analyze_and_submit_plan)
+and the Phase 1 path (main.execute_sequential) with synthetic plans of
+various sizes and dependency-graph shapes, against the LLM simulator. Real
+Dev and QA agents run; deployment is replaced by a no-op Ops agent.
+
+Reports per scenario, as JSON:
+- throughput (plans/min, tasks/s) and plan latency percentiles
+- queue wait percentiles per stage (Phase 2)
+- stage latency percentiles from tracing spans (pipeline.*, dev.*, qa.*, llm.*)
+- peak RSS, event-loop lag and slow callbacks (utils/loop_monitor.py)
+
+Usage:
+    python -m benchmarks.pipeline_benchmark --mode phase2 --sizes 5,20 --shapes chain,fanout
+    python -m benchmarks.pipeline_benchmark --time-scale 0.1 --output bench.jsonl
+
+A .jsonl output gets one line appended per run, for tracking results from
+commit to commit. Simulator settings not exposed as flags are read from
+LLM_SIM_* environment variables.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import argparse
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+SHAPES = ("independent", "chain", "fanout", "layered", "random")
+MODES = ("phase2", "sequential")
+
+
+# ============================================================================
+# Synthetic Plans
+# ============================================================================
+
+def plan_dependencies(size: int, shape: str, rng: random.Random) -> List[List[int]]:
+    """
+    Dependency lists (0-based task indexes) for a plan graph shape.
+
+    Shapes:
+        independent: no dependencies
+        chain: each task depends on the previous one
+        fanout: every task depends on the first
+        layered: ~sqrt(size) layers, each task depends on up to 3 tasks of the previous layer
+        random: each task depends on 0-2 random earlier tasks
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown plan shape '{shape}' (available: {', '.join(SHAPES)})")
+    width = max(1, round(math.sqrt(size)))
+    dependencies = []
+    for i in range(size):
+        if i == 0 or shape == "independent":
+            deps = []
+        elif shape == "chain":
+            deps = [i - 1]
+        elif shape == "fanout":
+            deps = [0]
+        elif shape == "layered":
+            layer = i // width
+            previous = list(range((layer - 1) * width, layer * width)) if layer else []
+            deps = sorted(rng.sample(previous, min(3, len(previous))))
+        else:
+            deps = sorted(rng.sample(range(i), min(i, rng.randint(0, 2))))
+        dependencies.append(deps)
+    return dependencies
+
+
+def synthetic_plan(plan_id: str, size: int, shape: str, seed: int = 0) -> Dict[str, Any]:
+    """
+    Build a plan dictionary whose tasks import each other along the graph shape.
+
+    Each task generates one file and its `code` imports its dependencies, so
+    the pipeline's DependencyAnalyzer sees the same graph as `dependencies`.
+    """
+    rng = random.Random(f"{seed}:{plan_id}")
+    tasks = []
+    for i, deps in enumerate(plan_dependencies(size, shape, rng)):
+        tasks.append({
+            "id": f"{plan_id}-{i + 1:03d}",
+            "title": f"Component {i + 1} of {plan_id}",
+            "description": f"Implement component {i + 1} for benchmark plan {plan_id}",
+            "priority": min(10, 1 + i // 5),
+            "dependencies": [f"{plan_id}-{d + 1:03d}" for d in deps],
+            "estimated_hours": 1.0,
+            "complexity": rng.choice(["low", "medium", "high"]),
+            "agent_type": "dev_agent",
+            "files_to_generate": [f"{plan_id}_component_{i + 1:03d}.py"],
+            "code": "\n".join(f"import {plan_id}_component_{d + 1:03d}" for d in deps)
+        })
+    return {
+        "id": plan_id,
+        "title": f"Benchmark plan {plan_id}",
+        "description": f"Synthetic {shape} plan with {size} tasks",
+        "tasks": tasks
+    }
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+def _summary(values: List[float]) -> Dict[str, Any]:
+    """count/mean/p50/p95/p99/max of raw samples (seconds, rounded to ms)."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": round(ordered[int(last * 0.50)], 3),
+        "p95": round(ordered[int(last * 0.95)], 3),
+        "p99": round(ordered[int(last * 0.99)], 3),
+        "max": round(ordered[-1], 3)
+    }
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageLatencyExporter:
+    """Span exporter collecting durations per span name."""
+
+    PREFIXES = ("pipeline.", "dev.", "qa.", "pm.", "llm.", "task.")
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = {}
+
+    def export(self, span):
+        if span.end_ns is not None and span.name.startswith(self.PREFIXES):
+            self.durations.setdefault(span.name, []).append((span.end_ns - span.start_ns) / 1e9)
+
+    def flush(self):
+        pass
+
+    def shutdown(self):
+        pass
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {name: _summary(values) for name, values in sorted(self.durations.items())}
+
+
+# ============================================================================
+# Harness Doubles (no real deployment or client)
+# ============================================================================
+
+class BenchmarkWebSocket:
+    """Stand-in client connection that counts messages."""
+
+    def __init__(self):
+        self.client = SimpleNamespace(host="benchmark", port=0)
+        self.messages = 0
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message: Dict[str, Any]):
+        self.messages += 1
+
+    async def send_text(self, message: str):
+        self.messages += 1
+
+
+class BenchmarkOpsAgent:
+    """Ops agent that completes deployments instantly and records plan completion."""
+
+    agent_id = "ops_agent"
+
+    def __init__(self, plan_sizes: Dict[str, int], submitted_at: Dict[str, float]):
+        self.plan_sizes = plan_sizes
+        self.submitted_at = submitted_at
+        self.deployed: Dict[str, int] = {}
+        self.plan_latencies: List[float] = []
+
+    async def execute_task(self, task):
+        from models.enums import TaskStatus
+        plan_id = (task.metadata or {}).get("plan_id")
+        self.deployed[plan_id] = self.deployed.get(plan_id, 0) + 1
+        if self.deployed[plan_id] == self.plan_sizes.get(plan_id):
+            self.plan_latencies.append(time.perf_counter() - self.submitted_at[plan_id])
+        task.status = TaskStatus.COMPLETED
+        return task
+
+
+# ============================================================================
+# Scenarios
+# ============================================================================
+
+async def run_phase2(size: int, shape: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Submit args.plans plans to a fresh EnhancedPipelineManager and wait for completion."""
+    from agents.dev_agent import DevAgent
+    from agents.qa_agent import QAAgent
+    from parse.websocket_manager import WebSocketManager
+    from utils.enhanced_pipeline_manager import EnhancedPipelineManager
+
+    websocket_manager = WebSocketManager()
+    websocket = BenchmarkWebSocket()
+    await websocket_manager.connect(websocket)
+
+    plans = [
+        synthetic_plan(f"p{shape[:3]}{size}x{n}", size, shape, args.seed)
+        for n in range(args.plans)
+    ]
+    submitted_at: Dict[str, float] = {}
+    ops_agent = BenchmarkOpsAgent({plan["id"]: size for plan in plans}, submitted_at)
+
+    manager = EnhancedPipelineManager(
+        dev_workers_min=args.dev_workers[0],
+        dev_workers_max=args.dev_workers[1],
+        qa_workers_min=args.qa_workers[0],
+        qa_workers_max=args.qa_workers[1],
+        enable_cache=args.cache
+    )
+    manager.set_agents(
+        dev_agent=DevAgent(websocket_manager),
+        qa_agent=QAAgent(websocket_manager),
+        ops_agent=ops_agent
+    )
+    await manager.start()
+
+    start = time.perf_counter()
+    try:
+        for plan in plans:
+            submitted_at[plan["id"]] = time.perf_counter()
+            await manager.analyze_and_submit_plan(
+                plan=plan, websocket=websocket, project_desc=plan["description"], tenant_id=plan["id"]
+            )
+        await asyncio.wait_for(manager.wait_until_complete(check_interval=0.05), timeout=args.timeout)
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+    elapsed = time.perf_counter() - start
+    await manager.stop(graceful=False, timeout=5.0)
+
+    stats = manager.get_enhanced_stats()
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "timed_out": timed_out,
+        "plans_completed": len(ops_agent.plan_latencies),
+        "tasks_deployed": sum(ops_agent.deployed.values()),
+        "plan_latency": _summary(ops_agent.plan_latencies),
+        "queue_wait": {
+            queue.name: queue.get_wait_stats()
+            for queue in (manager.unified_queue, manager.qa_queue, manager.deploy_queue)
+        },
+        "dlq_size": stats["dlq_size"],
+        "cache_hit_rate": stats["cache"].get("hit_rate") if stats["cache"] else None
+    }
+
+
+async def run_sequential(size: int, shape: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run args.plans plans one after another through main.execute_sequential."""
+    import main
+    from agents.pm_agent import PlannerAgent
+    from agents.dev_agent import DevAgent
+    from agents.qa_agent import QAAgent
+    from models.enums import TaskStatus
+    from utils.llm_setup import get_client
+    from utils.toon_parser import TOONParser
+
+    main.GENERATED_CODE_ROOT = main.Path.cwd() / "generated_code"
+    main.planner_agent = PlannerAgent(websocket_manager=main.websocket_manager)
+    main.dev_agent = DevAgent(websocket_manager=main.websocket_manager)
+    main.qa_agent = QAAgent(websocket_manager=main.websocket_manager)
+    main.ops_agent = BenchmarkOpsAgent({}, {})
+
+    client = await get_client()
+    websocket = BenchmarkWebSocket()
+    await main.websocket_manager.connect(websocket)
+
+    plan_latencies = []
+    tasks_completed = 0
+    start = time.perf_counter()
+    try:
+        for n in range(args.plans):
+            plan = synthetic_plan(f"s{shape[:3]}{size}x{n}", size, shape, args.seed)
+            # The planner's prompt for this request is answered with the synthetic plan
+            client.backend.recordings.add(
+                match=rf"(?=[\s\S]*PLAN<)[\s\S]*{plan['id']}\b",
+                response=TOONParser.serialize_plan_to_toon(plan)
+            )
+            plan_start = time.perf_counter()
+            await asyncio.wait_for(
+                main.execute_sequential(websocket, f"Build benchmark project {plan['id']}"),
+                timeout=args.timeout
+            )
+            plan_latencies.append(time.perf_counter() - plan_start)
+            current = main.planner_agent.current_plan
+            tasks_completed += sum(1 for t in current.tasks if t.status == TaskStatus.COMPLETED) if current else 0
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+    elapsed = time.perf_counter() - start
+    main.websocket_manager.disconnect(websocket)
+
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "timed_out": timed_out,
+        "plans_completed": len(plan_latencies),
+        "tasks_completed": tasks_completed,
+        "plan_latency": _summary(plan_latencies)
+    }
+
+
+async def run_scenario(mode: str, size: int, shape: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one scenario with loop-lag and span instrumentation."""
+    from utils.tracing import get_tracer
+    from utils.loop_monitor import LoopMonitor
+
+    tracer = get_tracer()
+    exporter = StageLatencyExporter()
+    tracer.add_exporter(exporter)
+    monitor = LoopMonitor(interval=0.05, slow_callback_threshold=0.1)
+    monitor.start()
+    logger.info(f"🏁 Benchmark scenario: mode={mode} size={size} shape={shape} plans={args.plans}")
+    try:
+        runner = run_phase2 if mode == "phase2" else run_sequential
+        result = await runner(size, shape, args)
+    finally:
+        await monitor.stop()
+        tracer.exporters.remove(exporter)
+
+    elapsed = result["elapsed_seconds"]
+    completed_tasks = result.get("tasks_deployed", result.get("tasks_completed", 0))
+    return {
+        "mode": mode,
+        "size": size,
+        "shape": shape,
+        "plans": args.plans,
+        **result,
+        "throughput": {
+            "plans_per_minute": round(result["plans_completed"] * 60 / elapsed, 3) if elapsed else None,
+            "tasks_per_second": round(completed_tasks / elapsed, 3) if elapsed else None
+        },
+        "stage_latency": exporter.summary(),
+        "event_loop_lag": monitor.lag.lifetime.snapshot(),
+        "slow_callbacks": [
+            {"coroutine": r.coroutine, "location": r.location, "duration": r.duration}
+            for r in monitor.reports
+        ],
+        "peak_rss_bytes": peak_rss_bytes()
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run every (mode, shape, size) scenario and collect the report."""
+    from utils.llm_setup import get_client
+
+    client = await get_client()
+    scenarios = []
+    for mode in args.modes:
+        for shape in args.shapes:
+            for size in args.sizes:
+                scenarios.append(await run_scenario(mode, size, shape, args))
+
+    return {
+        "benchmark": "pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "modes": args.modes, "sizes": args.sizes, "shapes": args.shapes, "plans": args.plans,
+            "dev_workers": args.dev_workers, "qa_workers": args.qa_workers, "cache": args.cache,
+            "seed": args.seed
+        },
+        "llm_backend": client.backend.get_stats(),
+        "scenarios": scenarios
+    }
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def _worker_range(value: str) -> List[int]:
+    low, _, high = value.partition("-")
+    return [int(low), int(high or low)]
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="End-to-end pipeline throughput benchmark")
+    parser.add_argument("--mode", dest="modes", default="phase2,sequential",
+                        type=lambda v: v.split(","), help=f"Comma-separated: {', '.join(MODES)}")
+    parser.add_argument("--sizes", default="5,20", type=_int_list, help="Tasks per plan (comma-separated)")
+    parser.add_argument("--shapes", default="independent,chain,fanout,layered",
+                        type=lambda v: v.split(","), help=f"Graph shapes: {', '.join(SHAPES)}")
+    parser.add_argument("--plans", default=3, type=int, help="Plans per scenario")
+    parser.add_argument("--dev-workers", default="2-10", type=_worker_range, help="Dev worker range (min-max)")
+    parser.add_argument("--qa-workers", default="1-5", type=_worker_range, help="QA worker range (min-max)")
+    parser.add_argument("--no-cache", dest="cache", action="store_false", help="Disable the dev result cache")
+    parser.add_argument("--seed", default=0, type=int, help="Plan and simulator seed")
+    parser.add_argument("--latency", help="Simulator first-token latency spec, e.g. lognormal:0.8,0.4")
+    parser.add_argument("--tokens-per-second", type=float, help="Simulator token rate")
+    parser.add_argument("--time-scale", type=float, help="Multiply all simulated delays (e.g. 0.1)")
+    parser.add_argument("--error-rate", type=float, help="Simulator 503 injection rate")
+    parser.add_argument("--rate-limit-rate", type=float, help="Simulator 429 injection rate")
+    parser.add_argument("--timeout", default=600.0, type=float, help="Per-scenario timeout (seconds)")
+    parser.add_argument("--workdir", help="Directory for generated files (default: a temp dir)")
+    parser.add_argument("--output", help="Write JSON here (.jsonl appends one line per run; default stdout)")
+    parser.add_argument("--log-level", default="WARNING", help="Logging level")
+    args = parser.parse_args(argv)
+
+    for mode in args.modes:
+        if mode not in MODES:
+            parser.error(f"Unknown mode '{mode}'")
+    for shape in args.shapes:
+        if shape not in SHAPES:
+            parser.error(f"Unknown shape '{shape}'")
+    return args
+
+
+def configure_environment(args: argparse.Namespace):
+    """Select the simulator backend and isolate generated files (before agents are imported)."""
+    os.environ["LLM_BACKEND"] = "simulator"
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ["LLM_SIM_SEED"] = str(args.seed)
+    overrides = {
+        "LLM_SIM_LATENCY": args.latency,
+        "LLM_SIM_TOKENS_PER_SECOND": args.tokens_per_second,
+        "LLM_SIM_TIME_SCALE": args.time_scale,
+        "LLM_SIM_ERROR_RATE": args.error_rate,
+        "LLM_SIM_429_RATE": args.rate_limit_rate
+    }
+    for name, value in overrides.items():
+        if value is not None:
+            os.environ[name] = str(value)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="pipeline-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+
+def write_report(report: Dict[str, Any], output: Optional[str]):
+    """Write the report as JSON (stdout, a .json file, or a line appended to .jsonl)."""
+    if not output:
+        print(json.dumps(report, indent=2))
+    elif output.endswith(".jsonl"):
+        with open(output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+    else:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def main(argv: Optional[List[str]] = None):
+    """CLI entry point."""
+    args = parse_args(argv)
+    if args.output:
+        args.output = os.path.abspath(args.output)
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, repo_root)
+    configure_environment(args)
+    logging.basicConfig(level=args.log_level.upper())
+
+    report = asyncio.run(run_benchmark(args))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Align tables with the application models
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-01-01 00:03:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Make the tables hold models.project_context / models.template data.
+
+    - Text IDs ("proj_...", "mod_...", template slugs) instead of UUIDs
+    - Project statuses and types, ModificationPlan statuses and template
+      categories of the application enums
+    - Project files move from the codebase JSONB column to project_files
+      (one row per file, bulk loaded with COPY)
+    - Modification and deployment history as JSONB arrays on
+      project_contexts, appended to in place
+    - ModificationPlan approval/execution columns on modifications
+    """
+
+    # Text IDs (the foreign key is recreated around the type change)
+    op.execute('ALTER TABLE modifications DROP CONSTRAINT IF EXISTS modifications_project_id_fkey')
+    op.execute('ALTER TABLE project_contexts ALTER COLUMN id DROP DEFAULT')
+    op.execute('ALTER TABLE project_contexts ALTER COLUMN id TYPE TEXT USING id::text')
+    op.execute('ALTER TABLE modifications ALTER COLUMN id DROP DEFAULT')
+    op.execute('ALTER TABLE modifications ALTER COLUMN id TYPE TEXT USING id::text')
+    op.execute('ALTER TABLE modifications ALTER COLUMN project_id TYPE TEXT USING project_id::text')
+    op.execute("""
+        ALTER TABLE modifications ADD CONSTRAINT modifications_project_id_fkey
+            FOREIGN KEY (project_id) REFERENCES project_contexts(id) ON DELETE CASCADE
+    """)
+    op.execute('ALTER TABLE templates ALTER COLUMN id DROP DEFAULT')
+    op.execute('ALTER TABLE templates ALTER COLUMN id TYPE TEXT USING id::text')
+
+    # Application enums
+    op.execute('ALTER TABLE project_contexts DROP CONSTRAINT IF EXISTS check_project_type')
+    op.execute('ALTER TABLE project_contexts DROP CONSTRAINT IF EXISTS project_contexts_type_check')
+    op.execute("""
+        ALTER TABLE project_contexts ADD CONSTRAINT check_project_type
+            CHECK (type IN ('api', 'web_app', 'mobile_backend', 'data_pipeline', 'microservice', 'other'))
+    """)
+    op.execute('ALTER TABLE project_contexts DROP CONSTRAINT IF EXISTS check_project_status')
+    op.execute('ALTER TABLE project_contexts DROP CONSTRAINT IF EXISTS project_contexts_status_check')
+    op.execute("UPDATE project_contexts SET status = 'in_progress' WHERE status = 'active'")
+    op.execute("UPDATE project_contexts SET status = 'archived' WHERE status = 'deleted'")
+    op.execute("ALTER TABLE project_contexts ALTER COLUMN status SET DEFAULT 'created'")
+    op.execute("""
+        ALTER TABLE project_contexts ADD CONSTRAINT check_project_status
+            CHECK (status IN ('created', 'in_progress', 'deployed', 'archived', 'failed'))
+    """)
+    op.execute('ALTER TABLE modifications DROP CONSTRAINT IF EXISTS check_modification_status')
+    op.execute('ALTER TABLE modifications DROP CONSTRAINT IF EXISTS modifications_status_check')
+    op.execute("UPDATE modifications SET status = 'pending_approval' WHERE status = 'pending'")
+    op.execute("UPDATE modifications SET status = 'completed' WHERE status = 'applied'")
+    op.execute("ALTER TABLE modifications ALTER COLUMN status TYPE VARCHAR(32)")
+    op.execute("ALTER TABLE modifications ALTER COLUMN status SET DEFAULT 'pending_approval'")
+    op.execute("""
+        ALTER TABLE modifications ADD CONSTRAINT check_modification_status
+            CHECK (status IN ('pending_approval', 'approved', 'rejected', 'in_progress',
+                              'completed', 'failed', 'rolled_back'))
+    """)
+    op.execute('ALTER TABLE templates DROP CONSTRAINT IF EXISTS check_template_category')
+    op.execute('ALTER TABLE templates DROP CONSTRAINT IF EXISTS templates_category_check')
+    op.execute("""
+        UPDATE templates SET category = CASE category
+            WHEN 'web' THEN 'web_app' WHEN 'mobile' THEN 'mobile_backend' WHEN 'data' THEN 'data_pipeline'
+            ELSE category END
+    """)
+    op.execute("""
+        ALTER TABLE templates ADD CONSTRAINT check_template_category
+            CHECK (category IN ('api', 'web_app', 'mobile_backend', 'data_pipeline', 'microservice'))
+    """)
+
+    # Dependencies become {name, version, type} objects (models.project_context.Dependency)
+    op.execute("ALTER TABLE project_contexts ADD COLUMN dependencies_json JSONB DEFAULT '[]'::jsonb")
+    op.execute("""
+        UPDATE project_contexts SET dependencies_json = COALESCE(
+            (SELECT jsonb_agg(jsonb_build_object('name', d, 'version', '*', 'type', 'runtime'))
+             FROM unnest(dependencies) AS d),
+            '[]'::jsonb
+        )
+    """)
+    op.execute('ALTER TABLE project_contexts DROP COLUMN dependencies')
+    op.execute('ALTER TABLE project_contexts RENAME COLUMN dependencies_json TO dependencies')
+
+    # Project columns the application model has
+    op.execute("""
+        ALTER TABLE project_contexts
+            ADD COLUMN IF NOT EXISTS modifications JSONB DEFAULT '[]'::jsonb,
+            ADD COLUMN IF NOT EXISTS deployments JSONB DEFAULT '[]'::jsonb,
+            ADD COLUMN IF NOT EXISTS description TEXT DEFAULT '',
+            ADD COLUMN IF NOT EXISTS repository_url TEXT
+    """)
+    op.execute("""
+        ALTER TABLE modifications
+            ADD COLUMN IF NOT EXISTS approved_at TIMESTAMP WITH TIME ZONE,
+            ADD COLUMN IF NOT EXISTS approved_by VARCHAR(255),
+            ADD COLUMN IF NOT EXISTS started_at TIMESTAMP WITH TIME ZONE,
+            ADD COLUMN IF NOT EXISTS error_message TEXT
+    """)
+    op.execute("""
+        ALTER TABLE templates
+            ADD COLUMN IF NOT EXISTS author VARCHAR(255) DEFAULT 'system',
+            ADD COLUMN IF NOT EXISTS version VARCHAR(50) DEFAULT '1.0.0'
+    """)
+
+    # One row per project file
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS project_files (
+            project_id TEXT NOT NULL REFERENCES project_contexts(id) ON DELETE CASCADE,
+            path TEXT NOT NULL,
+            content TEXT NOT NULL,
+            content_hash CHAR(64) NOT NULL,
+            size INTEGER NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (project_id, path)
+        )
+    """)
+    op.execute("""
+        INSERT INTO project_files (project_id, path, content, content_hash, size)
+        SELECT p.id, f.key, f.value, encode(sha256(convert_to(f.value, 'UTF8')), 'hex'),
+               octet_length(convert_to(f.value, 'UTF8'))
+        FROM project_contexts p, jsonb_each_text(p.codebase) f
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute('DROP INDEX IF EXISTS idx_project_contexts_codebase')
+    op.execute('ALTER TABLE project_contexts DROP COLUMN IF EXISTS codebase')
+
+    # Keyset pagination order of project and modification listings
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_project_contexts_updated_at_id
+            ON project_contexts(updated_at DESC, id DESC)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_modifications_project_requested_at
+            ON modifications(project_id, requested_at DESC, id DESC)
+    """)
+
+
+def downgrade() -> None:
+    """
+    Restore the codebase JSONB column and drop the columns added above.
+
+    Text IDs and the new CHECK constraints are kept: existing IDs and
+    statuses cannot be mapped back.
+    """
+    op.execute('DROP INDEX IF EXISTS idx_modifications_project_requested_at')
+    op.execute('DROP INDEX IF EXISTS idx_project_contexts_updated_at_id')
+
+    op.execute("ALTER TABLE project_contexts ADD COLUMN IF NOT EXISTS codebase JSONB DEFAULT '{}'::jsonb")
+    op.execute("""
+        UPDATE project_contexts p SET codebase = f.files
+        FROM (SELECT project_id, jsonb_object_agg(path, content) AS files
+              FROM project_files GROUP BY project_id) f
+        WHERE f.project_id = p.id
+    """)
+    op.execute('CREATE INDEX IF NOT EXISTS idx_project_contexts_codebase ON project_contexts USING GIN (codebase)')
+    op.execute('DROP TABLE IF EXISTS project_files')
+
+    op.execute('ALTER TABLE templates DROP COLUMN IF EXISTS version, DROP COLUMN IF EXISTS author')
+    op.execute("""
+        ALTER TABLE modifications
+            DROP COLUMN IF EXISTS error_message,
+            DROP COLUMN IF EXISTS started_at,
+            DROP COLUMN IF EXISTS approved_by,
+            DROP COLUMN IF EXISTS approved_at
+    """)
+    op.execute("""
+        ALTER TABLE project_contexts
+            DROP COLUMN IF EXISTS repository_url,
+            DROP COLUMN IF EXISTS description,
+            DROP COLUMN IF EXISTS deployments,
+            DROP COLUMN IF EXISTS modifications
+    """)
+    op.execute("ALTER TABLE project_contexts ADD COLUMN dependencies_array TEXT[] DEFAULT ARRAY[]::TEXT[]")
+    op.execute("""
+        UPDATE project_contexts SET dependencies_array = ARRAY(
+            SELECT d->>'name' FROM jsonb_array_elements(dependencies) AS d
+        )
+    """)
+    op.execute('ALTER TABLE project_contexts DROP COLUMN dependencies')
+    op.execute('ALTER TABLE project_contexts RENAME COLUMN dependencies_array TO dependencies')
@@ -0,0 +1,46 @@
+"""Create codebase snapshot tables
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-01-01 00:04:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Keep codebase snapshots in the database instead of a host-local blob store.
+
+    - codebase_objects: trees and file bodies addressed by SHA-256
+    - codebase_manifests: named manifests (path -> hash) that keep objects
+      alive; snapshot manifests are named snapshots/{project_id}/{root}
+    """
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS codebase_objects (
+            hash CHAR(64) PRIMARY KEY,
+            data BYTEA NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS codebase_manifests (
+            name TEXT NOT NULL,
+            path TEXT NOT NULL,
+            hash CHAR(64) NOT NULL REFERENCES codebase_objects(hash),
+            PRIMARY KEY (name, path)
+        )
+    """)
+    op.execute('CREATE INDEX IF NOT EXISTS idx_codebase_manifests_hash ON codebase_manifests(hash)')
+
+
+def downgrade() -> None:
+    """Drop the codebase snapshot tables (snapshots recorded in them are lost)."""
+    op.execute('DROP TABLE IF EXISTS codebase_manifests')
+    op.execute('DROP TABLE IF EXISTS codebase_objects')
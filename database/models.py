@@ -20,13 +20,19 @@ class ProjectContext(BaseModel):
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
-    type: str  # 'api', 'web_app', 'mobile_backend', 'data_pipeline', 'microservice'
-    status: str = 'active'  # 'active', 'archived', 'deleted'
+    type: str  # 'api', 'web_app', 'mobile_backend', 'data_pipeline', 'microservice', 'other'
+    status: str = 'created'  # 'created', 'in_progress', 'deployed', 'archived', 'failed'
     owner_id: str
+    description: str = ''
+    repository_url: Optional[str] = None
     
-    # Code and structure (stored as JSONB)
+    # Code and structure (codebase rows live in project_files)
     codebase: Dict[str, str] = Field(default_factory=dict)  # filename -> content
-    dependencies: List[str] = Field(default_factory=list)
+    dependencies: List[Dict[str, str]] = Field(default_factory=list)  # stored as JSONB
+    
+    # History (stored as JSONB arrays)
+    modifications: List[Dict[str, Any]] = Field(default_factory=list)
+    deployments: List[Dict[str, Any]] = Field(default_factory=list)
     
     # Configuration (stored as JSONB)
     environment_vars: Dict[str, str] = Field(default_factory=dict)
@@ -45,16 +51,19 @@ class ProjectContext(BaseModel):
     class Config:
         json_schema_extra = {
             "example": {
-                "id": "550e8400-e29b-41d4-a716-446655440000",
+                "id": "proj_20240101_todo_api",
                 "name": "Todo API",
                 "type": "api",
-                "status": "active",
+                "status": "deployed",
                 "owner_id": "user123",
                 "codebase": {
                     "main.py": "from fastapi import FastAPI...",
                     "models.py": "from sqlalchemy import..."
                 },
-                "dependencies": ["fastapi", "sqlalchemy", "pytest"],
+                "dependencies": [
+                    {"name": "fastapi", "version": "0.110.0", "type": "runtime"},
+                    {"name": "pytest", "version": "8.0.0", "type": "dev"}
+                ],
                 "environment_vars": {
                     "DATABASE_URL": "postgresql://localhost/db",
                     "API_KEY": "***"
@@ -74,7 +83,8 @@ class Modification(BaseModel):
     """
     Modification model for tracking project changes.
     
-    Stores modification requests, impact analysis, and results.
+    Stores modification plans (models.modification_plan), impact analysis,
+    and results.
     """
     
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -90,8 +100,12 @@ class Modification(BaseModel):
     affected_files: List[str] = Field(default_factory=list)
     
     # Execution
-    status: str = 'pending'  # 'pending', 'approved', 'applied', 'failed', 'rejected'
+    status: str = 'pending_approval'  # 'pending_approval', 'approved', 'rejected', 'in_progress', 'completed', 'failed', 'rolled_back'
+    approved_at: Optional[datetime] = None
+    approved_by: Optional[str] = None
+    started_at: Optional[datetime] = None
     applied_at: Optional[datetime] = None
+    error_message: Optional[str] = None
     
     # Results (stored as JSONB)
     modified_files: Dict[str, str] = Field(default_factory=dict)  # filename -> new content
@@ -100,8 +114,8 @@ class Modification(BaseModel):
     class Config:
         json_schema_extra = {
             "example": {
-                "id": "660e8400-e29b-41d4-a716-446655440001",
-                "project_id": "550e8400-e29b-41d4-a716-446655440000",
+                "id": "mod_20240101_auth",
+                "project_id": "proj_20240101_todo_api",
                 "request": "Add user authentication with JWT",
                 "requested_by": "user123",
                 "impact_analysis": {
@@ -110,7 +124,7 @@ class Modification(BaseModel):
                     "breaking_changes": False
                 },
                 "affected_files": ["main.py", "auth.py", "models.py"],
-                "status": "applied",
+                "status": "completed",
                 "modified_files": {
                     "auth.py": "from fastapi import Depends..."
                 },
@@ -132,7 +146,7 @@ class Template(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     description: str
-    category: str  # 'api', 'web', 'mobile', 'data', 'microservice'
+    category: str  # 'api', 'web_app', 'mobile_backend', 'data_pipeline', 'microservice'
     
     # Template content (stored as JSONB)
     files: Dict[str, str] = Field(default_factory=dict)  # filename -> template content
@@ -146,6 +160,8 @@ class Template(BaseModel):
     estimated_setup_time: int = 15  # minutes
     complexity: str = 'medium'  # 'simple', 'medium', 'complex'
     tags: List[str] = Field(default_factory=list)
+    author: str = 'system'
+    version: str = '1.0.0'
     
     # Timestamps
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -154,7 +170,7 @@ class Template(BaseModel):
     class Config:
         json_schema_extra = {
             "example": {
-                "id": "770e8400-e29b-41d4-a716-446655440002",
+                "id": "rest-api-with-fastapi",
                 "name": "REST API with FastAPI",
                 "description": "Production-ready REST API template",
                 "category": "api",
@@ -7,22 +7,29 @@ CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 -- ============================================================================
 -- PROJECT CONTEXTS TABLE
 -- ============================================================================
--- Stores project state across iterations including codebase, configuration,
--- and metrics.
+-- Stores project state across iterations including configuration, metrics
+-- and history. File contents live in project_files.
 
 CREATE TABLE IF NOT EXISTS project_contexts (
     -- Primary key
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id TEXT PRIMARY KEY,
     
     -- Basic information
     name VARCHAR(255) NOT NULL,
-    type VARCHAR(50) NOT NULL CHECK (type IN ('api', 'web_app', 'mobile_backend', 'data_pipeline', 'microservice')),
-    status VARCHAR(20) NOT NULL DEFAULT 'active' CHECK (status IN ('active', 'archived', 'deleted')),
+    type VARCHAR(50) NOT NULL CONSTRAINT check_project_type
+        CHECK (type IN ('api', 'web_app', 'mobile_backend', 'data_pipeline', 'microservice', 'other')),
+    status VARCHAR(20) NOT NULL DEFAULT 'created' CONSTRAINT check_project_status
+        CHECK (status IN ('created', 'in_progress', 'deployed', 'archived', 'failed')),
     owner_id VARCHAR(255) NOT NULL,
+    description TEXT DEFAULT '',
+    repository_url TEXT,
     
-    -- Code and structure (JSONB for flexible schema)
-    codebase JSONB DEFAULT '{}'::jsonb,
-    dependencies TEXT[] DEFAULT ARRAY[]::TEXT[],
+    -- Structure (JSONB for flexible schema)
+    dependencies JSONB DEFAULT '[]'::jsonb,
+    
+    -- History (JSONB arrays, appended to in place)
+    modifications JSONB DEFAULT '[]'::jsonb,
+    deployments JSONB DEFAULT '[]'::jsonb,
     
     -- Configuration (JSONB for flexible schema)
     environment_vars JSONB DEFAULT '{}'::jsonb,
@@ -46,24 +53,65 @@ CREATE INDEX IF NOT EXISTS idx_project_contexts_type ON project_contexts(type);
 CREATE INDEX IF NOT EXISTS idx_project_contexts_created_at ON project_contexts(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_project_contexts_updated_at ON project_contexts(updated_at DESC);
 
+-- Keyset pagination order of project listings
+CREATE INDEX IF NOT EXISTS idx_project_contexts_updated_at_id ON project_contexts(updated_at DESC, id DESC);
+
 -- GIN index for JSONB columns for efficient querying
-CREATE INDEX IF NOT EXISTS idx_project_contexts_codebase ON project_contexts USING GIN (codebase);
 CREATE INDEX IF NOT EXISTS idx_project_contexts_environment_vars ON project_contexts USING GIN (environment_vars);
 
 -- Composite index for common queries
 CREATE INDEX IF NOT EXISTS idx_project_contexts_owner_status ON project_contexts(owner_id, status);
 
+-- ============================================================================
+-- PROJECT FILES TABLE
+-- ============================================================================
+-- One row per project file (path -> content), bulk loaded with COPY.
+
+CREATE TABLE IF NOT EXISTS project_files (
+    project_id TEXT NOT NULL REFERENCES project_contexts(id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    content TEXT NOT NULL,
+    content_hash CHAR(64) NOT NULL,
+    size INTEGER NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (project_id, path)
+);
+
+-- ============================================================================
+-- CODEBASE SNAPSHOT TABLES
+-- ============================================================================
+-- Trees and file bodies of codebase snapshots (utils.codebase_versions),
+-- addressed by SHA-256, and the named manifests that keep them alive
+-- (utils.postgres_object_store).
+
+CREATE TABLE IF NOT EXISTS codebase_objects (
+    hash CHAR(64) PRIMARY KEY,
+    data BYTEA NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS codebase_manifests (
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    hash CHAR(64) NOT NULL REFERENCES codebase_objects(hash),
+    PRIMARY KEY (name, path)
+);
+
+-- Unreferenced object lookups of gc
+CREATE INDEX IF NOT EXISTS idx_codebase_manifests_hash ON codebase_manifests(hash);
+
 -- ============================================================================
 -- MODIFICATIONS TABLE
 -- ============================================================================
--- Tracks project modification requests, analysis, and results.
+-- Tracks project modification plans (models.modification_plan), analysis,
+-- and results.
 
 CREATE TABLE IF NOT EXISTS modifications (
     -- Primary key
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id TEXT PRIMARY KEY,
     
     -- Foreign key to project
-    project_id UUID NOT NULL REFERENCES project_contexts(id) ON DELETE CASCADE,
+    project_id TEXT NOT NULL REFERENCES project_contexts(id) ON DELETE CASCADE,
     
     -- Request details
     request TEXT NOT NULL,
@@ -75,8 +123,13 @@ CREATE TABLE IF NOT EXISTS modifications (
     affected_files TEXT[] DEFAULT ARRAY[]::TEXT[],
     
     -- Execution status
-    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'applied', 'failed', 'rejected')),
+    status VARCHAR(32) NOT NULL DEFAULT 'pending_approval' CONSTRAINT check_modification_status
+        CHECK (status IN ('pending_approval', 'approved', 'rejected', 'in_progress', 'completed', 'failed', 'rolled_back')),
+    approved_at TIMESTAMP WITH TIME ZONE,
+    approved_by VARCHAR(255),
+    started_at TIMESTAMP WITH TIME ZONE,
     applied_at TIMESTAMP WITH TIME ZONE,
+    error_message TEXT,
     
     -- Results (JSONB for flexible schema)
     modified_files JSONB DEFAULT '{}'::jsonb,
@@ -89,6 +142,9 @@ CREATE INDEX IF NOT EXISTS idx_modifications_requested_by ON modifications(reque
 CREATE INDEX IF NOT EXISTS idx_modifications_status ON modifications(status);
 CREATE INDEX IF NOT EXISTS idx_modifications_requested_at ON modifications(requested_at DESC);
 
+-- Keyset pagination order of a project's modifications
+CREATE INDEX IF NOT EXISTS idx_modifications_project_requested_at ON modifications(project_id, requested_at DESC, id DESC);
+
 -- GIN indexes for JSONB columns
 CREATE INDEX IF NOT EXISTS idx_modifications_impact_analysis ON modifications USING GIN (impact_analysis);
 CREATE INDEX IF NOT EXISTS idx_modifications_test_results ON modifications USING GIN (test_results);
@@ -103,12 +159,13 @@ CREATE INDEX IF NOT EXISTS idx_modifications_project_status ON modifications(pro
 
 CREATE TABLE IF NOT EXISTS templates (
     -- Primary key
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id TEXT PRIMARY KEY,
     
     -- Basic information
     name VARCHAR(255) NOT NULL,
     description TEXT,
-    category VARCHAR(50) NOT NULL CHECK (category IN ('api', 'web', 'mobile', 'data', 'microservice')),
+    category VARCHAR(50) NOT NULL CONSTRAINT check_template_category
+        CHECK (category IN ('api', 'web_app', 'mobile_backend', 'data_pipeline', 'microservice')),
     
     -- Template content (JSONB for flexible schema)
     files JSONB DEFAULT '{}'::jsonb,
@@ -122,6 +179,8 @@ CREATE TABLE IF NOT EXISTS templates (
     estimated_setup_time INTEGER DEFAULT 15,
     complexity VARCHAR(20) DEFAULT 'medium' CHECK (complexity IN ('simple', 'medium', 'complex')),
     tags TEXT[] DEFAULT ARRAY[]::TEXT[],
+    author VARCHAR(255) DEFAULT 'system',
+    version VARCHAR(50) DEFAULT '1.0.0',
     
     -- Timestamps
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
@@ -153,6 +212,7 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+DROP TRIGGER IF EXISTS trigger_update_project_contexts_updated_at ON project_contexts;
 CREATE TRIGGER trigger_update_project_contexts_updated_at
     BEFORE UPDATE ON project_contexts
     FOR EACH ROW
@@ -167,6 +227,7 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+DROP TRIGGER IF EXISTS trigger_update_templates_updated_at ON templates;
 CREATE TRIGGER trigger_update_templates_updated_at
     BEFORE UPDATE ON templates
     FOR EACH ROW
@@ -176,11 +237,17 @@ CREATE TRIGGER trigger_update_templates_updated_at
 -- COMMENTS
 -- ============================================================================
 
-COMMENT ON TABLE project_contexts IS 'Stores project state across iterations including codebase, configuration, and metrics';
-COMMENT ON COLUMN project_contexts.codebase IS 'JSONB storage for project files (filename -> content)';
+COMMENT ON TABLE project_contexts IS 'Stores project state across iterations including configuration, metrics, and history';
+COMMENT ON COLUMN project_contexts.modifications IS 'JSONB array of modification history entries';
+COMMENT ON COLUMN project_contexts.deployments IS 'JSONB array of deployment history entries';
 COMMENT ON COLUMN project_contexts.environment_vars IS 'JSONB storage for environment variables';
 COMMENT ON COLUMN project_contexts.deployment_config IS 'JSONB storage for deployment configuration';
 
+COMMENT ON TABLE project_files IS 'Project files (path -> content) with content hashes for delta saves';
+
+COMMENT ON TABLE codebase_objects IS 'Content-addressed trees and file bodies of codebase snapshots';
+COMMENT ON TABLE codebase_manifests IS 'Named manifests (path -> object hash) keeping snapshot objects alive';
+
 COMMENT ON TABLE modifications IS 'Tracks project modification requests, analysis, and results';
 COMMENT ON COLUMN modifications.impact_analysis IS 'JSONB storage for modification impact analysis';
 COMMENT ON COLUMN modifications.affected_files IS 'Array of file paths affected by modification';
@@ -44,13 +44,17 @@ async def test_project_contexts_table():
     try:
         # Test insert
         project_id = await db.fetchval("""
-            INSERT INTO project_contexts (name, type, owner_id, codebase, environment_vars)
+            INSERT INTO project_contexts (id, name, type, owner_id, environment_vars)
             VALUES ($1, $2, $3, $4, $5)
             RETURNING id
-        """, "Test Project", "api", "test_user", 
-            '{"main.py": "print(\'hello\')"}', 
+        """, "proj_migration_test", "Test Project", "api", "test_user",
             '{"API_KEY": "test"}')
         
+        await db.execute("""
+            INSERT INTO project_files (project_id, path, content, content_hash, size)
+            VALUES ($1, $2, $3, encode(sha256(convert_to($3, 'UTF8')), 'hex'), octet_length($3))
+        """, project_id, "main.py", "print('hello')")
+        
         print(f"✓ Inserted project with id: {project_id}")
         
         # Test select
@@ -78,14 +82,15 @@ async def test_project_contexts_table():
         assert float(updated['security_score']) == 0.92
         print("✓ Updated project successfully")
         
-        # Test JSONB query
+        # Test file query
         projects_with_main = await db.fetch("""
-            SELECT id, name FROM project_contexts 
-            WHERE codebase ? 'main.py'
+            SELECT p.id, p.name FROM project_contexts p
+            JOIN project_files f ON f.project_id = p.id
+            WHERE f.path = 'main.py'
         """)
         
         assert len(projects_with_main) > 0
-        print("✓ JSONB query successful")
+        print("✓ File query successful")
         
         # Test delete
         await db.execute("""
@@ -115,17 +120,17 @@ async def test_modifications_table():
     try:
         # First create a project
         project_id = await db.fetchval("""
-            INSERT INTO project_contexts (name, type, owner_id)
-            VALUES ($1, $2, $3)
+            INSERT INTO project_contexts (id, name, type, owner_id)
+            VALUES ($1, $2, $3, $4)
             RETURNING id
-        """, "Test Project for Mods", "api", "test_user")
+        """, "proj_migration_mods", "Test Project for Mods", "api", "test_user")
         
         # Test insert modification
         mod_id = await db.fetchval("""
-            INSERT INTO modifications (project_id, request, requested_by, impact_analysis, affected_files)
-            VALUES ($1, $2, $3, $4, $5)
+            INSERT INTO modifications (id, project_id, request, requested_by, impact_analysis, affected_files)
+            VALUES ($1, $2, $3, $4, $5, $6)
             RETURNING id
-        """, project_id, "Add authentication", "test_user",
+        """, "mod_migration_test", project_id, "Add authentication", "test_user",
             '{"risk_level": "medium", "estimated_time": "2 hours"}',
             ['main.py', 'auth.py'])
         
@@ -137,7 +142,7 @@ async def test_modifications_table():
         """, mod_id)
         
         assert mod['request'] == "Add authentication"
-        assert mod['status'] == "pending"
+        assert mod['status'] == "pending_approval"
         print("✓ Selected modification successfully")
         
         # Test update status
@@ -145,13 +150,13 @@ async def test_modifications_table():
             UPDATE modifications 
             SET status = $1, modified_files = $2
             WHERE id = $3
-        """, "applied", '{"auth.py": "def authenticate(): pass"}', mod_id)
+        """, "completed", '{"auth.py": "def authenticate(): pass"}', mod_id)
         
         updated = await db.fetchrow("""
             SELECT status FROM modifications WHERE id = $1
         """, mod_id)
         
-        assert updated['status'] == "applied"
+        assert updated['status'] == "completed"
         print("✓ Updated modification successfully")
         
         # Test cascade delete
@@ -182,10 +187,10 @@ async def test_templates_table():
     try:
         # Test insert
         template_id = await db.fetchval("""
-            INSERT INTO templates (name, description, category, files, required_vars, tech_stack, tags)
-            VALUES ($1, $2, $3, $4, $5, $6, $7)
+            INSERT INTO templates (id, name, description, category, files, required_vars, tech_stack, tags)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
             RETURNING id
-        """, "REST API Template", "A simple REST API template", "api",
+        """, "rest-api-migration-test", "REST API Template", "A simple REST API template", "api",
             '{"main.py": "from fastapi import FastAPI"}',
             ['project_name', 'db_name'],
             ['FastAPI', 'PostgreSQL'],
@@ -259,9 +264,12 @@ async def test_indexes():
         # Check for key indexes
         required_indexes = [
             'idx_project_contexts_owner_id',
-            'idx_project_contexts_codebase',
+            'idx_project_contexts_updated_at_id',
+            'project_files_pkey',
+            'idx_codebase_manifests_hash',
             'idx_modifications_project_id',
             'idx_modifications_impact_analysis',
+            'idx_modifications_project_requested_at',
             'idx_templates_category',
             'idx_templates_tech_stack'
         ]
@@ -289,10 +297,10 @@ async def test_triggers():
     try:
         # Create a project
         project_id = await db.fetchval("""
-            INSERT INTO project_contexts (name, type, owner_id)
-            VALUES ($1, $2, $3)
+            INSERT INTO project_contexts (id, name, type, owner_id)
+            VALUES ($1, $2, $3, $4)
             RETURNING id
-        """, "Trigger Test", "api", "test_user")
+        """, "proj_migration_trigger", "Trigger Test", "api", "test_user")
         
         # Get initial timestamps
         initial = await db.fetchrow("""
@@ -9,6 +9,7 @@ Requirements: 1.3, 2.2, 1.5, 6.3, 6.5
 
 import json
 import os
+import base64
 import logging
 from datetime import datetime
 from typing import Dict, Any, Optional
@@ -192,34 +193,78 @@ def get_project(project_id: str) -> Dict[str, Any]:
         return create_error_response(500, 'INTERNAL_ERROR', str(e))
 
 
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Encode a LastEvaluatedKey as an opaque, URL-safe cursor token."""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, separators=(',', ':'), sort_keys=True, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode a cursor token back into an ExclusiveStartKey (ValueError if malformed)."""
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError(f'Invalid pagination cursor: {cursor!r}') from e
+    if not isinstance(key, dict) or not all(isinstance(v, str) for v in key.values()):
+        raise ValueError(f'Invalid pagination cursor: {cursor!r}')
+    return key
+
+
 def list_projects(query_params: Dict[str, Any]) -> Dict[str, Any]:
-    """List projects with optional filtering."""
+    """List one page of an owner's projects, newest first, with optional status filter."""
     try:
         owner_id = query_params.get('owner_id', 'default_user')
         status = query_params.get('status')
-        limit = int(query_params.get('limit', 50))
+        try:
+            limit = int(query_params.get('limit', 50))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= 100:
+            return create_error_response(400, 'VALIDATION_ERROR', 'limit must be an integer between 1 and 100')
+        
+        try:
+            start_key = decode_cursor(query_params.get('cursor'))
+        except ValueError as e:
+            return create_error_response(400, 'INVALID_CURSOR', str(e))
         
-        # Query by owner using GSI1
+        # Query by owner using GSI1; the status filter runs in DynamoDB
         query_kwargs = {
             'IndexName': 'GSI1',
             'KeyConditionExpression': 'GSI1PK = :owner',
             'ExpressionAttributeValues': {
                 ':owner': f'OWNER#{owner_id}'
             },
-            'Limit': limit
+            'ScanIndexForward': False
         }
-        
-        response = table.query(**query_kwargs)
-        projects = response.get('Items', [])
-        
-        # Filter by status if provided
         if status:
-            projects = [p for p in projects if p.get('status') == status]
-        
+            query_kwargs['FilterExpression'] = '#status = :status'
+            query_kwargs['ExpressionAttributeNames'] = {'#status': 'status'}
+            query_kwargs['ExpressionAttributeValues'][':status'] = status
+        
+        # Limit counts items read before the filter, so keep reading until the
+        # page is full; asking only for what is missing keeps the cursor exact
+        projects = []
+        while True:
+            if start_key:
+                query_kwargs['ExclusiveStartKey'] = start_key
+            query_kwargs['Limit'] = limit - len(projects)
+            response = table.query(**query_kwargs)
+            projects.extend(response.get('Items', []))
+            start_key = response.get('LastEvaluatedKey')
+            if not start_key or len(projects) >= limit:
+                break
+        
+        next_cursor = encode_cursor(start_key)
         return create_response(200, {
             'success': True,
             'projects': projects,
-            'count': len(projects)
+            'count': len(projects),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
         
     except Exception as e:
@@ -11,12 +11,21 @@ Requirements: 1.3, 2.2
 
 import json
 import os
+import sys
+import gzip
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import boto3
 from botocore.exceptions import ClientError
 
+# Shared layer (/opt/python in Lambda; lambda/shared/python in a checkout)
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared', 'python'))
+from file_bodies import read_file_contents
+
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -33,6 +42,10 @@ S3_BUCKET_NAME = os.environ.get('S3_BUCKET_NAME', 'agenticai-generated-code')
 SQS_QUEUE_URL_QA = os.environ.get('SQS_QUEUE_URL_QA', '')
 GEMINI_API_KEY = None  # Will be loaded from Parameter Store
 
+# Files larger than this are stored gzip-compressed in S3 under a
+# content-addressed key; their FILE# item keeps a pointer, hash and size
+FILE_INLINE_MAX_BYTES = int(os.environ.get('FILE_INLINE_MAX_BYTES', str(32 * 1024)))
+
 # DynamoDB table
 table = dynamodb.Table(DYNAMODB_TABLE_NAME)
 
@@ -108,44 +121,62 @@ def get_project_files(project_id: str) -> Dict[str, str]:
             }
         )
         
-        files = {}
-        for item in response.get('Items', []):
-            file_path = item['file_path']
-            files[file_path] = item.get('content', '')
-        
-        return files
+        return read_file_contents(response.get('Items', []), s3_client, S3_BUCKET_NAME)
     except Exception as e:
+        # A project whose files cannot be read must not look like an empty one
         logger.error(f"Error getting project files: {e}")
-        return {}
+        raise
+
+
+def build_file_item(project_id: str, file_path: str, content: str) -> Dict[str, Any]:
+    """FILE# item for a file; bodies over FILE_INLINE_MAX_BYTES are uploaded to S3."""
+    data = content.encode('utf-8')
+    content_hash = hashlib.sha256(data).hexdigest()
+    item = {
+        'PK': f'PROJECT#{project_id}',
+        'SK': f'FILE#{file_path}',
+        'EntityType': 'ProjectFile',
+        'file_path': file_path,
+        'content_hash': content_hash,
+        'size': len(content),
+        'last_modified': datetime.utcnow().isoformat()
+    }
+    
+    if len(data) <= FILE_INLINE_MAX_BYTES:
+        item['content'] = content
+        return item
+    
+    body = gzip.compress(data, mtime=0)
+    body_key = f'file-bodies/{content_hash[:2]}/{content_hash}.gz'
+    s3_client.put_object(
+        Bucket=S3_BUCKET_NAME,
+        Key=body_key,
+        Body=body,
+        ContentType='application/octet-stream',
+        Metadata={'codec': 'gzip', 'sha256': content_hash}
+    )
+    item.update({
+        'body_bucket': S3_BUCKET_NAME,
+        'body_key': body_key,
+        'body_codec': 'gzip',
+        'stored_size': len(body)
+    })
+    return item
 
 
 def save_generated_code(project_id: str, files: Dict[str, str]):
-    """Save generated code files to DynamoDB and S3."""
+    """Save generated code files to DynamoDB (large bodies to S3)."""
     try:
-        # Save to DynamoDB
-        for file_path, content in files.items():
-            file_item = {
-                'PK': f'PROJECT#{project_id}',
-                'SK': f'FILE#{file_path}',
-                'EntityType': 'ProjectFile',
-                'file_path': file_path,
-                'content': content,
-                'size': len(content),
-                'last_modified': datetime.utcnow().isoformat()
-            }
-            table.put_item(Item=file_item)
-        
-        # Save to S3 for backup
-        for file_path, content in files.items():
-            s3_key = f'projects/{project_id}/{file_path}'
-            s3_client.put_object(
-                Bucket=S3_BUCKET_NAME,
-                Key=s3_key,
-                Body=content,
-                ContentType='text/plain'
-            )
+        # Upload large bodies concurrently, then batch-write the items
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            items = list(pool.map(lambda path: build_file_item(project_id, path, files[path]), files))
+        
+        with table.batch_writer() as batch:
+            for item in items:
+                batch.put_item(Item=item)
         
-        logger.info(f"Saved {len(files)} files for project {project_id}")
+        offloaded = sum(1 for item in items if 'body_key' in item)
+        logger.info(f"Saved {len(files)} files for project {project_id} ({offloaded} bodies in S3)")
     except Exception as e:
         logger.error(f"Error saving generated code: {e}")
         raise
@@ -9,12 +9,18 @@ Requirements: 1.3, 2.2
 
 import json
 import os
+import sys
 import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import boto3
 from botocore.exceptions import ClientError
 
+# Shared layer (/opt/python in Lambda; lambda/shared/python in a checkout)
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared', 'python'))
+from file_bodies import read_file_contents
+
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -76,15 +82,11 @@ def get_project_files(project_id: str) -> Dict[str, str]:
             }
         )
         
-        files = {}
-        for item in response.get('Items', []):
-            file_path = item['file_path']
-            files[file_path] = item.get('content', '')
-        
-        return files
+        return read_file_contents(response.get('Items', []), s3_client, S3_BUCKET_NAME)
     except Exception as e:
+        # A project whose files cannot be read must not look like an empty one
         logger.error(f"Error getting project files: {e}")
-        return {}
+        raise
 
 
 def detect_project_type(files: Dict[str, str]) -> str:
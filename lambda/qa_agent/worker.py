@@ -9,6 +9,7 @@ Requirements: 1.3, 2.2
 
 import json
 import os
+import sys
 import logging
 import tempfile
 import subprocess
@@ -17,6 +18,11 @@ from typing import Dict, Any, List
 import boto3
 from botocore.exceptions import ClientError
 
+# Shared layer (/opt/python in Lambda; lambda/shared/python in a checkout)
+sys.path.append('/opt/python')
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shared', 'python'))
+from file_bodies import read_file_content, read_file_contents
+
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -72,7 +78,7 @@ def get_project_files(project_id: str, file_names: List[str] = None) -> Dict[str
                     }
                 )
                 if 'Item' in response:
-                    files[file_name] = response['Item'].get('content', '')
+                    files[file_name] = read_file_content(response['Item'], s3_client, S3_BUCKET_NAME)
             return files
         else:
             # Get all files
@@ -84,15 +90,11 @@ def get_project_files(project_id: str, file_names: List[str] = None) -> Dict[str
                 }
             )
             
-            files = {}
-            for item in response.get('Items', []):
-                file_path = item['file_path']
-                files[file_path] = item.get('content', '')
-            
-            return files
+            return read_file_contents(response.get('Items', []), s3_client, S3_BUCKET_NAME)
     except Exception as e:
+        # A project whose files cannot be read must not look like an empty one
         logger.error(f"Error getting project files: {e}")
-        return {}
+        raise
 
 
 def run_syntax_check(file_path: str, content: str) -> Dict[str, Any]:
@@ -0,0 +1,52 @@
+"""
+Reading project files whose bodies may be offloaded to S3.
+
+FILE# items keep small files inline in 'content'. Larger bodies are
+stored compressed in S3 (utils.file_body_store in the application) and the
+item keeps a pointer: body_bucket, body_key, body_codec.
+
+Bodies are gzip-compressed unless the writer was configured with
+FILE_BODY_CODEC=zstd; reading those needs the zstandard package, which the
+shared layer installs. Read errors are raised, never turned into a
+missing or empty file.
+"""
+
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+
+def decompress_body(body: bytes, codec: str) -> bytes:
+    """
+    Decompress an offloaded body.
+
+    Raises:
+        RuntimeError: If the body is zstd-compressed and zstandard is not installed
+        ValueError: If the codec is unknown
+    """
+    if codec == 'gzip':
+        return gzip.decompress(body)
+    if codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError('File body is zstd-compressed but the zstandard package is not installed') from e
+        return zstandard.ZstdDecompressor().decompress(body)
+    raise ValueError(f'Unknown file body codec: {codec!r}')
+
+
+def read_file_content(item: Dict[str, Any], s3_client, default_bucket: str) -> str:
+    """Content of a FILE# item, reading its S3 body if it was offloaded."""
+    if 'content' in item or 'body_key' not in item:
+        return item.get('content', '')
+    response = s3_client.get_object(Bucket=item.get('body_bucket', default_bucket), Key=item['body_key'])
+    return decompress_body(response['Body'].read(), item.get('body_codec', 'gzip')).decode('utf-8')
+
+
+def read_file_contents(items: List[Dict[str, Any]], s3_client, default_bucket: str) -> Dict[str, str]:
+    """Contents of FILE# items by path; offloaded bodies are fetched concurrently."""
+    if not any('body_key' in item for item in items):
+        return {item['file_path']: item.get('content', '') for item in items}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        contents = list(pool.map(lambda item: read_file_content(item, s3_client, default_bucket), items))
+    return {item['file_path']: content for item, content in zip(items, contents)}
@@ -22,20 +22,30 @@ from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 from typing import Optional
 
+from utils.startup_profile import start_startup_profile, get_startup_profiler
+
+# Startup profiling (import time per module, see /debug/startup); must run before the imports below
+if os.getenv("STARTUP_PROFILE", "false").lower() == "true":
+    start_startup_profile()
+
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, HTTPException, BackgroundTasks
 from fastapi.responses import HTMLResponse, PlainTextResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 
 # Core models and agents
 from models.task import Task
 from models.plan import Plan
 from models.enums import TaskStatus
 from parse.websocket_manager import WebSocketManager
+from utils.metrics_registry import generate_latest, CONTENT_TYPE_LATEST
+from utils.tracing import get_tracer
+from utils.loop_monitor import get_loop_monitor
+from utils.blob_store import gc_periodically, get_blob_store
+from config import PROJECT_STORE_BACKEND
+from utils.cancellation import ScopeCancelledError, connection_id, get_cancellation_registry, scope_keys
 from agents.pm_agent import PlannerAgent
 from agents.dev_agent import DevAgent
 from agents.qa_agent import QAAgent
@@ -66,6 +76,13 @@ CIRCUIT_BREAKER_THRESHOLD = float(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "0.8"))
 # Circuit breaker: 60s timeout before attempting recovery
 CIRCUIT_BREAKER_TIMEOUT = float(os.getenv("CIRCUIT_BREAKER_TIMEOUT", "60.0"))
 
+# Event-loop lag monitor (thresholds: LOOP_MONITOR_INTERVAL, LOOP_MONITOR_SLOW_CALLBACK_THRESHOLD)
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+
+# Blob garbage collection: seconds between runs of gc() on the blob store
+# (and the Postgres snapshot objects with PROJECT_STORE_BACKEND=postgres); 0 disables
+BLOB_GC_INTERVAL_SECONDS = float(os.getenv("BLOB_GC_INTERVAL_SECONDS", "3600"))
+
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 logging.basicConfig(
@@ -147,6 +164,9 @@ async def lifespan(app: FastAPI):
     
     # Track if Phase 2 is actually enabled (may fall back to Phase 1)
     phase2_active = PHASE2_ENABLED
+    startup_profiler = get_startup_profiler()
+    if startup_profiler:
+        startup_profiler.mark("imports")
     
     # ========================================
     # STARTUP
@@ -175,6 +195,9 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Failed to initialize agents: {e}")
         raise
     
+    if startup_profiler:
+        startup_profiler.mark("agents")
+    
     # Initialize Phase 2 components if enabled
     if phase2_active:
         try:
@@ -238,8 +261,29 @@ async def lifespan(app: FastAPI):
             phase2_active = False
             # Don't raise, fall back to Phase 1
     
+    if startup_profiler and phase2_active:
+        startup_profiler.mark("phase2")
+    
+    # Start event-loop lag monitoring
+    if LOOP_MONITOR_ENABLED:
+        get_loop_monitor().start()
+    
+    # Free blobs no project, plan or cache references any more
+    blob_gc_task = None
+    if BLOB_GC_INTERVAL_SECONDS > 0:
+        gc_stores = [get_blob_store()]
+        if PROJECT_STORE_BACKEND == "postgres":
+            from utils.postgres_object_store import PostgresObjectStore
+            gc_stores.append(PostgresObjectStore())
+        blob_gc_task = asyncio.create_task(
+            gc_periodically(gc_stores, BLOB_GC_INTERVAL_SECONDS), name="blob-gc"
+        )
+        logger.info(f"🧹 Blob garbage collection every {BLOB_GC_INTERVAL_SECONDS:.0f}s")
+    
     # Start file monitoring
     try:
+        from watchdog.observers import Observer
+        
         loop = asyncio.get_running_loop()
         event_handler = FileChangeHandler(loop=loop, manager=websocket_manager)
         observer = Observer()
@@ -254,6 +298,10 @@ async def lifespan(app: FastAPI):
     logger.info("-" * 60)
     logger.info("✅ Application startup complete")
     logger.info("")
+    if startup_profiler:
+        startup_profiler.mark("startup_complete")
+        startup_profiler.uninstall()
+        startup_profiler.log_report()
     
     yield  # Application runs here
     
@@ -270,6 +318,16 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"⚠️  Shutdown error: {e}")
     
+    if blob_gc_task:
+        blob_gc_task.cancel()
+        try:
+            await blob_gc_task
+        except asyncio.CancelledError:
+            pass
+    
+    if LOOP_MONITOR_ENABLED:
+        await get_loop_monitor().stop()
+    
     logger.info("✅ Shutdown complete")
 
 # ============================================================
@@ -385,6 +443,12 @@ async def health_check():
 
 
 @app.get("/metrics")
+async def get_prometheus_metrics():
+    """Prometheus scrape endpoint (text exposition format, both phases)."""
+    return PlainTextResponse(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/metrics/json")
 async def get_metrics():
     """Get system metrics (Phase 2 only)."""
     if not PHASE2_ENABLED or not pipeline_manager:
@@ -403,6 +467,36 @@ async def get_metrics():
         return {"error": str(e)}
 
 
+@app.get("/debug/traces")
+async def list_traces():
+    """List recent trace IDs held in memory (most recent last)."""
+    return {"traces": get_tracer().memory.trace_ids()}
+
+
+@app.get("/debug/traces/{trace_key}")
+async def get_trace_timeline(trace_key: str, format: str = "json"):
+    """Timeline of a trace by trace ID or plan ID (format=text for a flame view)."""
+    memory = get_tracer().memory
+    if format == "text":
+        return PlainTextResponse(memory.render(trace_key))
+    return memory.timeline(trace_key)
+
+
+@app.get("/debug/startup")
+async def get_startup_profile(limit: int = 25):
+    """Import time per module and startup phases (requires STARTUP_PROFILE=true)."""
+    profiler = get_startup_profiler()
+    if profiler is None:
+        return {"error": "Startup profiling is off (set STARTUP_PROFILE=true)"}
+    return profiler.report(limit=limit)
+
+
+@app.get("/debug/loop")
+async def get_loop_health(limit: int = 20):
+    """Event-loop lag percentiles and recent slow callbacks with their stacks."""
+    return get_loop_monitor().snapshot(limit=limit)
+
+
 @app.get("/api/deployment-status")
 async def get_deployment_status():
     """Get current deployment status and statistics."""
@@ -997,11 +1091,15 @@ async def websocket_endpoint(websocket: WebSocket):
                         }, websocket)
                         continue
                     
-                    # Route to appropriate execution flow
-                    if PHASE2_ENABLED and pipeline_manager:
-                        await execute_with_phase2(websocket, requirements)
-                    else:
-                        await execute_sequential(websocket, requirements)
+                    # Route to appropriate execution flow (cancelled if the client goes away)
+                    execution = (
+                        execute_with_phase2(websocket, requirements)
+                        if PHASE2_ENABLED and pipeline_manager
+                        else execute_sequential(websocket, requirements)
+                    )
+                    await get_cancellation_registry().run(
+                        execution, scope_keys(connection=connection_id(websocket))
+                    )
                 
                 elif msg_type == "github_deployment_response":
                     # Handle user's response to GitHub deployment prompt
@@ -1047,6 +1145,10 @@ async def websocket_endpoint(websocket: WebSocket):
                 logger.info(f"🔌 Client disconnected: {client_host}")
                 break
             
+            except ScopeCancelledError as e:
+                logger.info(f"🛑 Work for {client_host} cancelled: {e}")
+                break
+            
             except Exception as e:
                 logger.error(f"❌ Error processing message from {client_host}: {e}")
                 if websocket in websocket_manager.active_connections:
@@ -1548,13 +1650,24 @@ async def trigger_ops_deployment():
 # FILE MONITORING
 # ============================================================
 
-class FileChangeHandler(FileSystemEventHandler):
-    """Monitor file system changes and notify via WebSocket."""
+class FileChangeHandler:
+    """
+    Monitor file system changes and notify via WebSocket.
+    
+    Implements watchdog's handler interface (dispatch) without subclassing
+    FileSystemEventHandler, so watchdog is only imported when monitoring starts.
+    """
     
     def __init__(self, loop, manager: WebSocketManager):
         self.loop = loop
         self.manager = manager
     
+    def dispatch(self, event):
+        """Route a watchdog event to its on_<event_type> handler, if any."""
+        handler = getattr(self, f"on_{event.event_type}", None)
+        if handler:
+            handler(event)
+    
     def on_created(self, event):
         """Handle file creation events."""
         if event.is_directory:
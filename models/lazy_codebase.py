@@ -0,0 +1,201 @@
+"""
+LazyCodebase: A mapping of file paths to contents that loads bodies on demand.
+
+Stores can return a project's codebase as a LazyCodebase instead of a plain
+dict. Paths, sizes and content hashes are known up front; a body is fetched
+the first time it is read, and `prefetch` / `load` fetch a known set of
+files in one batch. Writes and deletes work like on a dict, and files that
+were never read keep their stored hash, so saving the project does not need
+their bodies.
+"""
+
+import asyncio
+import hashlib
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+BodyLoader = Callable[[List[str]], Dict[str, str]]
+AsyncBodyLoader = Callable[[List[str]], Awaitable[Dict[str, str]]]
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    """What a store knows about a file before its body is loaded."""
+    size: int
+    content_hash: Optional[str] = None
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 of UTF-8 file content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class LazyCodebase(MutableMapping):
+    """
+    Codebase view (file path -> content) that fetches bodies on first access.
+
+    Iteration, `len`, `in`, `sizes()` and `content_hash()` of unread files
+    never touch storage. Reading one missing body calls the loader for that
+    file only; use `prefetch` (async) or `load` (blocking) to fetch several
+    at once, and `materialize` to get a plain dict.
+    """
+
+    def __init__(
+        self,
+        entries: Dict[str, FileEntry],
+        loader: BodyLoader,
+        async_loader: Optional[AsyncBodyLoader] = None,
+        bodies: Optional[Dict[str, str]] = None
+    ):
+        """
+        Initialize the view.
+
+        Args:
+            entries: file_path -> FileEntry for every file in the codebase
+            loader: Blocking batch loader (file paths -> contents)
+            async_loader: Async batch loader (defaults to the blocking one in a thread)
+            bodies: Contents already in memory
+        """
+        self._entries = dict(entries)
+        self._bodies = dict(bodies or {})
+        self._loader = loader
+        self._async_loader = async_loader
+
+    # ========================================================================
+    # Mapping Interface
+    # ========================================================================
+
+    def __getitem__(self, path: str) -> str:
+        if path not in self._entries:
+            raise KeyError(path)
+        if path not in self._bodies:
+            self._store(self._loader([path]), [path])
+        return self._bodies[path]
+
+    def __setitem__(self, path: str, content: str) -> None:
+        self._bodies[path] = content
+        self._entries[path] = FileEntry(size=len(content.encode("utf-8")))
+
+    def __delitem__(self, path: str) -> None:
+        del self._entries[path]
+        self._bodies.pop(path, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._entries
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyCodebase):
+            other = other.materialize()
+        if not isinstance(other, dict):
+            return NotImplemented
+        return self._entries.keys() == other.keys() and self.materialize() == other
+
+    def __repr__(self) -> str:
+        return f"LazyCodebase({len(self._entries)} files, {len(self._bodies)} loaded)"
+
+    def items(self):
+        self.load()
+        return super().items()
+
+    def values(self):
+        self.load()
+        return super().values()
+
+    def copy(self) -> "LazyCodebase":
+        """Shallow copy sharing the loaders (bodies are immutable strings)."""
+        return LazyCodebase(self._entries, self._loader, self._async_loader, self._bodies)
+
+    def __copy__(self) -> "LazyCodebase":
+        return self.copy()
+
+    def __deepcopy__(self, memo) -> "LazyCodebase":
+        return self.copy()
+
+    # ========================================================================
+    # Lazy Loading
+    # ========================================================================
+
+    def _missing(self, paths: Optional[Iterable[str]]) -> List[str]:
+        wanted = self._entries if paths is None else paths
+        return [path for path in wanted if path in self._entries and path not in self._bodies]
+
+    def _store(self, contents: Dict[str, str], requested: List[str]) -> None:
+        missing = [path for path in requested if path not in contents]
+        if missing:
+            raise KeyError(f"File bodies not found in storage: {missing[:5]}")
+        for path in requested:
+            self._bodies[path] = contents[path]
+
+    def load(self, paths: Optional[Iterable[str]] = None) -> None:
+        """
+        Fetch bodies in one blocking batch.
+
+        Args:
+            paths: Files to fetch (None: every file not yet loaded)
+        """
+        missing = self._missing(paths)
+        if missing:
+            self._store(self._loader(missing), missing)
+
+    async def prefetch(self, paths: Optional[Iterable[str]] = None) -> None:
+        """
+        Fetch bodies in one batch without blocking the event loop.
+
+        Args:
+            paths: Files to fetch (None: every file not yet loaded)
+        """
+        missing = self._missing(paths)
+        if not missing:
+            return
+        if self._async_loader:
+            contents = await self._async_loader(missing)
+        else:
+            contents = await asyncio.to_thread(self._loader, missing)
+        self._store(contents, missing)
+
+    def materialize(self) -> Dict[str, str]:
+        """Every file as a plain dict (loads the remaining bodies in one batch)."""
+        self.load()
+        return {path: self._bodies[path] for path in self._entries}
+
+    # ========================================================================
+    # Metadata
+    # ========================================================================
+
+    def is_loaded(self, path: str) -> bool:
+        """Whether a file's body is in memory."""
+        return path in self._bodies
+
+    def size(self, path: str) -> int:
+        """A file's size as recorded by the store (no body is loaded)."""
+        return self._entries[path].size
+
+    def sizes(self) -> Dict[str, int]:
+        """file_path -> size as recorded by the store (no bodies are loaded)."""
+        return {path: entry.size for path, entry in self._entries.items()}
+
+    def content_hash(self, path: str) -> str:
+        """
+        SHA-256 of a file's content.
+
+        Uses the stored hash for files that were not rewritten, so no body
+        is loaded; hashes the body otherwise.
+        """
+        entry = self._entries[path]
+        if entry.content_hash:
+            return entry.content_hash
+        return content_hash(self[path])
+
+
+def codebase_hash(codebase, path: str) -> str:
+    """SHA-256 of one file in a plain or lazy codebase."""
+    if isinstance(codebase, LazyCodebase):
+        return codebase.content_hash(path)
+    return content_hash(codebase[path])
@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, MutableMapping, Optional
 from enum import Enum
 
+from models.lazy_codebase import LazyCodebase
+
 
 class ProjectType(Enum):
     """Types of projects that can be created."""
@@ -40,6 +42,8 @@ class Modification:
     affected_files: List[str]
     requested_by: str
     status: str  # 'pending', 'applied', 'failed', 'rolled_back'
+    base_snapshot: Optional[str] = None  # Codebase root hash before the modification
+    snapshot: Optional[str] = None  # Codebase root hash after it (utils.codebase_versions)
 
 
 @dataclass
@@ -84,7 +88,7 @@ class ProjectContext:
     last_deployed_at: Optional[datetime] = None
     
     # Code and structure
-    codebase: Dict[str, str] = field(default_factory=dict)  # filename -> content
+    codebase: MutableMapping[str, str] = field(default_factory=dict)  # filename -> content (dict or LazyCodebase)
     dependencies: List[Dependency] = field(default_factory=list)
     
     # History tracking
@@ -104,9 +108,15 @@ class ProjectContext:
     description: str = ""
     repository_url: Optional[str] = None
     
-    def to_dict(self) -> Dict:
-        """Convert ProjectContext to dictionary for serialization."""
-        return {
+    def to_dict(self, include_codebase: bool = True) -> Dict:
+        """
+        Convert ProjectContext to dictionary for serialization.
+        
+        Args:
+            include_codebase: Include file contents (a lazy codebase is loaded
+                              in full); when False the "codebase" key is omitted
+        """
+        data = {
             "id": self.id,
             "name": self.name,
             "type": self.type.value,
@@ -115,7 +125,6 @@ class ProjectContext:
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
             "last_deployed_at": self.last_deployed_at.isoformat() if self.last_deployed_at else None,
-            "codebase": self.codebase,
             "dependencies": [
                 {"name": d.name, "version": d.version, "type": d.type}
                 for d in self.dependencies
@@ -127,7 +136,9 @@ class ProjectContext:
                     "description": m.description,
                     "affected_files": m.affected_files,
                     "requested_by": m.requested_by,
-                    "status": m.status
+                    "status": m.status,
+                    "base_snapshot": m.base_snapshot,
+                    "snapshot": m.snapshot
                 }
                 for m in self.modifications
             ],
@@ -156,6 +167,11 @@ class ProjectContext:
             "description": self.description,
             "repository_url": self.repository_url
         }
+        if include_codebase:
+            data["codebase"] = (
+                self.codebase.materialize() if isinstance(self.codebase, LazyCodebase) else self.codebase
+            )
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'ProjectContext':
@@ -178,7 +194,9 @@ class ProjectContext:
                 description=m["description"],
                 affected_files=m["affected_files"],
                 requested_by=m["requested_by"],
-                status=m["status"]
+                status=m["status"],
+                base_snapshot=m.get("base_snapshot"),
+                snapshot=m.get("snapshot")
             )
             for m in data.get("modifications", [])
         ]
@@ -5,10 +5,18 @@ from typing import Dict, List, Any
 
 from fastapi import WebSocket
 
+from utils.metrics_registry import counter, gauge
+from utils.cancellation import CONNECTION, connection_id, get_cancellation_registry
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Scrapeable WebSocket metrics (kind is "broadcast", "personal" or "chunk")
+WS_CONNECTIONS = gauge("websocket_connections", "Active WebSocket connections")
+WS_MESSAGES = counter("websocket_messages_sent_total", "Messages sent to clients", ("kind",))
+WS_SEND_ERRORS = counter("websocket_send_errors_total", "Failed sends to clients", ("kind",))
+
 
 class WebSocketManager:
     """
@@ -19,6 +27,9 @@ class WebSocketManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
         self.lock = threading.Lock()
+        self._connections_metric = WS_CONNECTIONS.labels()
+        self._sent_metrics = {kind: WS_MESSAGES.labels(kind) for kind in ("broadcast", "personal", "chunk")}
+        self._error_metrics = {kind: WS_SEND_ERRORS.labels(kind) for kind in ("broadcast", "personal", "chunk")}
 
     async def connect(self, websocket: WebSocket):
         """
@@ -27,15 +38,22 @@ class WebSocketManager:
         """
         with self.lock:
             self.active_connections.append(websocket)
+            self._connections_metric.set(len(self.active_connections))
             logger.info(f"WebSocket connected: {websocket.client.host}:{websocket.client.port}. Total active connections: {len(self.active_connections)}")
 
+    def _cancel_connection_work(self, websocket: WebSocket):
+        """Cancel in-flight work (LLM streams, pipeline tasks) started for a closed connection."""
+        get_cancellation_registry().cancel(CONNECTION, connection_id(websocket), "client disconnected")
+
     def disconnect(self, websocket: WebSocket):
         """
-        Removes a WebSocket connection from the active list.
+        Removes a WebSocket connection from the active list and cancels its work.
         """
+        self._cancel_connection_work(websocket)
         with self.lock:
             if websocket in self.active_connections:
                 self.active_connections.remove(websocket)
+                self._connections_metric.set(len(self.active_connections))
                 logger.info(f"WebSocket disconnected: {websocket.client.host}:{websocket.client.port}. Total active connections: {len(self.active_connections)}")
             else:
                 logger.warning(f"Attempted to disconnect a non-active WebSocket: {websocket.client.host}:{websocket.client.port}")
@@ -57,7 +75,9 @@ class WebSocketManager:
             try:
                 # Use send_json for dictionary messages
                 await connection.send_json(message) 
+                self._sent_metrics["broadcast"].inc()
             except Exception as e:
+                self._error_metrics["broadcast"].inc()
                 logger.error(f"Error broadcasting JSON message to client {connection.client.host}:{connection.client.port}: {e}")
                 disconnected_clients.append(connection)
         
@@ -67,6 +87,8 @@ class WebSocketManager:
                 for client in disconnected_clients:
                     if client in self.active_connections:
                         self.active_connections.remove(client)
+                    self._cancel_connection_work(client)
+                self._connections_metric.set(len(self.active_connections))
                 logger.info(f"Cleaned up {len(disconnected_clients)} disconnected clients during broadcast. Remaining: {len(self.active_connections)}")
 
 
@@ -81,7 +103,9 @@ class WebSocketManager:
         if websocket in self.active_connections:
             try:
                 await websocket.send_json(message)
+                self._sent_metrics["personal"].inc()
             except Exception as e:
+                self._error_metrics["personal"].inc()
                 logger.error(f"Error sending personal JSON message to client {websocket.client.host}:{websocket.client.port}: {e}")
                 self.disconnect(websocket)
         else:
@@ -98,7 +122,9 @@ class WebSocketManager:
         if websocket in self.active_connections:
             try:
                 await websocket.send_text(chunk)
+                self._sent_metrics["chunk"].inc()
             except Exception as e:
+                self._error_metrics["chunk"].inc()
                 logger.error(f"Error streaming chunk to client {websocket.client.host}:{websocket.client.port}: {e}")
                 self.disconnect(websocket)
         else:
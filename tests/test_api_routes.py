@@ -14,10 +14,22 @@ from datetime import datetime
 
 # Import the FastAPI app
 from main import app
+from utils.project_context_store import ProjectContextStore
+from utils.stores import get_shared_project_store, get_shared_template_library
+from utils.template_library import TemplateLibrary
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def stores(tmp_path):
+    """Route every test's projects and templates to temporary file stores."""
+    app.dependency_overrides[get_shared_project_store] = lambda: ProjectContextStore(storage_root=tmp_path / 'projects')
+    app.dependency_overrides[get_shared_template_library] = lambda: TemplateLibrary(storage_root=tmp_path / 'templates')
+    yield
+    app.dependency_overrides.clear()
+
+
 class TestProjectManagementEndpoints:
     """Test project management endpoints (Task 7.1)"""
     
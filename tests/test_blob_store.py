@@ -0,0 +1,180 @@
+"""
+Unit tests for the content-addressed blob store.
+
+Tests deduplication, reference counting and deferred gc, named manifests,
+corruption detection, materialized exports and blob sharing between
+project contexts and templates.
+"""
+
+import os
+import gzip
+import asyncio
+import pytest
+
+from models.project_context import ProjectContext, ProjectType, ProjectStatus
+from models.template import ProjectTemplate
+from utils import blob_store
+from utils.blob_store import BlobStore, blob_hash, gc_periodically
+from utils.project_context_store import ProjectContextStore
+from utils.template_library import TemplateLibrary
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def blobs(tmp_path):
+    """A blob store on an empty temporary root."""
+    return BlobStore(tmp_path / 'blobs', codec='gzip')
+
+
+# ============================================================================
+# Blob Tests
+# ============================================================================
+
+def test_identical_content_is_stored_once(blobs):
+    """put returns the SHA-256 and skips content already stored."""
+    first = blobs.put('print("hi")\n')
+    second = blobs.put(b'print("hi")\n')
+
+    assert first == second == blob_hash('print("hi")\n')
+    assert blobs.stats()['blobs'] == 1
+    assert blobs.get_text(first) == 'print("hi")\n'
+    assert len(list((blobs.root / 'objects').rglob('*.gz'))) == 1
+
+
+def test_missing_and_corrupt_blobs_raise(blobs):
+    """Unknown hashes raise KeyError; damaged objects fail verification."""
+    content_hash = blobs.put('x = 1\n')
+    next((blobs.root / 'objects').rglob('*.gz')).write_bytes(gzip.compress(b'x = 2\n'))
+
+    with pytest.raises(KeyError):
+        blobs.get(blob_hash('nothing'))
+    with pytest.raises(ValueError):
+        blobs.get(content_hash)
+
+
+def test_gc_waits_for_release_and_grace_period(blobs):
+    """Blobs are freed only once unreferenced for longer than the grace period."""
+    kept = blobs.put('kept\n')
+    dropped = blobs.put('dropped\n')
+    blobs.retain([kept, dropped, dropped])
+    blobs.release([dropped])
+
+    assert blobs.gc(grace_seconds=0) == 0
+    blobs.release([dropped])
+    assert blobs.gc(grace_seconds=3600) == 0
+    assert blobs.gc(grace_seconds=0) == 1
+    assert blobs.exists(kept) and not blobs.exists(dropped)
+
+
+@pytest.mark.asyncio
+async def test_gc_runs_on_a_schedule(blobs):
+    """gc_periodically collects at once and then every interval."""
+    dropped = blobs.put('dropped\n')
+    blobs.retain([dropped])
+    blobs.release([dropped])
+
+    task = asyncio.create_task(gc_periodically([blobs], interval_seconds=0.01, grace_seconds=0))
+    for _ in range(100):
+        if not blobs.exists(dropped):
+            break
+        await asyncio.sleep(0.01)
+    task.cancel()
+
+    assert not blobs.exists(dropped)
+
+
+# ============================================================================
+# Manifest Tests
+# ============================================================================
+
+def test_rewriting_a_manifest_moves_references(blobs):
+    """Each manifest entry holds one reference; replaced entries are released."""
+    blobs.put_manifest('plans/a', {'main.py': 'v1\n', 'copy.py': 'v1\n'})
+    blobs.put_manifest('plans/b', {'main.py': 'v1\n'})
+    blobs.put_manifest('plans/a', {'main.py': 'v2\n'})
+
+    assert blobs.stats()['referenced_bytes'] == 2 * len('v1\n')
+    assert blobs.delete_manifest('plans/b')
+    assert blobs.gc(grace_seconds=0) == 1
+    assert blobs.read_files(blobs.get_manifest('plans/a')) == {'main.py': 'v2\n'}
+
+
+def test_manifest_names_cannot_escape_the_root(blobs):
+    with pytest.raises(ValueError):
+        blobs.put_manifest('../outside', {'a.py': 'x\n'})
+
+
+# ============================================================================
+# Materialization Tests
+# ============================================================================
+
+def test_hardlinked_exports_share_one_inode(blobs, tmp_path):
+    """Read-only exports of the same content are links to one raw copy."""
+    manifest = blobs.put_manifest('archive', {'a/one.py': 'same\n', 'b/two.py': 'same\n'})
+    blobs.materialize(manifest, tmp_path / 'out', mode='hardlink')
+
+    one, two = tmp_path / 'out' / 'a' / 'one.py', tmp_path / 'out' / 'b' / 'two.py'
+    assert one.read_text() == 'same\n'
+    assert os.stat(one).st_ino == os.stat(two).st_ino
+
+
+def test_working_copies_are_independent(blobs, tmp_path):
+    """reflink/copy exports can be edited without touching the stored blob."""
+    content_hash = blobs.put('original\n')
+    target = tmp_path / 'work' / 'main.py'
+    blobs.materialize_file(content_hash, target, mode='reflink')
+
+    target.write_text('edited\n')
+    blobs.materialize_file(content_hash, tmp_path / 'work' / 'again.py', mode='copy')
+
+    assert blobs.get_text(content_hash) == 'original\n'
+    assert (tmp_path / 'work' / 'again.py').read_text() == 'original\n'
+
+
+def test_reflink_without_clone_support_leaves_no_raw_copy(blobs, tmp_path, monkeypatch):
+    """Where cloning fails, reflink exports are plain copies and no raw copy is kept."""
+    monkeypatch.setattr(blob_store, '_reflink', lambda src, dst: False)
+    content_hash = blobs.put('x = 1\n' * 100)
+    blobs.materialize_file(content_hash, tmp_path / 'work' / 'main.py', mode='reflink')
+
+    assert (tmp_path / 'work' / 'main.py').read_text() == 'x = 1\n' * 100
+    assert not [path for path in (blobs.root / 'raw').rglob('*') if path.is_file()]
+
+
+def test_materialize_rejects_paths_outside_destination(blobs, tmp_path):
+    content_hash = blobs.put('x\n')
+    with pytest.raises(ValueError):
+        blobs.materialize({'../escape.py': content_hash}, tmp_path / 'out')
+
+
+# ============================================================================
+# Integration Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_projects_and_templates_share_blobs(tmp_path, blobs):
+    """The same file saved by two projects and a template is stored once."""
+    store = ProjectContextStore(storage_root=tmp_path / 'projects', blob_store=blobs)
+    library = TemplateLibrary(storage_root=tmp_path / 'templates', blob_store=blobs)
+    files = {'main.py': 'from fastapi import FastAPI\n'}
+
+    for project_id in ('p1', 'p2'):
+        await store.save_context(ProjectContext(
+            id=project_id, name=project_id, type=ProjectType.API,
+            status=ProjectStatus.CREATED, codebase=dict(files)
+        ))
+    template_id = await library.save_template(ProjectTemplate(
+        id='starter', name='Starter', description='', category='api', files=dict(files)
+    ))
+
+    assert blobs.stats()['blobs'] == 1
+    assert blobs.stats()['referenced_bytes'] == 3 * len(files['main.py'])
+    assert (await library.load_template(template_id)).files == files
+    assert (await store.load_context('p2')).codebase == files
+
+    assert await library.delete_template(template_id)
+    assert await store.delete_context('p1')
+    assert blobs.gc(grace_seconds=0) == 0
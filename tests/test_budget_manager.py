@@ -0,0 +1,136 @@
+"""
+Unit tests for LLM budgets and admission control.
+
+Tests for admit/degrade/reject decisions, per-project and per-stage
+accounting, window resets, scope propagation and the admission metric.
+"""
+
+import asyncio
+import pytest
+from utils.budget_manager import (
+    Budget, BudgetManager, AdmissionDecision, DEGRADED_MODEL,
+    budget_scope, budget_stage, current_scope
+)
+from utils.metrics_registry import REGISTRY
+
+
+class FakeClock:
+    """Controllable time source."""
+
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+# ============================================================================
+# Admission Tests
+# ============================================================================
+
+def test_unconfigured_manager_admits_everything():
+    """Without budgets every call is admitted with the requested model."""
+    manager = BudgetManager()
+    admission = manager.admit(estimated_tokens=10**9, model="gemini-2.5-pro")
+
+    assert admission.decision == AdmissionDecision.ADMIT
+    assert admission.model == "gemini-2.5-pro"
+    assert manager.is_degraded() is False
+
+
+def test_admit_then_degrade_then_reject():
+    """Calls are degraded near the limit and rejected beyond it."""
+    manager = BudgetManager(project_budget=Budget(tokens=1000), degrade_at=0.8)
+
+    first = manager.admit(estimated_tokens=100, project="p1", stage="dev", model="pro")
+    manager.record(700, project="p1", stage="dev")
+    second = manager.admit(estimated_tokens=100, project="p1", stage="dev", model="pro")
+    manager.record(250, project="p1", stage="dev")
+    third = manager.admit(estimated_tokens=100, project="p1", stage="dev", model="pro")
+
+    assert first.decision == AdmissionDecision.ADMIT
+    assert first.model == "pro"
+    assert second.degraded and second.model == DEGRADED_MODEL
+    assert third.rejected
+    assert manager.get_stats()["decisions"] == {"admit": 1, "degrade": 1, "reject": 1}
+
+
+def test_projects_and_stages_are_isolated():
+    """One project's or stage's usage does not degrade another."""
+    manager = BudgetManager(
+        project_budget=Budget(tokens=1000),
+        stage_budgets={"docs": Budget(tokens=100)}
+    )
+    manager.record(90, project="p1", stage="docs")
+    manager.record(900, project="p2", stage="dev")
+
+    assert manager.is_degraded(stage="docs", project="p1")
+    assert not manager.is_degraded(stage="dev", project="p1")
+    assert manager.is_degraded(stage="dev", project="p2")
+    assert not manager.is_degraded(stage="docs", project="p3")
+
+
+def test_request_budget_and_window_reset():
+    """Request limits count admitted calls and reset with the window."""
+    clock = FakeClock()
+    manager = BudgetManager(global_budget=Budget(requests=2), window_seconds=60, clock=clock)
+
+    assert manager.admit().decision == AdmissionDecision.ADMIT
+    assert manager.admit().decision == AdmissionDecision.DEGRADE
+    assert manager.admit().rejected
+
+    clock.now += 61
+    assert manager.admit().decision == AdmissionDecision.ADMIT
+    assert manager.get_stats()["global"]["requests"] == 1
+
+
+def test_admission_metric_by_stage_and_decision():
+    """Decisions are exported as llm_budget_admissions_total{stage,decision}."""
+    manager = BudgetManager(stage_budgets={"metric_stage": Budget(requests=1)})
+    before = REGISTRY.get_sample_value(
+        "llm_budget_admissions_total", {"stage": "metric_stage", "decision": "reject"}
+    ) or 0
+
+    manager.admit(stage="metric_stage")
+    manager.admit(stage="metric_stage")
+
+    after = REGISTRY.get_sample_value(
+        "llm_budget_admissions_total", {"stage": "metric_stage", "decision": "reject"}
+    )
+    assert after == before + 1
+
+
+# ============================================================================
+# Scope Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_budget_stage_sets_scope_and_inherits_project():
+    """Decorated coroutines run in their stage and inherit the caller's project."""
+    seen = []
+
+    @budget_stage("docs")
+    async def generate_docs():
+        await asyncio.sleep(0)
+        seen.append(current_scope())
+
+    @budget_stage("dev", lambda payload: payload["project"])
+    async def process(payload):
+        seen.append(current_scope())
+        await generate_docs()
+
+    await process({"project": "plan-7"})
+
+    assert seen == [("plan-7", "dev"), ("plan-7", "docs")]
+    assert current_scope() == (None, None)
+
+
+def test_record_uses_current_scope():
+    """Usage recorded inside a scope is charged to that project and stage."""
+    manager = BudgetManager(project_budget=Budget(tokens=100))
+    with budget_scope("p9", "qa"):
+        manager.record(85)
+        assert manager.is_degraded()
+
+    assert manager.get_stats()["projects"]["p9"]["tokens"] == 85
+    assert not manager.is_degraded()
@@ -0,0 +1,194 @@
+"""
+Unit tests for cancellation scopes.
+
+Tests for scope registration and inheritance, cancellable child tasks,
+worker-pool teardown of stopped plans, LLM stream cancellation and QA
+subprocess termination.
+"""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+import pytest
+from utils import cancellation
+from utils.cancellation import (
+    CancellationRegistry, ScopeCancelledError, PLAN, CONNECTION, TASK,
+    cancel_scope, current_scopes, scope_keys, scopes_for_task, connection_id
+)
+from utils.task_queue import AsyncTaskQueue, QueueTask
+from utils.worker_pool import WorkerPool
+from utils.llm_setup import LLMClient
+from agents.qa_agent import _run_process
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Fresh registry installed as the module default."""
+    fresh = CancellationRegistry()
+    monkeypatch.setattr(cancellation, "_registry", fresh)
+    return fresh
+
+
+# ============================================================================
+# Registry Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_run_cancels_child_but_spares_caller(registry):
+    """Cancelling a scope raises ScopeCancelledError in the caller, which keeps running."""
+    started = asyncio.Event()
+
+    async def work():
+        started.set()
+        await asyncio.sleep(10)
+
+    runner = asyncio.create_task(registry.run(work(), scope_keys(plan="p1")))
+    await started.wait()
+    assert registry.cancel(PLAN, "p1", "stopped") == 1
+
+    with pytest.raises(ScopeCancelledError, match="stopped"):
+        await runner
+    assert registry.active(PLAN, "p1") == 0
+    assert registry.is_cancelled(scope_keys(plan="p1")) == "stopped"
+
+
+@pytest.mark.asyncio
+async def test_scopes_are_inherited_by_created_tasks(registry):
+    """Tasks created inside a connection scope are cancelled with the connection."""
+    inner_scopes = []
+
+    async def dev_task():
+        with cancel_scope(task="t1"):
+            inner_scopes.append(current_scopes())
+            await asyncio.sleep(10)
+
+    async def session():
+        spawned = asyncio.create_task(dev_task())
+        await asyncio.sleep(10)
+        return spawned
+
+    outer = asyncio.create_task(registry.run(session(), scope_keys(connection="c1")))
+    await asyncio.sleep(0.01)
+
+    assert inner_scopes == [((CONNECTION, "c1"), (TASK, "t1"))]
+    assert registry.cancel(CONNECTION, "c1") == 2
+    with pytest.raises(ScopeCancelledError):
+        await outer
+
+
+def test_scopes_for_queue_task():
+    """Pipeline tasks are scoped by plan, subtask and submitting connection."""
+    websocket = SimpleNamespace()
+    task = QueueTask(task_id="qa_t9", task_type="qa", payload={
+        "plan": {"id": "plan-1"}, "subtask": SimpleNamespace(id="t9"), "websocket": websocket
+    })
+    assert scopes_for_task(task) == (
+        (PLAN, "plan-1"), (TASK, "t9"), (CONNECTION, connection_id(websocket))
+    )
+
+
+# ============================================================================
+# Worker Pool Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_worker_pool_tears_down_stopped_plan(registry):
+    """In-flight work for a stopped plan is cancelled, queued work skipped, the worker freed."""
+    queue = AsyncTaskQueue("CancelQueue")
+    processed = []
+    running = asyncio.Event()
+
+    async def process(task):
+        if task.payload["plan"]["id"] == "stop-me":
+            running.set()
+            await asyncio.sleep(10)
+        processed.append(task.task_id)
+
+    await queue.put(QueueTask(task_id="a", task_type="dev", payload={"plan": {"id": "stop-me"}}))
+    await queue.put(QueueTask(task_id="b", task_type="dev", payload={"plan": {"id": "stop-me"}}))
+    await queue.put(QueueTask(task_id="c", task_type="dev", payload={"plan": {"id": "keep"}}))
+
+    pool = WorkerPool("CancelPool", 1, queue, process)
+    await pool.start()
+    await running.wait()
+
+    start = time.monotonic()
+    registry.cancel(PLAN, "stop-me", "emergency stop")
+    await queue.wait_until_empty(check_interval=0.005)
+    elapsed = time.monotonic() - start
+    await pool.stop(graceful=False)
+
+    assert processed == ["c"]
+    assert elapsed < 0.5
+    assert pool.total_failed == 0
+
+
+# ============================================================================
+# LLM and Subprocess Teardown
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_cancelled_consumer_closes_llm_stream(registry, monkeypatch):
+    """Cancelling the consumer's scope stops the shared stream and the upstream generator."""
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    client = LLMClient()
+    client._min_request_interval = 0
+    upstream = {"chunks": 0, "closed": False}
+
+    class EndlessModel:
+        async def generate_content_async(self, prompt, stream=False):
+            async def chunks():
+                try:
+                    while True:
+                        await asyncio.sleep(0.005)
+                        upstream["chunks"] += 1
+                        yield SimpleNamespace(text="tok")
+                finally:
+                    upstream["closed"] = True
+            return chunks()
+
+    async def get_model(model_name, temperature=None):
+        return EndlessModel()
+
+    client._get_model = get_model
+
+    async def consume():
+        with cancel_scope(plan="p-stream"):
+            async for _ in client.ask_llm_streaming("never ending"):
+                pass
+
+    consumer = asyncio.create_task(consume())
+    await asyncio.sleep(0.05)
+    registry.cancel(PLAN, "p-stream", "client disconnected")
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    await asyncio.sleep(0.02)
+
+    produced = upstream["chunks"]
+    await asyncio.sleep(0.05)
+    assert upstream["chunks"] == produced
+    assert upstream["closed"] is True
+    assert client._inflight_streams == {}
+
+
+@pytest.mark.asyncio
+async def test_run_process_killed_on_cancel():
+    """QA subprocesses are killed when their task is cancelled."""
+    runner = asyncio.create_task(
+        _run_process([sys.executable, "-c", "import time; time.sleep(30)"])
+    )
+    await asyncio.sleep(0.2)
+    start = time.monotonic()
+    runner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await runner
+    assert time.monotonic() - start < 1.0
+
+
+@pytest.mark.asyncio
+async def test_run_process_returns_completed_process():
+    """Output and exit code are captured like subprocess.run."""
+    result = await _run_process([sys.executable, "-c", "print('ok'); raise SystemExit(3)"])
+    assert result.returncode == 3
+    assert result.stdout.strip() == "ok"
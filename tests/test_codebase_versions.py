@@ -0,0 +1,204 @@
+"""
+Unit tests for versioned codebase snapshots.
+
+Tests structural sharing between snapshots, diffs that skip unchanged
+subtrees, history rollback, multi-file CodeModifier changes and snapshot
+recording in PlannerAgent.apply_modification_plan.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from models.project_context import ProjectContext, ProjectType, ProjectStatus
+from utils.blob_store import BlobStore, blob_hash
+from utils.code_modifier import CodeModifier, ModificationResult
+from utils.codebase_versions import CodebaseHistory, FileChange, SnapshotStore
+from utils.project_context_store import ProjectContextStore
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+FILES = {
+    'README.md': '# App\n',
+    'src/app/main.py': 'print("main")\n',
+    'src/app/util.py': 'def helper():\n    return 1\n',
+    'src/lib/db.py': 'DB = None\n',
+    'tests/test_main.py': 'def test_main():\n    pass\n'
+}
+
+
+class CountingStore(SnapshotStore):
+    """Snapshot store that records which trees it reads."""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = []
+
+    def _tree(self, digest):
+        self.reads.append(digest)
+        return super()._tree(digest)
+
+
+# ============================================================================
+# SnapshotStore Tests
+# ============================================================================
+
+def test_update_writes_only_the_changed_path():
+    """Changing one file writes its blob and the trees above it, sharing the rest."""
+    store = SnapshotStore()
+    base = store.update(store.root_of({}), FILES).root
+
+    update = store.update(base, {'src/app/main.py': 'print("v2")\n'})
+
+    # blob + src/app + src + root
+    assert len(update.objects) == 4
+    assert store.lookup(update.root, 'src/lib/db.py') == store.lookup(base, 'src/lib/db.py')
+    assert store.read(update.root, 'src/app/main.py') == 'print("v2")\n'
+    assert store.read(base, 'src/app/main.py') == 'print("main")\n'
+    assert store.root_of(store.file_hashes(update.root)) == update.root
+
+
+def test_diff_descends_only_into_changed_subtrees():
+    store = CountingStore()
+    base = store.update(store.root_of({}), FILES).root
+    new = store.update(base, {'src/app/util.py': None, 'docs/guide.md': 'Guide\n'}).root
+
+    store.reads.clear()
+    changes = store.diff(base, new)
+
+    # root, src and src/app on each side plus the new docs/; tests/ and src/lib are never opened
+    assert len(store.reads) == 7
+    assert [(c.path, c.kind) for c in changes] == [('docs/guide.md', 'added'), ('src/app/util.py', 'deleted')]
+    assert store.changes_between(new, base) == {'docs/guide.md': None, 'src/app/util.py': FILES['src/app/util.py']}
+
+
+def test_deleting_every_file_in_a_directory_drops_it():
+    store = SnapshotStore()
+    base = store.update(store.root_of({}), FILES).root
+    new = store.update(base, {'src/lib/db.py': None}).root
+
+    assert 'src/lib/db.py' not in store.file_hashes(new)
+    assert store.root_of({p: h for p, h in store.file_hashes(base).items() if p != 'src/lib/db.py'}) == new
+
+
+def test_invalid_paths_are_rejected():
+    store = SnapshotStore()
+    with pytest.raises(ValueError):
+        store.update(store.root_of({}), {'../etc/passwd': 'x'})
+
+
+def test_file_and_directory_collisions_are_rejected():
+    """A file and a directory of the same name raise in either order instead of replacing each other."""
+    store = SnapshotStore()
+    for files in ({'a': 'x', 'a/b.py': 'y'}, {'a/b.py': 'y', 'a': 'x'}):
+        with pytest.raises(ValueError):
+            store.root_of(files)
+
+    base = store.write_tree({'a/b.py': store.objects.put('y\n')}).root
+    with pytest.raises(ValueError):
+        store.update(base, {'a': 'x\n'})
+    with pytest.raises(ValueError):
+        store.update(store.update(base, {'c': 'x\n'}).root, {'c/d.py': 'y\n'})
+    # Replacing a directory by a file (or back) in one change set is allowed
+    as_file = store.update(base, {'a/b.py': None, 'a': 'x\n'}).root
+    assert store.file_hashes(as_file) == {'a': blob_hash('x\n')}
+    assert store.file_hashes(store.update(as_file, {'a': None, 'a/b.py': 'y\n'}).root) == store.file_hashes(base)
+
+
+def test_snapshots_persist_in_the_blob_store(tmp_path):
+    """A root hash is enough to read a snapshot back from a new store."""
+    blobs = BlobStore(tmp_path / 'blobs', codec='gzip')
+    root = SnapshotStore(blobs).update(SnapshotStore().root_of({}), FILES).root
+
+    assert SnapshotStore(BlobStore(tmp_path / 'blobs', codec='gzip')).files(root) == FILES
+
+
+# ============================================================================
+# CodebaseHistory Tests
+# ============================================================================
+
+def test_history_versions_and_rollback():
+    history = CodebaseHistory(FILES)
+    history.commit({'src/app/main.py': 'print("v1")\n'}, 'first')
+    history.commit({'src/app/main.py': 'print("v2")\n', 'NEW.md': 'new\n'}, 'second')
+
+    assert history.read('src/app/main.py', version=1) == 'print("v1")\n'
+    assert history[2].changed == ('NEW.md', 'src/app/main.py')
+    assert history.diff(1) == [
+        FileChange('NEW.md', None, history.store.lookup(history.head.root, 'NEW.md')),
+        FileChange(
+            'src/app/main.py',
+            history.store.lookup(history[1].root, 'src/app/main.py'),
+            history.store.lookup(history[2].root, 'src/app/main.py')
+        )
+    ]
+
+    restored = history.rollback(0)
+    assert restored.version == 3 and restored.root == history[0].root
+    assert history.files() == FILES
+    assert history.read('NEW.md', version=2) == 'new\n'
+
+
+# ============================================================================
+# Integration Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_code_modifier_commits_all_files_or_none(monkeypatch):
+    history = CodebaseHistory(FILES)
+    modifier = CodeModifier()
+
+    async def fake_modify(file_path, original_content, modification_request):
+        if 'fail' in modification_request:
+            return ModificationResult(success=False, modified_files={}, diff='', validation_errors=['bad'])
+        return ModificationResult(success=True, modified_files={file_path: original_content + '# changed\n'}, diff='')
+
+    monkeypatch.setattr(modifier, 'modify_code', fake_modify)
+
+    failed = await modifier.modify_files(history, {'README.md': 'ok', 'src/lib/db.py': 'fail'})
+    assert not failed.success and failed.validation_errors == ['src/lib/db.py: bad']
+    assert len(history) == 1
+
+    result = await modifier.modify_files(history, {'README.md': 'ok', 'src/lib/db.py': 'ok'})
+    assert result.success and result.metadata['version'] == 1
+    assert '+# changed' in result.diff
+    assert history.read('src/lib/db.py') == 'DB = None\n# changed\n'
+
+    modifier.rollback(history, result)
+    assert history.files() == FILES
+
+
+@pytest.mark.asyncio
+async def test_planner_records_snapshots_and_rolls_back(tmp_path, monkeypatch):
+    from agents import pm_agent
+
+    # Agent output directories and snapshot blobs stay under tmp_path
+    monkeypatch.setattr(pm_agent, 'GENERATED_CODE_ROOT', tmp_path)
+    monkeypatch.setattr(pm_agent, 'get_blob_store', lambda: BlobStore(tmp_path / 'blobs'))
+    websocket_manager = MagicMock()
+    websocket_manager.send_personal_message = AsyncMock()
+    agent = pm_agent.PlannerAgent(websocket_manager, context_store=ProjectContextStore(storage_root=tmp_path / 'projects'))
+    await agent.context_store.save_context(ProjectContext(
+        id='versioned', name='Versioned', type=ProjectType.API, status=ProjectStatus.CREATED, codebase=dict(FILES)
+    ))
+
+    assert await agent.apply_modification_plan(
+        'versioned', 'plan_1', None, changes={'src/app/main.py': 'print("v1")\n', 'README.md': None}
+    )
+    assert await agent.apply_modification_plan('versioned', 'plan_2', None, changes={'NEW.md': 'new\n'})
+
+    context = await agent.context_store.load_context('versioned')
+    assert context.codebase['src/app/main.py'] == 'print("v1")\n'
+    assert [m.affected_files for m in context.modifications] == [['README.md', 'src/app/main.py'], ['NEW.md']]
+    assert (await agent.get_codebase_at('versioned', 'plan_1')) == {
+        path: content for path, content in {**FILES, 'src/app/main.py': 'print("v1")\n'}.items()
+        if path != 'README.md'
+    }
+
+    assert await agent.rollback_modification('versioned', 'plan_1')
+    context = await agent.context_store.load_context('versioned')
+    assert context.codebase == FILES
+    assert context.modifications[0].status == 'rolled_back'
+    assert sorted(context.modifications[-1].affected_files) == ['NEW.md', 'README.md', 'src/app/main.py']
@@ -0,0 +1,265 @@
+"""
+Tests for cursor pagination of project listings and project history.
+
+Covers keyset pages of the file store's index, in-memory history pages,
+the DynamoDB history page and the cursor-based API endpoints.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import pytest
+from fastapi.testclient import TestClient
+from moto import mock_aws
+
+from models.project_context import ProjectContext, ProjectType, ProjectStatus, Modification, Deployment
+from utils.pagination import encode_cursor
+from utils.project_context_store import ProjectContextStore
+from utils.project_history import history_page
+
+START = datetime(2024, 1, 1)
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def store(tmp_path):
+    """A file store on an empty temporary root."""
+    return ProjectContextStore(storage_root=tmp_path)
+
+
+def make_project(project_id: str, owner_id: str = 'owner_1', status=ProjectStatus.CREATED) -> ProjectContext:
+    return ProjectContext(
+        id=project_id,
+        name=f'Project {project_id}',
+        type=ProjectType.API,
+        status=status,
+        owner_id=owner_id,
+        codebase={'main.py': 'print("hi")\n'}
+    )
+
+
+def make_history(count: int = 5):
+    """Modifications at even minutes, deployments at odd ones; every third entry failed."""
+    modifications, deployments = [], []
+    for i in range(count):
+        status = 'failed' if i % 3 == 0 else 'applied'
+        if i % 2:
+            deployments.append(Deployment(
+                id=f'dep_{i}', timestamp=START + timedelta(minutes=i), environment='production',
+                platform='render', status=status
+            ))
+        else:
+            modifications.append(Modification(
+                id=f'mod_{i}', timestamp=START + timedelta(minutes=i), description=f'Change {i}',
+                affected_files=['main.py'], requested_by='user', status=status
+            ))
+    return modifications, deployments
+
+
+async def collect_pages(list_page, **kwargs):
+    """IDs of every page of a paginated call, following next_cursor."""
+    seen, cursor = [], None
+    while True:
+        page = await list_page(cursor=cursor, **kwargs)
+        seen.append([item.id for item in page.items])
+        if not page.next_cursor:
+            return seen
+        cursor = page.next_cursor
+
+
+# ============================================================================
+# File Store Listing Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_every_project_once(store):
+    for i in range(7):
+        assert await store.save_context(make_project(f'proj_{i}', owner_id='alice' if i % 2 else 'bob'))
+
+    pages = await collect_pages(store.list_contexts_page, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == [p.id for p in await store.list_contexts()]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_apply_filters_in_the_index(store):
+    for i in range(6):
+        status = ProjectStatus.DEPLOYED if i % 3 == 0 else ProjectStatus.CREATED
+        assert await store.save_context(make_project(f'proj_{i}', owner_id='alice' if i < 4 else 'bob', status=status))
+
+    pages = await collect_pages(store.list_contexts_page, owner_id='alice', status=ProjectStatus.DEPLOYED, limit=1)
+
+    assert sorted(sum(pages, [])) == ['proj_0', 'proj_3']
+
+
+@pytest.mark.asyncio
+async def test_projects_updated_between_pages_are_not_repeated(store):
+    for i in range(4):
+        assert await store.save_context(make_project(f'proj_{i}'))
+
+    first = await store.list_contexts_page(limit=2)
+    # Moving a project of the first page to the front does not shift the rest
+    assert await store.update_context_fields(first.items[1].id, {'name': 'Renamed'})
+    second = await store.list_contexts_page(limit=2, cursor=first.next_cursor)
+
+    assert {p.id for p in first.items}.isdisjoint(p.id for p in second.items)
+    assert len(second.items) == 2 and second.next_cursor is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('cursor', ['not-a-cursor', encode_cursor({'id': 'proj_1'})])
+async def test_invalid_listing_cursor_raises_value_error(store, cursor):
+    with pytest.raises(ValueError):
+        await store.list_contexts_page(cursor=cursor)
+
+
+# ============================================================================
+# History Page Tests
+# ============================================================================
+
+def test_history_pages_are_newest_first():
+    modifications, deployments = make_history(5)
+
+    first = history_page(modifications, deployments, limit=3)
+    second = history_page(modifications, deployments, limit=3, cursor=first.next_cursor)
+
+    assert [e.id for e in first.items] == ['mod_4', 'dep_3', 'mod_2']
+    assert [e.id for e in second.items] == ['dep_1', 'mod_0']
+    assert second.next_cursor is None
+
+
+def test_history_page_filters_by_type_and_status():
+    modifications, deployments = make_history(7)
+
+    assert [e.id for e in history_page(modifications, deployments, kind='deployment').items] == ['dep_5', 'dep_3', 'dep_1']
+    assert [e.id for e in history_page(modifications, deployments, status='failed').items] == ['mod_6', 'dep_3', 'mod_0']
+    with pytest.raises(ValueError):
+        history_page(modifications, deployments, kind='rollback')
+
+
+def test_history_ties_on_timestamp_page_without_loss():
+    modifications = [
+        Modification(id=f'mod_{i}', timestamp=START, description='', affected_files=[],
+                     requested_by='user', status='applied')
+        for i in range(5)
+    ]
+
+    first = history_page(modifications, [], limit=2)
+    rest = history_page(modifications, [], limit=5, cursor=first.next_cursor)
+
+    assert [e.id for e in first.items + rest.items] == ['mod_4', 'mod_3', 'mod_2', 'mod_1', 'mod_0']
+
+
+def test_history_pages_mix_aware_and_naive_timestamps():
+    """Aware cursor and event timestamps are compared as naive UTC instead of raising."""
+    modifications, deployments = make_history(5)
+    deployments[0].timestamp = deployments[0].timestamp.replace(tzinfo=timezone.utc)
+    # mod_2's position, written in UTC+2
+    at_mod_2 = (START + timedelta(hours=2, minutes=2)).replace(tzinfo=timezone(timedelta(hours=2)))
+    cursor = encode_cursor({'timestamp': at_mod_2, 'type': 'modification', 'id': 'mod_2'})
+
+    assert [e.id for e in history_page(modifications, deployments).items] == ['mod_4', 'dep_3', 'mod_2', 'dep_1', 'mod_0']
+    assert [e.id for e in history_page(modifications, deployments, cursor=cursor).items] == ['dep_1', 'mod_0']
+
+
+@pytest.mark.asyncio
+async def test_file_store_history_page(store):
+    project = make_project('proj_history')
+    project.modifications, project.deployments = make_history(4)
+    assert await store.save_context(project)
+
+    pages = await collect_pages(store.list_history_page, project_id='proj_history', limit=3)
+
+    assert pages == [['dep_3', 'mod_2', 'dep_1'], ['mod_0']]
+    assert await store.list_history_page('missing') is None
+
+
+@pytest.mark.asyncio
+async def test_dynamodb_store_history_page(monkeypatch):
+    from utils.dynamodb_project_store import DynamoDBProjectStore
+
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN'):
+        monkeypatch.setenv(name, 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+
+    with mock_aws():
+        boto3.resource('dynamodb', region_name='us-east-1').create_table(
+            TableName='history-test',
+            KeySchema=[
+                {'AttributeName': 'PK', 'KeyType': 'HASH'},
+                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'PK', 'AttributeType': 'S'},
+                {'AttributeName': 'SK', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        dynamodb_store = DynamoDBProjectStore(table_name='history-test', region='us-east-1')
+        assert await dynamodb_store.save_context(make_project('proj_dynamo'))
+        modifications, deployments = make_history(4)
+        for mod in modifications:
+            assert await dynamodb_store.add_modification('proj_dynamo', vars(mod))
+        for dep in deployments:
+            assert await dynamodb_store.add_deployment('proj_dynamo', vars(dep))
+
+        page = await dynamodb_store.list_history_page('proj_dynamo', kind='modification', limit=1)
+        rest = await dynamodb_store.list_history_page('proj_dynamo', kind='modification', cursor=page.next_cursor)
+
+        assert [e.id for e in page.items + rest.items] == ['mod_2', 'mod_0']
+        assert await dynamodb_store.list_history_page('missing') is None
+
+
+# ============================================================================
+# API Endpoint Tests
+# ============================================================================
+
+@pytest.fixture
+def client(store, tmp_path, monkeypatch):
+    """API client whose routes use the temporary file store."""
+    from main import app
+    from utils import blob_store
+    from utils.stores import get_shared_project_store
+
+    # Nothing may fall back to the default blob store under generated_code/
+    monkeypatch.setattr(blob_store, 'get_blob_store', lambda: blob_store.BlobStore(tmp_path / 'blobs'))
+    app.dependency_overrides[get_shared_project_store] = lambda: store
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_shared_project_store, None)
+
+
+@pytest.mark.asyncio
+async def test_list_projects_endpoint_follows_cursors(client, store):
+    for i in range(3):
+        assert await store.save_context(make_project(f'proj_{i}', owner_id='alice'))
+
+    first = client.get('/api/projects', params={'owner_id': 'alice', 'limit': 2}).json()
+    second = client.get('/api/projects', params={
+        'owner_id': 'alice', 'limit': 2, 'cursor': first['pagination']['next_cursor']
+    }).json()
+
+    assert len(first['projects']) == 2 and first['pagination']['has_more']
+    assert 'codebase' not in first['projects'][0]
+    assert len(second['projects']) == 1 and second['pagination']['next_cursor'] is None
+    assert client.get('/api/projects', params={'cursor': 'garbage'}).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_history_endpoints_page_in_the_store(client, store):
+    project = make_project('proj_api')
+    project.modifications, project.deployments = make_history(6)
+    assert await store.save_context(project)
+
+    failed = client.get('/api/projects/proj_api/modifications', params={'status': 'failed'}).json()
+    assert [m['id'] for m in failed['modifications']] == ['mod_0']
+
+    history = client.get('/api/projects/proj_api/history', params={'limit': 4}).json()
+    assert [e['type'] for e in history['history']] == ['deployment', 'modification', 'deployment', 'modification']
+    assert history['pagination']['has_more']
+
+    assert client.get('/api/projects/proj_api/history', params={'kind': 'other'}).status_code == 400
+    assert client.get('/api/projects/missing/modifications').status_code == 404
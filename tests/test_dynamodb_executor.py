@@ -0,0 +1,141 @@
+"""
+Unit tests for the DynamoDB executor.
+
+Tests that blocking boto3 calls run off the event loop on a bounded pool,
+and that the stores issue independent calls concurrently.
+"""
+
+import time
+import asyncio
+import threading
+import pytest
+from moto import mock_aws
+import boto3
+
+from utils.dynamodb_executor import DynamoDBExecutor, get_dynamodb_executor
+from utils.dynamodb_project_store import DynamoDBProjectStore
+from models.project_context import ProjectContext, ProjectType, ProjectStatus
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def executor():
+    """A small executor, shut down after the test."""
+    pool = DynamoDBExecutor(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Project store on a mocked table."""
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN'):
+        monkeypatch.setenv(name, 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+
+    with mock_aws():
+        boto3.resource('dynamodb', region_name='us-east-1').create_table(
+            TableName='executor-test',
+            KeySchema=[
+                {'AttributeName': 'PK', 'KeyType': 'HASH'},
+                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'PK', 'AttributeType': 'S'},
+                {'AttributeName': 'SK', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        yield DynamoDBProjectStore(table_name='executor-test', region='us-east-1')
+
+
+# ============================================================================
+# Executor Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_run_keeps_event_loop_responsive(executor):
+    """Blocking calls on the executor do not stall other coroutines."""
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    beat = asyncio.create_task(heartbeat())
+    start = time.monotonic()
+    await asyncio.gather(executor.run(time.sleep, 0.2), executor.run(time.sleep, 0.2))
+    elapsed = time.monotonic() - start
+    beat.cancel()
+
+    assert elapsed < 0.35  # both sleeps overlapped
+    assert ticks >= 10
+    assert executor.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_run_is_bounded_by_max_workers():
+    """Calls beyond max_workers queue instead of running concurrently."""
+    pool = DynamoDBExecutor(max_workers=1)
+    try:
+        start = time.monotonic()
+        await asyncio.gather(pool.run(time.sleep, 0.1), pool.run(time.sleep, 0.1))
+        assert time.monotonic() - start >= 0.2
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_run_propagates_exceptions(executor):
+    """Exceptions raised on a worker thread reach the caller."""
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        await executor.run(fail)
+
+
+def test_resource_connection_pool_matches_workers(executor):
+    """The botocore connection pool is sized to the worker count."""
+    resource = executor.resource('us-east-1')
+    assert resource.meta.client.meta.config.max_pool_connections == executor.max_workers
+
+
+# ============================================================================
+# Store Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_load_context_reads_metadata_and_files_concurrently(store):
+    """get_item and the FILE# query overlap, both on executor threads."""
+    project = ProjectContext(
+        id='executor_project', name='Executor', type=ProjectType.API, status=ProjectStatus.CREATED,
+        codebase={'app.py': 'print("hi")\n', 'util.py': 'x = 1\n'}
+    )
+    assert await store.save_context(project)
+
+    threads = []
+
+    def slow_call(model, **kwargs):
+        threads.append((model.name, threading.current_thread().name))
+        time.sleep(0.2)
+
+    store.dynamodb.meta.client.meta.events.register('before-call.dynamodb', slow_call)
+    start = time.monotonic()
+    loaded = await store.load_context('executor_project')
+    elapsed = time.monotonic() - start
+
+    assert loaded.codebase == project.codebase
+    assert sorted(name for name, _ in threads) == ['GetItem', 'Query']
+    assert all(thread.startswith('dynamodb') for _, thread in threads)
+    assert elapsed < 0.35
+
+
+def test_stores_share_the_global_executor(store):
+    """Every store uses the process-wide executor."""
+    assert store._executor is get_dynamodb_executor()
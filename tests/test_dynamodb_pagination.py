@@ -0,0 +1,234 @@
+"""
+Unit tests for DynamoDB pagination, parallel scans and batch gets.
+
+Tests cursor tokens, LastEvaluatedKey following, UnprocessedKeys retries,
+and complete listings from the project store on a mocked table.
+"""
+
+import pytest
+from decimal import Decimal
+from moto import mock_aws
+import boto3
+
+from utils.dynamodb_executor import DynamoDBExecutor
+from utils.dynamodb_pagination import (
+    UnprocessedKeysError, encode_cursor, decode_cursor, paginate, fetch_page,
+    parallel_scan, batch_get_items, abatch_get_items
+)
+from utils.dynamodb_project_store import DynamoDBProjectStore
+from models.project_context import ProjectContext, ProjectType, ProjectStatus
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def executor():
+    """A small executor, shut down after the test."""
+    pool = DynamoDBExecutor(max_workers=4)
+    yield pool
+    pool.shutdown()
+
+
+def paged_query(data, max_page=3):
+    """A fake query returning at most `max_page` items per call (like the 1 MB cap)."""
+    calls = []
+
+    def query(Limit=None, ExclusiveStartKey=None, **params):
+        calls.append(Limit)
+        start = int(ExclusiveStartKey['i']) + 1 if ExclusiveStartKey else 0
+        size = min(Limit or max_page, max_page)
+        items = data[start:start + size]
+        response = {'Items': items}
+        if start + size < len(data):
+            response['LastEvaluatedKey'] = {'i': items[-1]['i']}
+        return response
+
+    query.calls = calls
+    return query
+
+
+class FlakyBatchGet:
+    """A fake resource whose batch_get_item leaves keys unprocessed at first."""
+
+    def __init__(self, table, unprocessed_rounds=1):
+        self.table = table
+        self.unprocessed_rounds = unprocessed_rounds
+        self.calls = 0
+
+    def batch_get_item(self, RequestItems):
+        self.calls += 1
+        keys = RequestItems['t']['Keys']
+        if self.calls <= self.unprocessed_rounds:
+            served, unprocessed = keys[:1], keys[1:]
+        else:
+            served, unprocessed = keys, []
+        response = {'Responses': {'t': [self.table[key['id']] for key in served if key['id'] in self.table]}}
+        if unprocessed:
+            response['UnprocessedKeys'] = {'t': {'Keys': unprocessed}}
+        return response
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Project store on a mocked table with owner and status indexes."""
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN'):
+        monkeypatch.setenv(name, 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+
+    with mock_aws():
+        boto3.resource('dynamodb', region_name='us-east-1').create_table(
+            TableName='pagination-test',
+            KeySchema=[
+                {'AttributeName': 'PK', 'KeyType': 'HASH'},
+                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': name, 'AttributeType': 'S'}
+                for name in ('PK', 'SK', 'GSI1PK', 'GSI1SK', 'GSI2PK', 'GSI2SK')
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': index,
+                    'KeySchema': [
+                        {'AttributeName': f'{index}PK', 'KeyType': 'HASH'},
+                        {'AttributeName': f'{index}SK', 'KeyType': 'RANGE'}
+                    ],
+                    'Projection': {'ProjectionType': 'ALL'}
+                }
+                for index in ('GSI1', 'GSI2')
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        yield DynamoDBProjectStore(table_name='pagination-test', region='us-east-1', scan_segments=3)
+
+
+async def save_projects(store, count, owner_id='owner_1'):
+    for i in range(count):
+        assert await store.save_context(ProjectContext(
+            id=f'project_{i:03d}', name=f'Project {i}', type=ProjectType.API,
+            status=ProjectStatus.CREATED, owner_id=owner_id
+        ))
+
+
+# ============================================================================
+# Cursor Tests
+# ============================================================================
+
+def test_cursor_round_trip_preserves_types():
+    """Cursors are opaque strings that decode to the original key."""
+    key = {'PK': 'PROJECT#a/b', 'SK': 'FILE#src/x.py', 'n': Decimal('42')}
+    cursor = encode_cursor(key)
+
+    assert isinstance(cursor, str) and '/' not in cursor
+    assert decode_cursor(cursor) == key
+    assert encode_cursor(None) is None and decode_cursor(None) is None
+
+
+def test_invalid_cursor_raises_value_error():
+    """A tampered cursor is rejected."""
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor!')
+
+
+# ============================================================================
+# Pagination Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_paginate_follows_last_evaluated_key(executor):
+    """Every page is read, not just the first."""
+    data = [{'i': i} for i in range(10)]
+    pages = [page async for page in paginate(executor, paged_query(data))]
+
+    assert [item['i'] for page in pages for item in page.items] == list(range(10))
+    assert [len(page.items) for page in pages] == [3, 3, 3, 1]
+    assert pages[-1].next_cursor is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_page_with_limit_resumes_exactly(executor):
+    """Requests never overshoot the limit, so cursors resume without gaps."""
+    data = [{'i': i} for i in range(10)]
+    query = paged_query(data)
+
+    first = await fetch_page(executor, query, limit=4)
+    second = await fetch_page(executor, query, limit=4, cursor=first.next_cursor)
+    third = await fetch_page(executor, query, limit=4, cursor=second.next_cursor)
+
+    seen = [item['i'] for page in (first, second, third) for item in page.items]
+    assert seen == list(range(10))
+    assert third.next_cursor is None
+    assert max(query.calls) <= 4
+
+
+@pytest.mark.asyncio
+async def test_parallel_scan_reads_all_segments(store):
+    """A segmented scan returns every matching item once."""
+    await save_projects(store, 12)
+
+    ids = []
+    async for items in parallel_scan(store._executor, store.table.scan, 4, ProjectionExpression='PK'):
+        ids.extend(item['PK'] for item in items)
+
+    assert sorted(ids) == sorted(f'PROJECT#project_{i:03d}' for i in range(12))
+
+
+# ============================================================================
+# Batch Get Tests
+# ============================================================================
+
+def test_batch_get_retries_unprocessed_keys():
+    """Unprocessed keys are retried until every item is read."""
+    table = {i: {'id': i} for i in range(5)}
+    dynamodb = FlakyBatchGet(table, unprocessed_rounds=2)
+
+    items = batch_get_items(dynamodb, 't', [{'id': i} for i in range(5)] + [{'id': 0}], base_delay=0.001)
+
+    assert sorted(item['id'] for item in items) == list(range(5))
+    assert dynamodb.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_async_batch_get_reports_keys_left_after_retries(executor):
+    """Exhausted retries raise with the keys left and the items already read."""
+    table = {i: {'id': i} for i in range(3)}
+    dynamodb = FlakyBatchGet(table, unprocessed_rounds=10)
+
+    with pytest.raises(UnprocessedKeysError) as error:
+        await abatch_get_items(
+            executor, dynamodb, 't', [{'id': i} for i in range(3)], max_attempts=2, base_delay=0.001
+        )
+
+    assert [item['id'] for item in error.value.items] == [0, 1]
+    assert error.value.keys == [{'id': 2}]
+
+
+# ============================================================================
+# Store Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_list_contexts_page_walks_every_project(store):
+    """Cursor pages cover an owner's projects exactly once."""
+    await save_projects(store, 25)
+
+    seen, cursor = [], None
+    while True:
+        page = await store.list_contexts_page(owner_id='owner_1', limit=10, cursor=cursor)
+        seen.extend(project.id for project in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert sorted(seen) == [f'project_{i:03d}' for i in range(25)]
+    assert len((await store.list_contexts())) == 25
+    assert len(await store.query_by_owner('owner_1', limit=7)) == 7
+
+
+@pytest.mark.asyncio
+async def test_list_contexts_page_rejects_bad_cursor(store):
+    """An invalid cursor is a caller error, not an empty page."""
+    with pytest.raises(ValueError):
+        await store.list_contexts_page(cursor='garbage')
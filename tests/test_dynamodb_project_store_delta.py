@@ -0,0 +1,188 @@
+"""
+Unit tests for delta writes in DynamoDBProjectStore.
+
+Tests that saves write only changed files, delete removed ones, and that
+history entries and field updates use in-place UpdateItem calls.
+"""
+
+import os
+import pytest
+from collections import Counter
+from datetime import datetime
+from moto import mock_aws
+import boto3
+
+from utils.dynamodb_project_store import DynamoDBProjectStore
+from models.project_context import ProjectContext, ProjectType, ProjectStatus
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def store(monkeypatch):
+    """Project store on a mocked table, with a log of write requests."""
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN'):
+        monkeypatch.setenv(name, 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+
+    with mock_aws():
+        boto3.resource('dynamodb', region_name='us-east-1').create_table(
+            TableName='delta-test',
+            KeySchema=[
+                {'AttributeName': 'PK', 'KeyType': 'HASH'},
+                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'PK', 'AttributeType': 'S'},
+                {'AttributeName': 'SK', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        yield tracked_store()
+
+
+def tracked_store() -> DynamoDBProjectStore:
+    """A store whose write requests are counted in .writes as (kind, SK)."""
+    project_store = DynamoDBProjectStore(table_name='delta-test', region='us-east-1')
+    project_store.writes = Counter()
+
+    def record_writes(params, model, **kwargs):
+        if model.name == 'BatchWriteItem':
+            for request in params['RequestItems']['delta-test']:
+                if 'PutRequest' in request:
+                    project_store.writes[('put', request['PutRequest']['Item']['SK'])] += 1
+                else:
+                    project_store.writes[('delete', request['DeleteRequest']['Key']['SK'])] += 1
+        elif model.name in ('UpdateItem', 'PutItem'):
+            project_store.writes[(model.name, None)] += 1
+
+    project_store.dynamodb.meta.client.meta.events.register('provide-client-params.dynamodb', record_writes)
+    return project_store
+
+
+def make_project(files: int = 5) -> ProjectContext:
+    return ProjectContext(
+        id='delta_project',
+        name='Delta',
+        type=ProjectType.API,
+        status=ProjectStatus.CREATED,
+        codebase={f'src/file_{i}.py': f'value = {i}\n' for i in range(files)}
+    )
+
+
+# ============================================================================
+# File Delta Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_save_writes_only_changed_and_removed_files(store):
+    """A second save puts changed/new files, deletes removed ones, skips the rest."""
+    project = make_project(files=5)
+    assert await store.save_context(project)
+    assert sum(1 for kind, sk in store.writes if sk.startswith('FILE#')) == 5
+
+    store.writes.clear()
+    project.codebase['src/file_1.py'] = 'value = "changed"\n'
+    project.codebase['src/new.py'] = 'new = True\n'
+    del project.codebase['src/file_4.py']
+    assert await store.save_context(project)
+
+    assert set(store.writes) == {
+        ('put', 'METADATA'),
+        ('put', 'FILE#src/file_1.py'),
+        ('put', 'FILE#src/new.py'),
+        ('delete', 'FILE#src/file_4.py')
+    }
+    loaded = await DynamoDBProjectStore(table_name='delta-test', region='us-east-1').load_context('delta_project')
+    assert loaded.codebase == project.codebase
+
+
+@pytest.mark.asyncio
+async def test_fresh_store_compares_against_stored_hashes(store):
+    """A store that never saw the project reads stored hashes before writing."""
+    await store.save_context(make_project(files=3))
+
+    other = tracked_store()
+    project = make_project(files=3)
+    project.codebase['src/file_0.py'] = 'value = -1\n'
+    assert await other.save_context(project)
+
+    assert set(other.writes) == {('put', 'METADATA'), ('put', 'FILE#src/file_0.py')}
+
+
+@pytest.mark.asyncio
+async def test_writes_by_other_stores_are_not_lost(store):
+    """Deltas are computed against the table, not what this store last wrote."""
+    project = make_project(files=2)
+    assert await store.save_context(project)
+
+    # Another process rewrites a file and adds one
+    other = tracked_store()
+    changed = make_project(files=2)
+    changed.codebase['src/file_0.py'] = 'value = "other"\n'
+    changed.codebase['src/other.py'] = 'other = True\n'
+    assert await other.save_context(changed)
+
+    # Saving this store's (older) codebase again restores it completely
+    store.writes.clear()
+    assert await store.save_context(project)
+
+    assert set(store.writes) == {
+        ('put', 'METADATA'),
+        ('put', 'FILE#src/file_0.py'),
+        ('delete', 'FILE#src/other.py')
+    }
+    loaded = await tracked_store().load_context('delta_project')
+    assert loaded.codebase == project.codebase
+
+
+# ============================================================================
+# In-Place Update Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_history_appends_use_update_item(store):
+    """Modifications and deployments are appended without rewriting files."""
+    await store.save_context(make_project(files=20))
+    store.writes.clear()
+
+    assert await store.add_modification('delta_project', {'id': 'm1', 'description': 'Add auth'})
+    assert await store.add_modification('delta_project', {'id': 'm2', 'description': 'Fix bug'})
+    assert await store.add_deployment('delta_project', {
+        'id': 'd1', 'environment': 'production', 'platform': 'render', 'timestamp': datetime(2025, 1, 2)
+    })
+
+    assert store.writes == Counter({('UpdateItem', None): 3})
+    project = await store.load_context('delta_project')
+    assert [m.id for m in project.modifications] == ['m1', 'm2']
+    assert project.deployments[0].platform == 'render'
+    assert project.last_deployed_at == datetime(2025, 1, 2)
+    assert len(project.codebase) == 20
+
+
+@pytest.mark.asyncio
+async def test_update_context_fields_in_place(store):
+    """Field updates set metadata attributes (and GSI keys) with one UpdateItem."""
+    await store.save_context(make_project(files=10))
+    store.writes.clear()
+
+    assert await store.update_context_fields('delta_project', {
+        'status': 'deployed', 'test_coverage': 0.9, 'bogus': 1
+    })
+
+    assert store.writes == Counter({('UpdateItem', None): 1})
+    item = store.table.get_item(Key={'PK': 'PROJECT#delta_project', 'SK': 'METADATA'})['Item']
+    assert item['GSI2PK'] == 'STATUS#deployed'
+    project = await store.load_context('delta_project')
+    assert project.status == ProjectStatus.DEPLOYED
+    assert project.test_coverage == 0.9
+
+
+@pytest.mark.asyncio
+async def test_updates_to_missing_project_fail(store):
+    """Appends and field updates do not create a project that does not exist."""
+    assert not await store.add_modification('missing', {'description': 'x'})
+    assert not await store.update_context_fields('missing', {'name': 'x'})
+    assert await store.load_context('missing') is None
@@ -0,0 +1,184 @@
+"""
+Unit tests for fair scheduling between tenants.
+
+Tests for FairPriorityQueue, FairTaskQueue and their use by WorkerPool.
+"""
+
+import asyncio
+import pytest
+from utils.task_queue import QueueTask
+from utils.worker_pool import WorkerPool
+from utils.fair_scheduler import FairTaskQueue, default_tenant_key, DEFAULT_TENANT
+
+
+def make_task(task_id: str, tenant: str, priority: int = 5) -> QueueTask:
+    return QueueTask(
+        task_id=task_id,
+        task_type="dev",
+        payload={"plan": {"id": tenant}},
+        priority=priority
+    )
+
+
+# ============================================================================
+# Tenant Key Tests
+# ============================================================================
+
+def test_default_tenant_key_lookup_order():
+    """Explicit tenant wins, then payload IDs, then plan ID."""
+    task = QueueTask(task_id="t", task_type="dev", payload={"plan": {"id": "plan_1"}})
+    assert default_tenant_key(task) == "plan_1"
+
+    task.payload["owner_id"] = "alice"
+    assert default_tenant_key(task) == "alice"
+
+    task.tenant_id = "explicit"
+    assert default_tenant_key(task) == "explicit"
+
+    empty = QueueTask(task_id="e", task_type="dev", payload=None)
+    assert default_tenant_key(empty) == DEFAULT_TENANT
+
+
+# ============================================================================
+# FairTaskQueue Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_round_robin_between_tenants():
+    """A small tenant is served before a large tenant's backlog drains."""
+    queue = FairTaskQueue("FairQueue")
+
+    for i in range(50):
+        await queue.put(make_task(f"big_{i}", "big"))
+    await queue.put(make_task("small_0", "small"))
+
+    first = await queue.get()
+    second = await queue.get()
+
+    assert first.task_id == "big_0"
+    assert second.task_id == "small_0"
+
+
+@pytest.mark.asyncio
+async def test_priority_preserved_within_tenant():
+    """Tasks of one tenant are dequeued in priority order."""
+    queue = FairTaskQueue("FairQueue")
+
+    await queue.put(make_task("low", "a", priority=4))
+    await queue.put(make_task("critical", "a", priority=1))
+    await queue.put(make_task("normal", "a", priority=3))
+
+    order = [(await queue.get()).task_id for _ in range(3)]
+    assert order == ["critical", "normal", "low"]
+
+
+@pytest.mark.asyncio
+async def test_weighted_share():
+    """A tenant with weight 3 gets three dequeues per round."""
+    queue = FairTaskQueue("FairQueue")
+    queue.set_tenant_weight("heavy", 3)
+
+    for i in range(6):
+        await queue.put(make_task(f"heavy_{i}", "heavy"))
+        await queue.put(make_task(f"light_{i}", "light"))
+
+    order = [(await queue.get()).tenant_id for _ in range(8)]
+    assert order == ["heavy"] * 3 + ["light"] + ["heavy"] * 3 + ["light"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("light_weight", [0.3, 0.25, 0.1])
+async def test_fractional_weights_are_served(light_weight):
+    """Weights below 0.5 still dequeue queued tasks, at their share."""
+    queue = FairTaskQueue("FairQueue", default_weight=light_weight)
+
+    await queue.put(make_task("only", "light"))
+    assert (await asyncio.wait_for(queue.get(), timeout=1)).task_id == "only"
+
+    queue.set_tenant_weight("heavy", 1)
+    for i in range(20):
+        await queue.put(make_task(f"heavy_{i}", "heavy"))
+        await queue.put(make_task(f"light_{i}", "light"))
+
+    order = [(await asyncio.wait_for(queue.get(), timeout=1)).tenant_id for _ in range(20)]
+    assert order.count("light") == pytest.approx(20 * light_weight / (1 + light_weight), abs=1)
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_blocks_until_release():
+    """A tenant at its in-flight limit is skipped until a task completes."""
+    queue = FairTaskQueue("FairQueue", max_in_flight_per_tenant=1)
+
+    await queue.put(make_task("a_0", "a"))
+    await queue.put(make_task("a_1", "a"))
+
+    first = await queue.get()
+    assert first.task_id == "a_0"
+    assert queue.size() == 1
+
+    with pytest.raises(asyncio.TimeoutError):
+        await queue.get(timeout=0.05)
+
+    queue.task_done(first.task_id, success=True)
+    second = await queue.get(timeout=1.0)
+    assert second.task_id == "a_1"
+
+
+@pytest.mark.asyncio
+async def test_retry_releases_in_flight_slot():
+    """Retried tasks give back their slot and are re-enqueued."""
+    queue = FairTaskQueue("FairQueue", max_in_flight_per_tenant=1)
+
+    await queue.put(make_task("a_0", "a"))
+    task = await queue.get()
+
+    assert queue.task_retry(task) is True
+    retried = await queue.get(timeout=1.0)
+    assert retried.task_id == "a_0"
+    assert retried.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_clear_tenant_and_stats():
+    """Per-tenant stats and clearing one tenant's backlog."""
+    queue = FairTaskQueue("FairQueue")
+
+    for i in range(3):
+        await queue.put(make_task(f"a_{i}", "a"))
+    await queue.put(make_task("b_0", "b"))
+
+    stats = queue.get_stats()
+    assert stats["pending"] == 4
+    assert stats["tenants"]["a"]["pending"] == 3
+    assert stats["tenants"]["b"]["pending"] == 1
+
+    assert queue.clear_tenant("a") == 3
+    assert queue.size() == 1
+    task = await queue.get()
+    assert task.task_id == "b_0"
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_interleaves_tenants():
+    """WorkerPool consumes FairTaskQueue unchanged and interleaves tenants."""
+    queue = FairTaskQueue("FairQueue")
+    processed = []
+
+    async def process_func(task):
+        processed.append(task.tenant_id)
+        await asyncio.sleep(0.001)
+        return None
+
+    for i in range(20):
+        await queue.put(make_task(f"big_{i}", "big"))
+    for i in range(2):
+        await queue.put(make_task(f"small_{i}", "small"))
+
+    pool = WorkerPool("FairPool", 1, queue, process_func)
+    await pool.start()
+    await queue.wait_until_empty(check_interval=0.01)
+    await pool.stop(graceful=False)
+
+    assert len(processed) == 22
+    # Both small tasks finish within the first few dispatches
+    assert processed[:4].count("small") == 2
@@ -0,0 +1,189 @@
+"""
+Unit tests for S3 offloading of large file bodies.
+
+Tests the codecs, the size threshold, content-addressed deduplication,
+DynamoDBProjectStore saving and loading offloaded files and the Lambda
+workers' reader of offloaded bodies.
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+from collections import Counter
+from moto import mock_aws
+import boto3
+
+from utils.file_body_store import FileBodyStore, ZSTD_AVAILABLE, compress, decompress, is_offloaded
+from utils.dynamodb_project_store import DynamoDBProjectStore
+from models.project_context import ProjectContext, ProjectType, ProjectStatus
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def aws(monkeypatch):
+    """Mocked DynamoDB table and S3 bucket."""
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN'):
+        monkeypatch.setenv(name, 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+
+    with mock_aws():
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket='bodies')
+        boto3.resource('dynamodb', region_name='us-east-1').create_table(
+            TableName='bodies-test',
+            KeySchema=[
+                {'AttributeName': 'PK', 'KeyType': 'HASH'},
+                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'PK', 'AttributeType': 'S'},
+                {'AttributeName': 'SK', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        yield
+
+
+@pytest.fixture
+def body_store(aws):
+    """Body store offloading anything over 1 KB, counting S3 puts."""
+    bodies = FileBodyStore(bucket='bodies', region='us-east-1', inline_max_bytes=1024)
+    bodies.puts = Counter()
+
+    def count_puts(model, **kwargs):
+        bodies.puts[model.name] += 1
+
+    bodies.s3.meta.events.register('before-call.s3.PutObject', count_puts)
+    return bodies
+
+
+@pytest.fixture
+def file_bodies():
+    """The Lambda workers' reader (lambda/shared/python/file_bodies.py)."""
+    path = Path(__file__).parent.parent / 'lambda' / 'shared' / 'python' / 'file_bodies.py'
+    spec = importlib.util.spec_from_file_location('file_bodies', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_project() -> ProjectContext:
+    return ProjectContext(
+        id='bodies_project',
+        name='Bodies',
+        type=ProjectType.API,
+        status=ProjectStatus.CREATED,
+        codebase={
+            'small.py': 'x = 1\n',
+            'large.py': ''.join(f'line_{i} = {i}\n' for i in range(2000))
+        }
+    )
+
+
+# ============================================================================
+# Codec and Policy Tests
+# ============================================================================
+
+@pytest.mark.parametrize('codec', ['gzip', 'zstd'])
+def test_codec_round_trip(codec):
+    """Compressed bodies decompress to the original bytes."""
+    if codec == 'zstd' and not ZSTD_AVAILABLE:
+        pytest.skip('zstandard not installed')
+    data = b'print("hello")\n' * 500
+    packed = compress(data, codec)
+
+    assert len(packed) < len(data)
+    assert decompress(packed, codec) == data
+
+
+def test_threshold_counts_utf8_bytes(body_store):
+    """The inline limit applies to encoded size, not characters."""
+    assert not body_store.should_offload('a' * 1024)
+    assert body_store.should_offload('a' * 1025)
+    assert body_store.should_offload('é' * 600)  # 1200 bytes
+
+
+def test_identical_bodies_are_uploaded_once(body_store):
+    """Content addressing turns a repeated body into a HEAD, not a PUT."""
+    content = 'data = 1\n' * 500
+    first = body_store.put(content, 'ab' * 32)
+    second = body_store.put(content, 'ab' * 32)
+
+    assert first['body_key'] == second['body_key'] == body_store.key_for('ab' * 32)
+    assert body_store.puts['PutObject'] == 1
+
+
+# ============================================================================
+# Project Store Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_large_files_are_offloaded_and_loaded_back(body_store):
+    """Only the large file moves to S3; loading restores both."""
+    store = DynamoDBProjectStore(table_name='bodies-test', region='us-east-1', body_store=body_store)
+    project = make_project()
+    assert await store.save_context(project)
+
+    items = {
+        item['file_path']: item
+        for item in store.table.scan()['Items'] if item['SK'].startswith('FILE#')
+    }
+    assert not is_offloaded(items['small.py'])
+    assert is_offloaded(items['large.py'])
+    assert items['large.py']['stored_size'] < items['large.py']['size']
+
+    loaded = await DynamoDBProjectStore(
+        table_name='bodies-test', region='us-east-1', body_store=body_store
+    ).load_context(project.id)
+    assert loaded.codebase == project.codebase
+
+
+@pytest.mark.asyncio
+async def test_store_without_policy_still_reads_offloaded_files(body_store):
+    """A store that keeps bodies inline resolves pointers written elsewhere."""
+    project = make_project()
+    writer = DynamoDBProjectStore(table_name='bodies-test', region='us-east-1', body_store=body_store)
+    assert await writer.save_context(project)
+
+    reader = DynamoDBProjectStore(table_name='bodies-test', region='us-east-1')
+    reader.body_store = None
+
+    loaded = await reader.load_context(project.id)
+    assert loaded.codebase == project.codebase
+
+
+def test_corrupted_body_is_rejected(body_store):
+    """A body that does not match its content_hash raises instead of loading."""
+    content = 'value = 42\n' * 200
+    pointer = body_store.put(content, 'cd' * 32)
+
+    with pytest.raises(ValueError, match='content hash'):
+        body_store.get({**pointer, 'content_hash': 'cd' * 32})
+
+
+# ============================================================================
+# Lambda Worker Reader Tests
+# ============================================================================
+
+def test_workers_read_default_bodies_without_zstandard(body_store, file_bodies, monkeypatch):
+    """Bodies are gzip by default, so workers without zstandard can read them."""
+    monkeypatch.setitem(sys.modules, 'zstandard', None)
+    content = 'value = 42\n' * 200
+    item = {'file_path': 'big.py', **body_store.put(content, 'ef' * 32)}
+
+    assert body_store.codec == 'gzip'
+    assert file_bodies.read_file_contents([item], body_store.s3, 'bodies') == {'big.py': content}
+
+
+def test_workers_fail_loudly_on_unreadable_bodies(file_bodies, monkeypatch):
+    """A zstd body without zstandard, or an unknown codec, raises instead of reading as empty."""
+    monkeypatch.setitem(sys.modules, 'zstandard', None)
+
+    with pytest.raises(RuntimeError, match='zstandard'):
+        file_bodies.decompress_body(b'\x28\xb5\x2f\xfd', 'zstd')
+    with pytest.raises(ValueError, match='codec'):
+        file_bodies.decompress_body(b'', 'lz4')
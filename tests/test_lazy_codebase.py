@@ -0,0 +1,200 @@
+"""
+Unit tests for lazy, on-demand codebase loading.
+
+Tests the LazyCodebase mapping, and lazy loads from the file-based and
+DynamoDB project stores: paths and sizes up front, bodies on access,
+batched prefetch and saves that skip unread files.
+"""
+
+import pytest
+from moto import mock_aws
+import boto3
+
+from models.lazy_codebase import FileEntry, LazyCodebase, content_hash
+from models.project_context import ProjectContext, ProjectType, ProjectStatus
+from utils.project_context_store import ProjectContextStore
+from utils.dynamodb_project_store import DynamoDBProjectStore
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+FILES = {
+    'main.py': 'print("main")\n',
+    'util.py': 'def helper():\n    return 1\n',
+    'README.md': '# Readme\n'
+}
+
+
+def make_view(files=FILES):
+    """A LazyCodebase over a dict, recording loader batches."""
+    batches = []
+
+    def load(paths):
+        batches.append(sorted(paths))
+        return {path: files[path] for path in paths}
+
+    entries = {path: FileEntry(size=len(body), content_hash=content_hash(body)) for path, body in files.items()}
+    return LazyCodebase(entries, load), batches
+
+
+def make_project(project_id: str = 'lazy_project') -> ProjectContext:
+    return ProjectContext(
+        id=project_id,
+        name='Lazy',
+        type=ProjectType.API,
+        status=ProjectStatus.CREATED,
+        codebase=dict(FILES)
+    )
+
+
+@pytest.fixture
+def dynamodb_store(monkeypatch):
+    """Project store on a mocked table."""
+    for name in ('AWS_ACCESS_KEY_ID', 'AWS_SECRET_ACCESS_KEY', 'AWS_SESSION_TOKEN'):
+        monkeypatch.setenv(name, 'testing')
+    monkeypatch.setenv('AWS_DEFAULT_REGION', 'us-east-1')
+
+    with mock_aws():
+        boto3.resource('dynamodb', region_name='us-east-1').create_table(
+            TableName='lazy-test',
+            KeySchema=[
+                {'AttributeName': 'PK', 'KeyType': 'HASH'},
+                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'PK', 'AttributeType': 'S'},
+                {'AttributeName': 'SK', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        yield DynamoDBProjectStore(table_name='lazy-test', region='us-east-1')
+
+
+# ============================================================================
+# LazyCodebase Tests
+# ============================================================================
+
+def test_metadata_needs_no_bodies():
+    """Paths, sizes, membership and hashes come from the entries."""
+    view, batches = make_view()
+
+    assert sorted(view) == sorted(FILES)
+    assert len(view) == 3 and 'main.py' in view and 'other.py' not in view
+    assert view.sizes()['README.md'] == len(FILES['README.md'])
+    assert view.content_hash('util.py') == content_hash(FILES['util.py'])
+    assert batches == []
+
+
+def test_bodies_load_once_on_access():
+    """A body is fetched on first read and then served from memory."""
+    view, batches = make_view()
+
+    assert view['main.py'] == FILES['main.py']
+    assert view.get('main.py') == FILES['main.py']
+    assert view.get('missing.py', '') == ''
+    assert batches == [['main.py']]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_fetches_a_known_set_in_one_batch():
+    """prefetch loads only missing files, in a single loader call."""
+    view, batches = make_view()
+    view['main.py']
+
+    await view.prefetch(['main.py', 'util.py', 'README.md', 'not-there.md'])
+
+    assert batches == [['main.py'], ['README.md', 'util.py']]
+    assert view == FILES
+
+
+def test_writes_and_deletes_behave_like_a_dict():
+    """Assigned bodies replace stored ones; deleted files disappear."""
+    view, batches = make_view()
+    view['main.py'] = 'print("changed")\n'
+    del view['README.md']
+    view['new.py'] = 'x = 1\n'
+
+    assert view.materialize() == {'main.py': 'print("changed")\n', 'util.py': FILES['util.py'], 'new.py': 'x = 1\n'}
+    assert view.content_hash('main.py') == content_hash('print("changed")\n')
+    assert batches == [['util.py']]
+
+
+# ============================================================================
+# Store Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_file_store_lazy_load_and_save_skip_unread_bodies(tmp_path, monkeypatch):
+    """A lazily loaded context round-trips without reading untouched bodies."""
+    store = ProjectContextStore(storage_root=tmp_path)
+    assert await store.save_context(make_project())
+
+    reader = ProjectContextStore(storage_root=tmp_path)
+    project = await reader.load_context('lazy_project', lazy=True)
+    assert isinstance(project.codebase, LazyCodebase)
+    assert project.codebase.sizes()['main.py'] == len(FILES['main.py'].encode('utf-8'))
+
+    project.codebase['util.py'] = 'def helper():\n    return 2\n'
+    monkeypatch.setattr(reader, '_read_codebase', None)  # eager reads would fail
+    assert await reader.save_context(project)
+    assert not project.codebase.is_loaded('main.py')
+
+    reloaded = await ProjectContextStore(storage_root=tmp_path).load_context('lazy_project')
+    assert reloaded.codebase == {**FILES, 'util.py': 'def helper():\n    return 2\n'}
+
+
+@pytest.mark.asyncio
+async def test_file_store_eager_load_after_lazy_save_has_bodies(tmp_path):
+    """Saving a lazy context does not leave a lazy codebase in the cache."""
+    assert await ProjectContextStore(storage_root=tmp_path).save_context(make_project())
+
+    store = ProjectContextStore(storage_root=tmp_path)
+    project = await store.load_context('lazy_project', lazy=True)
+    assert isinstance(project.codebase, LazyCodebase)
+    project.codebase['util.py'] = 'def helper():\n    return 2\n'
+    assert await store.save_context(project)
+
+    loaded = await store.load_context('lazy_project')
+    assert type(loaded.codebase) is dict
+    assert loaded.codebase == {**FILES, 'util.py': 'def helper():\n    return 2\n'}
+
+
+@pytest.mark.asyncio
+async def test_dynamodb_lazy_load_reads_only_keys_and_sizes(dynamodb_store):
+    """The lazy files query projects away content; prefetch is one BatchGetItem."""
+    assert await dynamodb_store.save_context(make_project())
+
+    calls = []
+    dynamodb_store.dynamodb.meta.client.meta.events.register(
+        'provide-client-params.dynamodb', lambda model, params, **kwargs: calls.append((model.name, params))
+    )
+    project = await dynamodb_store.load_context('lazy_project', lazy=True)
+
+    query = next(params for name, params in calls if name == 'Query')
+    assert query['ProjectionExpression'] == 'file_path, #size, content_hash'
+    assert sorted(project.codebase) == sorted(FILES)
+
+    calls.clear()
+    await project.codebase.prefetch(['main.py', 'util.py'])
+    assert [name for name, _ in calls] == ['BatchGetItem']
+    assert project.codebase['util.py'] == FILES['util.py']
+
+
+@pytest.mark.asyncio
+async def test_dynamodb_save_of_unchanged_lazy_codebase_writes_no_files(dynamodb_store):
+    """Unread files keep their stored hashes, so only the metadata is written."""
+    assert await dynamodb_store.save_context(make_project())
+    project = await dynamodb_store.load_context('lazy_project', lazy=True)
+
+    writes = []
+    dynamodb_store.dynamodb.meta.client.meta.events.register(
+        'provide-client-params.dynamodb.BatchWriteItem',
+        lambda params, **kwargs: writes.extend(params['RequestItems']['lazy-test'])
+    )
+    project.description = 'metadata only'
+    assert await dynamodb_store.save_context(project)
+
+    assert [request['PutRequest']['Item']['SK'] for request in writes] == ['METADATA']
+    assert (await dynamodb_store.load_context('lazy_project')).codebase == FILES
@@ -0,0 +1,226 @@
+"""
+Unit tests for LLMClient deadlines, retry backoff and hedged requests.
+
+Tests for deadline scopes, Retry-After aware jittered backoff, deadline
+enforcement on attempts and retries, hedging against slow first tokens and
+deadline propagation from pipeline tasks.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from utils import llm_setup
+from utils.llm_setup import LLMClient, DeadlineExceededError, _backoff_delay, _retry_after
+from utils.deadlines import deadline_scope, remaining, with_deadline
+from utils.enhanced_pipeline_manager import _task_deadline
+from utils.task_queue import QueueTask
+
+
+class ScriptedModel:
+    """Fake Gemini model whose n-th call sleeps delays[n] (or raises errors[n])."""
+
+    def __init__(self, delays=None, errors=None, chunks=("x", "y")):
+        self.delays = list(delays or [])
+        self.errors = list(errors or [])
+        self.chunks = chunks
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, stream=False):
+        index = self.calls
+        self.calls += 1
+        if index < len(self.errors) and self.errors[index] is not None:
+            raise self.errors[index]
+        delay = self.delays[index] if index < len(self.delays) else 0
+        if stream:
+            return self._stream(delay, index)
+        await asyncio.sleep(delay)
+        return SimpleNamespace(text=f"response {index}")
+
+    async def _stream(self, delay, index):
+        await asyncio.sleep(delay)
+        for chunk in self.chunks:
+            yield SimpleNamespace(text=f"{chunk}{index}")
+
+
+@pytest.fixture
+def make_client(monkeypatch):
+    """Build an LLMClient bound to a scripted fake model."""
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
+    def build(model):
+        client = LLMClient()
+        client._min_request_interval = 0
+
+        async def get_model(model_name, temperature=None):
+            return model
+
+        client._get_model = get_model
+        return client
+
+    return build
+
+
+def train_hedging(client, mode, latency=0.01, samples=20):
+    """Enable hedging with enough first-token samples for a p95."""
+    client.hedging = True
+    for _ in range(samples):
+        client._observe_first_token(client.default_model, mode, latency)
+
+
+# ============================================================================
+# Deadline Scope Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_nested_deadline_scopes_only_shorten():
+    """Inner scopes cannot extend an outer deadline and apply to created tasks."""
+    assert remaining() is None
+    with deadline_scope(1.0):
+        with deadline_scope(100.0):
+            assert remaining() <= 1.0
+        with deadline_scope(0.2):
+            left = await asyncio.create_task(asyncio.sleep(0, result=remaining()))
+            assert 0 < left <= 0.2
+    assert remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_with_deadline_uses_call_arguments():
+    """Pipeline processors derive their deadline from the queue task."""
+    manager = SimpleNamespace(task_deadlines={"dev": 600.0})
+    explicit = QueueTask(task_id="t1", task_type="dev", payload={}, deadline=time.time() + 5)
+    default = QueueTask(task_id="t2", task_type="dev", payload={})
+
+    @with_deadline(_task_deadline)
+    async def process(self, task):
+        return remaining()
+
+    assert 4 < await process(manager, explicit) <= 5
+    assert 599 < await process(manager, default) <= 600
+
+
+# ============================================================================
+# Backoff Tests
+# ============================================================================
+
+def test_backoff_honours_retry_after():
+    """Retry-After headers, retry_after attributes and Gemini retry hints win over backoff."""
+    header_error = Exception("429")
+    header_error.response = SimpleNamespace(headers={"Retry-After": "7"})
+    gemini_error = Exception("429 Quota exceeded. Please retry in 12.5s. retry_delay { seconds: 12 }")
+
+    assert _backoff_delay(0, header_error) == 7.0
+    assert _retry_after(gemini_error) == 12.0
+    assert _retry_after(Exception("boom")) is None
+
+
+def test_backoff_is_jittered_and_capped():
+    """Delays fall in [ceiling/2, ceiling] and never exceed the cap."""
+    delays = {_backoff_delay(2, Exception("boom")) for _ in range(50)}
+    assert all(2.0 <= d <= 4.0 for d in delays)
+    assert len(delays) > 1
+    assert _backoff_delay(20, Exception("503 unavailable")) <= llm_setup.BACKOFF_CAP
+
+
+# ============================================================================
+# Deadline Enforcement
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_ask_llm_stops_at_deadline(make_client):
+    """A stuck call is abandoned at the deadline instead of falling back after retries."""
+    model = ScriptedModel(delays=[10, 10, 10])
+    client = make_client(model)
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceededError):
+        await client.ask_llm("slow prompt", deadline=0.1)
+
+    assert time.monotonic() - start < 1.0
+    assert model.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_deadline_on_last_attempt_raises_instead_of_falling_back(make_client):
+    """A final attempt cut off by the deadline raises; other final failures still fall back."""
+    model = ScriptedModel(delays=[10], errors=[None, Exception("boom")])
+    client = make_client(model)
+    client.single_flight = False
+
+    with pytest.raises(DeadlineExceededError):
+        await client.ask_llm("slow prompt", max_retries=1, deadline=0.3)
+    assert await client.ask_llm("failing prompt", max_retries=1, deadline=5) == client.get_fallback_response("failing prompt")
+
+
+@pytest.mark.asyncio
+async def test_retry_skipped_when_retry_after_exceeds_deadline(make_client):
+    """No retry is attempted when the server-requested delay overruns the deadline."""
+    throttled = Exception("429 resource exhausted")
+    throttled.retry_after = 30
+    model = ScriptedModel(errors=[throttled])
+    client = make_client(model)
+
+    with pytest.raises(DeadlineExceededError):
+        await client.ask_llm("prompt", deadline=2.0)
+    assert model.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_streaming_honours_deadline(make_client):
+    """A stream whose first chunk never arrives raises at the deadline."""
+    model = ScriptedModel(delays=[10, 10, 10])
+    client = make_client(model)
+
+    with pytest.raises(DeadlineExceededError):
+        async for _ in client.ask_llm_streaming("slow stream", deadline=0.1):
+            pass
+
+
+# ============================================================================
+# Hedging Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_hedge_wins_when_primary_is_slow(make_client):
+    """A hedge is sent after the p95 delay and the faster response is used."""
+    model = ScriptedModel(delays=[5, 0])
+    client = make_client(model)
+    train_hedging(client, "single")
+
+    start = time.monotonic()
+    result = await client.ask_llm("hedged prompt")
+
+    assert result == "response 1"
+    assert model.calls == 2
+    assert time.monotonic() - start < 2.0
+    assert client._hedges_sent == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_stream_uses_first_responder(make_client):
+    """Streams hedge on the first chunk and continue with the winner."""
+    model = ScriptedModel(delays=[5, 0])
+    client = make_client(model)
+    train_hedging(client, "stream")
+
+    chunks = [chunk async for chunk in client.ask_llm_streaming("hedged stream")]
+
+    assert chunks == ["x1", "y1"]
+    assert model.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_no_hedging_without_samples_or_over_budget(make_client):
+    """Hedging needs latency history and is limited to a fraction of requests."""
+    model = ScriptedModel(delays=[0.05] * 10)
+    client = make_client(model)
+    client.hedging = True
+
+    await client.ask_llm("untrained")
+    assert model.calls == 1
+
+    train_hedging(client, "single", latency=0.001)
+    client._hedges_sent = 100
+    await client.ask_llm("over budget")
+    assert model.calls == 2
@@ -0,0 +1,159 @@
+"""
+Unit tests for pluggable LLM backends and the local simulator.
+
+Tests for backend selection, deterministic generation of TOON plans and
+code, streaming pacing, error and 429 injection through LLMClient, and
+recording/replay of responses.
+"""
+
+import json
+import time
+import random
+import pytest
+from utils.llm_backends import create_backend, GeminiBackend
+from utils.llm_simulator import (
+    SimulatorBackend, SimulatorConfig, LatencyDistribution, RecordingBackend,
+    SimulatedRateLimitError
+)
+from utils.llm_setup import LLMClient
+from utils.toon_parser import TOONParser
+
+
+def fast_config(**overrides):
+    """Simulator config with negligible latency."""
+    settings = dict(first_token_latency=LatencyDistribution("fixed", 0.0), tokens_per_second=0)
+    settings.update(overrides)
+    return SimulatorConfig(**settings)
+
+
+async def generate(backend, prompt, model="sim-model"):
+    return (await backend.create_model(model).generate_content_async(prompt)).text
+
+
+# ============================================================================
+# Backend Selection
+# ============================================================================
+
+def test_create_backend_by_name(monkeypatch):
+    """LLM_BACKEND selects the backend; unknown names are rejected."""
+    monkeypatch.setenv("LLM_BACKEND", "simulator")
+    monkeypatch.setenv("LLM_SIM_LATENCY", "lognormal:0.5,0.3")
+    monkeypatch.setenv("LLM_SIM_SEED", "7")
+    backend = create_backend()
+    assert isinstance(backend, SimulatorBackend)
+    assert backend.config.seed == 7
+    assert backend.config.first_token_latency == LatencyDistribution("lognormal", 0.5, 0.3)
+
+    with pytest.raises(ValueError, match="Unknown LLM backend"):
+        create_backend("nope")
+
+
+def test_llm_client_uses_backend_limits(monkeypatch):
+    """Rate limits come from the backend, and no API key is needed for the simulator."""
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    client = LLMClient(backend=SimulatorBackend(fast_config(max_concurrent_requests=8)))
+    assert client._min_request_interval == 0.0
+    assert client._request_semaphore._value == 8
+    assert GeminiBackend.min_request_interval == 5.0
+
+
+def test_latency_distributions():
+    """Specs parse into samplers with the expected ranges."""
+    rng = random.Random(1)
+    assert LatencyDistribution.parse("0.25").sample(rng) == 0.25
+    uniform = LatencyDistribution.parse("uniform:0.1,0.2")
+    assert all(0.1 <= uniform.sample(rng) <= 0.2 for _ in range(100))
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("pareto:1")
+
+
+# ============================================================================
+# Generation Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_generation_is_deterministic_and_shaped_by_prompt():
+    """Same seed gives the same outputs; plans are valid TOON and code is fenced."""
+    first, second = SimulatorBackend(fast_config(seed=3)), SimulatorBackend(fast_config(seed=3))
+    prompts = ["Create a plan in TOON format", "Write the code for the API", "Review it.\nReturn JSON:"]
+
+    outputs = [await generate(first, p) for p in prompts]
+    assert outputs == [await generate(second, p) for p in prompts]
+    assert outputs != [await generate(SimulatorBackend(fast_config(seed=4)), p) for p in prompts]
+
+    plan = TOONParser.parse_toon_to_dict(outputs[0])
+    assert len(plan["tasks"]) == 5
+    assert "```python\n# src/" in outputs[1]
+    assert "confidence" in json.loads(outputs[2])
+
+
+@pytest.mark.asyncio
+async def test_stream_chunks_paced_by_token_rate():
+    """Streams yield chunk_tokens-sized chunks at the configured token rate."""
+    backend = SimulatorBackend(fast_config(
+        first_token_latency=LatencyDistribution("fixed", 0.05), tokens_per_second=1000,
+        chunk_tokens=25, response_tokens=100
+    ))
+    stream = await backend.create_model("sim").generate_content_async("Write code", stream=True)
+
+    start = time.monotonic()
+    chunks = [chunk.text async for chunk in stream]
+    elapsed = time.monotonic() - start
+
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert len(chunks) > 1
+    assert elapsed >= 0.05 + (len(chunks) - 1) * 0.025 * 0.9
+    assert stream.usage_metadata["candidates_token_count"] > 0
+
+
+# ============================================================================
+# Fault Injection Through LLMClient
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_client_retries_injected_rate_limits():
+    """Injected 429s carry retry_after, which the client honours before retrying."""
+    backend = SimulatorBackend(fast_config(rate_limit_rate=1.0, retry_after=0.01))
+    with pytest.raises(SimulatedRateLimitError):
+        await generate(backend, "anything")
+
+    client = LLMClient(backend=backend)
+    result = await client.ask_llm("Write code", max_retries=2)
+
+    assert result == client.get_fallback_response("Write code")
+    assert backend.stats["rate_limited"] == 3
+
+
+@pytest.mark.asyncio
+async def test_client_streams_from_simulator():
+    """The full streaming path works end to end against the simulator."""
+    backend = SimulatorBackend(fast_config(chunk_tokens=8))
+    client = LLMClient(backend=backend)
+
+    text = "".join([chunk async for chunk in client.ask_llm_streaming("Write the code")])
+
+    assert text.startswith("Here is the implementation.")
+    assert backend.stats["streams"] == 1
+
+
+# ============================================================================
+# Recording and Replay
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_recorded_responses_are_replayed(tmp_path):
+    """Responses recorded from one backend are replayed by the simulator."""
+    path = tmp_path / "recordings.jsonl"
+    recorder = RecordingBackend(SimulatorBackend(fast_config(seed=11)), str(path))
+    recorded = await generate(recorder, "Write code for the exact prompt")
+    stream = await recorder.create_model("sim").generate_content_async("Stream it", stream=True)
+    streamed = "".join([chunk.text async for chunk in stream])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"match": "weather", "response": "sunny"}) + "\n")
+
+    replay = SimulatorBackend(fast_config(seed=99, recordings=str(path)))
+
+    assert await generate(replay, "Write code for the exact prompt") == recorded
+    assert await generate(replay, "Stream it") == streamed
+    assert await generate(replay, "what is the weather like") == "sunny"
+    assert replay.stats["replayed"] == 3
@@ -0,0 +1,195 @@
+"""
+Unit tests for single-flight coalescing in LLMClient.
+
+Tests that identical concurrent ask_llm/ask_llm_streaming calls share one
+upstream request, that streams fan out to late joiners, and that differing
+parameters or sequential calls are not coalesced.
+"""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from utils.llm_setup import LLMClient, LLMError, DeadlineExceededError
+
+
+class FakeModel:
+    """Fake Gemini model counting generate_content_async calls."""
+
+    def __init__(self, text: str = "answer", chunks=None, delay: float = 0.02):
+        self.text = text
+        self.chunks = chunks or ["a", "b", "c"]
+        self.delay = delay
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        if stream:
+            return self._stream()
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(text=f"{self.text}:{prompt}")
+
+    async def _stream(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield SimpleNamespace(text=chunk)
+
+
+@pytest.fixture
+def client_and_model(monkeypatch):
+    """LLMClient wired to a FakeModel with rate limiting disabled."""
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    client = LLMClient()
+    client._min_request_interval = 0
+    model = FakeModel()
+
+    async def get_model(model_name, temperature=None):
+        return model
+
+    monkeypatch.setattr(client, "_get_model", get_model)
+    return client, model
+
+
+# ============================================================================
+# Single-shot Coalescing
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_one_call(client_and_model):
+    """Concurrent identical prompts issue a single upstream request."""
+    client, model = client_and_model
+
+    results = await asyncio.gather(*[client.ask_llm("same prompt") for _ in range(5)])
+
+    assert model.calls == 1
+    assert set(results) == {"answer:same prompt"}
+    assert client._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_different_parameters_and_sequential_calls_not_coalesced(client_and_model):
+    """Different prompts/temperatures and non-overlapping calls each hit the model."""
+    client, model = client_and_model
+
+    await asyncio.gather(
+        client.ask_llm("prompt"),
+        client.ask_llm("prompt", temperature=0.5),
+        client.ask_llm("other prompt")
+    )
+    await client.ask_llm("prompt")
+
+    assert model.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call(client_and_model):
+    """Other waiters still get the result when one caller is cancelled."""
+    client, model = client_and_model
+
+    first = asyncio.create_task(client.ask_llm("shared"))
+    second = asyncio.create_task(client.ask_llm("shared"))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "answer:shared"
+    assert model.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_request_after_last_waiter_cancelled_starts_a_new_call(client_and_model):
+    """A new caller never joins a shared call cancelled because its waiters left."""
+    client, model = client_and_model
+
+    first = asyncio.create_task(client.ask_llm("shared"))
+    await asyncio.sleep(0)
+    first.cancel()
+    second = asyncio.create_task(client.ask_llm("shared"))
+
+    assert await second == "answer:shared"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert client._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_waiters_get_llm_error_when_shared_call_is_cancelled(client_and_model):
+    """Cancelling the shared call itself fails its waiters with LLMError, not CancelledError."""
+    client, model = client_and_model
+
+    waiter = asyncio.create_task(client.ask_llm("shared"))
+    await asyncio.sleep(0)
+    next(iter(client._inflight.values())).task.cancel()
+
+    with pytest.raises(LLMError):
+        await waiter
+
+
+# ============================================================================
+# Streaming Fan-out
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_stream_fans_out_to_late_joiners(client_and_model):
+    """A consumer joining mid-stream receives every chunk from the start."""
+    client, model = client_and_model
+    received = {"leader": [], "joiner": []}
+    joiner_callback_chunks = []
+
+    async def consume(name, callback=None):
+        async for chunk in client.ask_llm_streaming("stream me", callback=callback):
+            received[name].append(chunk)
+
+    leader = asyncio.create_task(consume("leader"))
+    await asyncio.sleep(model.delay * 1.5)
+    await consume("joiner", callback=joiner_callback_chunks.append)
+    await leader
+
+    assert model.calls == 1
+    assert received["leader"] == ["a", "b", "c"]
+    assert received["joiner"] == ["a", "b", "c"]
+    assert joiner_callback_chunks == ["a", "b", "c"]
+    assert client._inflight_streams == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_after_last_subscriber_left_starts_a_new_call(client_and_model):
+    """A stream abandoned by its only consumer is not joined by the next one."""
+    client, model = client_and_model
+
+    abandoned = client.ask_llm_streaming("stream me")
+    assert await abandoned.__anext__() == "a"
+    await abandoned.aclose()
+
+    assert [chunk async for chunk in client.ask_llm_streaming("stream me")] == ["a", "b", "c"]
+    assert model.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_joiner_deadline_applies_on_its_side(client_and_model):
+    """A joiner with a short deadline times out while the leader's stream completes."""
+    client, model = client_and_model
+    received = []
+
+    async def lead():
+        async for chunk in client.ask_llm_streaming("stream me"):
+            received.append(chunk)
+
+    leader = asyncio.create_task(lead())
+    await asyncio.sleep(model.delay * 1.5)
+    with pytest.raises(DeadlineExceededError):
+        async for _ in client.ask_llm_streaming("stream me", deadline=model.delay * 0.25):
+            pass
+    await leader
+
+    assert received == ["a", "b", "c"]
+    assert model.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_can_be_disabled(client_and_model):
+    """With LLM_SINGLE_FLIGHT=false every call reaches the model."""
+    client, model = client_and_model
+    client.single_flight = False
+
+    await asyncio.gather(client.ask_llm("p"), client.ask_llm("p"))
+
+    assert model.calls == 2
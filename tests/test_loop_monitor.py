@@ -0,0 +1,82 @@
+"""
+Unit tests for the event-loop lag monitor.
+
+Tests for lag sampling, slow-callback capture (coroutine and stack) and
+the debug snapshot.
+"""
+
+import time
+import asyncio
+import pytest
+from utils.loop_monitor import LoopMonitor
+
+
+async def blocking_handler():
+    """A coroutine that blocks the loop the way a synchronous call would."""
+    time.sleep(0.3)
+
+
+# ============================================================================
+# Slow Callback Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_blocking_coroutine_is_reported_with_stack():
+    """A blocking call inside a coroutine is captured while the loop is stuck."""
+    monitor = LoopMonitor(interval=0.02, slow_callback_threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(blocking_handler(), name="handler-task")
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    assert monitor.slow_callbacks_total == 1
+    report = monitor.reports[0]
+    assert report.coroutine == "blocking_handler"
+    assert report.task == "handler-task"
+    assert "test_loop_monitor.py" in report.location
+    assert any("time.sleep(0.3)" in line for line in report.stack)
+    assert report.duration >= 0.25
+
+
+@pytest.mark.asyncio
+async def test_cooperative_work_is_not_reported():
+    """Short awaits only produce lag samples, no slow callbacks."""
+    monitor = LoopMonitor(interval=0.01, slow_callback_threshold=0.2)
+    monitor.start()
+    try:
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+    finally:
+        await monitor.stop()
+
+    assert monitor.slow_callbacks_total == 0
+    assert monitor.lag.lifetime.count > 0
+    assert not monitor.running
+
+
+# ============================================================================
+# Snapshot Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_snapshot_lists_most_recent_first():
+    """The debug snapshot carries lag windows and the newest reports first."""
+    monitor = LoopMonitor(interval=0.02, slow_callback_threshold=0.05)
+    monitor.start()
+    try:
+        for pause in (0.1, 0.15):
+            await asyncio.sleep(0.05)
+            time.sleep(pause)
+            await asyncio.sleep(0.05)
+        snapshot = monitor.snapshot(limit=1)
+    finally:
+        await monitor.stop()
+
+    assert snapshot["running"] is True
+    assert snapshot["slow_callbacks_total"] == 2
+    assert len(snapshot["slow_callbacks"]) == 1
+    assert snapshot["slow_callbacks"][0]["duration"] >= 0.1
+    assert snapshot["lag"]["1m"]["max"] >= 0.1
@@ -0,0 +1,159 @@
+"""
+Unit tests for the Prometheus-style metrics registry.
+
+Tests for Counter/Gauge/Histogram, text exposition and the metrics
+published by AsyncTaskQueue, WorkerPool, ResultCache and CircuitBreaker.
+"""
+
+import asyncio
+import pytest
+from utils.metrics_registry import MetricsRegistry, REGISTRY, generate_latest
+from utils.task_queue import AsyncTaskQueue, QueueTask
+from utils.worker_pool import WorkerPool
+from utils.enhanced_components import ResultCache
+from utils.circuit_breaker import CircuitBreaker, CircuitBreakerConfig, CircuitBreakerOpenError
+
+
+# ============================================================================
+# Registry Tests
+# ============================================================================
+
+def test_counter_and_gauge_exposition():
+    """Counters get a _total suffix; gauges render their current value."""
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests_total", "Requests", ("route",))
+    inflight = registry.gauge("app_inflight", "In-flight requests")
+
+    requests.labels("/a").inc()
+    requests.labels(route="/a").inc(2)
+    inflight.set(3)
+    inflight.dec()
+
+    text = registry.render()
+    assert "# TYPE app_requests counter" in text
+    assert 'app_requests_total{route="/a"} 3' in text
+    assert "# TYPE app_inflight gauge" in text
+    assert "app_inflight 2" in text
+
+    with pytest.raises(ValueError):
+        requests.labels("/a").inc(-1)
+
+
+def test_histogram_buckets_are_cumulative():
+    """Bucket counts are cumulative and end with +Inf, sum and count."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("op_seconds", "Op latency", buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 5.0):
+        latency.observe(value)
+
+    assert registry.get_sample_value("op_seconds_bucket", {"le": "0.1"}) == 2
+    assert registry.get_sample_value("op_seconds_bucket", {"le": "1"}) == 3
+    assert registry.get_sample_value("op_seconds_bucket", {"le": "+Inf"}) == 4
+    assert registry.get_sample_value("op_seconds_count") == 4
+    assert registry.get_sample_value("op_seconds_sum") == pytest.approx(5.65)
+
+
+def test_registration_is_idempotent_and_checked():
+    """Same declaration returns the same family; conflicting ones fail."""
+    registry = MetricsRegistry()
+    first = registry.counter("jobs_total", "Jobs", ("queue",))
+    assert registry.counter("jobs_total", "Jobs", ("queue",)) is first
+
+    with pytest.raises(ValueError):
+        registry.gauge("jobs", "Jobs")
+    with pytest.raises(ValueError):
+        registry.counter("jobs_total", "Jobs", ("pool",))
+    with pytest.raises(ValueError):
+        first.labels("a", "b")
+
+
+def test_label_values_are_escaped():
+    """Quotes, backslashes and newlines in label values are escaped."""
+    registry = MetricsRegistry()
+    registry.counter("odd_total", "Odd labels", ("name",)).labels('a"b\\c\nd').inc()
+
+    assert 'odd_total{name="a\\"b\\\\c\\nd"} 1' in registry.render()
+
+
+# ============================================================================
+# Component Instrumentation
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_queue_and_pool_publish_metrics():
+    """Queue wait, depth and worker service time reach the default registry."""
+    queue = AsyncTaskQueue("MetricsTestQueue")
+
+    async def process_func(task):
+        await asyncio.sleep(0.001)
+        return None
+
+    for i in range(3):
+        await queue.put(QueueTask(task_id=f"t_{i}", task_type="dev", payload={}))
+
+    assert REGISTRY.get_sample_value(
+        "pipeline_queue_depth", {"queue": "MetricsTestQueue"}
+    ) == 3
+
+    pool = WorkerPool("MetricsTestPool", 2, queue, process_func)
+    await pool.start()
+    await queue.wait_until_empty(check_interval=0.01)
+    await pool.stop(graceful=False)
+
+    labels = {"queue": "MetricsTestQueue", "task_type": "dev"}
+    assert REGISTRY.get_sample_value("pipeline_queue_enqueued_total", labels) == 3
+    assert REGISTRY.get_sample_value("pipeline_queue_wait_seconds_count", labels) == 3
+    assert REGISTRY.get_sample_value(
+        "pipeline_queue_depth", {"queue": "MetricsTestQueue"}
+    ) == 0
+    assert REGISTRY.get_sample_value(
+        "pipeline_task_service_seconds_count",
+        {"pool": "MetricsTestPool", "outcome": "success"}
+    ) == 3
+    assert REGISTRY.get_sample_value(
+        "pipeline_pool_busy_workers", {"pool": "MetricsTestPool"}
+    ) == 0
+
+
+def test_result_cache_hits_and_misses():
+    """Cache lookups are counted by result."""
+    hits_before = REGISTRY.get_sample_value("result_cache_requests_total", {"result": "hit"}) or 0
+    misses_before = REGISTRY.get_sample_value("result_cache_requests_total", {"result": "miss"}) or 0
+
+    cache = ResultCache()
+    task = {"title": "metrics", "description": "cache test"}
+    assert cache.get(task) is None
+    cache.set(task, {"ok": True})
+    assert cache.get(task) == {"ok": True}
+
+    assert REGISTRY.get_sample_value("result_cache_requests_total", {"result": "hit"}) == hits_before + 1
+    assert REGISTRY.get_sample_value("result_cache_requests_total", {"result": "miss"}) == misses_before + 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_state_and_rejections():
+    """Breaker state gauge follows transitions; rejected calls are counted."""
+    breaker = CircuitBreaker(
+        "metrics_test_breaker",
+        CircuitBreakerConfig(min_requests=2, failure_threshold=0.5, timeout_seconds=60)
+    )
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await breaker.call(failing)
+    with pytest.raises(CircuitBreakerOpenError):
+        await breaker.call(failing)
+
+    labels = {"breaker": "metrics_test_breaker"}
+    assert REGISTRY.get_sample_value("circuit_breaker_state", labels) == 2
+    assert REGISTRY.get_sample_value(
+        "circuit_breaker_calls_total", {**labels, "outcome": "rejected"}
+    ) == 1
+    assert 'circuit_breaker_state{breaker="metrics_test_breaker"} 2' in generate_latest()
+
+    await breaker.reset()
+    assert REGISTRY.get_sample_value("circuit_breaker_state", labels) == 0
@@ -0,0 +1,90 @@
+"""
+Unit tests for the hot-path micro-benchmark suite.
+
+Tests for input generators, scaling detection, the time budget and
+baseline comparison.
+"""
+
+import time
+import tempfile
+
+import pytest
+from benchmarks.micro_benchmarks import (
+    CASES, MicroCase, llm_response, template_text, run_case, compare_to_baseline
+)
+
+
+# ============================================================================
+# Input Generators
+# ============================================================================
+
+def test_generated_inputs_reach_requested_size():
+    """Responses and templates scale to the requested byte size."""
+    response = llm_response(10 * 1024)
+    assert len(response) >= 10 * 1024
+    assert response.count("```python") >= 10
+    assert len(template_text(4096)) >= 4096
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda c: c.name)
+def test_every_case_runs_at_smallest_size(case):
+    """Each registered case sets up and runs."""
+    with case.prepared(case.sizes[0]) as op:
+        op()
+
+
+def test_case_resources_are_released_after_the_case(tmp_path, monkeypatch):
+    """Temporary directories a setup creates are removed once the size is measured."""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    case = next(c for c in CASES if c.name == "template.substitute_variables")
+
+    run_case(case, sizes=[1024], min_time=0.01)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+# ============================================================================
+# Scaling and Budget
+# ============================================================================
+
+def test_super_linear_case_is_flagged_as_blowup():
+    """An O(n^2) operation registered as O(n) is reported as a blow-up."""
+    def quadratic(size):
+        return lambda: [i * j for i in range(size) for j in range(size)]
+
+    linear_case = MicroCase("test.quadratic", "items", [50, 200], 1.0, quadratic)
+    result = run_case(linear_case, min_time=0.01)
+
+    assert result["exponent"] > 1.5
+    assert result["blowup"] is True
+
+
+def test_budget_skips_sizes_predicted_to_be_too_slow():
+    """A size predicted past the budget is skipped, not run."""
+    calls = []
+
+    def slow(size):
+        calls.append(size)
+        return lambda: time.sleep(0.01)
+
+    case = MicroCase("test.slow", "items", [1, 1000], 1.0, slow)
+    result = run_case(case, min_time=0.01, budget=1.0)
+
+    assert calls == [1]
+    assert "skipped" in result["results"][1]
+    assert result["blowup"] is True
+
+
+def test_compare_to_baseline_reports_regressions():
+    """A throughput drop beyond the tolerance is a regression."""
+    baseline = {"cases": [{"name": "a", "results": [
+        {"size": 10, "ops_per_sec": 100.0}, {"size": 100, "ops_per_sec": 10.0}
+    ]}]}
+    report = {"cases": [{"name": "a", "results": [
+        {"size": 10, "ops_per_sec": 90.0}, {"size": 100, "ops_per_sec": 5.0},
+        {"size": 1000, "ops_per_sec": 1.0}
+    ]}]}
+
+    comparison = compare_to_baseline(report, baseline, tolerance=0.25)
+
+    assert [(c["size"], c["regression"]) for c in comparison] == [(10, False), (100, True)]
@@ -0,0 +1,86 @@
+"""
+Unit tests for the pipeline throughput benchmark harness.
+
+Tests for synthetic plan shapes, Phase 2 completion detection and the
+machine-readable report output.
+"""
+
+import json
+import asyncio
+import random
+import pytest
+from benchmarks.pipeline_benchmark import (
+    plan_dependencies, synthetic_plan, parse_args, write_report, _summary
+)
+from utils.dependency_analyzer import DependencyAnalyzer
+from utils.enhanced_pipeline_manager import EnhancedPipelineManager
+from utils.task_queue import QueueTask
+
+
+# ============================================================================
+# Synthetic Plan Tests
+# ============================================================================
+
+@pytest.mark.parametrize("shape,batches", [
+    ("independent", 1), ("chain", 6), ("fanout", 2), ("layered", 3)
+])
+def test_plan_shapes_reach_dependency_analyzer(shape, batches):
+    """Task imports reproduce the shape's graph in the pipeline's analyzer."""
+    plan = synthetic_plan("p1", 6, shape)
+    analyzer = DependencyAnalyzer()
+    analyzer.build_dependency_graph(plan["tasks"])
+
+    assert len(analyzer.topological_sort()) == batches
+    assert len({task["id"] for task in plan["tasks"]}) == 6
+
+
+def test_random_shape_is_acyclic_and_seeded():
+    """Random graphs only point backwards and are reproducible per seed."""
+    deps = plan_dependencies(30, "random", random.Random(5))
+    assert all(d < i for i, task_deps in enumerate(deps) for d in task_deps)
+    assert deps == plan_dependencies(30, "random", random.Random(5))
+    with pytest.raises(ValueError):
+        plan_dependencies(3, "star", random.Random(0))
+
+
+# ============================================================================
+# Completion and Reporting
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_enhanced_wait_until_complete_watches_unified_queue():
+    """Completion waits for the unified dev/fix queue, not the unused base dev queue."""
+    manager = EnhancedPipelineManager(enable_circuit_breaker=False)
+    await manager.unified_queue.put(QueueTask(task_id="t1", task_type="dev", payload={}))
+
+    waiter = asyncio.create_task(manager.wait_until_complete(check_interval=0.01))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    task = await manager.unified_queue.get()
+    manager.unified_queue.task_done(task.task_id)
+    await asyncio.wait_for(waiter, timeout=1.0)
+
+
+def test_report_appends_jsonl(tmp_path):
+    """A .jsonl output gets one report per run for commit-to-commit tracking."""
+    output = tmp_path / "bench.jsonl"
+    write_report({"run": 1}, str(output))
+    write_report({"run": 2}, str(output))
+
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["run"] for line in lines] == [1, 2]
+
+
+def test_cli_parsing_and_summary():
+    """Worker ranges and lists parse; summaries report percentiles."""
+    args = parse_args(["--mode", "phase2", "--sizes", "5,50", "--dev-workers", "4-8", "--qa-workers", "3"])
+    assert args.modes == ["phase2"]
+    assert args.sizes == [5, 50]
+    assert args.dev_workers == [4, 8]
+    assert args.qa_workers == [3, 3]
+
+    summary = _summary([0.1 * i for i in range(1, 101)])
+    assert summary["count"] == 100
+    assert summary["p50"] == 5.0
+    assert summary["max"] == 10.0
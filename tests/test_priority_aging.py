@@ -0,0 +1,136 @@
+"""
+Unit tests for priority aging and starvation protection.
+
+Tests for AgingHeap, AsyncTaskQueue aging/max-wait options and
+per-class queue-wait statistics.
+"""
+
+import pytest
+from utils import task_queue as task_queue_module
+from utils.task_queue import AgingHeap, AsyncTaskQueue, QueueTask, MIN_PRIORITY
+from utils.fair_scheduler import FairTaskQueue
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(task_queue_module.time, "monotonic", fake)
+    return fake
+
+
+# ============================================================================
+# AgingHeap Tests
+# ============================================================================
+
+def test_aging_heap_without_aging_is_priority_fifo(clock):
+    """With aging disabled, order is priority then insertion order."""
+    heap = AgingHeap()
+    heap.push(3, "normal_1")
+    heap.push(1, "critical")
+    heap.push(3, "normal_2")
+
+    assert [heap.pop() for _ in range(3)] == ["critical", "normal_1", "normal_2"]
+    assert len(heap) == 0
+
+
+def test_aging_promotes_old_low_priority_items(clock):
+    """An old low-priority item overtakes newer high-priority items."""
+    heap = AgingHeap(aging_rate=0.1)
+    heap.push(4, "old_low")
+
+    clock.now += 30  # 30s * 0.1 = 3 levels gained -> effective priority 1
+    heap.push(2, "new_high")
+
+    assert heap.pop() == "old_low"
+    assert heap.pop() == "new_high"
+
+
+def test_max_wait_serves_overdue_class_first(clock):
+    """A class exceeding max_wait is served ahead of heap order."""
+    heap = AgingHeap(max_wait={"dev": 10.0})
+    heap.push(4, "dev_task", "dev")
+    heap.push(1, "fix_1", "fix")
+
+    clock.now += 5
+    assert heap.pop() == "fix_1"
+
+    heap.push(1, "fix_2", "fix")
+    clock.now += 6  # dev_task has waited 11s > 10s
+    assert heap.pop() == "dev_task"
+    assert heap.deadline_promotions == 1
+    assert heap.pop() == "fix_2"
+    assert len(heap) == 0
+
+
+# ============================================================================
+# AsyncTaskQueue Integration
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_queue_max_wait_prevents_starvation(clock):
+    """Dev tasks are not starved by a steady stream of fix tasks."""
+    queue = AsyncTaskQueue("UnifiedQueue", max_wait={"dev": 10.0})
+
+    await queue.put(QueueTask(task_id="dev_0", task_type="dev", payload={}, priority=5))
+
+    served = []
+    for i in range(5):
+        await queue.put(QueueTask(task_id=f"fix_{i}", task_type="fix", payload={}, priority=1))
+        clock.now += 3
+        served.append((await queue.get()).task_id)
+
+    assert "dev_0" in served
+    assert served.index("dev_0") <= 4
+
+
+@pytest.mark.asyncio
+async def test_fair_queue_supports_aging(clock):
+    """FairTaskQueue applies aging within a tenant."""
+    queue = FairTaskQueue("FairQueue", aging_rate=0.1)
+
+    await queue.put(QueueTask(task_id="old", task_type="dev", payload={}, priority=4, tenant_id="a"))
+    clock.now += 30
+    await queue.put(QueueTask(task_id="new", task_type="dev", payload={}, priority=2, tenant_id="a"))
+
+    assert (await queue.get()).task_id == "old"
+
+
+@pytest.mark.asyncio
+async def test_retry_demotion_is_bounded():
+    """Retries never push priority past MIN_PRIORITY."""
+    queue = AsyncTaskQueue("TestQueue")
+    task = QueueTask(task_id="t", task_type="dev", payload={}, priority=MIN_PRIORITY, max_retries=5)
+    await queue.put(task)
+    await queue.get()
+
+    assert queue.task_retry(task) is True
+    assert task.priority == MIN_PRIORITY
+
+
+@pytest.mark.asyncio
+async def test_wait_stats_per_class():
+    """Queue wait percentiles are reported per task type."""
+    queue = AsyncTaskQueue("TestQueue")
+
+    for i in range(3):
+        await queue.put(QueueTask(task_id=f"dev_{i}", task_type="dev", payload={}))
+    await queue.put(QueueTask(task_id="fix_0", task_type="fix", payload={}))
+
+    for _ in range(4):
+        await queue.get()
+
+    stats = queue.get_stats()["wait_times"]
+    assert stats["dev"]["count"] == 3
+    assert stats["fix"]["count"] == 1
+    for key in ("p50", "p95", "p99", "max"):
+        assert stats["dev"][key] >= 0.0
@@ -0,0 +1,182 @@
+"""
+Unit tests for the indexed, atomic ProjectContextStore.
+
+Tests split metadata/body storage, the sqlite listing index, atomic writes,
+legacy context files and the LRU of hot contexts.
+"""
+
+import os
+import json
+import hashlib
+import pytest
+
+from models.project_context import ProjectContext, ProjectType, ProjectStatus
+from utils.project_context_store import ProjectContextStore, INDEX_FILENAME
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def store(tmp_path):
+    """A store on an empty temporary root."""
+    return ProjectContextStore(storage_root=tmp_path, cache_size=2)
+
+
+def make_project(project_id: str, owner_id: str = 'owner_1', status=ProjectStatus.CREATED, codebase=None):
+    return ProjectContext(
+        id=project_id,
+        name=f'Project {project_id}',
+        type=ProjectType.API,
+        status=status,
+        owner_id=owner_id,
+        codebase=codebase if codebase is not None else {'main.py': 'print("hi")\n'}
+    )
+
+
+def body_hash(content: str) -> str:
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+# ============================================================================
+# Storage Layout Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_metadata_and_bodies_are_stored_separately(store):
+    """context.json holds a manifest; bodies live in the blob store by hash."""
+    project = make_project('layout', codebase={'a.py': 'x = 1\n', 'b.py': 'x = 1\n', 'c.py': 'y = 2\n'})
+    assert await store.save_context(project)
+
+    project_dir = store.storage_root / 'layout'
+    metadata = json.loads((project_dir / 'context.json').read_text(encoding='utf-8'))
+    assert 'codebase' not in metadata
+    assert metadata['files']['a.py'] == {'hash': body_hash('x = 1\n'), 'size': 6}
+    assert store.blob_store.stats()['blobs'] == 2
+    assert store.blob_store.get_text(body_hash('y = 2\n')) == 'y = 2\n'
+
+    loaded = await ProjectContextStore(storage_root=store.storage_root).load_context('layout')
+    assert loaded.codebase == project.codebase
+
+
+@pytest.mark.asyncio
+async def test_replaced_bodies_are_released(store):
+    """Bodies no longer referenced by the manifest are collected after saving."""
+    project = make_project('churn', codebase={'a.py': 'old\n'})
+    await store.save_context(project)
+
+    project.codebase = {'a.py': 'new\n'}
+    await store.save_context(project)
+
+    assert store.blob_store.gc(grace_seconds=0) == 1
+    assert not store.blob_store.exists(body_hash('old\n'))
+    assert store.blob_store.exists(body_hash('new\n'))
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_previous_version(store, monkeypatch):
+    """An interrupted save leaves the old context and no temp files."""
+    project = make_project('atomic')
+    await store.save_context(project)
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    project.description = 'never written'
+    monkeypatch.setattr(os, 'replace', fail)
+    assert not await store.save_context(project)
+    monkeypatch.undo()
+
+    project_dir = store.storage_root / 'atomic'
+    assert not [p for p in project_dir.rglob('*.tmp')]
+    reloaded = await ProjectContextStore(storage_root=store.storage_root).load_context('atomic')
+    assert reloaded.description == ''
+
+
+@pytest.mark.asyncio
+async def test_legacy_context_files_are_loaded_and_indexed(tmp_path):
+    """Contexts written with the codebase inline load, and a new index picks them up."""
+    project = make_project('legacy', codebase={'app.py': 'print(1)\n'})
+    (tmp_path / 'legacy').mkdir()
+    (tmp_path / 'legacy' / 'context.json').write_text(json.dumps(project.to_dict(), indent=2), encoding='utf-8')
+    (tmp_path / 'current').mkdir()
+
+    store = ProjectContextStore(storage_root=tmp_path)
+
+    assert (tmp_path / INDEX_FILENAME).exists()
+    assert [p.id for p in await store.list_contexts(owner_id='owner_1')] == ['legacy']
+    assert (await store.load_context('legacy')).codebase == project.codebase
+
+
+# ============================================================================
+# Index Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_list_filters_and_paginates_in_the_index(store, monkeypatch):
+    """Only the requested page's context files are read."""
+    for i in range(10):
+        status = ProjectStatus.IN_PROGRESS if i % 2 else ProjectStatus.CREATED
+        await store.save_context(make_project(f'p{i}', owner_id='owner_1' if i < 8 else 'owner_2', status=status))
+
+    reads = []
+    read_metadata = store._read_metadata
+    monkeypatch.setattr(store, '_read_metadata', lambda pid: reads.append(pid) or read_metadata(pid))
+
+    page = await store.list_contexts(owner_id='owner_1', limit=3, offset=1)
+    assert [p.id for p in page] == ['p6', 'p5', 'p4']
+    assert reads == ['p6', 'p5', 'p4']
+    assert all(p.codebase == {} for p in page)
+
+    active = await store.list_contexts(owner_id='owner_1', status='in_progress')
+    assert [p.id for p in active] == ['p7', 'p5', 'p3', 'p1']
+    assert await store.count_contexts(owner_id='owner_1') == 8
+    assert await store.count_contexts(status=ProjectStatus.IN_PROGRESS) == 5
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_index_row_and_bodies(store):
+    """Deleted projects disappear from listings and leave no bodies behind."""
+    await store.save_context(make_project('gone'))
+    assert await store.delete_context('gone')
+
+    assert await store.count_contexts() == 0
+    assert store.blob_store.gc(grace_seconds=0) == 1
+    assert await store.load_context('gone') is None
+
+
+# ============================================================================
+# Cache Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_hot_contexts_are_served_from_cache(store, monkeypatch):
+    """Repeated loads skip disk, and callers get independent copies."""
+    await store.save_context(make_project('hot'))
+
+    reads = []
+    read_metadata = store._read_metadata
+    monkeypatch.setattr(store, '_read_metadata', lambda pid: reads.append(pid) or read_metadata(pid))
+
+    first = await store.load_context('hot')
+    first.codebase['main.py'] = 'mutated'
+    second = await store.load_context('hot')
+
+    assert reads == []
+    assert second.codebase['main.py'] == 'print("hi")\n'
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded_and_sees_other_writers(store):
+    """The LRU evicts past its size and reloads contexts saved elsewhere."""
+    for name in ('a', 'b', 'c'):
+        await store.save_context(make_project(name))
+    assert list(store._cache) == ['b', 'c']
+
+    other = ProjectContextStore(storage_root=store.storage_root)
+    project = await other.load_context('c')
+    project.description = 'changed elsewhere'
+    await other.save_context(project)
+
+    assert (await store.load_context('c')).description == 'changed elsewhere'
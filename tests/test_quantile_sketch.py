@@ -0,0 +1,143 @@
+"""
+Unit tests for streaming quantile sketches.
+
+Tests for LogHistogram, RollingHistogram and the MetricsCollector
+windowed percentile statistics built on them.
+"""
+
+import random
+import pytest
+from utils.quantile_sketch import LogHistogram, RollingHistogram
+from utils.metrics_stream import MetricsCollector, MetricType, create_performance_metric
+
+
+class FakeClock:
+    """Controllable time source."""
+
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+def exact_quantile(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+# ============================================================================
+# LogHistogram Tests
+# ============================================================================
+
+def test_quantiles_within_relative_error():
+    """Quantile estimates stay within the configured relative accuracy."""
+    rng = random.Random(42)
+    values = [rng.lognormvariate(3, 1.5) for _ in range(20000)]
+
+    hist = LogHistogram(relative_accuracy=0.01)
+    for value in values:
+        hist.record(value)
+
+    for q in (0.5, 0.95, 0.99):
+        expected = exact_quantile(values, q)
+        assert hist.quantile(q) == pytest.approx(expected, rel=0.02)
+
+    assert hist.count == len(values)
+    assert hist.mean() == pytest.approx(sum(values) / len(values))
+
+
+def test_merge_equals_combined_recording():
+    """Merging two sketches gives the same result as one sketch of all data."""
+    left, right, combined = LogHistogram(), LogHistogram(), LogHistogram()
+    for i in range(1, 1001):
+        (left if i % 2 else right).record(float(i))
+        combined.record(float(i))
+
+    left.merge(right)
+
+    assert left.count == combined.count
+    assert left.buckets == combined.buckets
+    assert left.quantile(0.99) == combined.quantile(0.99)
+
+
+def test_zero_and_empty_values():
+    """Zero/negative values use the zero bucket; empty sketches return None."""
+    hist = LogHistogram()
+    assert hist.quantile(0.5) is None
+    assert hist.snapshot() == {'count': 0}
+
+    hist.record(0.0)
+    hist.record(-5.0)
+    hist.record(10.0)
+    assert hist.quantile(0.0) == 0.0
+    assert hist.quantile(1.0) == pytest.approx(10.0, rel=0.01)
+
+
+def test_merge_rejects_different_accuracy():
+    """Sketches with different bucket widths cannot be merged."""
+    other = LogHistogram(0.05)
+    other.record(1.0)
+    with pytest.raises(ValueError):
+        LogHistogram(0.01).merge(other)
+
+
+# ============================================================================
+# RollingHistogram Tests
+# ============================================================================
+
+def test_rolling_windows_expire_old_samples():
+    """Samples leave the 1m window after a minute and the 1h window after an hour."""
+    clock = FakeClock()
+    rolling = RollingHistogram(clock=clock)
+
+    for _ in range(100):
+        rolling.record(1000.0)  # Slow burst
+
+    clock.now += 120
+    for _ in range(100):
+        rolling.record(10.0)
+
+    snapshot = rolling.snapshot()
+    assert snapshot['1m']['count'] == 100
+    assert snapshot['1m']['p99'] == pytest.approx(10.0, rel=0.01)
+    assert snapshot['5m']['count'] == 200
+    assert snapshot['1h']['count'] == 200
+    assert snapshot['5m']['p99'] == pytest.approx(1000.0, rel=0.01)
+
+    clock.now += 3700
+    assert rolling.window(3600).count == 0
+    assert rolling.lifetime.count == 200
+
+
+def test_ring_slots_are_reused():
+    """Second buckets are reset when their ring slot comes around again."""
+    clock = FakeClock()
+    rolling = RollingHistogram(second_buckets=10, minute_buckets=5, clock=clock)
+
+    rolling.record(1.0)
+    clock.now += 10  # Same ring slot, new second
+    rolling.record(2.0)
+
+    assert rolling.window(10).count == 1
+
+
+# ============================================================================
+# MetricsCollector Integration
+# ============================================================================
+
+def test_collector_reports_windowed_percentiles():
+    """Collector exposes p99 and 1m/5m/1h windows beyond the raw sample window."""
+    collector = MetricsCollector(window_size=10)
+
+    for latency in range(1, 1001):
+        collector.record(create_performance_metric(
+            latency=float(latency), success_count=1, error_count=0
+        ))
+
+    stats = collector.get_stats(MetricType.PERFORMANCE)
+    assert stats['count'] == 10  # Raw window is still bounded
+    assert stats['p99_latency'] == pytest.approx(990.0, rel=0.02)
+    assert stats['latency_windows']['1m']['count'] == 1000
+    assert stats['total_success'] == 1000
+    assert stats['error_rate'] == 0.0
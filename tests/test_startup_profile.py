@@ -0,0 +1,64 @@
+"""
+Unit tests for startup-time profiling and lazy imports.
+
+Tests for per-module import timing and that the agents do not pull in
+LangGraph or the Google client at import time.
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+from utils.startup_profile import StartupProfiler
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+# ============================================================================
+# Profiler Tests
+# ============================================================================
+
+def test_profiler_records_self_and_cumulative_time(tmp_path, monkeypatch):
+    """Nested imports count toward the parent's cumulative but not self time."""
+    (tmp_path / "startup_outer.py").write_text("import time\nimport startup_inner\ntime.sleep(0.02)\n")
+    (tmp_path / "startup_inner.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = StartupProfiler()
+    profiler.install()
+    try:
+        import startup_outer  # noqa: F401
+    finally:
+        profiler.uninstall()
+        sys.modules.pop("startup_outer", None)
+        sys.modules.pop("startup_inner", None)
+
+    outer = profiler.imports["startup_outer"]
+    inner = profiler.imports["startup_inner"]
+    assert inner["nested"] and not outer["nested"]
+    assert outer["cumulative"] >= 0.07
+    assert 0.02 <= outer["self"] < 0.05
+
+    profiler.mark("imports")
+    report = profiler.report(limit=1)
+    assert report["slowest_cumulative"][0]["module"] == "startup_outer"
+    assert report["slowest_self"][0]["module"] == "startup_inner"
+    assert report["phases"][0]["phase"] == "imports"
+    assert profiler not in sys.meta_path
+
+
+# ============================================================================
+# Lazy Import Tests
+# ============================================================================
+
+def test_agents_import_without_langgraph_or_google_client():
+    """LangGraph and google.api_core load on first use, not when agents are imported."""
+    code = (
+        "import sys; import agents.dev_agent, agents.qa_agent, utils.llm_setup; "
+        "print(sorted({m.split('.')[0] + '.' + m.split('.')[1] if m.startswith('google.') else m.split('.')[0] "
+        "for m in sys.modules if m.startswith(('langgraph', 'langchain_core', 'google.api_core', 'watchdog'))}))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,131 @@
+"""
+Unit tests for token accounting.
+
+Tests for usage-metadata extraction, incremental per-dimension aggregates,
+rolling windows, bounded memory and persistence in TokenCounter.
+"""
+
+from types import SimpleNamespace
+from utils.token_counter import TokenCounter, TokenUsage, extract_usage, OVERFLOW_KEY
+
+
+class FakeClock:
+    """Controllable time source."""
+
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+def gemini_response(prompt: int, candidates: int, cached: int = 0):
+    """Object shaped like a Gemini response with usage metadata."""
+    return SimpleNamespace(usage_metadata=SimpleNamespace(
+        prompt_token_count=prompt,
+        candidates_token_count=candidates,
+        cached_content_token_count=cached
+    ))
+
+
+# ============================================================================
+# Usage Extraction
+# ============================================================================
+
+def test_extract_usage_from_metadata():
+    """Reported prompt/candidate/cached counts are read from the response."""
+    assert extract_usage(gemini_response(120, 30, 100)) == {
+        "prompt_tokens": 120, "response_tokens": 30, "cached_tokens": 100
+    }
+    assert extract_usage(SimpleNamespace(text="no usage")) is None
+
+
+def test_add_from_response_falls_back_to_estimate():
+    """Responses without usage metadata are estimated from characters and flagged."""
+    counter = TokenCounter()
+
+    real = counter.add_from_response(gemini_response(50, 10), agent="dev", prompt_name="code", model="m")
+    estimate = counter.add_from_response(object(), agent="dev", prompt_name="code",
+                                         prompt_chars=400, response_chars=80)
+
+    assert (real.prompt_tokens, real.estimated) == (50, False)
+    assert (estimate.prompt_tokens, estimate.response_tokens, estimate.estimated) == (100, 20, True)
+    assert counter.get_stats()["estimated_calls"] == 1
+
+
+# ============================================================================
+# Aggregation Tests
+# ============================================================================
+
+def test_breakdowns_by_agent_prompt_model_project():
+    """Each call is aggregated under agent, prompt_name, model and project."""
+    counter = TokenCounter()
+    counter.add_from_response(gemini_response(100, 20, 80), agent="qa", prompt_name="review",
+                              model="flash", project_id="p1")
+    counter.add_from_response(gemini_response(10, 5), agent="dev", prompt_name="code",
+                              model="pro", project_id="p1")
+
+    stats = counter.get_stats()
+    assert stats["total_tokens"] == 135
+    assert stats["total_cached_tokens"] == 80
+    assert stats["total_calls"] == 2
+    assert stats["agent_breakdown"]["qa"]["total"] == 120
+    assert stats["prompt_breakdown"]["code"]["calls"] == 1
+    assert stats["model_breakdown"]["flash"]["cached"] == 80
+    assert stats["project_breakdown"]["p1"]["calls"] == 2
+
+
+def test_rolling_windows_expire():
+    """Usage leaves the 1m window after a minute and the 1h window after an hour."""
+    clock = FakeClock()
+    counter = TokenCounter(clock=clock)
+
+    counter.add_usage(TokenUsage(agent="dev", prompt_name="code", prompt_tokens=600, response_tokens=0))
+    clock.now += 120
+    counter.add_usage(TokenUsage(agent="dev", prompt_name="code", prompt_tokens=60, response_tokens=0))
+
+    windows = counter.get_stats()["windows"]
+    assert windows["1m"]["total"] == 60
+    assert windows["5m"]["total"] == 660
+    assert windows["1h"]["tokens_per_minute"] == 11.0
+
+    clock.now += 3600
+    assert counter.get_window(3600)["totals"]["calls"] == 0
+    assert counter.total_tokens == 660
+
+
+def test_memory_is_bounded():
+    """Recent calls and per-dimension keys are capped."""
+    counter = TokenCounter(recent_size=10, max_keys_per_dimension=3)
+    for i in range(50):
+        counter.add_usage(TokenUsage(agent=f"agent_{i}", prompt_name="p", prompt_tokens=1))
+
+    stats = counter.get_stats()
+    assert len(counter.usages) == 10
+    assert len(stats["agent_breakdown"]) == 4  # 3 keys + overflow
+    assert stats["agent_breakdown"][OVERFLOW_KEY]["calls"] == 47
+    assert stats["total_calls"] == 50
+
+
+# ============================================================================
+# Persistence Tests
+# ============================================================================
+
+def test_periodic_persistence_and_reload(tmp_path):
+    """Aggregates are saved after the interval and restored by a new counter."""
+    path = tmp_path / "usage" / "tokens.json"
+    clock = FakeClock()
+    counter = TokenCounter(persist_path=str(path), persist_interval=60, clock=clock)
+
+    counter.add_from_response(gemini_response(100, 50), agent="pm", prompt_name="plan", model="pro")
+    assert not path.exists()
+
+    clock.now += 61
+    counter.add_from_response(gemini_response(10, 5), agent="pm", prompt_name="plan", model="pro")
+    assert path.exists()
+
+    restored = TokenCounter(persist_path=str(path))
+    stats = restored.get_stats()
+    assert stats["total_tokens"] == 165
+    assert stats["agent_breakdown"]["pm"]["calls"] == 2
+    assert stats["model_breakdown"]["pro"]["prompt"] == 110
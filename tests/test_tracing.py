@@ -0,0 +1,184 @@
+"""
+Unit tests for span tracing.
+
+Tests for Tracer context propagation, the traced decorator, timeline and
+critical-path views, OTLP/JSONL export and queue/worker span linking.
+"""
+
+import asyncio
+import json
+import pytest
+from utils import tracing
+from utils.tracing import (
+    Tracer, JsonlSpanExporter, SpanContext, STATUS_ERROR,
+    bind_trace, current_context, get_tracer, traced, trace_id_for
+)
+from utils.task_queue import AsyncTaskQueue, QueueTask
+from utils.worker_pool import WorkerPool
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    """Fresh tracer installed as the module default."""
+    fresh = Tracer()
+    monkeypatch.setattr(tracing, "_tracer", fresh)
+    return fresh
+
+
+# ============================================================================
+# Tracer Tests
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_nested_spans_share_trace_and_link_parents(tracer):
+    """Child spans (including in created tasks) inherit the current span."""
+    async def child_work():
+        with tracer.span("child"):
+            await asyncio.sleep(0)
+
+    with tracer.span("root") as root:
+        await asyncio.create_task(child_work())
+        with tracer.span("sibling"):
+            pass
+
+    spans = {s.name: s for s in tracer.memory.get_spans(root.trace_id)}
+    assert set(spans) == {"root", "child", "sibling"}
+    assert spans["child"].parent_id == root.span_id
+    assert spans["sibling"].parent_id == root.span_id
+    assert spans["root"].parent_id is None
+    assert current_context() is None
+
+
+@pytest.mark.asyncio
+async def test_traced_marks_errors(tracer):
+    """Exceptions propagate and set error status on the span."""
+    @traced("failing")
+    async def failing():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        await failing()
+
+    (span,) = [s for t in tracer.memory.trace_ids() for s in tracer.memory.get_spans(t)]
+    assert span.status == STATUS_ERROR
+    assert "bad input" in span.status_message
+
+
+@pytest.mark.asyncio
+async def test_traced_async_generator_scopes_span_to_body(tracer):
+    """A traced generator's span is current inside the body, not in the consumer."""
+    seen_inside = []
+
+    @traced("stream")
+    async def stream():
+        for i in range(3):
+            seen_inside.append(current_context())
+            yield i
+
+    consumer_contexts = []
+    async for _ in stream():
+        consumer_contexts.append(current_context())
+
+    assert all(ctx is not None for ctx in seen_inside)
+    assert consumer_contexts == [None, None, None]
+    (span,) = tracer.memory.get_spans(seen_inside[0].trace_id)
+    assert span.name == "stream"
+    assert span.end_ns is not None
+
+
+@pytest.mark.asyncio
+async def test_bind_trace_and_plan_timeline(tracer):
+    """Plan spans are retrievable by plan ID with a critical path and flame view."""
+    @traced("plan")
+    async def plan():
+        bind_trace("plan-123")
+        with tracer.span("fast"):
+            pass
+        with tracer.span("slow"):
+            with tracer.span("llm"):
+                await asyncio.sleep(0.01)
+
+    await plan()
+
+    view = tracer.memory.timeline("plan-123")
+    assert view["trace_id"] == trace_id_for("plan-123")
+    assert [s["name"] for s in view["spans"]][0] == "plan"
+    assert {s["name"]: s["depth"] for s in view["spans"]}["llm"] == 2
+    assert view["critical_path"] == ["plan", "slow", "llm"]
+    assert "llm" in tracer.memory.render("plan-123")
+
+
+def test_disabled_tracer_is_noop():
+    """Disabled tracer yields no-op spans and stores nothing."""
+    disabled = Tracer(enabled=False)
+    with disabled.span("ignored") as span:
+        span.set_attribute("k", "v")
+    assert disabled.memory.trace_ids() == []
+
+
+def test_in_memory_store_is_bounded():
+    """Old traces are evicted beyond max_traces."""
+    bounded = Tracer()
+    bounded.memory.max_traces = 3
+    for i in range(5):
+        with bounded.span(f"root_{i}", parent=SpanContext.for_key(f"k{i}")):
+            pass
+    assert bounded.memory.trace_ids() == [trace_id_for(f"k{i}") for i in (2, 3, 4)]
+
+
+# ============================================================================
+# Export Tests
+# ============================================================================
+
+def test_jsonl_exporter_writes_otlp_lines(tmp_path):
+    """Spans are written as OTLP/JSON ExportTraceServiceRequest lines."""
+    path = tmp_path / "traces" / "spans.jsonl"
+    exporter = JsonlSpanExporter(str(path), batch_size=2)
+    file_tracer = Tracer(exporters=[exporter])
+
+    with file_tracer.span("outer", attributes={"task.id": "t1", "retries": 2}):
+        with file_tracer.span("inner"):
+            pass
+    with file_tracer.span("third"):
+        pass
+    file_tracer.shutdown()
+
+    lines = path.read_text().strip().splitlines()
+    assert len(lines) == 2
+    spans = [
+        span
+        for line in lines
+        for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    ]
+    by_name = {s["name"]: s for s in spans}
+    assert by_name["inner"]["parentSpanId"] == by_name["outer"]["spanId"]
+    assert {"key": "retries", "value": {"intValue": "2"}} in by_name["outer"]["attributes"]
+    assert int(by_name["outer"]["endTimeUnixNano"]) >= int(by_name["outer"]["startTimeUnixNano"])
+
+
+# ============================================================================
+# Queue Propagation
+# ============================================================================
+
+@pytest.mark.asyncio
+async def test_queue_wait_and_processing_join_producer_trace(tracer):
+    """Tasks enqueued in a span get queue.wait and task.process child spans."""
+    queue = AsyncTaskQueue("TraceQueue")
+
+    async def process_func(task):
+        with get_tracer().span("work"):
+            await asyncio.sleep(0.001)
+
+    with tracer.span("producer") as producer:
+        await queue.put(QueueTask(task_id="traced_1", task_type="dev", payload={}))
+
+    pool = WorkerPool("TracePool", 1, queue, process_func)
+    await pool.start()
+    await queue.wait_until_empty(check_interval=0.01)
+    await pool.stop(graceful=False)
+
+    spans = {s.name: s for s in tracer.memory.get_spans(producer.trace_id)}
+    assert spans["queue.wait"].parent_id == producer.span_id
+    assert spans["task.process"].parent_id == producer.span_id
+    assert spans["work"].parent_id == spans["task.process"].span_id
+    assert spans["queue.wait"].attributes["queue"] == "TraceQueue"
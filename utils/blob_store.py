@@ -0,0 +1,484 @@
+"""
+Content-addressed, compressed, reference-counted storage for generated files.
+
+Generated files are stored once per distinct content, keyed by SHA-256, no
+matter how many plans, projects, archives, caches or templates contain
+them. Callers keep lightweight manifests (path -> hash) and the store
+counts how many manifest entries reference each blob.
+
+Layout under the store root:
+- objects/ab/<sha256>.zst|.gz   Compressed blob (the canonical copy)
+- raw/ab/<sha256>               Uncompressed, read-only copy, created by
+                                the first hardlink export and shared by
+                                every hardlinked or reflinked export
+- manifests/<name>.json         Named manifests {path: sha256}
+- refs.sqlite3                  Reference counts and sizes
+
+Exports materialize manifests into directories. "hardlink" is for
+read-only copies such as archives; "reflink" (copy-on-write clone where
+the filesystem supports it, a plain copy otherwise) is for working trees
+that are edited afterwards; it clones the raw copy where the filesystem
+allows and otherwise writes the decompressed blob, without leaving a raw
+copy behind. Every exported file is created under a temp
+name and renamed into place, so re-exporting never writes through an
+existing hardlink.
+
+Unreferenced blobs are removed by gc() after a grace period, not on
+release, so a writer that has stored a blob but not yet referenced it
+never loses it. gc_periodically runs gc() on a schedule; the application
+starts it at startup (main.py, BLOB_GC_INTERVAL_SECONDS).
+
+Configuration (environment):
+- BLOB_STORE_ROOT: Store root (default: generated_code/blobs)
+- BLOB_STORE_CODEC: "zstd" or "gzip" (default: zstd if available)
+"""
+
+import os
+import json
+import asyncio
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Union
+
+from utils.file_body_store import CODEC_EXTENSIONS, ZSTD_AVAILABLE, compress, decompress
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FICLONE = 0x40049409  # Linux ioctl: clone a file's extents (btrfs, xfs, ...)
+MATERIALIZE_MODES = ("hardlink", "reflink", "copy")
+
+Content = Union[str, bytes]
+
+
+def blob_hash(content: Content) -> str:
+    """SHA-256 hex digest of file content (str is encoded as UTF-8)."""
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes, mode: Optional[int] = None) -> None:
+    """Write a file under a temp name and rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Clone src into the new file dst; False when the filesystem cannot."""
+    if fcntl is None:
+        return False
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            return True
+        except OSError:
+            return False
+
+
+class BlobStore:
+    """
+    SHA-256-keyed blob storage with named manifests and reference counts.
+
+    Thread-safe; the reference counts live in sqlite, so several processes
+    may share a root.
+    """
+
+    def __init__(self, root: Path, codec: Optional[str] = None):
+        """
+        Initialize blob store.
+
+        Args:
+            root: Directory holding objects, raw copies, manifests and counts
+            codec: "zstd" or "gzip" (defaults to zstd when available)
+        """
+        self.root = Path(root)
+        self.codec = codec or ("zstd" if ZSTD_AVAILABLE else "gzip")
+        if self.codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown codec: {self.codec}")
+
+        self.objects_dir = self.root / "objects"
+        self.raw_dir = self.root / "raw"
+        self.manifests_dir = self.root / "manifests"
+        for directory in (self.objects_dir, self.raw_dir, self.manifests_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(str(self.root / "refs.sqlite3"), check_same_thread=False, timeout=30)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "hash TEXT PRIMARY KEY, refcount INTEGER NOT NULL DEFAULT 0, "
+                "size INTEGER NOT NULL, stored_size INTEGER NOT NULL, codec TEXT NOT NULL, "
+                "released_at REAL)"
+            )
+
+        logger.info(f"📦 BlobStore: {self.root} ({self.codec})")
+
+    # ========================================================================
+    # Paths
+    # ========================================================================
+
+    def _object_path(self, content_hash: str, codec: Optional[str] = None) -> Path:
+        ext = CODEC_EXTENSIONS[codec or self.codec]
+        return self.objects_dir / content_hash[:2] / f"{content_hash}.{ext}"
+
+    def _raw_path(self, content_hash: str) -> Path:
+        return self.raw_dir / content_hash[:2] / content_hash
+
+    def _manifest_path(self, name: str) -> Path:
+        parts = Path(name).parts
+        if not parts or any(part in ("..", "") for part in parts) or Path(name).is_absolute():
+            raise ValueError(f"Invalid manifest name: {name!r}")
+        return self.manifests_dir / f"{name}.json"
+
+    def _codec_of(self, content_hash: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT codec FROM blobs WHERE hash = ?", (content_hash,)).fetchone()
+        return row[0] if row else None
+
+    # ========================================================================
+    # Blobs
+    # ========================================================================
+
+    def put(self, content: Content) -> str:
+        """
+        Store content unless an identical blob exists (no reference is added).
+
+        Returns:
+            SHA-256 hex digest of the content
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        content_hash = hashlib.sha256(data).hexdigest()
+        if self._codec_of(content_hash) is not None:
+            # Restart the grace period of an unreferenced blob about to be reused
+            with self._lock, self._db:
+                self._db.execute(
+                    "UPDATE blobs SET released_at = ? WHERE hash = ? AND refcount = 0", (time.time(), content_hash)
+                )
+            return content_hash
+
+        packed = compress(data, self.codec)
+        _write_atomic(self._object_path(content_hash), packed)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO blobs (hash, refcount, size, stored_size, codec, released_at) "
+                "VALUES (?, 0, ?, ?, ?, ?)",
+                (content_hash, len(data), len(packed), self.codec, time.time())
+            )
+        return content_hash
+
+    def exists(self, content_hash: str) -> bool:
+        """Whether a blob is stored."""
+        return self._codec_of(content_hash) is not None
+
+    def get(self, content_hash: str) -> bytes:
+        """
+        Read a blob.
+
+        Raises:
+            KeyError: If the blob is not stored
+            ValueError: If the stored bytes do not match the hash
+        """
+        raw = self._raw_path(content_hash)
+        if raw.exists():
+            data = raw.read_bytes()
+            if hashlib.sha256(data).hexdigest() == content_hash:
+                return data
+            # Written through a hardlinked export: drop it, the object is canonical
+            logger.warning(f"⚠️ BlobStore: Raw copy of {content_hash} was modified, discarding it")
+            raw.unlink(missing_ok=True)
+
+        codec = self._codec_of(content_hash)
+        if codec is None:
+            raise KeyError(content_hash)
+        data = decompress(self._object_path(content_hash, codec).read_bytes(), codec)
+        if hashlib.sha256(data).hexdigest() != content_hash:
+            raise ValueError(f"Blob {content_hash} does not match its content hash")
+        return data
+
+    def get_text(self, content_hash: str) -> str:
+        """Read a blob as UTF-8 text."""
+        return self.get(content_hash).decode("utf-8")
+
+    def retain(self, hashes: Iterable[str]) -> None:
+        """Add one reference per occurrence of each hash."""
+        counts = Counter(hashes)
+        if not counts:
+            return
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE blobs SET refcount = refcount + ?, released_at = NULL WHERE hash = ?",
+                [(count, content_hash) for content_hash, count in counts.items()]
+            )
+
+    def release(self, hashes: Iterable[str]) -> None:
+        """Drop one reference per occurrence of each hash (gc() frees unreferenced blobs)."""
+        counts = Counter(hashes)
+        if not counts:
+            return
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE blobs SET refcount = MAX(refcount - ?, 0), "
+                "released_at = CASE WHEN refcount - ? <= 0 THEN ? ELSE released_at END WHERE hash = ?",
+                [(count, count, now, content_hash) for content_hash, count in counts.items()]
+            )
+
+    def gc(self, grace_seconds: float = 3600.0) -> int:
+        """
+        Delete blobs that have been unreferenced for longer than grace_seconds.
+
+        Returns:
+            Number of blobs deleted
+        """
+        cutoff = time.time() - grace_seconds
+        with self._lock, self._db:
+            rows = self._db.execute(
+                "SELECT hash, codec FROM blobs WHERE refcount = 0 AND released_at <= ?", (cutoff,)
+            ).fetchall()
+            for content_hash, codec in rows:
+                self._object_path(content_hash, codec).unlink(missing_ok=True)
+                self._drop_raw_copy(content_hash)
+            self._db.executemany("DELETE FROM blobs WHERE hash = ?", [(row[0],) for row in rows])
+        if rows:
+            logger.info(f"🧹 BlobStore: Deleted {len(rows)} unreferenced blobs")
+        return len(rows)
+
+    def stats(self) -> Dict[str, int]:
+        """Blob count, referenced-content bytes and stored (compressed) bytes."""
+        with self._lock:
+            blobs, size, stored, referenced = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0), "
+                "COALESCE(SUM(size * refcount), 0) FROM blobs"
+            ).fetchone()
+        return {"blobs": blobs, "unique_bytes": size, "stored_bytes": stored, "referenced_bytes": referenced}
+
+    # ========================================================================
+    # Manifests
+    # ========================================================================
+
+    def put_manifest(self, name: str, files: Mapping[str, Content]) -> Dict[str, str]:
+        """
+        Store files and (re)write a named manifest, updating reference counts.
+
+        Args:
+            name: Manifest name, a relative path such as "projects/archived/foo"
+            files: path -> content
+
+        Returns:
+            The manifest (path -> hash)
+        """
+        manifest = {path: self.put(content) for path, content in files.items()}
+        self.write_manifest(name, manifest)
+        return manifest
+
+    def write_manifest(self, name: str, manifest: Mapping[str, str]) -> None:
+        """
+        (Re)write a named manifest of already stored blobs.
+
+        Raises:
+            KeyError: If a hash in the manifest is not stored
+        """
+        missing = [content_hash for content_hash in set(manifest.values()) if not self.exists(content_hash)]
+        if missing:
+            raise KeyError(f"Manifest {name} references unknown blobs: {missing[:5]}")
+
+        with self._lock:
+            previous = self.get_manifest(name) or {}
+            self.retain(manifest.values())
+            _write_atomic(
+                self._manifest_path(name),
+                json.dumps(dict(manifest), separators=(",", ":"), sort_keys=True).encode("utf-8")
+            )
+            self.release(previous.values())
+
+    def get_manifest(self, name: str) -> Optional[Dict[str, str]]:
+        """A named manifest (path -> hash), or None if it does not exist."""
+        try:
+            return json.loads(self._manifest_path(name).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def read_files(self, manifest: Mapping[str, str]) -> Dict[str, str]:
+        """Text contents of every file in a manifest."""
+        return {path: self.get_text(content_hash) for path, content_hash in manifest.items()}
+
+    def delete_manifest(self, name: str) -> bool:
+        """Delete a named manifest and release its references."""
+        with self._lock:
+            manifest = self.get_manifest(name)
+            if manifest is None:
+                return False
+            self._manifest_path(name).unlink()
+            self.release(manifest.values())
+            return True
+
+    def delete_manifests(self, prefix: str) -> int:
+        """
+        Delete every manifest whose name starts with prefix + "/".
+
+        Returns:
+            Number of manifests deleted
+        """
+        directory = self._manifest_path(prefix).with_suffix("")
+        names = [
+            path.relative_to(self.manifests_dir).as_posix()[:-len(".json")]
+            for path in directory.rglob("*.json")
+        ] if directory.is_dir() else []
+        return sum(self.delete_manifest(name) for name in names)
+
+    # ========================================================================
+    # Materialization
+    # ========================================================================
+
+    def _raw_copy(self, content_hash: str, data: Optional[bytes] = None) -> Path:
+        """The shared, read-only uncompressed copy of a blob (created on demand)."""
+        raw = self._raw_path(content_hash)
+        if not raw.exists():
+            _write_atomic(raw, self.get(content_hash) if data is None else data, mode=0o444)
+        return raw
+
+    def _drop_raw_copy(self, content_hash: str) -> None:
+        raw = self._raw_path(content_hash)
+        if raw.exists():
+            os.chmod(raw, 0o644)
+            raw.unlink(missing_ok=True)
+
+    def materialize_file(self, content_hash: str, dest: Path, mode: str = "reflink") -> None:
+        """
+        Create dest with a blob's content.
+
+        Args:
+            content_hash: Blob to export
+            dest: Destination file path (replaced if it exists)
+            mode: "hardlink" (read-only exports), "reflink" (copy-on-write
+                  clone, falling back to a copy) or "copy"
+        """
+        if mode not in MATERIALIZE_MODES:
+            raise ValueError(f"Unknown materialize mode: {mode}")
+
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.parent / f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if mode == "hardlink":
+                try:
+                    os.link(self._raw_copy(content_hash), tmp)
+                except OSError:
+                    # Different filesystem or no hardlink support
+                    mode = "reflink"
+            data = None
+            if mode == "reflink":
+                raw = self._raw_path(content_hash)
+                if raw.exists():
+                    cloned = _reflink(raw, tmp)
+                else:
+                    # Clone a new raw copy, and keep it only if the clone
+                    # shares its extents
+                    data = self.get(content_hash)
+                    cloned = _reflink(self._raw_copy(content_hash, data), tmp)
+                    if not cloned:
+                        self._drop_raw_copy(content_hash)
+                if not cloned:
+                    tmp.unlink(missing_ok=True)
+                    mode = "copy"
+            if mode == "copy":
+                with open(tmp, "wb") as f:
+                    f.write(self.get(content_hash) if data is None else data)
+                os.chmod(tmp, 0o644)
+            elif mode == "reflink":
+                os.chmod(tmp, 0o644)
+            os.replace(tmp, dest)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def materialize(self, manifest: Mapping[str, str], dest: Path, mode: str = "reflink") -> int:
+        """
+        Export every file of a manifest under dest.
+
+        Returns:
+            Number of files written
+        """
+        dest = Path(dest)
+        for path, content_hash in manifest.items():
+            target = dest / path
+            if dest.resolve() not in target.resolve().parents:
+                raise ValueError(f"Manifest path escapes the destination: {path}")
+            self.materialize_file(content_hash, target, mode)
+        return len(manifest)
+
+    def import_file(self, src: Path, dest: Path, mode: str = "reflink") -> str:
+        """
+        Store a file's content and export it to dest (deduplicated copy).
+
+        Returns:
+            SHA-256 of the content
+        """
+        content_hash = self.put(Path(src).read_bytes())
+        self.materialize_file(content_hash, dest, mode)
+        return content_hash
+
+    def import_tree(self, src: Path) -> Dict[str, str]:
+        """Store every file under src and return its manifest (paths use "/")."""
+        src = Path(src)
+        return {
+            file_path.relative_to(src).as_posix(): self.put(file_path.read_bytes())
+            for file_path in sorted(src.rglob("*")) if file_path.is_file()
+        }
+
+
+async def gc_periodically(stores: Iterable, interval_seconds: float, grace_seconds: float = 3600.0) -> None:
+    """
+    Run gc() on each store now and then every interval_seconds, until cancelled.
+
+    Args:
+        stores: Stores with a blocking gc(grace_seconds) (BlobStore, PostgresObjectStore)
+        interval_seconds: Time between collections
+        grace_seconds: Passed to gc()
+    """
+    stores = list(stores)
+    while True:
+        for store in stores:
+            try:
+                await asyncio.to_thread(store.gc, grace_seconds)
+            except Exception as e:
+                logger.warning(f"⚠️  {type(store).__name__}: gc failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Get or create the global blob store."""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            from config import GENERATED_CODE_ROOT
+            _blob_store = BlobStore(
+                root=Path(os.getenv("BLOB_STORE_ROOT") or GENERATED_CODE_ROOT / "blobs"),
+                codec=os.getenv("BLOB_STORE_CODEC") or None
+            )
+        return _blob_store
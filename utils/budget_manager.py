@@ -0,0 +1,361 @@
+"""
+Token and request budgets with cost-aware admission for LLM calls.
+
+This module provides:
+- Budget: Token/request limits for one scope within a window (default: a day)
+- BudgetManager: Tracks usage globally, per project and per (project, stage),
+  and decides for each LLM call whether to admit it, admit it degraded
+  (cheaper model, optional work skipped, syntax-only QA) or reject it
+- budget_scope/budget_stage: ContextVar-based attribution of calls to a
+  project and pipeline stage, set by pipeline processors and agent methods
+
+Stages used by the pipeline: plan, dev, fix, qa, docs, tests, deploy.
+With no budgets configured every call is admitted unchanged.
+"""
+
+import os
+import time
+import logging
+import functools
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from utils.metrics_registry import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+# Project used when a call is made outside any project scope
+DEFAULT_PROJECT = "default"
+
+# Cheapest model (the syntax_review tier of QAAgent._select_model_for_task)
+DEGRADED_MODEL = os.getenv("BUDGET_DEGRADED_MODEL", "gemini-1.5-flash-8b")
+
+# Stages whose work may be skipped entirely when degraded
+OPTIONAL_STAGES = ("docs", "tests")
+
+BUDGET_ADMISSIONS = counter(
+    "llm_budget_admissions_total", "LLM admission decisions", ("stage", "decision")
+)
+BUDGET_UTILIZATION = gauge(
+    "llm_budget_utilization", "Highest budget utilization at last admission (1.0 = limit)", ("scope",)
+)
+
+_scope: contextvars.ContextVar[Tuple[Optional[str], Optional[str]]] = contextvars.ContextVar(
+    "budget_scope", default=(None, None)
+)
+
+
+class AdmissionDecision(Enum):
+    """Outcome of a budget check."""
+    ADMIT = "admit"
+    DEGRADE = "degrade"
+    REJECT = "reject"
+
+
+@dataclass
+class Budget:
+    """Limits for one scope per window (None = unlimited)."""
+    tokens: Optional[int] = None
+    requests: Optional[int] = None
+
+
+@dataclass
+class Admission:
+    """Result of BudgetManager.admit()."""
+    decision: AdmissionDecision
+    project: str
+    stage: str
+    utilization: float
+    reason: str = ""
+    model: Optional[str] = None
+
+    @property
+    def degraded(self) -> bool:
+        return self.decision == AdmissionDecision.DEGRADE
+
+    @property
+    def rejected(self) -> bool:
+        return self.decision == AdmissionDecision.REJECT
+
+
+class _Usage:
+    """Tokens and requests consumed in the current window."""
+
+    __slots__ = ('tokens', 'requests')
+
+    def __init__(self):
+        self.tokens = 0
+        self.requests = 0
+
+    def utilization(self, budget: Optional[Budget], extra_tokens: int = 0, extra_requests: int = 0) -> float:
+        if budget is None:
+            return 0.0
+        ratios = [0.0]
+        if budget.tokens:
+            ratios.append((self.tokens + extra_tokens) / budget.tokens)
+        if budget.requests:
+            ratios.append((self.requests + extra_requests) / budget.requests)
+        return max(ratios)
+
+
+class BudgetManager:
+    """
+    Admission controller for LLM calls.
+
+    Usage accumulates in fixed windows (reset every window_seconds). A call
+    is degraded once any applicable budget (global, project, project+stage)
+    would reach degrade_at of its limit, and rejected once it would exceed
+    the limit.
+    """
+
+    def __init__(
+        self,
+        global_budget: Optional[Budget] = None,
+        project_budget: Optional[Budget] = None,
+        stage_budgets: Optional[Dict[str, Budget]] = None,
+        window_seconds: float = 86400.0,
+        degrade_at: float = 0.8,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize budget manager.
+
+        Args:
+            global_budget: Limits across all projects (the provider quota)
+            project_budget: Limits applied to each project
+            stage_budgets: Per-stage limits applied within each project
+            window_seconds: Budget window length (default: 1 day)
+            degrade_at: Utilization at which calls are degraded (0.0-1.0)
+            clock: Time source in seconds (injectable for tests)
+        """
+        self.global_budget = global_budget
+        self.project_budget = project_budget
+        self.stage_budgets = dict(stage_budgets or {})
+        self.window_seconds = window_seconds
+        self.degrade_at = degrade_at
+        self._clock = clock
+
+        self._window_start = clock()
+        self._global = _Usage()
+        self._projects: Dict[str, _Usage] = {}
+        self._stages: Dict[Tuple[str, str], _Usage] = {}
+
+        self.decisions = {d.value: 0 for d in AdmissionDecision}
+
+    @property
+    def enabled(self) -> bool:
+        """True if any budget is configured."""
+        return bool(self.global_budget or self.project_budget or self.stage_budgets)
+
+    def _roll_window(self):
+        now = self._clock()
+        if now - self._window_start >= self.window_seconds:
+            self._window_start = now
+            self._global = _Usage()
+            self._projects.clear()
+            self._stages.clear()
+            logger.info("🔄 BudgetManager: New budget window started")
+
+    def _resolve(self, project: Optional[str], stage: Optional[str]) -> Tuple[str, str]:
+        scoped_project, scoped_stage = _scope.get()
+        return (
+            project or scoped_project or DEFAULT_PROJECT,
+            stage or scoped_stage or "unscoped"
+        )
+
+    def utilization(self, project: Optional[str] = None, stage: Optional[str] = None,
+                    extra_tokens: int = 0, extra_requests: int = 0) -> float:
+        """
+        Highest utilization across the budgets that apply to a call.
+
+        Returns:
+            Ratio of usage to limit (1.0 = at limit); 0.0 if unlimited
+        """
+        self._roll_window()
+        project, stage = self._resolve(project, stage)
+        return max(
+            self._global.utilization(self.global_budget, extra_tokens, extra_requests),
+            self._projects.get(project, _Usage()).utilization(
+                self.project_budget, extra_tokens, extra_requests
+            ),
+            self._stages.get((project, stage), _Usage()).utilization(
+                self.stage_budgets.get(stage), extra_tokens, extra_requests
+            )
+        )
+
+    def is_degraded(self, stage: Optional[str] = None, project: Optional[str] = None) -> bool:
+        """True if work in this scope should run in degraded mode."""
+        if not self.enabled:
+            return False
+        return self.utilization(project, stage) >= self.degrade_at
+
+    def admit(self, estimated_tokens: int = 0, project: Optional[str] = None,
+              stage: Optional[str] = None, model: Optional[str] = None) -> Admission:
+        """
+        Decide whether an LLM call may run and count it as a request.
+
+        Args:
+            estimated_tokens: Expected prompt tokens of the call
+            project: Project (default: current budget scope)
+            stage: Pipeline stage (default: current budget scope)
+            model: Requested model
+
+        Returns:
+            Admission (model is the model to use)
+        """
+        project, stage = self._resolve(project, stage)
+        if not self.enabled:
+            return Admission(AdmissionDecision.ADMIT, project, stage, 0.0, model=model)
+
+        util = self.utilization(project, stage, extra_tokens=estimated_tokens, extra_requests=1)
+        if util > 1.0:
+            decision = AdmissionDecision.REJECT
+            reason = f"budget exhausted for project '{project}' stage '{stage}' ({util:.0%})"
+        elif util >= self.degrade_at:
+            decision = AdmissionDecision.DEGRADE
+            reason = f"budget at {util:.0%} for project '{project}' stage '{stage}'"
+            model = DEGRADED_MODEL
+        else:
+            decision = AdmissionDecision.ADMIT
+            reason = ""
+
+        if decision != AdmissionDecision.REJECT:
+            self._global.requests += 1
+            self._projects.setdefault(project, _Usage()).requests += 1
+            self._stages.setdefault((project, stage), _Usage()).requests += 1
+
+        self.decisions[decision.value] += 1
+        BUDGET_ADMISSIONS.labels(stage, decision.value).inc()
+        BUDGET_UTILIZATION.labels("global").set(
+            self._global.utilization(self.global_budget)
+        )
+        if decision != AdmissionDecision.ADMIT:
+            logger.warning(f"💸 BudgetManager: {decision.value.upper()} - {reason}")
+
+        return Admission(decision, project, stage, round(util, 4), reason, model)
+
+    def record(self, tokens: int, project: Optional[str] = None, stage: Optional[str] = None):
+        """Charge tokens actually used by a completed call."""
+        if not self.enabled:
+            return
+        self._roll_window()
+        project, stage = self._resolve(project, stage)
+        self._global.tokens += tokens
+        self._projects.setdefault(project, _Usage()).tokens += tokens
+        self._stages.setdefault((project, stage), _Usage()).tokens += tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get budget usage and decision counts for the current window."""
+        self._roll_window()
+        return {
+            "enabled": self.enabled,
+            "window_seconds": self.window_seconds,
+            "window_elapsed": round(self._clock() - self._window_start, 1),
+            "degrade_at": self.degrade_at,
+            "global": {"tokens": self._global.tokens, "requests": self._global.requests},
+            "projects": {
+                project: {
+                    "tokens": usage.tokens,
+                    "requests": usage.requests,
+                    "utilization": round(usage.utilization(self.project_budget), 4)
+                }
+                for project, usage in self._projects.items()
+            },
+            "decisions": dict(self.decisions)
+        }
+
+
+# ============================================================================
+# Scope Helpers
+# ============================================================================
+
+@contextmanager
+def budget_scope(project: Optional[str] = None, stage: Optional[str] = None) -> Iterator[None]:
+    """Attribute LLM calls in this block to a project and/or stage (others inherited)."""
+    current_project, current_stage = _scope.get()
+    token = _scope.set((project or current_project, stage or current_stage))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def current_scope() -> Tuple[Optional[str], Optional[str]]:
+    """Current (project, stage)."""
+    return _scope.get()
+
+
+def budget_stage(stage: str, project: Optional[Callable[..., Optional[str]]] = None):
+    """
+    Decorator running a coroutine inside a budget scope.
+
+    Args:
+        stage: Stage name
+        project: Optional callable receiving the call arguments and returning
+                 the project ID (default: inherited from the caller)
+
+    Returns:
+        Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            project_id = None
+            if project is not None:
+                try:
+                    project_id = project(*args, **kwargs)
+                except Exception:
+                    project_id = None
+            with budget_scope(project_id, stage):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _budget_from_env(prefix: str) -> Optional[Budget]:
+    tokens = os.getenv(f"{prefix}_TOKENS")
+    requests = os.getenv(f"{prefix}_REQUESTS")
+    if not tokens and not requests:
+        return None
+    return Budget(
+        tokens=int(tokens) if tokens else None,
+        requests=int(requests) if requests else None
+    )
+
+
+def _stage_budgets_from_env() -> Dict[str, Budget]:
+    """Parse LLM_BUDGET_STAGE_TOKENS like 'docs=20000,tests=30000'."""
+    budgets = {}
+    for item in os.getenv("LLM_BUDGET_STAGE_TOKENS", "").split(","):
+        if "=" in item:
+            stage, limit = item.split("=", 1)
+            budgets[stage.strip()] = Budget(tokens=int(limit))
+    return budgets
+
+
+_budget_manager: Optional[BudgetManager] = None
+
+
+def get_budget_manager() -> BudgetManager:
+    """Get or create the global budget manager (configured from LLM_BUDGET_* env vars)."""
+    global _budget_manager
+    if _budget_manager is None:
+        _budget_manager = BudgetManager(
+            global_budget=_budget_from_env("LLM_BUDGET_GLOBAL"),
+            project_budget=_budget_from_env("LLM_BUDGET_PROJECT"),
+            stage_budgets=_stage_budgets_from_env(),
+            window_seconds=float(os.getenv("LLM_BUDGET_WINDOW_SECONDS", "86400")),
+            degrade_at=float(os.getenv("LLM_BUDGET_DEGRADE_AT", "0.8"))
+        )
+        if _budget_manager.enabled:
+            logger.info("💸 BudgetManager initialized with LLM budgets")
+    return _budget_manager
+
+
+def set_budget_manager(manager: Optional[BudgetManager]):
+    """Replace the global budget manager (None = rebuild from environment)."""
+    global _budget_manager
+    _budget_manager = manager
@@ -3,6 +3,11 @@
 This module keeps previously generated artefacts (plans, test scaffolds,
 documentation templates, etc) so we can reuse them instead of calling the LLM
 again for the same task and prompt type.
+
+Content is stored once in the shared blob store (utils.blob_store) under the
+manifest cache/<prompt_type>/<cache_id>; the cache file itself is a
+read-only hardlink to that blob, so identical artefacts cached for several
+tasks share their bytes.
 """
 
 from __future__ import annotations
@@ -13,6 +18,7 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 from config import GENERATED_CODE_ROOT
+from utils.blob_store import get_blob_store
 
 CACHE_ROOT = GENERATED_CODE_ROOT / "cache"
 
@@ -45,6 +51,10 @@ def cache_file_path(task_id: Optional[str], prompt_type: str, extension: str = "
     return _prompt_cache_dir(prompt_type) / f"{cache_id}.{suffix}"
 
 
+def _manifest_name(task_id: Optional[str], prompt_type: str) -> str:
+    return f"cache/{_normalise(prompt_type)}/{compute_cache_key(task_id, prompt_type)}"
+
+
 def metadata_file_path(task_id: Optional[str], prompt_type: str) -> Path:
     cache_id = compute_cache_key(task_id, prompt_type)
     return _prompt_cache_dir(prompt_type) / f"{cache_id}.meta.json"
@@ -80,7 +90,10 @@ def save_cached_content(
 ) -> None:
     """Persist content and optional metadata for later reuse."""
     cache_path = cache_file_path(task_id, prompt_type, extension)
-    cache_path.write_text(content, encoding="utf-8")
+    blob_store = get_blob_store()
+    content_hash = blob_store.put(content)
+    blob_store.write_manifest(_manifest_name(task_id, prompt_type), {cache_path.name: content_hash})
+    blob_store.materialize_file(content_hash, cache_path, mode="hardlink")
 
     if metadata:
         meta_path = metadata_file_path(task_id, prompt_type)
@@ -90,8 +103,8 @@ def save_cached_content(
 def delete_cached_content(task_id: Optional[str], prompt_type: str) -> None:
     """Delete all cached artefacts for a given (task_id, prompt_type) pair.
 
-    This removes both the content file and associated metadata file if present.
-    Silently ignores missing files.
+    This removes both the content file and associated metadata file if present,
+    and releases the stored blob. Silently ignores missing files.
     """
     cache_id = compute_cache_key(task_id, prompt_type)
     directory = _prompt_cache_dir(prompt_type)
@@ -101,3 +114,4 @@ def delete_cached_content(task_id: Optional[str], prompt_type: str) -> None:
         except Exception:
             # Best-effort deletion; ignore any filesystem race conditions
             pass
+    get_blob_store().delete_manifest(_manifest_name(task_id, prompt_type))
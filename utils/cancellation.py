@@ -0,0 +1,271 @@
+"""
+Cancellation scopes for plans, tasks and client connections.
+
+This module provides:
+- CancellationRegistry: Maps scope keys (plan/task/connection IDs) to the
+  asyncio tasks doing work for them, and cancels that work on demand
+  (emergency stop, pause, client disconnect)
+- cancel_scope: Register the current task under scope keys
+- run: Run a coroutine as a cancellable child task, so cancelling a scope
+  tears down the work without killing the long-lived worker awaiting it
+- scopes_for_task: Derive scope keys from a pipeline QueueTask
+
+Cancelling a task propagates through awaits into LLMClient (coalesced calls
+and stream fan-outs are cancelled once their last consumer goes away, which
+closes the underlying Gemini stream) and into QA subprocesses (killed).
+"""
+
+import uuid
+import asyncio
+import logging
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterable, Iterator, Optional, Set, Tuple, TypeVar
+
+from utils.metrics_registry import counter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Scope kinds
+PLAN = "plan"
+TASK = "task"
+CONNECTION = "connection"
+
+ScopeKey = Tuple[str, str]
+
+SCOPE_CANCELLATIONS = counter(
+    "cancellation_scope_tasks_total", "Tasks cancelled through a cancellation scope", ("kind",)
+)
+
+# Scopes of the current work; inherited by tasks created within it
+_scopes: contextvars.ContextVar[Tuple[ScopeKey, ...]] = contextvars.ContextVar(
+    "cancel_scopes", default=()
+)
+
+
+def _with_inherited(keys: Iterable[ScopeKey]) -> Tuple[ScopeKey, ...]:
+    inherited = _scopes.get()
+    return inherited + tuple(key for key in keys if key not in inherited)
+
+
+class ScopeCancelledError(Exception):
+    """Raised by run() when the work was cancelled through one of its scopes."""
+    pass
+
+
+class CancellationRegistry:
+    """
+    Registry of in-flight work per scope.
+
+    Cancelled scopes are remembered (bounded) so work queued for a stopped
+    plan or a closed connection is skipped instead of started.
+    """
+
+    def __init__(self, max_cancelled: int = 1024):
+        """
+        Initialize registry.
+
+        Args:
+            max_cancelled: Number of cancelled scopes remembered
+        """
+        self.max_cancelled = max_cancelled
+        self._tasks: Dict[ScopeKey, Set[asyncio.Task]] = {}
+        self._cancelled: "OrderedDict[ScopeKey, str]" = OrderedDict()
+        self.total_cancelled = 0
+
+    def register(self, task: asyncio.Task, keys: Iterable[ScopeKey], until_done: bool = True):
+        """
+        Associate a task with scope keys.
+
+        Args:
+            task: Task doing work for the scopes
+            keys: Scope keys
+            until_done: Unregister automatically when the task finishes
+        """
+        keys = list(keys)
+        for key in keys:
+            self._tasks.setdefault(key, set()).add(task)
+        if until_done:
+            task.add_done_callback(lambda finished: self.unregister(finished, keys))
+
+    def unregister(self, task: asyncio.Task, keys: Iterable[ScopeKey]):
+        """Remove a task from scope keys."""
+        for key in keys:
+            tasks = self._tasks.get(key)
+            if tasks is not None:
+                tasks.discard(task)
+                if not tasks:
+                    del self._tasks[key]
+
+    def is_cancelled(self, keys: Iterable[ScopeKey]) -> Optional[str]:
+        """Cancellation reason if any of the scopes was cancelled, else None."""
+        for key in keys:
+            if key in self._cancelled:
+                return self._cancelled[key]
+        return None
+
+    def cancel(self, kind: str, scope_id: Optional[str], reason: str = "cancelled",
+               remember: bool = True) -> int:
+        """
+        Cancel all work registered under a scope.
+
+        Args:
+            kind: Scope kind (PLAN, TASK or CONNECTION)
+            scope_id: Scope identifier
+            reason: Reason passed to the cancelled tasks
+            remember: Skip work started for this scope later
+
+        Returns:
+            Number of tasks cancelled
+        """
+        if not scope_id:
+            return 0
+        key = (kind, str(scope_id))
+        if remember:
+            self._cancelled[key] = reason
+            self._cancelled.move_to_end(key)
+            while len(self._cancelled) > self.max_cancelled:
+                self._cancelled.popitem(last=False)
+
+        tasks = [task for task in self._tasks.get(key, ()) if not task.done()]
+        for task in tasks:
+            task.cancel(reason)
+        if tasks:
+            self.total_cancelled += len(tasks)
+            SCOPE_CANCELLATIONS.labels(kind).inc(len(tasks))
+            logger.info(f"🛑 Cancelled {len(tasks)} task(s) for {kind} {scope_id}: {reason}")
+        return len(tasks)
+
+    async def cancel_and_wait(self, kind: str, scope_id: Optional[str], reason: str = "cancelled",
+                              timeout: float = 1.0, remember: bool = True) -> int:
+        """Cancel a scope and wait (up to timeout) for its tasks to finish tearing down."""
+        tasks = [task for task in self._tasks.get((kind, str(scope_id)), ()) if not task.done()]
+        count = self.cancel(kind, scope_id, reason, remember)
+        current = asyncio.current_task()
+        tasks = [task for task in tasks if task is not current]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        return count
+
+    def forget(self, kind: str, scope_id: Optional[str]):
+        """Allow new work for a previously cancelled scope (e.g. a restarted plan)."""
+        self._cancelled.pop((kind, str(scope_id)), None)
+
+    def active(self, kind: str, scope_id: str) -> int:
+        """Number of running tasks registered under a scope."""
+        return len(self._tasks.get((kind, str(scope_id)), ()))
+
+    async def run(self, coro: Awaitable[T], keys: Iterable[ScopeKey]) -> T:
+        """
+        Run a coroutine as a child task registered under scope keys
+        (plus the scopes inherited from the caller).
+
+        Raises:
+            ScopeCancelledError: If the child was cancelled through a scope
+            asyncio.CancelledError: If the caller itself was cancelled
+        """
+        keys = _with_inherited(keys)
+        token = _scopes.set(keys)
+        try:
+            child = asyncio.ensure_future(coro)
+        finally:
+            _scopes.reset(token)
+        self.register(child, keys)
+        try:
+            return await child
+        except asyncio.CancelledError as e:
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                raise
+            reason = e.args[0] if e.args else self.is_cancelled(keys) or "cancelled"
+            raise ScopeCancelledError(reason) from None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics."""
+        return {
+            "active_scopes": len(self._tasks),
+            "active_tasks": len({task for tasks in self._tasks.values() for task in tasks}),
+            "cancelled_scopes": len(self._cancelled),
+            "total_cancelled": self.total_cancelled
+        }
+
+
+_registry: Optional[CancellationRegistry] = None
+
+
+def get_cancellation_registry() -> CancellationRegistry:
+    """Get or create the global cancellation registry."""
+    global _registry
+    if _registry is None:
+        _registry = CancellationRegistry()
+    return _registry
+
+
+def scope_keys(plan: Optional[str] = None, task: Optional[str] = None,
+               connection: Optional[str] = None) -> Tuple[ScopeKey, ...]:
+    """Scope keys for the given IDs (None values are skipped)."""
+    return tuple(
+        (kind, str(value))
+        for kind, value in ((PLAN, plan), (TASK, task), (CONNECTION, connection))
+        if value
+    )
+
+
+@contextmanager
+def cancel_scope(plan: Optional[str] = None, task: Optional[str] = None,
+                 connection: Optional[str] = None) -> Iterator[Tuple[ScopeKey, ...]]:
+    """
+    Register the current asyncio task under scope keys (plus inherited
+    scopes) for the block; tasks created inside inherit them.
+
+    Only use this in tasks dedicated to the work; long-lived loops should
+    use CancellationRegistry.run() so cancelling the scope spares them.
+    """
+    registry = get_cancellation_registry()
+    keys = _with_inherited(scope_keys(plan, task, connection))
+    current = asyncio.current_task()
+    token = _scopes.set(keys)
+    if current is not None:
+        registry.register(current, keys, until_done=False)
+    try:
+        yield keys
+    finally:
+        if current is not None:
+            registry.unregister(current, keys)
+        _scopes.reset(token)
+
+
+def current_scopes() -> Tuple[ScopeKey, ...]:
+    """Scope keys of the current work (including inherited ones)."""
+    return _scopes.get()
+
+
+def connection_id(websocket: Any) -> Optional[str]:
+    """Stable ID for a client connection (assigned on first use)."""
+    if websocket is None:
+        return None
+    conn_id = getattr(websocket, "_connection_id", None)
+    if conn_id is None:
+        conn_id = uuid.uuid4().hex[:12]
+        try:
+            setattr(websocket, "_connection_id", conn_id)
+        except AttributeError:
+            return None
+    return conn_id
+
+
+def scopes_for_task(task: Any) -> Tuple[ScopeKey, ...]:
+    """
+    Scope keys of a pipeline QueueTask: its plan, its task and the client
+    connection that submitted it.
+    """
+    payload = task.payload if isinstance(task.payload, dict) else {}
+    plan = payload.get("plan")
+    plan_id = payload.get("plan_id") or (
+        (plan.get("id") or plan.get("plan_id")) if isinstance(plan, dict) else None
+    )
+    task_id = getattr(payload.get("subtask"), "id", None) or task.task_id
+    return scope_keys(plan_id, task_id, connection_id(payload.get("websocket")))
@@ -17,8 +17,21 @@ from typing import Optional, Callable, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
+from utils.metrics_registry import counter, gauge
+
 logger = logging.getLogger(__name__)
 
+# Scrapeable breaker metrics (labelled by breaker name)
+BREAKER_STATE = gauge(
+    "circuit_breaker_state", "Breaker state (0=closed, 1=half_open, 2=open)", ("breaker",)
+)
+BREAKER_CALLS = counter(
+    "circuit_breaker_calls_total", "Calls through the breaker by outcome", ("breaker", "outcome")
+)
+BREAKER_TRANSITIONS = counter(
+    "circuit_breaker_transitions_total", "State transitions by target state", ("breaker", "state")
+)
+
 
 class CircuitState(Enum):
     """Circuit breaker states."""
@@ -27,6 +40,14 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"    # Testing recovery
 
 
+# Numeric encoding of CircuitState for the state gauge
+STATE_VALUES = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2
+}
+
+
 @dataclass
 class CircuitBreakerConfig:
     """Configuration for circuit breaker."""
@@ -84,6 +105,14 @@ class CircuitBreaker:
         self.on_close_callbacks: list[Callable] = []
         self.on_half_open_callbacks: list[Callable] = []
         
+        # Registry series for this breaker
+        self._state_metric = BREAKER_STATE.labels(name)
+        self._call_metrics = {
+            outcome: BREAKER_CALLS.labels(name, outcome)
+            for outcome in ("success", "failure", "rejected")
+        }
+        self._publish_state()
+        
         logger.info(
             f"🔌 CircuitBreaker '{name}': Initialized "
             f"(failure_threshold={self.config.failure_threshold}, "
@@ -112,6 +141,7 @@ class CircuitBreaker:
             if self._should_attempt_reset():
                 await self._transition_to_half_open()
             else:
+                self._call_metrics["rejected"].inc()
                 raise CircuitBreakerOpenError(
                     f"Circuit breaker '{self.name}' is OPEN"
                 )
@@ -138,9 +168,14 @@ class CircuitBreaker:
         elapsed = datetime.now() - self.last_state_change
         return elapsed.total_seconds() >= self.config.timeout_seconds
     
+    def _publish_state(self):
+        """Publish the current state to the metrics registry."""
+        self._state_metric.set(STATE_VALUES[self.state])
+    
     async def _record_success(self):
         """Record successful request."""
         self.total_successes += 1
+        self._call_metrics["success"].inc()
         self.consecutive_successes += 1
         self.consecutive_failures = 0
         
@@ -162,6 +197,7 @@ class CircuitBreaker:
     async def _record_failure(self):
         """Record failed request."""
         self.total_failures += 1
+        self._call_metrics["failure"].inc()
         self.consecutive_failures += 1
         self.consecutive_successes = 0
         
@@ -219,6 +255,8 @@ class CircuitBreaker:
         self.state = CircuitState.OPEN
         self.last_state_change = datetime.now()
         self.times_opened += 1
+        self._publish_state()
+        BREAKER_TRANSITIONS.labels(self.name, "open").inc()
         
         logger.error(
             f"🔴 CircuitBreaker '{self.name}': {old_state.value} → OPEN "
@@ -246,6 +284,8 @@ class CircuitBreaker:
         self.consecutive_successes = 0
         self.consecutive_failures = 0
         self.times_half_opened += 1
+        self._publish_state()
+        BREAKER_TRANSITIONS.labels(self.name, "half_open").inc()
         
         logger.warning(
             f"🟡 CircuitBreaker '{self.name}': OPEN → HALF_OPEN "
@@ -270,6 +310,8 @@ class CircuitBreaker:
         old_state = self.state
         self.state = CircuitState.CLOSED
         self.last_state_change = datetime.now()
+        self._publish_state()
+        BREAKER_TRANSITIONS.labels(self.name, "closed").inc()
         
         logger.info(
             f"🟢 CircuitBreaker '{self.name}': {old_state.value} → CLOSED "
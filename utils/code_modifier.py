@@ -7,7 +7,8 @@ This module provides safe code modification capabilities with:
 - Safe application of changes
 - Syntax validation
 - Diff generation
-- Rollback capability
+- Rollback capability (multi-file changes are versioned as codebase
+  snapshots, see utils.codebase_versions)
 """
 
 import os
@@ -15,17 +16,20 @@ import ast
 import json
 import logging
 import difflib
-from typing import Dict, List, Optional, Any, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 from enum import Enum
 
-# LangGraph imports
-from langgraph.graph import StateGraph, END
 from typing_extensions import TypedDict
 
+if TYPE_CHECKING:
+    # LangGraph is imported when the workflow is first needed (slow to import)
+    from langgraph.graph import StateGraph
+
 from utils.llm_setup import ask_llm, LLMError
+from utils.codebase_versions import CodebaseHistory, CodebaseSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -127,11 +131,20 @@ class CodeModifier:
             model: LLM model to use for code analysis and modification
         """
         self.model = model
-        self.workflow = self._build_workflow()
+        self._workflow = None
         logger.info(f"CodeModifier initialized with model: {model}")
     
-    def _build_workflow(self) -> StateGraph:
+    @property
+    def workflow(self):
+        """Compiled LangGraph workflow (built on first use)."""
+        if self._workflow is None:
+            self._workflow = self._build_workflow()
+        return self._workflow
+    
+    def _build_workflow(self) -> "StateGraph":
         """Build the LangGraph workflow for code modification."""
+        from langgraph.graph import StateGraph, END
+        
         workflow = StateGraph(WorkflowState)
         
         # Add nodes for each state
@@ -247,6 +260,76 @@ class CodeModifier:
                 metadata={"error": str(e)}
             )
     
+    async def modify_files(
+        self,
+        history: CodebaseHistory,
+        modification_requests: Dict[str, str],
+        message: str = ""
+    ) -> ModificationResult:
+        """
+        Modify several files of a versioned codebase as one change.
+        
+        Each file is modified against the history's head. The changes are
+        committed as a single new version only if every file succeeds, so a
+        failed run leaves the history untouched; a committed run can be
+        undone with `rollback`.
+        
+        Args:
+            history: Versioned codebase to modify
+            modification_requests: file path -> description of desired changes
+            message: Description of the new version
+            
+        Returns:
+            ModificationResult; metadata holds base_version and version
+        """
+        base = history.head
+        results = {
+            file_path: await self.modify_code(file_path, history.read(file_path), request)
+            for file_path, request in modification_requests.items()
+        }
+        
+        errors = [
+            f"{file_path}: {error}"
+            for file_path, result in results.items() if not result.success
+            for error in (result.validation_errors or [result.metadata.get("error", "Unknown error")])
+        ]
+        if errors:
+            return ModificationResult(
+                success=False,
+                modified_files={},
+                diff="",
+                validation_errors=errors,
+                rollback_available=False,
+                metadata={"base_version": base.version}
+            )
+        
+        modified_files = {
+            file_path: result.modified_files[file_path] for file_path, result in results.items()
+        }
+        snapshot = history.commit(modified_files, message or "; ".join(modification_requests.values()))
+        return ModificationResult(
+            success=True,
+            modified_files=modified_files,
+            diff=history.store.unified_diff(base.root, snapshot.root),
+            rollback_available=True,
+            metadata={
+                "base_version": base.version,
+                "version": snapshot.version,
+                "timestamp": datetime.now().isoformat()
+            }
+        )
+    
+    def rollback(self, history: CodebaseHistory, result: ModificationResult) -> CodebaseSnapshot:
+        """
+        Undo a successful `modify_files` run by recording its base version as the new head.
+        
+        Raises:
+            ValueError: If the result has nothing to roll back
+        """
+        if not result.success or "version" not in result.metadata:
+            raise ValueError("Modification result has no committed version to roll back")
+        return history.rollback(result.metadata["base_version"])
+    
     async def _parse_code(self, state: WorkflowState) -> WorkflowState:
         """Parse existing code to understand its structure."""
         logger.info("Parsing code structure...")
@@ -0,0 +1,462 @@
+"""
+Versioned codebase snapshots with structural sharing.
+
+A snapshot is the root of a Merkle tree: each directory is a tree object
+({name: [kind, hash]}) and each file is a blob, all stored by SHA-256 in an
+object store (the BlobStore from utils.blob_store, or memory). Changing
+files rewrites only the trees along the changed paths; every other subtree
+is shared with the parent snapshot. As a result:
+
+- A new version costs O(changed files x depth) to create and store
+- Two versions are diffed by descending only into subtrees whose hashes
+  differ, so the diff is O(changed files x depth) too
+- "State at version N" is just N's root hash; files are read on demand
+- Rolling back records an old root as a new version
+
+SnapshotStore works on root hashes; CodebaseHistory keeps a numbered list
+of versions on top of it.
+"""
+
+import json
+import difflib
+import logging
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from utils.blob_store import blob_hash
+
+logger = logging.getLogger(__name__)
+
+TREE = "tree"
+BLOB = "blob"
+TREE_CACHE_SIZE = 4096
+
+EMPTY_TREE = "{}"
+EMPTY_ROOT = blob_hash(EMPTY_TREE)
+
+
+def snapshot_manifest_prefix(project_id: str) -> str:
+    """Blob store manifest prefix holding the references of a project's snapshots."""
+    return f"snapshots/{project_id}"
+
+
+def _split(path: str) -> Tuple[str, ...]:
+    parts = tuple(path.split("/"))
+    if not path or any(part in ("", ".", "..") for part in parts):
+        raise ValueError(f"Invalid codebase path: {path!r}")
+    return parts
+
+
+def _encode_tree(entries: Mapping[str, List[str]]) -> str:
+    return json.dumps(entries, sort_keys=True, separators=(",", ":"))
+
+
+class MemoryObjectStore:
+    """In-process object store with the BlobStore read/write interface."""
+
+    def __init__(self):
+        self._objects: Dict[str, bytes] = {}
+
+    def put(self, content) -> str:
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        content_hash = blob_hash(data)
+        self._objects.setdefault(content_hash, data)
+        return content_hash
+
+    def exists(self, content_hash: str) -> bool:
+        return content_hash in self._objects
+
+    def get(self, content_hash: str) -> bytes:
+        return self._objects[content_hash]
+
+    def get_text(self, content_hash: str) -> str:
+        return self.get(content_hash).decode("utf-8")
+
+
+@dataclass(frozen=True)
+class FileChange:
+    """One file that differs between two snapshots (hashes are None when absent)."""
+    path: str
+    old_hash: Optional[str]
+    new_hash: Optional[str]
+
+    @property
+    def kind(self) -> str:
+        if self.old_hash is None:
+            return "added"
+        if self.new_hash is None:
+            return "deleted"
+        return "modified"
+
+
+@dataclass(frozen=True)
+class SnapshotUpdate:
+    """Result of writing a snapshot: its root and the objects it references anew."""
+    root: str
+    objects: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class CodebaseSnapshot:
+    """One version of a codebase (a root hash plus a few fields of metadata)."""
+    version: int
+    root: str
+    parent: Optional[int]
+    message: str = ""
+    changed: Tuple[str, ...] = ()
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class SnapshotStore:
+    """
+    Persistent Merkle trees of codebases, addressed by root hash.
+
+    Trees are immutable once written, so they are cached by hash and shared
+    freely between snapshots.
+    """
+
+    def __init__(self, objects=None):
+        """
+        Initialize snapshot store.
+
+        Args:
+            objects: Object store with put/get/get_text/exists (a BlobStore;
+                     defaults to an in-memory store)
+        """
+        self.objects = objects if objects is not None else MemoryObjectStore()
+        self._trees: "OrderedDict[str, Dict[str, List[str]]]" = OrderedDict()
+
+    # ========================================================================
+    # Tree Objects
+    # ========================================================================
+
+    def _tree(self, digest: str) -> Dict[str, List[str]]:
+        entries = self._trees.get(digest)
+        if entries is None:
+            try:
+                entries = {} if digest == EMPTY_ROOT else json.loads(self.objects.get_text(digest))
+            except KeyError:
+                # e.g. recorded by a host whose blob store this one does not share
+                raise KeyError(f"Snapshot tree {digest} is not in the object store") from None
+            self._trees[digest] = entries
+            if len(self._trees) > TREE_CACHE_SIZE:
+                self._trees.popitem(last=False)
+        else:
+            self._trees.move_to_end(digest)
+        return entries
+
+    def _put_tree(self, entries: Dict[str, List[str]], written: Optional[List[str]]) -> str:
+        encoded = _encode_tree(entries)
+        if written is None:
+            return blob_hash(encoded)
+        digest = self.objects.put(encoded)
+        self._trees[digest] = entries
+        written.append(digest)
+        return digest
+
+    def _build(self, file_hashes: Mapping[str, str], written: Optional[List[str]]) -> str:
+        nested: Dict = {}
+        for path, content_hash in file_hashes.items():
+            *dirs, name = _split(path)
+            node = nested
+            for part in dirs:
+                node = node.setdefault(part, {})
+                if not isinstance(node, dict):
+                    raise ValueError(f"Path is both a file and a directory: {path}")
+            if isinstance(node.get(name), dict):
+                raise ValueError(f"Path is both a file and a directory: {path}")
+            node[name] = content_hash
+
+        def write(node: Dict) -> str:
+            entries = {
+                name: [TREE, write(child)] if isinstance(child, dict) else [BLOB, child]
+                for name, child in node.items()
+            }
+            return self._put_tree(entries, written)
+
+        return write(nested)
+
+    # ========================================================================
+    # Writing Snapshots
+    # ========================================================================
+
+    def root_of(self, file_hashes: Mapping[str, str]) -> str:
+        """Root hash of a codebase given as path -> content hash (nothing is written)."""
+        return self._build(file_hashes, written=None)
+
+    def write_tree(self, file_hashes: Mapping[str, str]) -> SnapshotUpdate:
+        """
+        Write the trees of a codebase whose file bodies are already stored.
+
+        Args:
+            file_hashes: path -> content hash
+
+        Returns:
+            SnapshotUpdate listing every tree and file of the snapshot
+        """
+        written: List[str] = []
+        root = self._build(file_hashes, written)
+        return SnapshotUpdate(root, tuple(written) + tuple(file_hashes.values()))
+
+    def update(self, root: str, changes: Mapping[str, Optional[str]]) -> SnapshotUpdate:
+        """
+        Derive a snapshot from root by changing a few files.
+
+        Only the trees on the changed paths are written; all other subtrees
+        are shared with root.
+
+        Args:
+            root: Root hash of the parent snapshot
+            changes: path -> new content, or None to delete the file
+
+        Returns:
+            SnapshotUpdate with the new root and the objects written for it
+        """
+        written: List[str] = []
+        by_parts: Dict[Tuple[str, ...], Optional[str]] = {}
+        for path, content in changes.items():
+            if content is None:
+                by_parts[_split(path)] = None
+            else:
+                content_hash = self.objects.put(content)
+                written.append(content_hash)
+                by_parts[_split(path)] = content_hash
+
+        new_root = self._apply(root, by_parts, written) or self._put_tree({}, written)
+        return SnapshotUpdate(new_root, tuple(written))
+
+    def _apply(
+        self,
+        digest: Optional[str],
+        changes: Dict[Tuple[str, ...], Optional[str]],
+        written: List[str]
+    ) -> Optional[str]:
+        """
+        Rewrite one tree; returns None when it ends up empty.
+
+        Deletions apply first, then subtrees, then added files, so a file
+        can replace a directory emptied by the same changes (and the other
+        way round).
+
+        Raises:
+            ValueError: If a name would be both a file and a directory
+        """
+        entries = dict(self._tree(digest)) if digest else {}
+        nested: Dict[str, Dict[Tuple[str, ...], Optional[str]]] = defaultdict(dict)
+        added: Dict[str, str] = {}
+        for parts, content_hash in changes.items():
+            if len(parts) > 1:
+                nested[parts[0]][parts[1:]] = content_hash
+            elif content_hash is None:
+                if entries.get(parts[0], [None])[0] == BLOB:
+                    del entries[parts[0]]
+            else:
+                added[parts[0]] = content_hash
+
+        for name, child_changes in nested.items():
+            current = entries.get(name)
+            if current and current[0] == BLOB:
+                raise ValueError(f"Path is both a file and a directory: {name}")
+            new_child = self._apply(current[1] if current else None, child_changes, written)
+            if new_child is None:
+                entries.pop(name, None)
+            else:
+                entries[name] = [TREE, new_child]
+
+        for name, content_hash in added.items():
+            if entries.get(name, [None])[0] == TREE:
+                raise ValueError(f"Path is both a file and a directory: {name}")
+            entries[name] = [BLOB, content_hash]
+
+        if not entries:
+            return None
+        if digest and entries == self._tree(digest):
+            return digest
+        return self._put_tree(entries, written)
+
+    # ========================================================================
+    # Reading Snapshots
+    # ========================================================================
+
+    def lookup(self, root: str, path: str) -> Optional[str]:
+        """Content hash of one file in a snapshot, or None if it is absent."""
+        digest = root
+        *dirs, name = _split(path)
+        for part in dirs:
+            entry = self._tree(digest).get(part)
+            if not entry or entry[0] != TREE:
+                return None
+            digest = entry[1]
+        entry = self._tree(digest).get(name)
+        return entry[1] if entry and entry[0] == BLOB else None
+
+    def read(self, root: str, path: str) -> str:
+        """
+        Read one file of a snapshot.
+
+        Raises:
+            KeyError: If the file is not in the snapshot
+        """
+        content_hash = self.lookup(root, path)
+        if content_hash is None:
+            raise KeyError(path)
+        return self.objects.get_text(content_hash)
+
+    def iter_files(self, root: str, prefix: str = "") -> Iterator[Tuple[str, str]]:
+        """Yield (path, content hash) for every file of a snapshot."""
+        for name, (kind, digest) in sorted(self._tree(root).items()):
+            if kind == TREE:
+                yield from self.iter_files(digest, f"{prefix}{name}/")
+            else:
+                yield f"{prefix}{name}", digest
+
+    def file_hashes(self, root: str) -> Dict[str, str]:
+        """path -> content hash for every file of a snapshot."""
+        return dict(self.iter_files(root))
+
+    def files(self, root: str) -> Dict[str, str]:
+        """path -> content for every file of a snapshot."""
+        return {path: self.objects.get_text(content_hash) for path, content_hash in self.iter_files(root)}
+
+    # ========================================================================
+    # Comparing Snapshots
+    # ========================================================================
+
+    def diff(self, old_root: str, new_root: str) -> List[FileChange]:
+        """Files that differ between two snapshots, skipping identical subtrees."""
+        changes: List[FileChange] = []
+        self._diff(old_root, new_root, "", changes)
+        return changes
+
+    def _diff(self, old: Optional[str], new: Optional[str], prefix: str, changes: List[FileChange]) -> None:
+        if old == new:
+            return
+        old_entries = self._tree(old) if old else {}
+        new_entries = self._tree(new) if new else {}
+        for name in sorted(old_entries.keys() | new_entries.keys()):
+            old_entry, new_entry = old_entries.get(name), new_entries.get(name)
+            if old_entry == new_entry:
+                continue
+            path = f"{prefix}{name}"
+            old_tree = old_entry[1] if old_entry and old_entry[0] == TREE else None
+            new_tree = new_entry[1] if new_entry and new_entry[0] == TREE else None
+            if old_tree or new_tree:
+                self._diff(old_tree, new_tree, f"{path}/", changes)
+            old_blob = old_entry[1] if old_entry and old_entry[0] == BLOB else None
+            new_blob = new_entry[1] if new_entry and new_entry[0] == BLOB else None
+            if old_blob != new_blob:
+                changes.append(FileChange(path, old_blob, new_blob))
+
+    def changes_between(self, old_root: str, new_root: str) -> Dict[str, Optional[str]]:
+        """The update (path -> content or None) that turns old_root into new_root."""
+        return {
+            change.path: None if change.new_hash is None else self.objects.get_text(change.new_hash)
+            for change in self.diff(old_root, new_root)
+        }
+
+    def unified_diff(self, old_root: str, new_root: str) -> str:
+        """Unified diff of every changed file between two snapshots."""
+        chunks = []
+        for change in self.diff(old_root, new_root):
+            old_text = self.objects.get_text(change.old_hash) if change.old_hash else ""
+            new_text = self.objects.get_text(change.new_hash) if change.new_hash else ""
+            chunks.extend(difflib.unified_diff(
+                old_text.splitlines(keepends=True),
+                new_text.splitlines(keepends=True),
+                fromfile=f"a/{change.path}" if change.old_hash else "/dev/null",
+                tofile=f"b/{change.path}" if change.new_hash else "/dev/null"
+            ))
+        return "".join(chunks)
+
+
+class CodebaseHistory:
+    """
+    Numbered versions of one codebase, each a snapshot sharing structure with its parent.
+
+    Version 0 is the initial codebase. Every commit and rollback appends a
+    version; old versions are never modified.
+    """
+
+    def __init__(
+        self,
+        files: Optional[Mapping[str, str]] = None,
+        store: Optional[SnapshotStore] = None,
+        message: str = "Initial version"
+    ):
+        """
+        Initialize history with version 0.
+
+        Args:
+            files: Initial codebase (path -> content)
+            store: Snapshot store (defaults to an in-memory one)
+            message: Description of version 0
+        """
+        self.store = store or SnapshotStore()
+        initial = self.store.update(EMPTY_ROOT, dict(files or {}))
+        self._versions: List[CodebaseSnapshot] = [
+            CodebaseSnapshot(version=0, root=initial.root, parent=None, message=message, changed=tuple(files or ()))
+        ]
+
+    def __len__(self) -> int:
+        return len(self._versions)
+
+    def __iter__(self) -> Iterator[CodebaseSnapshot]:
+        return iter(list(self._versions))
+
+    def __getitem__(self, version: int) -> CodebaseSnapshot:
+        return self._versions[version]
+
+    @property
+    def head(self) -> CodebaseSnapshot:
+        """The latest version."""
+        return self._versions[-1]
+
+    def _append(self, root: str, message: str, changed: Tuple[str, ...]) -> CodebaseSnapshot:
+        snapshot = CodebaseSnapshot(
+            version=len(self._versions), root=root, parent=self.head.version, message=message, changed=changed
+        )
+        self._versions.append(snapshot)
+        return snapshot
+
+    def commit(self, changes: Mapping[str, Optional[str]], message: str = "") -> CodebaseSnapshot:
+        """
+        Record a new version with some files changed.
+
+        Args:
+            changes: path -> new content, or None to delete the file
+            message: Description of the change
+
+        Returns:
+            The new head
+        """
+        update = self.store.update(self.head.root, changes)
+        changed = tuple(change.path for change in self.store.diff(self.head.root, update.root))
+        return self._append(update.root, message, changed)
+
+    def rollback(self, version: int, message: Optional[str] = None) -> CodebaseSnapshot:
+        """
+        Record a new version whose content is that of an earlier one.
+
+        Returns:
+            The new head
+        """
+        target = self._versions[version]
+        changed = tuple(change.path for change in self.store.diff(self.head.root, target.root))
+        return self._append(target.root, message or f"Rolled back to version {target.version}", changed)
+
+    def diff(self, old_version: int, new_version: Optional[int] = None) -> List[FileChange]:
+        """Files changed between two versions (new_version defaults to head)."""
+        new = self.head if new_version is None else self._versions[new_version]
+        return self.store.diff(self._versions[old_version].root, new.root)
+
+    def read(self, path: str, version: Optional[int] = None) -> str:
+        """One file at a version (defaults to head)."""
+        snapshot = self.head if version is None else self._versions[version]
+        return self.store.read(snapshot.root, path)
+
+    def files(self, version: Optional[int] = None) -> Dict[str, str]:
+        """The whole codebase at a version (defaults to head)."""
+        snapshot = self.head if version is None else self._versions[version]
+        return self.store.files(snapshot.root)
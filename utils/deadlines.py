@@ -0,0 +1,115 @@
+"""
+Per-call deadlines propagated through ContextVars.
+
+This module provides:
+- deadline_scope: Bound all work in a block (including created tasks) by a
+  timeout; nested scopes can only shorten the effective deadline
+- with_deadline: Decorator applying a deadline scope to a coroutine
+- remaining/expired: Query the time left, used by LLMClient to cap
+  attempts and retry backoff
+
+Deadlines are absolute time.monotonic() values, so they are unaffected by
+wall-clock changes.
+"""
+
+import time
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Union
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "deadline", default=None
+)
+
+
+@contextmanager
+def deadline_scope(timeout: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Run a block under a deadline of `timeout` seconds from now.
+
+    Args:
+        timeout: Seconds until the deadline (None = inherit current deadline)
+
+    Yields:
+        Effective absolute deadline (monotonic), or None if unbounded
+    """
+    current = _deadline.get()
+    if timeout is None:
+        effective = current
+    else:
+        candidate = time.monotonic() + max(0.0, timeout)
+        effective = candidate if current is None else min(current, candidate)
+
+    token = _deadline.set(effective)
+    try:
+        yield effective
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """Current absolute deadline (monotonic), or None if unbounded."""
+    return _deadline.get()
+
+
+def remaining(timeout: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds left before the effective deadline.
+
+    Args:
+        timeout: Optional per-call timeout combined with the ambient deadline
+
+    Returns:
+        Seconds remaining (may be <= 0), or None if unbounded
+    """
+    candidates = []
+    deadline = _deadline.get()
+    if deadline is not None:
+        candidates.append(deadline - time.monotonic())
+    if timeout is not None:
+        candidates.append(timeout)
+    return min(candidates) if candidates else None
+
+
+def resolve_deadline(timeout: Optional[float] = None) -> Optional[float]:
+    """
+    Absolute deadline (monotonic) for a call: the ambient deadline combined
+    with an optional per-call timeout.
+
+    Use this where a scope cannot be held, e.g. across async generator yields.
+    """
+    left = remaining(timeout)
+    return None if left is None else time.monotonic() + left
+
+
+def time_left(deadline_at: Optional[float]) -> Optional[float]:
+    """Seconds until an absolute deadline (None if unbounded)."""
+    return None if deadline_at is None else deadline_at - time.monotonic()
+
+
+def expired() -> bool:
+    """True if the ambient deadline has passed."""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def with_deadline(timeout: Union[float, Callable[..., Optional[float]], None]):
+    """
+    Decorator running a coroutine inside a deadline scope.
+
+    Args:
+        timeout: Seconds, or a callable receiving the call arguments and
+                 returning seconds (None = no additional bound)
+
+    Returns:
+        Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            seconds = timeout(*args, **kwargs) if callable(timeout) else timeout
+            with deadline_scope(seconds):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,121 @@
+"""
+Non-blocking execution of boto3 DynamoDB calls.
+
+boto3 is synchronous and no native async client is a dependency here, so
+the DynamoDB stores run their calls on a dedicated, bounded thread pool
+instead of the event loop. The pool size and the botocore connection pool
+are sized together, so every worker thread gets a pooled HTTP connection
+and concurrent calls (e.g. the metadata get_item and the FILE# query in
+load_context) actually overlap.
+
+Configuration (environment):
+- DYNAMODB_MAX_WORKERS: Worker threads and pooled connections (default: 16)
+- DYNAMODB_CONNECT_TIMEOUT / DYNAMODB_READ_TIMEOUT: Seconds (default: 2 / 10)
+- DYNAMODB_MAX_ATTEMPTS: botocore retry attempts, adaptive mode (default: 5)
+"""
+
+import os
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+import boto3
+from botocore.config import Config
+
+from utils.metrics_registry import gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DYNAMODB_CALL_SECONDS = histogram(
+    "dynamodb_call_duration_seconds", "DynamoDB call duration on the executor (including queueing)"
+)
+DYNAMODB_IN_FLIGHT = gauge("dynamodb_calls_in_flight", "DynamoDB calls submitted and not yet finished")
+
+
+class DynamoDBExecutor:
+    """
+    Bounded thread pool for blocking boto3 calls.
+
+    boto3 clients are thread-safe, and Table actions delegate to the
+    resource's client, so one resource per store is shared by the workers.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 10.0,
+        max_attempts: int = 5
+    ):
+        """
+        Initialize executor.
+
+        Args:
+            max_workers: Worker threads (also the botocore connection pool size)
+            connect_timeout: Connection timeout in seconds
+            read_timeout: Read timeout in seconds
+            max_attempts: botocore retry attempts (adaptive retry mode)
+        """
+        self.max_workers = max_workers
+        self.client_config = Config(
+            max_pool_connections=max_workers,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={"max_attempts": max_attempts, "mode": "adaptive"},
+            tcp_keepalive=True
+        )
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dynamodb")
+        self.in_flight = 0
+
+        logger.info(f"🗄️ DynamoDBExecutor: Initialized (workers: {max_workers})")
+
+    def resource(self, region: str):
+        """Create a DynamoDB resource whose connection pool matches the executor."""
+        return boto3.resource("dynamodb", region_name=region, config=self.client_config)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call on the pool and await its result.
+
+        Args:
+            fn: Blocking callable (e.g. table.get_item)
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The callable's return value (exceptions propagate)
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.in_flight += 1
+        DYNAMODB_IN_FLIGHT.inc()
+        try:
+            return await loop.run_in_executor(self._pool, functools.partial(fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            DYNAMODB_IN_FLIGHT.dec()
+            DYNAMODB_CALL_SECONDS.observe(loop.time() - start)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads."""
+        self._pool.shutdown(wait=wait)
+
+
+_executor: Optional[DynamoDBExecutor] = None
+
+
+def get_dynamodb_executor() -> DynamoDBExecutor:
+    """Get or create the global DynamoDB executor (configured from DYNAMODB_* env vars)."""
+    global _executor
+    if _executor is None:
+        _executor = DynamoDBExecutor(
+            max_workers=int(os.getenv("DYNAMODB_MAX_WORKERS", "16")),
+            connect_timeout=float(os.getenv("DYNAMODB_CONNECT_TIMEOUT", "2")),
+            read_timeout=float(os.getenv("DYNAMODB_READ_TIMEOUT", "10")),
+            max_attempts=int(os.getenv("DYNAMODB_MAX_ATTEMPTS", "5"))
+        )
+    return _executor
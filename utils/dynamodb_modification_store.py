@@ -3,6 +3,9 @@ DynamoDB adapter for ModificationPlan storage.
 
 Implements single-table design pattern with proper PK/SK structure
 for efficient querying and storage of modification plans.
+
+boto3 calls run on the shared DynamoDB executor (utils.dynamodb_executor),
+never on the event loop.
 """
 
 import logging
@@ -11,13 +14,14 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from decimal import Decimal
 
-import boto3
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 
 from models.modification_plan import (
     ModificationPlan, ModificationStatus, CodeChange
 )
+from utils.dynamodb_executor import get_dynamodb_executor
+from utils.dynamodb_pagination import Page, UnprocessedKeysError, fetch_page, batch_get_items, decode_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -46,8 +50,9 @@ class DynamoDBModificationStore:
         self.table_name = table_name or os.getenv('DYNAMODB_TABLE_NAME', 'agenticai-data')
         self.region = region or os.getenv('AWS_REGION', 'us-east-1')
         
-        # Initialize DynamoDB client
-        self.dynamodb = boto3.resource('dynamodb', region_name=self.region)
+        # Initialize DynamoDB client (pooled to match the executor)
+        self._executor = get_dynamodb_executor()
+        self.dynamodb = self._executor.resource(self.region)
         self.table = self.dynamodb.Table(self.table_name)
         
         logger.info(f"DynamoDBModificationStore initialized with table: {self.table_name}")
@@ -174,7 +179,7 @@ class DynamoDBModificationStore:
         """
         try:
             item = self._modification_to_item(modification)
-            self.table.put_item(Item=item)
+            await self._executor.run(self.table.put_item, Item=item)
             
             logger.info(f"Successfully saved modification {modification.id} for project {modification.project_id}")
             return True
@@ -198,7 +203,8 @@ class DynamoDBModificationStore:
             ModificationPlan if found, None otherwise
         """
         try:
-            response = self.table.get_item(
+            response = await self._executor.run(
+                self.table.get_item,
                 Key={
                     'PK': f'PROJECT#{project_id}',
                     'SK': f'MOD#{modification_id}'
@@ -244,7 +250,8 @@ class DynamoDBModificationStore:
             bool: True if deletion was successful, False otherwise
         """
         try:
-            self.table.delete_item(
+            await self._executor.run(
+                self.table.delete_item,
                 Key={
                     'PK': f'PROJECT#{project_id}',
                     'SK': f'MOD#{modification_id}'
@@ -261,6 +268,16 @@ class DynamoDBModificationStore:
             logger.error(f"Unexpected error deleting modification {modification_id}: {e}", exc_info=True)
             return False
     
+    def _parse_modifications(self, items: List[Dict]) -> List[ModificationPlan]:
+        """Convert items to ModificationPlans, skipping unparsable ones."""
+        modifications = []
+        for item in items:
+            try:
+                modifications.append(self._item_to_modification(item))
+            except Exception as e:
+                logger.warning(f"Failed to parse modification item: {e}")
+        return modifications
+    
     async def list_modifications_by_project(self, project_id: str, limit: int = 100) -> List[ModificationPlan]:
         """
         List all modifications for a specific project.
@@ -272,30 +289,45 @@ class DynamoDBModificationStore:
         Returns:
             List of ModificationPlan objects
         """
+        return (await self.list_modifications_page(project_id, limit=limit)).items
+    
+    async def list_modifications_page(
+        self,
+        project_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page[ModificationPlan]:
+        """
+        One page of a project's modifications, resumable with its next_cursor.
+        
+        Args:
+            project_id: The ID of the project
+            limit: Maximum number of modifications in the page
+            cursor: next_cursor of the previous page
+            
+        Returns:
+            Page of ModificationPlan objects (next_cursor is None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        decode_cursor(cursor)
         try:
-            response = self.table.query(
-                KeyConditionExpression=Key('PK').eq(f'PROJECT#{project_id}') & Key('SK').begins_with('MOD#'),
-                Limit=limit
+            page = await fetch_page(
+                self._executor, self.table.query, limit, cursor,
+                KeyConditionExpression=Key('PK').eq(f'PROJECT#{project_id}') & Key('SK').begins_with('MOD#')
             )
-            
-            modifications = []
-            for item in response.get('Items', []):
-                try:
-                    modification = self._item_to_modification(item)
-                    modifications.append(modification)
-                except Exception as e:
-                    logger.warning(f"Failed to parse modification item: {e}")
-                    continue
+            modifications = self._parse_modifications(page.items)
             
             logger.info(f"Found {len(modifications)} modifications for project {project_id}")
-            return modifications
+            return Page(items=modifications, next_cursor=page.next_cursor)
             
         except ClientError as e:
             logger.error(f"Failed to list modifications for project {project_id}: {e.response['Error']['Message']}")
-            return []
+            return Page()
         except Exception as e:
             logger.error(f"Unexpected error listing modifications: {e}", exc_info=True)
-            return []
+            return Page()
     
     async def list_modifications_by_status(self, status: str, limit: int = 100) -> List[ModificationPlan]:
         """
@@ -309,21 +341,13 @@ class DynamoDBModificationStore:
             List of ModificationPlan objects
         """
         try:
-            response = self.table.query(
+            page = await fetch_page(
+                self._executor, self.table.query, limit,
                 IndexName='GSI1',
                 KeyConditionExpression=Key('GSI1PK').eq(f'STATUS#{status}'),
-                Limit=limit,
                 ScanIndexForward=False  # Sort by created_at descending
             )
-            
-            modifications = []
-            for item in response.get('Items', []):
-                try:
-                    modification = self._item_to_modification(item)
-                    modifications.append(modification)
-                except Exception as e:
-                    logger.warning(f"Failed to parse modification item: {e}")
-                    continue
+            modifications = self._parse_modifications(page.items)
             
             logger.info(f"Found {len(modifications)} modifications with status {status}")
             return modifications
@@ -448,29 +472,17 @@ class DynamoDBModificationStore:
                 for project_id, mod_id in keys
             ]
             
-            # Batch get items (max 100 at a time)
-            for i in range(0, len(batch_keys), 100):
-                batch = batch_keys[i:i+100]
-                response = self.dynamodb.batch_get_item(
-                    RequestItems={
-                        self.table_name: {
-                            'Keys': batch
-                        }
-                    }
-                )
-                
-                # Convert items to ModificationPlan objects
-                for item in response.get('Responses', {}).get(self.table_name, []):
-                    try:
-                        modification = self._item_to_modification(item)
-                        modifications.append(modification)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse modification item: {e}")
-                        continue
+            # Batch get items (100 per request, unprocessed keys retried)
+            modifications = self._parse_modifications(
+                batch_get_items(self.dynamodb, self.table_name, batch_keys)
+            )
             
             logger.info(f"Batch loaded {len(modifications)} modifications")
             return modifications
             
+        except UnprocessedKeysError as e:
+            logger.error(f"Batch get left {len(e.keys)} modifications unprocessed after retries")
+            return self._parse_modifications(e.items)
         except ClientError as e:
             logger.error(f"Failed to batch get modifications: {e.response['Error']['Message']}")
             return modifications
@@ -490,7 +502,8 @@ class DynamoDBModificationStore:
             bool: True if modification exists, False otherwise
         """
         try:
-            response = self.table.get_item(
+            response = await self._executor.run(
+                self.table.get_item,
                 Key={
                     'PK': f'PROJECT#{project_id}',
                     'SK': f'MOD#{modification_id}'
@@ -0,0 +1,314 @@
+"""
+Complete reads for DynamoDB: pagination, parallel scans and batch gets.
+
+This module provides:
+- paginate: Async generator over query/scan pages, following
+  LastEvaluatedKey, with an optional item limit and starting cursor
+- fetch_page: One caller-facing page (items plus an opaque next cursor)
+- parallel_scan: Scan pages from several segments concurrently
+- batch_get_items / abatch_get_items: BatchGetItem in chunks of 100 that
+  retries UnprocessedKeys with exponential backoff and jitter
+- encode_cursor / decode_cursor: Opaque cursor tokens for LastEvaluatedKey
+
+All calls run on the DynamoDB executor, so paging never blocks the loop.
+When a limit is given, each request asks for at most the remaining
+number of items, so a page never overshoots and its LastEvaluatedKey is
+an exact resume point.
+"""
+
+import json
+import time
+import random
+import base64
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from utils.dynamodb_executor import DynamoDBExecutor
+from utils.pagination import Page
+
+logger = logging.getLogger(__name__)
+
+BATCH_GET_MAX_KEYS = 100
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+class UnprocessedKeysError(Exception):
+    """BatchGetItem still left keys unprocessed after all retries (.items holds what was read)."""
+
+    def __init__(self, keys: List[Dict[str, Any]], items: List[Dict]):
+        self.keys = keys
+        self.items = items
+        super().__init__(f"{len(keys)} keys still unprocessed after retries")
+
+
+# ============================================================================
+# Cursor Tokens
+# ============================================================================
+
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Encode a LastEvaluatedKey as an opaque, URL-safe cursor token."""
+    if not last_evaluated_key:
+        return None
+    typed = {name: _serializer.serialize(value) for name, value in last_evaluated_key.items()}
+    raw = json.dumps(typed, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Decode a cursor token back into an ExclusiveStartKey.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        typed = json.loads(raw)
+        return {name: _deserializer.deserialize(value) for name, value in typed.items()}
+    except Exception as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from e
+
+
+# ============================================================================
+# Query / Scan Pagination
+# ============================================================================
+
+async def paginate(
+    executor: DynamoDBExecutor,
+    operation: Callable[..., Dict],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    **params: Any
+) -> AsyncIterator[Page[Dict]]:
+    """
+    Yield every page of a query or scan.
+
+    Args:
+        executor: Executor to run the calls on
+        operation: Bound table.query or table.scan
+        limit: Stop after this many items (None: read to the end)
+        cursor: Resume after this cursor token
+        **params: Query/scan parameters (a Limit caps the page size)
+
+    Yields:
+        Page of raw items; next_cursor resumes after the page
+    """
+    page_size = params.pop("Limit", None)
+    start_key = decode_cursor(cursor)
+    remaining = limit
+
+    while True:
+        request = dict(params)
+        if start_key:
+            request["ExclusiveStartKey"] = start_key
+        if remaining is not None:
+            request["Limit"] = min(remaining, page_size) if page_size else remaining
+        elif page_size:
+            request["Limit"] = page_size
+
+        response = await executor.run(operation, **request)
+        items = response.get("Items", [])
+        start_key = response.get("LastEvaluatedKey")
+        yield Page(items=items, next_cursor=encode_cursor(start_key))
+
+        if remaining is not None:
+            remaining -= len(items)
+            if remaining <= 0:
+                return
+        if not start_key:
+            return
+
+
+async def fetch_page(
+    executor: DynamoDBExecutor,
+    operation: Callable[..., Dict],
+    limit: Optional[int],
+    cursor: Optional[str] = None,
+    **params: Any
+) -> Page[Dict]:
+    """
+    Collect up to `limit` items (None: all) starting at `cursor`.
+
+    Filtered reads may need several requests to fill the page; the
+    returned next_cursor resumes exactly after the last item.
+    """
+    result: Page[Dict] = Page()
+    async for page in paginate(executor, operation, limit=limit, cursor=cursor, **params):
+        result.items.extend(page.items)
+        result.next_cursor = page.next_cursor
+    return result
+
+
+async def collect(executor: DynamoDBExecutor, operation: Callable[..., Dict], **params: Any) -> List[Dict]:
+    """All items of a query or scan (every page)."""
+    return (await fetch_page(executor, operation, limit=None, **params)).items
+
+
+async def parallel_scan(
+    executor: DynamoDBExecutor,
+    scan: Callable[..., Dict],
+    segments: int = 4,
+    **params: Any
+) -> AsyncIterator[List[Dict]]:
+    """
+    Yield scan pages from `segments` segments read concurrently.
+
+    Pages arrive in completion order. With one segment this is a plain
+    sequential scan.
+
+    Args:
+        executor: Executor to run the calls on
+        scan: Bound table.scan
+        segments: TotalSegments for the parallel scan
+        **params: Scan parameters
+
+    Yields:
+        List of raw items per page
+    """
+    if segments <= 1:
+        async for page in paginate(executor, scan, **params):
+            yield page.items
+        return
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=segments * 2)
+    finished = object()
+
+    async def read_segment(segment: int):
+        try:
+            async for page in paginate(executor, scan, Segment=segment, TotalSegments=segments, **params):
+                await queue.put(page.items)
+            await queue.put(finished)
+        except Exception as e:
+            await queue.put(e)
+
+    tasks = [asyncio.create_task(read_segment(segment)) for segment in range(segments)]
+    try:
+        remaining = segments
+        while remaining:
+            result = await queue.get()
+            if result is finished:
+                remaining -= 1
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                yield result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# ============================================================================
+# Batch Get
+# ============================================================================
+
+def _unique_keys(keys: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop duplicate keys (BatchGetItem rejects them), keeping order."""
+    seen = set()
+    unique = []
+    for key in keys:
+        marker = tuple(sorted(key.items()))
+        if marker not in seen:
+            seen.add(marker)
+            unique.append(key)
+    return unique
+
+
+def _backoff(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def batch_get_items(
+    dynamodb,
+    table_name: str,
+    keys: List[Dict[str, Any]],
+    max_attempts: int = 8,
+    base_delay: float = 0.05,
+    max_delay: float = 2.0,
+    **params: Any
+) -> List[Dict]:
+    """
+    Get items by key (blocking), retrying UnprocessedKeys.
+
+    Args:
+        dynamodb: boto3 DynamoDB resource
+        table_name: Table to read
+        keys: Primary keys to fetch
+        max_attempts: Requests per chunk before giving up
+        base_delay: First backoff delay in seconds
+        max_delay: Backoff cap in seconds
+        **params: Extra per-table request parameters (e.g. ProjectionExpression)
+
+    Returns:
+        Items found (missing keys are simply absent)
+
+    Raises:
+        UnprocessedKeysError: If keys remain unprocessed after max_attempts
+    """
+    items: List[Dict] = []
+    failed: List[Dict[str, Any]] = []
+    keys = _unique_keys(keys)
+    for i in range(0, len(keys), BATCH_GET_MAX_KEYS):
+        pending = keys[i:i + BATCH_GET_MAX_KEYS]
+        for attempt in range(max_attempts):
+            response = dynamodb.batch_get_item(RequestItems={table_name: {"Keys": pending, **params}})
+            items.extend(response.get("Responses", {}).get(table_name, []))
+            pending = response.get("UnprocessedKeys", {}).get(table_name, {}).get("Keys", [])
+            if not pending:
+                break
+            if attempt + 1 < max_attempts:
+                time.sleep(_backoff(attempt, base_delay, max_delay))
+        failed.extend(pending)
+    if failed:
+        raise UnprocessedKeysError(failed, items)
+    return items
+
+
+async def abatch_get_items(
+    executor: DynamoDBExecutor,
+    dynamodb,
+    table_name: str,
+    keys: List[Dict[str, Any]],
+    max_attempts: int = 8,
+    base_delay: float = 0.05,
+    max_delay: float = 2.0,
+    **params: Any
+) -> List[Dict]:
+    """
+    Async batch_get_items: chunks run concurrently, backoff waits without a thread.
+
+    Raises:
+        UnprocessedKeysError: If keys remain unprocessed after max_attempts
+    """
+    async def get_chunk(pending: List[Dict[str, Any]]) -> Tuple[List[Dict], List[Dict[str, Any]]]:
+        found: List[Dict] = []
+        for attempt in range(max_attempts):
+            response = await executor.run(
+                dynamodb.batch_get_item, RequestItems={table_name: {"Keys": pending, **params}}
+            )
+            found.extend(response.get("Responses", {}).get(table_name, []))
+            pending = response.get("UnprocessedKeys", {}).get(table_name, {}).get("Keys", [])
+            if not pending:
+                break
+            if attempt + 1 < max_attempts:
+                logger.debug(f"🔁 BatchGetItem: retrying {len(pending)} unprocessed keys (attempt {attempt + 1})")
+                await asyncio.sleep(_backoff(attempt, base_delay, max_delay))
+        return found, pending
+
+    keys = _unique_keys(keys)
+    chunks = await asyncio.gather(*(
+        get_chunk(keys[i:i + BATCH_GET_MAX_KEYS]) for i in range(0, len(keys), BATCH_GET_MAX_KEYS)
+    ))
+    items = [item for found, _ in chunks for item in found]
+    failed = [key for _, pending in chunks for key in pending]
+    if failed:
+        raise UnprocessedKeysError(failed, items)
+    return items
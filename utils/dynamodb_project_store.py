@@ -3,15 +3,32 @@ DynamoDB adapter for ProjectContext storage.
 
 Implements single-table design pattern with proper PK/SK structure
 for efficient querying and storage of project data.
+
+Writes are proportional to what changed: FILE# items carry a content hash,
+so saves only put changed files and delete removed ones, and history
+entries are appended with UpdateItem list_append instead of a full
+load-modify-save.
+
+Bodies larger than the inline threshold are stored compressed in S3 by
+utils.file_body_store; their FILE# items keep a pointer, hash and size.
+
+boto3 calls run on the shared DynamoDB executor (utils.dynamodb_executor),
+never on the event loop.
+
+load_context(lazy=True) reads only file paths, sizes and hashes; bodies
+are fetched with BatchGetItem when first accessed or prefetched.
 """
 
+import asyncio
+import hashlib
 import logging
 import os
+from dataclasses import fields
 from datetime import datetime
-from typing import Dict, List, Optional
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
 from decimal import Decimal
 
-import boto3
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 
@@ -19,6 +36,17 @@ from models.project_context import (
     ProjectContext, ProjectType, ProjectStatus,
     Dependency, Modification, Deployment, DeploymentConfig
 )
+from models.lazy_codebase import FileEntry, LazyCodebase, codebase_hash
+from utils.dynamodb_executor import get_dynamodb_executor
+from utils.file_body_store import FileBodyStore, get_file_body_store, is_offloaded
+from utils.dynamodb_pagination import (
+    Page, UnprocessedKeysError, paginate, fetch_page, parallel_scan, batch_get_items, abatch_get_items,
+    decode_cursor
+)
+from utils.project_history import (
+    MODIFICATION, DEPLOYMENT, HistoryEvent, check_history_type, decode_history_cursor, event_from_dict,
+    history_page
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,22 +62,42 @@ class DynamoDBProjectStore:
     - GSI1SK: PROJECT#<created_at>
     - GSI2PK: STATUS#<status>
     - GSI2SK: PROJECT#<project_id>
+    
+    FILE# items store a content_hash (SHA-256 of the content). A save reads
+    the stored hashes (keys and hashes only) and writes only the delta.
+    They are read from the table on every save, never from a per-process
+    cache: the table is shared with other API processes and Lambda workers,
+    and a stale cache would skip writes that another writer has since
+    overwritten.
     """
     
-    def __init__(self, table_name: Optional[str] = None, region: Optional[str] = None):
+    def __init__(
+        self,
+        table_name: Optional[str] = None,
+        region: Optional[str] = None,
+        scan_segments: Optional[int] = None,
+        body_store: Optional[FileBodyStore] = None
+    ):
         """
         Initialize DynamoDB project store.
         
         Args:
             table_name: DynamoDB table name (defaults to env var DYNAMODB_TABLE_NAME)
             region: AWS region (defaults to env var AWS_REGION or us-east-1)
+            scan_segments: Parallel segments for full-table scans
+                (defaults to env var DYNAMODB_SCAN_SEGMENTS or 4)
+            body_store: S3 store for large file bodies (defaults to the
+                global one; None keeps every body inline)
         """
         self.table_name = table_name or os.getenv('DYNAMODB_TABLE_NAME', 'agenticai-data')
         self.region = region or os.getenv('AWS_REGION', 'us-east-1')
         
-        # Initialize DynamoDB client
-        self.dynamodb = boto3.resource('dynamodb', region_name=self.region)
+        # Initialize DynamoDB client (pooled to match the executor)
+        self._executor = get_dynamodb_executor()
+        self.dynamodb = self._executor.resource(self.region)
         self.table = self.dynamodb.Table(self.table_name)
+        self.scan_segments = scan_segments or int(os.getenv('DYNAMODB_SCAN_SEGMENTS', '4'))
+        self.body_store = body_store or get_file_body_store()
         
         logger.info(f"DynamoDBProjectStore initialized with table: {self.table_name}")
     
@@ -96,60 +144,230 @@ class DynamoDBProjectStore:
             'test_coverage': project.test_coverage,
             'security_score': project.security_score,
             'performance_score': project.performance_score,
-            'dependencies': [
-                {'name': d.name, 'version': d.version, 'type': d.type}
-                for d in project.dependencies
-            ],
-            'modifications': [
-                {
-                    'id': m.id,
-                    'timestamp': m.timestamp.isoformat(),
-                    'description': m.description,
-                    'affected_files': m.affected_files,
-                    'requested_by': m.requested_by,
-                    'status': m.status
-                }
-                for m in project.modifications
-            ],
-            'deployments': [
-                {
-                    'id': d.id,
-                    'timestamp': d.timestamp.isoformat(),
-                    'environment': d.environment,
-                    'platform': d.platform,
-                    'url': d.url,
-                    'status': d.status
-                }
-                for d in project.deployments
-            ],
+            'dependencies': [self._dependency_to_item(d) for d in project.dependencies],
+            'modifications': [self._modification_to_item(m) for m in project.modifications],
+            'deployments': [self._deployment_to_item(d) for d in project.deployments],
             'environment_vars': project.environment_vars,
-            'deployment_config': {
-                'platform': project.deployment_config.platform,
-                'environment': project.deployment_config.environment,
-                'auto_deploy': project.deployment_config.auto_deploy,
-                'health_check_enabled': project.deployment_config.health_check_enabled,
-                'monitoring_enabled': project.deployment_config.monitoring_enabled
-            }
+            'deployment_config': self._deployment_config_to_item(project.deployment_config)
         }
         
         # Convert floats to Decimal for DynamoDB
         return self._python_to_dynamodb(item)
     
+    @staticmethod
+    def _isoformat(value) -> Optional[str]:
+        """ISO string for a datetime (strings and None pass through)."""
+        return value.isoformat() if isinstance(value, datetime) else value
+    
+    @staticmethod
+    def _dependency_to_item(dependency: Dependency) -> Dict:
+        return {'name': dependency.name, 'version': dependency.version, 'type': dependency.type}
+    
+    def _modification_to_item(self, modification: Modification) -> Dict:
+        return {
+            'id': modification.id,
+            'timestamp': self._isoformat(modification.timestamp),
+            'description': modification.description,
+            'affected_files': modification.affected_files,
+            'requested_by': modification.requested_by,
+            'status': modification.status,
+            'base_snapshot': modification.base_snapshot,
+            'snapshot': modification.snapshot
+        }
+    
+    def _deployment_to_item(self, deployment: Deployment) -> Dict:
+        return {
+            'id': deployment.id,
+            'timestamp': self._isoformat(deployment.timestamp),
+            'environment': deployment.environment,
+            'platform': deployment.platform,
+            'url': deployment.url,
+            'status': deployment.status
+        }
+    
+    @staticmethod
+    def _deployment_config_to_item(config: DeploymentConfig) -> Dict:
+        return {
+            'platform': config.platform,
+            'environment': config.environment,
+            'auto_deploy': config.auto_deploy,
+            'health_check_enabled': config.health_check_enabled,
+            'monitoring_enabled': config.monitoring_enabled
+        }
+    
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        """SHA-256 of file content (stored on FILE# items as content_hash)."""
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    
+    def _file_to_item(self, project_id: str, file_path: str, content: str,
+                      content_hash: str, last_modified: datetime,
+                      body_pointer: Optional[Dict] = None) -> Dict:
+        """Convert one project file to a DynamoDB item (inline, or pointing at an S3 body)."""
+        item = {
+            'PK': f'PROJECT#{project_id}',
+            'SK': f'FILE#{file_path}',
+            'EntityType': 'ProjectFile',
+            'file_path': file_path,
+            'content_hash': content_hash,
+            'size': len(content),
+            'last_modified': last_modified.isoformat()
+        }
+        if body_pointer:
+            item.update(body_pointer)
+        else:
+            item['content'] = content
+        return item
+    
     def _project_files_to_items(self, project: ProjectContext) -> List[Dict]:
         """Convert project files to DynamoDB items."""
-        items = []
-        for file_path, content in project.codebase.items():
-            item = {
-                'PK': f'PROJECT#{project.id}',
-                'SK': f'FILE#{file_path}',
-                'EntityType': 'ProjectFile',
-                'file_path': file_path,
-                'content': content,
-                'size': len(content),
-                'last_modified': project.updated_at.isoformat()
+        return [
+            self._file_to_item(project.id, file_path, content, self._content_hash(content), project.updated_at)
+            for file_path, content in project.codebase.items()
+        ]
+    
+    def _query_all(self, **query) -> List[Dict]:
+        """Run a query and follow LastEvaluatedKey through every page (blocking)."""
+        items: List[Dict] = []
+        while True:
+            response = self.table.query(**query)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return items
+            query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    # ========================================================================
+    # File Delta Tracking
+    # ========================================================================
+    
+    def _stored_file_hashes(self, project_id: str) -> Dict[str, Optional[str]]:
+        """
+        Content hashes of the project's stored files.
+        
+        Always queried from the table (keys and hashes only). Files written
+        before hashes were stored map to None, so they are rewritten once.
+        """
+        items = self._query_all(
+            KeyConditionExpression=Key('PK').eq(f'PROJECT#{project_id}') & Key('SK').begins_with('FILE#'),
+            ProjectionExpression='SK, content_hash'
+        )
+        return {item['SK'][len('FILE#'):]: item.get('content_hash') for item in items}
+    
+    def _plan_file_delta(self, project_id: str,
+                         codebase: Dict[str, str]) -> Tuple[Dict[str, str], List[str], Dict[str, str]]:
+        """
+        Compare a codebase with the stored files (blocking).
+        
+        Returns:
+            Tuple of (changed file_path -> content_hash, removed file paths,
+            every current file_path -> content_hash)
+        """
+        stored = self._stored_file_hashes(project_id)
+        # Unread files of a lazy codebase keep their stored hash (no body load)
+        current = {path: codebase_hash(codebase, path) for path in codebase}
+        changed = {path: content_hash for path, content_hash in current.items() if stored.get(path) != content_hash}
+        removed = [file_path for file_path in stored if file_path not in current]
+        return changed, removed, current
+    
+    def _write_file_delta(self, batch, project_id: str, codebase: Dict[str, str],
+                          delta: Tuple[Dict[str, str], List[str], Dict[str, str]],
+                          last_modified: datetime, body_pointers: Dict[str, Dict]) -> Tuple[int, int]:
+        """
+        Queue puts for changed files and deletes for removed ones.
+        
+        Args:
+            batch: Table batch writer
+            project_id: Project ID
+            codebase: Complete new codebase (file_path -> content)
+            delta: Result of _plan_file_delta
+            last_modified: Timestamp for written files
+            body_pointers: S3 pointers of offloaded bodies (file_path -> attributes)
+            
+        Returns:
+            Tuple of (files written, files deleted)
+        """
+        changed, removed, current = delta
+        for file_path, content_hash in changed.items():
+            batch.put_item(Item=self._file_to_item(
+                project_id, file_path, codebase[file_path], content_hash, last_modified,
+                body_pointers.get(file_path)
+            ))
+        
+        for file_path in removed:
+            batch.delete_item(Key={'PK': f'PROJECT#{project_id}', 'SK': f'FILE#{file_path}'})
+        return len(changed), len(removed)
+    
+    async def _save_files(self, project_id: str, codebase: Dict[str, str], last_modified: datetime,
+                          metadata_item: Optional[Dict] = None) -> Tuple[int, int]:
+        """
+        Write the file delta, and the metadata item if given, in one batch.
+        
+        Changed bodies over the inline threshold are uploaded to S3
+        concurrently first, so items never point at missing objects.
+        
+        Returns:
+            Tuple of (files written, files deleted)
+        """
+        delta = await self._executor.run(self._plan_file_delta, project_id, codebase)
+        
+        body_pointers: Dict[str, Dict] = {}
+        if self.body_store:
+            large = {
+                path: (codebase[path], content_hash) for path, content_hash in delta[0].items()
+                if self.body_store.should_offload(codebase[path])
             }
-            items.append(item)
-        return items
+            if large:
+                body_pointers = await self.body_store.put_many(large)
+        
+        def write() -> Tuple[int, int]:
+            with self.table.batch_writer() as batch:
+                if metadata_item:
+                    batch.put_item(Item=metadata_item)
+                return self._write_file_delta(batch, project_id, codebase, delta, last_modified, body_pointers)
+        
+        return await self._executor.run(write)
+    
+    def _body_reader(self, offloaded: Dict[str, Dict]) -> FileBodyStore:
+        """Body store for reading offloaded items."""
+        # Items written elsewhere may be offloaded even if this store keeps bodies inline
+        return self.body_store or FileBodyStore(
+            bucket=next(iter(offloaded.values()))['body_bucket'], region=self.region
+        )
+    
+    async def _read_file_bodies(self, file_items: List[Dict]) -> Dict[str, str]:
+        """Contents of FILE# items, fetching offloaded bodies from S3 concurrently."""
+        contents = {item['file_path']: item['content'] for item in file_items if not is_offloaded(item)}
+        offloaded = {item['file_path']: item for item in file_items if is_offloaded(item)}
+        if offloaded:
+            contents.update(await self._body_reader(offloaded).get_many(offloaded))
+        return contents
+    
+    def _lazy_codebase(self, project_id: str, file_entries: List[Dict]) -> LazyCodebase:
+        """A codebase view whose bodies are fetched with BatchGetItem on demand."""
+        def keys(paths: List[str]) -> List[Dict]:
+            return [{'PK': f'PROJECT#{project_id}', 'SK': f'FILE#{path}'} for path in paths]
+        
+        def load(paths: List[str]) -> Dict[str, str]:
+            items = batch_get_items(self.dynamodb, self.table_name, keys(paths))
+            contents = {item['file_path']: item['content'] for item in items if not is_offloaded(item)}
+            offloaded = {item['file_path']: item for item in items if is_offloaded(item)}
+            if offloaded:
+                reader = self._body_reader(offloaded)
+                contents.update({path: reader.get(item) for path, item in offloaded.items()})
+            return contents
+        
+        async def load_async(paths: List[str]) -> Dict[str, str]:
+            items = await abatch_get_items(self._executor, self.dynamodb, self.table_name, keys(paths))
+            return await self._read_file_bodies(items)
+        
+        return LazyCodebase(
+            {
+                item['file_path']: FileEntry(size=int(item.get('size', 0)), content_hash=item.get('content_hash'))
+                for item in file_entries
+            },
+            load,
+            load_async
+        )
     
     def _metadata_item_to_project(self, item: Dict) -> ProjectContext:
         """Convert DynamoDB metadata item to ProjectContext."""
@@ -174,7 +392,9 @@ class DynamoDBProjectStore:
                 description=m['description'],
                 affected_files=m['affected_files'],
                 requested_by=m['requested_by'],
-                status=m['status']
+                status=m['status'],
+                base_snapshot=m.get('base_snapshot'),
+                snapshot=m.get('snapshot')
             )
             for m in item.get('modifications', [])
         ]
@@ -238,20 +458,16 @@ class DynamoDBProjectStore:
             # Update timestamp
             context.updated_at = datetime.utcnow()
             
-            # Prepare items
-            metadata_item = self._project_to_metadata_item(context)
-            file_items = self._project_files_to_items(context)
+            # Metadata plus only the files that changed since the last read/write
+            written, deleted = await self._save_files(
+                context.id, context.codebase, context.updated_at,
+                metadata_item=self._project_to_metadata_item(context)
+            )
             
-            # Batch write all items
-            with self.table.batch_writer() as batch:
-                # Write metadata
-                batch.put_item(Item=metadata_item)
-                
-                # Write files
-                for file_item in file_items:
-                    batch.put_item(Item=file_item)
-            
-            logger.info(f"Successfully saved project {context.id} with {len(file_items)} files")
+            logger.info(
+                f"Successfully saved project {context.id} "
+                f"({written}/{len(context.codebase)} files written, {deleted} deleted)"
+            )
             return True
             
         except ClientError as e:
@@ -261,23 +477,36 @@ class DynamoDBProjectStore:
             logger.error(f"Unexpected error saving project {context.id}: {e}", exc_info=True)
             return False
     
-    async def load_context(self, project_id: str) -> Optional[ProjectContext]:
+    async def load_context(self, project_id: str, lazy: bool = False) -> Optional[ProjectContext]:
         """
         Load a project context from DynamoDB.
         
         Args:
             project_id: The ID of the project to load
+            lazy: Return the codebase as a LazyCodebase (paths, sizes and
+                  hashes only; bodies are fetched on first access or prefetch)
             
         Returns:
             ProjectContext if found, None otherwise
         """
         try:
-            # Load metadata
-            response = self.table.get_item(
-                Key={
-                    'PK': f'PROJECT#{project_id}',
-                    'SK': 'METADATA'
-                }
+            files_query: Dict[str, Any] = {
+                'KeyConditionExpression': Key('PK').eq(f'PROJECT#{project_id}') & Key('SK').begins_with('FILE#')
+            }
+            if lazy:
+                files_query['ProjectionExpression'] = 'file_path, #size, content_hash'
+                files_query['ExpressionAttributeNames'] = {'#size': 'size'}
+            
+            # Load metadata and project files concurrently (every page of files)
+            response, file_items = await asyncio.gather(
+                self._executor.run(
+                    self.table.get_item,
+                    Key={
+                        'PK': f'PROJECT#{project_id}',
+                        'SK': 'METADATA'
+                    }
+                ),
+                self._executor.run(self._query_all, **files_query)
             )
             
             if 'Item' not in response:
@@ -287,16 +516,15 @@ class DynamoDBProjectStore:
             # Convert metadata to ProjectContext
             project = self._metadata_item_to_project(response['Item'])
             
-            # Load project files
-            file_response = self.table.query(
-                KeyConditionExpression=Key('PK').eq(f'PROJECT#{project_id}') & Key('SK').begins_with('FILE#')
-            )
+            if lazy:
+                project.codebase = self._lazy_codebase(project_id, file_items)
+                logger.info(f"Loaded project {project_id} metadata with {len(file_items)} lazy files")
+                return project
             
-            # Populate codebase
-            for item in file_response.get('Items', []):
-                file_path = item['file_path']
-                content = item['content']
-                project.codebase[file_path] = content
+            # Populate codebase (large bodies come from S3, fetched concurrently)
+            contents = await self._read_file_bodies(file_items)
+            for item in file_items:
+                project.codebase[item['file_path']] = contents[item['file_path']]
             
             logger.info(f"Successfully loaded project {project_id} with {len(project.codebase)} files")
             return project
@@ -320,10 +548,43 @@ class DynamoDBProjectStore:
         """
         return await self.save_context(context)
     
+    def _field_to_attributes(self, key: str, value: Any) -> Dict[str, Any]:
+        """
+        Metadata attributes to set for one ProjectContext field update.
+        
+        Fields that feed a GSI key also update that key.
+        """
+        if key in ('type', 'status'):
+            value = (ProjectType if key == 'type' else ProjectStatus)(value).value
+        elif key == 'dependencies':
+            value = [self._dependency_to_item(d) if isinstance(d, Dependency) else d for d in value]
+        elif key == 'modifications':
+            value = [self._modification_to_item(m) if isinstance(m, Modification) else m for m in value]
+        elif key == 'deployments':
+            value = [self._deployment_to_item(d) if isinstance(d, Deployment) else d for d in value]
+        elif key == 'deployment_config' and isinstance(value, DeploymentConfig):
+            value = self._deployment_config_to_item(value)
+        elif isinstance(value, Enum):
+            value = value.value
+        else:
+            value = self._isoformat(value)
+        
+        attributes = {key: value}
+        if key == 'status':
+            attributes['GSI2PK'] = f'STATUS#{value}'
+        elif key == 'owner_id':
+            attributes['GSI1PK'] = f'OWNER#{value}'
+        elif key == 'created_at':
+            attributes['GSI1SK'] = f'PROJECT#{value}'
+        return attributes
+    
     async def update_context_fields(self, project_id: str, updates: Dict) -> bool:
         """
         Update specific fields of a project context.
         
+        Metadata fields are set with a single UpdateItem; a 'codebase' update
+        writes only the files that changed.
+        
         Args:
             project_id: The ID of the project to update
             updates: Dictionary of fields to update
@@ -332,28 +593,38 @@ class DynamoDBProjectStore:
             bool: True if update was successful, False otherwise
         """
         try:
-            # Load existing context
-            context = await self.load_context(project_id)
-            if context is None:
-                logger.error(f"Cannot update non-existent project {project_id}")
-                return False
-            
-            # Apply updates
+            updatable = {f.name for f in fields(ProjectContext)} - {'id', 'updated_at', 'codebase'}
+            updated_at = datetime.utcnow()
+            attributes: Dict[str, Any] = {'updated_at': updated_at.isoformat()}
             for key, value in updates.items():
-                if hasattr(context, key):
-                    # Handle special cases for complex types
-                    if key == 'type' and isinstance(value, str):
-                        setattr(context, key, ProjectType(value))
-                    elif key == 'status' and isinstance(value, str):
-                        setattr(context, key, ProjectStatus(value))
-                    else:
-                        setattr(context, key, value)
-                else:
+                if key in updatable:
+                    attributes.update(self._field_to_attributes(key, value))
+                elif key != 'codebase':
                     logger.warning(f"Ignoring unknown field '{key}' in update")
             
-            # Save updated context
-            return await self.save_context(context)
+            names = {f'#f{i}': name for i, name in enumerate(attributes)}
+            values = {f':v{i}': value for i, value in enumerate(attributes.values())}
+            await self._executor.run(
+                self.table.update_item,
+                Key={'PK': f'PROJECT#{project_id}', 'SK': 'METADATA'},
+                UpdateExpression='SET ' + ', '.join(f'#f{i} = :v{i}' for i in range(len(attributes))),
+                ConditionExpression=Attr('PK').exists(),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=self._python_to_dynamodb(values)
+            )
+            
+            if 'codebase' in updates:
+                await self._save_files(project_id, dict(updates['codebase']), updated_at)
+            
+            logger.info(f"Updated fields {sorted(updates)} of project {project_id}")
+            return True
             
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                logger.error(f"Cannot update non-existent project {project_id}")
+            else:
+                logger.error(f"Failed to update context for project {project_id}: {e.response['Error']['Message']}")
+            return False
         except Exception as e:
             logger.error(f"Failed to update context for project {project_id}: {e}", exc_info=True)
             return False
@@ -369,26 +640,31 @@ class DynamoDBProjectStore:
             bool: True if deletion was successful, False otherwise
         """
         try:
-            # Query all items for this project
-            response = self.table.query(
-                KeyConditionExpression=Key('PK').eq(f'PROJECT#{project_id}')
+            # Query all items for this project (keys only)
+            items = await self._executor.run(
+                self._query_all,
+                KeyConditionExpression=Key('PK').eq(f'PROJECT#{project_id}'),
+                ProjectionExpression='PK, SK'
             )
             
-            if not response.get('Items'):
+            if not items:
                 logger.warning(f"Project {project_id} not found")
                 return False
             
             # Batch delete all items
-            with self.table.batch_writer() as batch:
-                for item in response['Items']:
-                    batch.delete_item(
-                        Key={
-                            'PK': item['PK'],
-                            'SK': item['SK']
-                        }
-                    )
-            
-            logger.info(f"Successfully deleted project {project_id} with {len(response['Items'])} items")
+            def delete():
+                with self.table.batch_writer() as batch:
+                    for item in items:
+                        batch.delete_item(
+                            Key={
+                                'PK': item['PK'],
+                                'SK': item['SK']
+                            }
+                        )
+            
+            await self._executor.run(delete)
+            
+            logger.info(f"Successfully deleted project {project_id} with {len(items)} items")
             return True
             
         except ClientError as e:
@@ -409,21 +685,50 @@ class DynamoDBProjectStore:
             bool: True if context exists, False otherwise
         """
         try:
-            response = self.table.get_item(
+            response = await self._executor.run(
+                self.table.get_item,
                 Key={
                     'PK': f'PROJECT#{project_id}',
                     'SK': 'METADATA'
-                }
+                },
+                ProjectionExpression='PK'
             )
             return 'Item' in response
         except Exception as e:
             logger.error(f"Error checking if project {project_id} exists: {e}")
             return False
     
+    def _parse_projects(self, items: List[Dict]) -> List[ProjectContext]:
+        """Convert metadata items to ProjectContexts, skipping unparsable ones."""
+        contexts = []
+        for item in items:
+            try:
+                # Note: codebase is not loaded for list operations (performance optimization)
+                contexts.append(self._metadata_item_to_project(item))
+            except Exception as e:
+                logger.warning(f"Failed to parse project item: {e}")
+        return contexts
+    
+    def _listing_query(self, owner_id: Optional[str], status: Optional[str]) -> Dict[str, Any]:
+        """Query parameters for an owner (GSI1) or status (GSI2) listing; empty means scan."""
+        if isinstance(status, Enum):
+            status = status.value
+        if owner_id:
+            query = {'IndexName': 'GSI1', 'KeyConditionExpression': Key('GSI1PK').eq(f'OWNER#{owner_id}')}
+            if status:
+                # Filtered server-side; fetch_page keeps reading until the page is full
+                query['FilterExpression'] = Attr('status').eq(status)
+            return query
+        if status:
+            return {'IndexName': 'GSI2', 'KeyConditionExpression': Key('GSI2PK').eq(f'STATUS#{status}')}
+        return {}
+    
     async def list_contexts(self, owner_id: Optional[str] = None, status: Optional[str] = None) -> List[ProjectContext]:
         """
         List all project contexts, optionally filtered by owner or status.
         
+        Reads every page; the unfiltered scan reads its segments in parallel.
+        
         Args:
             owner_id: Optional owner ID to filter by (uses GSI1)
             status: Optional status to filter by (uses GSI2)
@@ -434,33 +739,16 @@ class DynamoDBProjectStore:
         contexts = []
         
         try:
-            if owner_id:
-                # Query by owner using GSI1
-                response = self.table.query(
-                    IndexName='GSI1',
-                    KeyConditionExpression=Key('GSI1PK').eq(f'OWNER#{owner_id}')
-                )
-            elif status:
-                # Query by status using GSI2
-                response = self.table.query(
-                    IndexName='GSI2',
-                    KeyConditionExpression=Key('GSI2PK').eq(f'STATUS#{status}')
-                )
+            query = self._listing_query(owner_id, status)
+            if query:
+                async for page in paginate(self._executor, self.table.query, **query):
+                    contexts.extend(self._parse_projects(page.items))
             else:
-                # Scan for all projects (less efficient, but works)
-                response = self.table.scan(
+                async for items in parallel_scan(
+                    self._executor, self.table.scan, self.scan_segments,
                     FilterExpression=Attr('EntityType').eq('Project')
-                )
-            
-            # Convert items to ProjectContext objects
-            for item in response.get('Items', []):
-                try:
-                    project = self._metadata_item_to_project(item)
-                    # Note: codebase is not loaded for list operations (performance optimization)
-                    contexts.append(project)
-                except Exception as e:
-                    logger.warning(f"Failed to parse project item: {e}")
-                    continue
+                ):
+                    contexts.extend(self._parse_projects(items))
             
             logger.info(f"Listed {len(contexts)} project contexts")
             return contexts
@@ -472,10 +760,139 @@ class DynamoDBProjectStore:
             logger.error(f"Unexpected error listing contexts: {e}", exc_info=True)
             return contexts
     
+    async def list_contexts_page(
+        self,
+        owner_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page[ProjectContext]:
+        """
+        One page of project contexts, resumable with its next_cursor.
+        
+        Args:
+            owner_id: Optional owner ID to filter by (uses GSI1)
+            status: Optional status to filter by (uses GSI2)
+            limit: Maximum number of projects in the page
+            cursor: next_cursor of the previous page
+            
+        Returns:
+            Page of ProjectContext objects (next_cursor is None on the last page)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        decode_cursor(cursor)
+        query = self._listing_query(owner_id, status)
+        try:
+            if query:
+                page = await fetch_page(self._executor, self.table.query, limit, cursor, **query)
+            else:
+                page = await fetch_page(
+                    self._executor, self.table.scan, limit, cursor,
+                    FilterExpression=Attr('EntityType').eq('Project')
+                )
+            return Page(items=self._parse_projects(page.items), next_cursor=page.next_cursor)
+            
+        except ClientError as e:
+            logger.error(f"Failed to list contexts: {e.response['Error']['Message']}")
+            return Page()
+    
+    async def list_history_page(
+        self,
+        project_id: str,
+        kind: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Optional[Page[HistoryEvent]]:
+        """
+        One page of a project's modifications and deployments, newest first.
+        
+        Reads only the history attributes of the metadata item (no FILE# items).
+        
+        Args:
+            project_id: The ID of the project
+            kind: Only 'modification' or only 'deployment' events (None: both)
+            status: Only events with this status
+            limit: Maximum number of events in the page
+            cursor: next_cursor of the previous page
+            
+        Returns:
+            Page of Modification / Deployment objects, or None if the project does not exist
+            
+        Raises:
+            ValueError: If kind or the cursor is invalid
+        """
+        check_history_type(kind)
+        decode_history_cursor(cursor)
+        try:
+            response = await self._executor.run(
+                self.table.get_item,
+                Key={'PK': f'PROJECT#{project_id}', 'SK': 'METADATA'},
+                ProjectionExpression='PK, modifications, deployments'
+            )
+        except ClientError as e:
+            logger.error(f"Failed to read history of project {project_id}: {e.response['Error']['Message']}")
+            return Page()
+        
+        if 'Item' not in response:
+            logger.warning(f"Project {project_id} not found")
+            return None
+        
+        item = self._dynamodb_to_python(response['Item'])
+        return history_page(
+            [event_from_dict(MODIFICATION, m) for m in item.get('modifications', [])],
+            [event_from_dict(DEPLOYMENT, d) for d in item.get('deployments', [])],
+            kind, status, limit, cursor
+        )
+    
+    async def _append_history(self, project_id: str, attribute: str, entry: Dict,
+                        extra: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Append one entry to a metadata list attribute with list_append.
+        
+        Args:
+            project_id: The ID of the project
+            attribute: List attribute ('modifications' or 'deployments')
+            entry: Serialized entry to append
+            extra: Other attributes to set in the same update
+            
+        Returns:
+            bool: True if appended, False if the project does not exist
+        """
+        sets = {'updated_at': datetime.utcnow().isoformat(), **(extra or {})}
+        names = {'#list': attribute, **{f'#f{i}': name for i, name in enumerate(sets)}}
+        values = {
+            ':entry': [entry],
+            ':empty': [],
+            **{f':v{i}': value for i, value in enumerate(sets.values())}
+        }
+        try:
+            await self._executor.run(
+                self.table.update_item,
+                Key={'PK': f'PROJECT#{project_id}', 'SK': 'METADATA'},
+                UpdateExpression=(
+                    'SET #list = list_append(if_not_exists(#list, :empty), :entry), '
+                    + ', '.join(f'#f{i} = :v{i}' for i in range(len(sets)))
+                ),
+                ConditionExpression=Attr('PK').exists(),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=self._python_to_dynamodb(values)
+            )
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                logger.warning(f"Project {project_id} not found")
+                return False
+            raise
+    
     async def add_modification(self, project_id: str, modification: Dict) -> bool:
         """
         Add a modification record to a project's history.
         
+        Appends to the metadata item in place (no project load or file writes).
+        
         Args:
             project_id: The ID of the project
             modification: Dictionary containing modification details
@@ -484,21 +901,18 @@ class DynamoDBProjectStore:
             bool: True if successful, False otherwise
         """
         try:
-            context = await self.load_context(project_id)
-            if context is None:
-                return False
-            
             mod = Modification(
                 id=modification.get('id', str(datetime.utcnow().timestamp())),
                 timestamp=modification.get('timestamp', datetime.utcnow()),
                 description=modification['description'],
                 affected_files=modification.get('affected_files', []),
                 requested_by=modification.get('requested_by', 'system'),
-                status=modification.get('status', 'applied')
+                status=modification.get('status', 'applied'),
+                base_snapshot=modification.get('base_snapshot'),
+                snapshot=modification.get('snapshot')
             )
             
-            context.modifications.append(mod)
-            return await self.save_context(context)
+            return await self._append_history(project_id, 'modifications', self._modification_to_item(mod))
             
         except Exception as e:
             logger.error(f"Failed to add modification to project {project_id}: {e}", exc_info=True)
@@ -508,6 +922,8 @@ class DynamoDBProjectStore:
         """
         Add a deployment record to a project's history.
         
+        Appends to the metadata item in place (no project load or file writes).
+        
         Args:
             project_id: The ID of the project
             deployment: Dictionary containing deployment details
@@ -516,10 +932,6 @@ class DynamoDBProjectStore:
             bool: True if successful, False otherwise
         """
         try:
-            context = await self.load_context(project_id)
-            if context is None:
-                return False
-            
             dep = Deployment(
                 id=deployment.get('id', str(datetime.utcnow().timestamp())),
                 timestamp=deployment.get('timestamp', datetime.utcnow()),
@@ -529,10 +941,10 @@ class DynamoDBProjectStore:
                 status=deployment.get('status', 'success')
             )
             
-            context.deployments.append(dep)
-            context.last_deployed_at = dep.timestamp
-            
-            return await self.save_context(context)
+            return await self._append_history(
+                project_id, 'deployments', self._deployment_to_item(dep),
+                extra={'last_deployed_at': self._isoformat(dep.timestamp)}
+            )
             
         except Exception as e:
             logger.error(f"Failed to add deployment to project {project_id}: {e}", exc_info=True)
@@ -557,29 +969,15 @@ class DynamoDBProjectStore:
                 for pid in project_ids
             ]
             
-            # Batch get items (max 100 at a time)
-            for i in range(0, len(keys), 100):
-                batch_keys = keys[i:i+100]
-                response = self.dynamodb.batch_get_item(
-                    RequestItems={
-                        self.table_name: {
-                            'Keys': batch_keys
-                        }
-                    }
-                )
-                
-                # Convert items to ProjectContext objects
-                for item in response.get('Responses', {}).get(self.table_name, []):
-                    try:
-                        project = self._metadata_item_to_project(item)
-                        contexts.append(project)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse project item: {e}")
-                        continue
+            # Batch get items (100 per request, unprocessed keys retried)
+            contexts = self._parse_projects(batch_get_items(self.dynamodb, self.table_name, keys))
             
             logger.info(f"Batch loaded {len(contexts)} project contexts")
             return contexts
             
+        except UnprocessedKeysError as e:
+            logger.error(f"Batch get left {len(e.keys)} projects unprocessed after retries")
+            return self._parse_projects(e.items)
         except ClientError as e:
             logger.error(f"Failed to batch get contexts: {e.response['Error']['Message']}")
             return contexts
@@ -599,21 +997,13 @@ class DynamoDBProjectStore:
             List of ProjectContext objects
         """
         try:
-            response = self.table.query(
+            page = await fetch_page(
+                self._executor, self.table.query, limit,
                 IndexName='GSI1',
                 KeyConditionExpression=Key('GSI1PK').eq(f'OWNER#{owner_id}'),
-                Limit=limit,
                 ScanIndexForward=False  # Sort by created_at descending
             )
-            
-            contexts = []
-            for item in response.get('Items', []):
-                try:
-                    project = self._metadata_item_to_project(item)
-                    contexts.append(project)
-                except Exception as e:
-                    logger.warning(f"Failed to parse project item: {e}")
-                    continue
+            contexts = self._parse_projects(page.items)
             
             logger.info(f"Found {len(contexts)} projects for owner {owner_id}")
             return contexts
@@ -637,20 +1027,12 @@ class DynamoDBProjectStore:
             List of ProjectContext objects
         """
         try:
-            response = self.table.query(
+            page = await fetch_page(
+                self._executor, self.table.query, limit,
                 IndexName='GSI2',
-                KeyConditionExpression=Key('GSI2PK').eq(f'STATUS#{status}'),
-                Limit=limit
+                KeyConditionExpression=Key('GSI2PK').eq(f'STATUS#{status}')
             )
-            
-            contexts = []
-            for item in response.get('Items', []):
-                try:
-                    project = self._metadata_item_to_project(item)
-                    contexts.append(project)
-                except Exception as e:
-                    logger.warning(f"Failed to parse project item: {e}")
-                    continue
+            contexts = self._parse_projects(page.items)
             
             logger.info(f"Found {len(contexts)} projects with status {status}")
             return contexts
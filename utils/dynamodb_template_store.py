@@ -3,19 +3,27 @@ DynamoDB adapter for ProjectTemplate storage.
 
 Implements single-table design pattern with proper PK/SK structure
 for efficient querying and storage of project templates.
+
+boto3 calls run on the shared DynamoDB executor (utils.dynamodb_executor),
+never on the event loop.
 """
 
+import asyncio
 import logging
 import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from decimal import Decimal
 
-import boto3
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
 
 from models.template import ProjectTemplate
+from utils.dynamodb_executor import get_dynamodb_executor
+from utils.dynamodb_pagination import (
+    Page, UnprocessedKeysError, collect, fetch_page, parallel_scan,
+    batch_get_items, abatch_get_items, decode_cursor
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,20 +41,29 @@ class DynamoDBTemplateStore:
     - GSI2SK: TEMPLATE#<template_id>
     """
     
-    def __init__(self, table_name: Optional[str] = None, region: Optional[str] = None):
+    def __init__(
+        self,
+        table_name: Optional[str] = None,
+        region: Optional[str] = None,
+        scan_segments: Optional[int] = None
+    ):
         """
         Initialize DynamoDB template store.
         
         Args:
             table_name: DynamoDB table name (defaults to env var DYNAMODB_TABLE_NAME)
             region: AWS region (defaults to env var AWS_REGION or us-east-1)
+            scan_segments: Parallel segments for full-table scans
+                (defaults to env var DYNAMODB_SCAN_SEGMENTS or 4)
         """
         self.table_name = table_name or os.getenv('DYNAMODB_TABLE_NAME', 'agenticai-data')
         self.region = region or os.getenv('AWS_REGION', 'us-east-1')
         
-        # Initialize DynamoDB client
-        self.dynamodb = boto3.resource('dynamodb', region_name=self.region)
+        # Initialize DynamoDB client (pooled to match the executor)
+        self._executor = get_dynamodb_executor()
+        self.dynamodb = self._executor.resource(self.region)
         self.table = self.dynamodb.Table(self.table_name)
+        self.scan_segments = scan_segments or int(os.getenv('DYNAMODB_SCAN_SEGMENTS', '4'))
         
         logger.info(f"DynamoDBTemplateStore initialized with table: {self.table_name}")
     
@@ -154,27 +171,27 @@ class DynamoDBTemplateStore:
             metadata_item = self._template_to_metadata_item(template)
             file_items = self._template_files_to_items(template)
             
+            # Tag index items for GSI2
+            tag_items = [
+                {
+                    'PK': f'TEMPLATE#{template.id}',
+                    'SK': f'TAG#{tag}',
+                    'GSI2PK': f'TAG#{tag}',
+                    'GSI2SK': f'TEMPLATE#{template.id}',
+                    'EntityType': 'TemplateTag',
+                    'template_id': template.id,
+                    'tag': tag
+                }
+                for tag in template.tags
+            ]
+            
             # Batch write all items
-            with self.table.batch_writer() as batch:
-                # Write metadata
-                batch.put_item(Item=metadata_item)
-                
-                # Write files
-                for file_item in file_items:
-                    batch.put_item(Item=file_item)
-                
-                # Write tag index items for GSI2
-                for tag in template.tags:
-                    tag_item = {
-                        'PK': f'TEMPLATE#{template.id}',
-                        'SK': f'TAG#{tag}',
-                        'GSI2PK': f'TAG#{tag}',
-                        'GSI2SK': f'TEMPLATE#{template.id}',
-                        'EntityType': 'TemplateTag',
-                        'template_id': template.id,
-                        'tag': tag
-                    }
-                    batch.put_item(Item=tag_item)
+            def write():
+                with self.table.batch_writer() as batch:
+                    for item in [metadata_item, *file_items, *tag_items]:
+                        batch.put_item(Item=item)
+            
+            await self._executor.run(write)
             
             logger.info(f"Successfully saved template {template.id} with {len(file_items)} files and {len(template.tags)} tags")
             return True
@@ -197,12 +214,19 @@ class DynamoDBTemplateStore:
             ProjectTemplate if found, None otherwise
         """
         try:
-            # Load metadata
-            response = self.table.get_item(
-                Key={
-                    'PK': f'TEMPLATE#{template_id}',
-                    'SK': 'METADATA'
-                }
+            # Load metadata and template files (all pages) concurrently
+            response, file_items = await asyncio.gather(
+                self._executor.run(
+                    self.table.get_item,
+                    Key={
+                        'PK': f'TEMPLATE#{template_id}',
+                        'SK': 'METADATA'
+                    }
+                ),
+                collect(
+                    self._executor, self.table.query,
+                    KeyConditionExpression=Key('PK').eq(f'TEMPLATE#{template_id}') & Key('SK').begins_with('FILE#')
+                )
             )
             
             if 'Item' not in response:
@@ -212,13 +236,8 @@ class DynamoDBTemplateStore:
             # Convert metadata to ProjectTemplate
             template = self._metadata_item_to_template(response['Item'])
             
-            # Load template files
-            file_response = self.table.query(
-                KeyConditionExpression=Key('PK').eq(f'TEMPLATE#{template_id}') & Key('SK').begins_with('FILE#')
-            )
-            
             # Populate files
-            for item in file_response.get('Items', []):
+            for item in file_items:
                 file_path = item['file_path']
                 content = item['content']
                 template.files[file_path] = content
@@ -256,26 +275,31 @@ class DynamoDBTemplateStore:
             bool: True if deletion was successful, False otherwise
         """
         try:
-            # Query all items for this template
-            response = self.table.query(
-                KeyConditionExpression=Key('PK').eq(f'TEMPLATE#{template_id}')
+            # Query all items for this template (keys only)
+            items = await collect(
+                self._executor, self.table.query,
+                KeyConditionExpression=Key('PK').eq(f'TEMPLATE#{template_id}'),
+                ProjectionExpression='PK, SK'
             )
             
-            if not response.get('Items'):
+            if not items:
                 logger.warning(f"Template {template_id} not found")
                 return False
             
             # Batch delete all items
-            with self.table.batch_writer() as batch:
-                for item in response['Items']:
-                    batch.delete_item(
-                        Key={
-                            'PK': item['PK'],
-                            'SK': item['SK']
-                        }
-                    )
-            
-            logger.info(f"Successfully deleted template {template_id} with {len(response['Items'])} items")
+            def delete():
+                with self.table.batch_writer() as batch:
+                    for item in items:
+                        batch.delete_item(
+                            Key={
+                                'PK': item['PK'],
+                                'SK': item['SK']
+                            }
+                        )
+            
+            await self._executor.run(delete)
+            
+            logger.info(f"Successfully deleted template {template_id} with {len(items)} items")
             return True
             
         except ClientError as e:
@@ -296,7 +320,8 @@ class DynamoDBTemplateStore:
             bool: True if template exists, False otherwise
         """
         try:
-            response = self.table.get_item(
+            response = await self._executor.run(
+                self.table.get_item,
                 Key={
                     'PK': f'TEMPLATE#{template_id}',
                     'SK': 'METADATA'
@@ -307,6 +332,27 @@ class DynamoDBTemplateStore:
             logger.error(f"Error checking if template {template_id} exists: {e}")
             return False
     
+    def _parse_templates(self, items: List[Dict]) -> List[ProjectTemplate]:
+        """Convert metadata items to ProjectTemplates, skipping unparsable ones."""
+        templates = []
+        for item in items:
+            try:
+                # Note: files are not loaded for list operations (performance optimization)
+                templates.append(self._metadata_item_to_template(item))
+            except Exception as e:
+                logger.warning(f"Failed to parse template item: {e}")
+        return templates
+    
+    def _listing_request(self, category: Optional[str]) -> Tuple[Callable, Dict]:
+        """Operation and parameters for a category (GSI1) or full listing."""
+        if category:
+            return self.table.query, {
+                'IndexName': 'GSI1',
+                'KeyConditionExpression': Key('GSI1PK').eq(f'CATEGORY#{category}'),
+                'ScanIndexForward': False  # Sort by created_at descending
+            }
+        return self.table.scan, {'FilterExpression': Attr('EntityType').eq('Template')}
+    
     async def list_templates(self, category: Optional[str] = None, limit: int = 100) -> List[ProjectTemplate]:
         """
         List all templates, optionally filtered by category.
@@ -318,43 +364,46 @@ class DynamoDBTemplateStore:
         Returns:
             List of ProjectTemplate objects (metadata only, no files)
         """
-        templates = []
+        return (await self.list_templates_page(category=category, limit=limit)).items
+    
+    async def list_templates_page(
+        self,
+        category: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page[ProjectTemplate]:
+        """
+        One page of templates, resumable with its next_cursor.
         
-        try:
-            if category:
-                # Query by category using GSI1
-                response = self.table.query(
-                    IndexName='GSI1',
-                    KeyConditionExpression=Key('GSI1PK').eq(f'CATEGORY#{category}'),
-                    Limit=limit,
-                    ScanIndexForward=False  # Sort by created_at descending
-                )
-            else:
-                # Scan for all templates (less efficient, but works)
-                response = self.table.scan(
-                    FilterExpression=Attr('EntityType').eq('Template'),
-                    Limit=limit
-                )
+        Reads as many DynamoDB pages as needed to fill `limit` (the full
+        listing is a filtered scan, so a single request may match few items).
+        
+        Args:
+            category: Optional category to filter by (uses GSI1)
+            limit: Maximum number of templates in the page
+            cursor: next_cursor of the previous page
             
-            # Convert items to ProjectTemplate objects
-            for item in response.get('Items', []):
-                try:
-                    template = self._metadata_item_to_template(item)
-                    # Note: files are not loaded for list operations (performance optimization)
-                    templates.append(template)
-                except Exception as e:
-                    logger.warning(f"Failed to parse template item: {e}")
-                    continue
+        Returns:
+            Page of ProjectTemplate objects (metadata only, no files)
+            
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        decode_cursor(cursor)
+        operation, params = self._listing_request(category)
+        try:
+            page = await fetch_page(self._executor, operation, limit, cursor, **params)
+            templates = self._parse_templates(page.items)
             
             logger.info(f"Listed {len(templates)} templates")
-            return templates
+            return Page(items=templates, next_cursor=page.next_cursor)
             
         except ClientError as e:
             logger.error(f"Failed to list templates: {e.response['Error']['Message']}")
-            return templates
+            return Page()
         except Exception as e:
             logger.error(f"Unexpected error listing templates: {e}", exc_info=True)
-            return templates
+            return Page()
     
     async def list_templates_by_tag(self, tag: str, limit: int = 100) -> List[ProjectTemplate]:
         """
@@ -371,14 +420,14 @@ class DynamoDBTemplateStore:
         
         try:
             # Query by tag using GSI2
-            response = self.table.query(
+            page = await fetch_page(
+                self._executor, self.table.query, limit,
                 IndexName='GSI2',
-                KeyConditionExpression=Key('GSI2PK').eq(f'TAG#{tag}'),
-                Limit=limit
+                KeyConditionExpression=Key('GSI2PK').eq(f'TAG#{tag}')
             )
             
             # Get template IDs from tag items
-            template_ids = [item['template_id'] for item in response.get('Items', [])]
+            template_ids = [item['template_id'] for item in page.items]
             
             # Batch get template metadata
             if template_ids:
@@ -404,43 +453,25 @@ class DynamoDBTemplateStore:
         Returns:
             List of ProjectTemplate objects
         """
-        templates = []
+        keys = [
+            {'PK': f'TEMPLATE#{tid}', 'SK': 'METADATA'}
+            for tid in template_ids
+        ]
         
         try:
-            # Prepare batch get request
-            keys = [
-                {'PK': f'TEMPLATE#{tid}', 'SK': 'METADATA'}
-                for tid in template_ids
-            ]
-            
-            # Batch get items (max 100 at a time)
-            for i in range(0, len(keys), 100):
-                batch_keys = keys[i:i+100]
-                response = self.dynamodb.batch_get_item(
-                    RequestItems={
-                        self.table_name: {
-                            'Keys': batch_keys
-                        }
-                    }
-                )
-                
-                # Convert items to ProjectTemplate objects
-                for item in response.get('Responses', {}).get(self.table_name, []):
-                    try:
-                        template = self._metadata_item_to_template(item)
-                        templates.append(template)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse template item: {e}")
-                        continue
-            
-            return templates
+            # Chunks of 100 read concurrently, unprocessed keys retried
+            items = await abatch_get_items(self._executor, self.dynamodb, self.table_name, keys)
+            return self._parse_templates(items)
             
+        except UnprocessedKeysError as e:
+            logger.error(f"Batch get left {len(e.keys)} templates unprocessed after retries")
+            return self._parse_templates(e.items)
         except ClientError as e:
             logger.error(f"Failed to batch get templates: {e.response['Error']['Message']}")
-            return templates
+            return []
         except Exception as e:
             logger.error(f"Unexpected error in batch get: {e}", exc_info=True)
-            return templates
+            return []
     
     async def search_templates(
         self, 
@@ -452,10 +483,12 @@ class DynamoDBTemplateStore:
         """
         Search templates by name, description, or tech stack.
         
+        All criteria are evaluated server-side, so `limit` counts matches.
+        
         Args:
             query: Search query string
             category: Optional category filter
-            tags: Optional list of tags to filter by
+            tags: Optional list of tags to filter by (any of them)
             limit: Maximum number of results to return
             
         Returns:
@@ -469,7 +502,6 @@ class DynamoDBTemplateStore:
             
             # Add text search conditions
             if query:
-                query_lower = query.lower()
                 filter_expr = filter_expr & (
                     Attr('name').contains(query) |
                     Attr('description').contains(query) |
@@ -480,27 +512,16 @@ class DynamoDBTemplateStore:
             if category:
                 filter_expr = filter_expr & Attr('category').eq(category)
             
-            # Execute scan with filters
-            response = self.table.scan(
-                FilterExpression=filter_expr,
-                Limit=limit
-            )
+            # Add tag filter
+            if tags:
+                tag_expr = Attr('tags').contains(tags[0])
+                for tag in tags[1:]:
+                    tag_expr = tag_expr | Attr('tags').contains(tag)
+                filter_expr = filter_expr & tag_expr
             
-            # Convert items to ProjectTemplate objects
-            for item in response.get('Items', []):
-                try:
-                    template = self._metadata_item_to_template(item)
-                    
-                    # Additional tag filtering (if specified)
-                    if tags:
-                        if any(tag in template.tags for tag in tags):
-                            templates.append(template)
-                    else:
-                        templates.append(template)
-                        
-                except Exception as e:
-                    logger.warning(f"Failed to parse template item: {e}")
-                    continue
+            # Execute scan with filters, reading pages until `limit` matches
+            page = await fetch_page(self._executor, self.table.scan, limit, FilterExpression=filter_expr)
+            templates = self._parse_templates(page.items)
             
             logger.info(f"Search found {len(templates)} templates matching query '{query}'")
             return templates
@@ -524,7 +545,8 @@ class DynamoDBTemplateStore:
             File content if found, None otherwise
         """
         try:
-            response = self.table.get_item(
+            response = await self._executor.run(
+                self.table.get_item,
                 Key={
                     'PK': f'TEMPLATE#{template_id}',
                     'SK': f'FILE#{file_path}'
@@ -555,12 +577,13 @@ class DynamoDBTemplateStore:
             List of file paths
         """
         try:
-            response = self.table.query(
+            items = await collect(
+                self._executor, self.table.query,
                 KeyConditionExpression=Key('PK').eq(f'TEMPLATE#{template_id}') & Key('SK').begins_with('FILE#'),
                 ProjectionExpression='file_path'
             )
             
-            file_paths = [item['file_path'] for item in response.get('Items', [])]
+            file_paths = [item['file_path'] for item in items]
             logger.info(f"Template {template_id} has {len(file_paths)} files")
             return file_paths
             
@@ -601,7 +624,8 @@ class DynamoDBTemplateStore:
             update_expr = "SET " + ", ".join(update_expr_parts)
             
             # Execute update
-            self.table.update_item(
+            await self._executor.run(
+                self.table.update_item,
                 Key={
                     'PK': f'TEMPLATE#{template_id}',
                     'SK': 'METADATA'
@@ -640,29 +664,15 @@ class DynamoDBTemplateStore:
                 for tid in template_ids
             ]
             
-            # Batch get items (max 100 at a time)
-            for i in range(0, len(keys), 100):
-                batch_keys = keys[i:i+100]
-                response = self.dynamodb.batch_get_item(
-                    RequestItems={
-                        self.table_name: {
-                            'Keys': batch_keys
-                        }
-                    }
-                )
-                
-                # Convert items to ProjectTemplate objects
-                for item in response.get('Responses', {}).get(self.table_name, []):
-                    try:
-                        template = self._metadata_item_to_template(item)
-                        templates.append(template)
-                    except Exception as e:
-                        logger.warning(f"Failed to parse template item: {e}")
-                        continue
+            # Batch get items (100 per request, unprocessed keys retried)
+            templates = self._parse_templates(batch_get_items(self.dynamodb, self.table_name, keys))
             
             logger.info(f"Batch loaded {len(templates)} templates")
             return templates
             
+        except UnprocessedKeysError as e:
+            logger.error(f"Batch get left {len(e.keys)} templates unprocessed after retries")
+            return self._parse_templates(e.items)
         except ClientError as e:
             logger.error(f"Failed to batch get templates: {e.response['Error']['Message']}")
             return templates
@@ -678,12 +688,13 @@ class DynamoDBTemplateStore:
             List of category names
         """
         try:
-            response = self.table.scan(
+            categories = set()
+            async for items in parallel_scan(
+                self._executor, self.table.scan, self.scan_segments,
                 FilterExpression=Attr('EntityType').eq('Template'),
                 ProjectionExpression='category'
-            )
-            
-            categories = list(set(item['category'] for item in response.get('Items', [])))
+            ):
+                categories.update(item['category'] for item in items)
             logger.info(f"Found {len(categories)} template categories")
             return sorted(categories)
             
@@ -702,15 +713,15 @@ class DynamoDBTemplateStore:
             List of tag names
         """
         try:
-            response = self.table.scan(
-                FilterExpression=Attr('EntityType').eq('Template'),
-                ProjectionExpression='tags'
-            )
-            
             # Flatten all tags
             all_tags = set()
-            for item in response.get('Items', []):
-                all_tags.update(item.get('tags', []))
+            async for items in parallel_scan(
+                self._executor, self.table.scan, self.scan_segments,
+                FilterExpression=Attr('EntityType').eq('Template'),
+                ProjectionExpression='tags'
+            ):
+                for item in items:
+                    all_tags.update(item.get('tags', []))
             
             logger.info(f"Found {len(all_tags)} unique tags")
             return sorted(list(all_tags))
@@ -15,8 +15,21 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from utils.metrics_registry import counter, gauge
+
 logger = logging.getLogger(__name__)
 
+# Scrapeable cache metrics
+CACHE_REQUESTS = counter(
+    "result_cache_requests_total", "Result cache lookups", ("result",)
+)
+CACHE_EVICTIONS = counter(
+    "result_cache_evictions_total", "Result cache entries evicted for space"
+)
+CACHE_ENTRIES = gauge(
+    "result_cache_entries", "Entries currently in the result cache"
+)
+
 
 # ============================================================================
 # Event System
@@ -98,6 +111,12 @@ class ResultCache:
         self.misses = 0
         self.evictions = 0
         
+        # Registry series (cached to keep lookups off the hot path)
+        self._hit_metric = CACHE_REQUESTS.labels("hit")
+        self._miss_metric = CACHE_REQUESTS.labels("miss")
+        self._evictions_metric = CACHE_EVICTIONS.labels()
+        self._entries_metric = CACHE_ENTRIES.labels()
+        
         logger.info(
             f"💾 ResultCache: Initialized "
             f"(ttl={ttl_seconds}s, max_size={max_size})"
@@ -145,6 +164,7 @@ class ResultCache:
             
             if age < self.ttl:
                 self.hits += 1
+                self._hit_metric.inc()
                 logger.info(
                     f"💾 Cache HIT: {key} "
                     f"(age: {age.total_seconds():.1f}s, hit_rate: {self.hit_rate():.1%})"
@@ -153,9 +173,11 @@ class ResultCache:
             else:
                 # Expired - remove from cache
                 del self.cache[key]
+                self._entries_metric.set(len(self.cache))
                 logger.debug(f"⏰ Cache EXPIRED: {key}")
         
         self.misses += 1
+        self._miss_metric.inc()
         logger.debug(f"❌ Cache MISS: {key} (hit_rate: {self.hit_rate():.1%})")
         return None
     
@@ -176,6 +198,7 @@ class ResultCache:
             )
             del self.cache[oldest_key]
             self.evictions += 1
+            self._evictions_metric.inc()
             logger.debug(
                 f"🗑️ Cache evicted oldest: {oldest_key} "
                 f"(total evictions: {self.evictions})"
@@ -186,6 +209,7 @@ class ResultCache:
             'result': result,
             'timestamp': datetime.now()
         }
+        self._entries_metric.set(len(self.cache))
         
         logger.info(
             f"💾 Cache SET: {key} "
@@ -205,6 +229,7 @@ class ResultCache:
         key = self._generate_key(task_data)
         if key in self.cache:
             del self.cache[key]
+            self._entries_metric.set(len(self.cache))
             logger.info(f"🗑️ Cache invalidated: {key}")
             return True
         return False
@@ -216,6 +241,7 @@ class ResultCache:
         self.hits = 0
         self.misses = 0
         self.evictions = 0
+        self._entries_metric.set(0)
         logger.info(f"🗑️ Cache cleared ({size} entries removed)")
     
     def hit_rate(self) -> float:
@@ -9,10 +9,12 @@ This module extends PipelineManager with:
 - UnifiedWorkerPool: Dev+Fix in one pool
 - PriorityAssigner: Critical-path-first processing
 - DependencyAnalyzer: Parallel batch execution with dependency resolution
+- FairTaskQueue: Weighted fair scheduling between tenants (users/projects/plans)
 """
 
 import asyncio
 import logging
+import time
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
@@ -26,9 +28,44 @@ from utils.enhanced_components import (
     ResultCache, PriorityAssigner, Event, EventType, TaskPriority
 )
 from utils.dependency_analyzer import DependencyAnalyzer, analyze_plan_dependencies
+from utils.fair_scheduler import FairTaskQueue, default_tenant_key
+from utils.tracing import SpanContext, current_context, traced, task_attributes
+from utils.budget_manager import budget_stage, get_budget_manager
+from utils.deadlines import with_deadline
 
 logger = logging.getLogger(__name__)
 
+# Default per-class queue-wait guarantee (seconds) for pipeline queues
+DEFAULT_MAX_QUEUE_WAIT = {
+    'dev': 120.0,
+    'fix': 120.0,
+    'qa': 120.0,
+    'deploy': 120.0
+}
+
+
+# Default per-class processing deadline (seconds); bounds LLM calls and retries
+DEFAULT_TASK_DEADLINES = {
+    'dev': 900.0,
+    'fix': 600.0,
+    'qa': 600.0,
+    'deploy': 900.0
+}
+
+
+def _task_deadline(manager, task: QueueTask, *args, **kwargs) -> Optional[float]:
+    """Seconds left for a pipeline task: its own deadline capped by the stage default."""
+    stage_deadline = manager.task_deadlines.get(task.task_type)
+    if task.deadline is None:
+        return stage_deadline
+    left = task.deadline - time.time()
+    return left if stage_deadline is None else min(left, stage_deadline)
+
+
+def _budget_project(manager, task: QueueTask, *args, **kwargs) -> str:
+    """Budget project for a pipeline task (same key as fair-scheduling tenants)."""
+    return default_tenant_key(task)
+
 
 class EnhancedPipelineManager(PipelineManager):
     """
@@ -41,6 +78,8 @@ class EnhancedPipelineManager(PipelineManager):
     - Event-driven routing with Dead Letter Queue
     - Unified dev+fix worker pool (better utilization)
     - Priority-based task scheduling
+    - Fair scheduling between tenants with per-tenant in-flight limits
+    - Priority aging and per-class max queue wait (no starvation)
     """
     
     def __init__(
@@ -63,7 +102,15 @@ class EnhancedPipelineManager(PipelineManager):
         scale_up_threshold: int = 10,
         scale_down_threshold: int = 2,
         # Event routing
-        max_retries: int = 3
+        max_retries: int = 3,
+        # Fair scheduling
+        enable_fair_scheduling: bool = True,
+        tenant_max_in_flight: Optional[int] = None,
+        # Starvation protection
+        priority_aging_rate: float = 0.05,
+        max_queue_wait: Optional[Dict[str, float]] = None,
+        # Deadlines
+        task_deadlines: Optional[Dict[str, float]] = None
     ):
         """
         Initialize enhanced pipeline manager.
@@ -83,6 +130,11 @@ class EnhancedPipelineManager(PipelineManager):
             scale_up_threshold: Queue size to scale up (default: 10)
             scale_down_threshold: Queue size to scale down (default: 2)
             max_retries: Max retry attempts (default: 3)
+            enable_fair_scheduling: Share workers fairly between tenants (default: True)
+            tenant_max_in_flight: Per-tenant in-flight limit per stage (default: unlimited)
+            priority_aging_rate: Priority levels gained per second of queue wait (default: 0.05)
+            max_queue_wait: Per-task-type max queue wait in seconds (default: DEFAULT_MAX_QUEUE_WAIT)
+            task_deadlines: Per-task-type processing deadline in seconds (default: DEFAULT_TASK_DEADLINES)
         """
         # Store config before calling super().__init__
         self.dev_workers_min = dev_workers_min
@@ -100,6 +152,19 @@ class EnhancedPipelineManager(PipelineManager):
             deploy_workers=deploy_workers
         )
         
+        # Fair scheduling and starvation protection for QA and Deploy
+        self.fair_scheduling_enabled = enable_fair_scheduling
+        self.tenant_max_in_flight = tenant_max_in_flight
+        self.priority_aging_rate = priority_aging_rate
+        self.max_queue_wait = dict(
+            DEFAULT_MAX_QUEUE_WAIT if max_queue_wait is None else max_queue_wait
+        )
+        self.task_deadlines = dict(
+            DEFAULT_TASK_DEADLINES if task_deadlines is None else task_deadlines
+        )
+        self.qa_queue = self._create_queue("QAQueue")
+        self.deploy_queue = self._create_queue("DeployQueue")
+        
         # Enhanced components
         self.cache_enabled = enable_cache
         self.circuit_breaker_enabled = enable_circuit_breaker
@@ -143,7 +208,7 @@ class EnhancedPipelineManager(PipelineManager):
         ) if enable_circuit_breaker else None
         
         # Unified dev+fix queue and pool (will replace dev_queue and fix_queue)
-        self.unified_queue = AsyncTaskQueue("UnifiedDevFixQueue")
+        self.unified_queue = self._create_queue("UnifiedDevFixQueue")
         self.unified_pool = None  # Initialized in start()
         
         # Dependency analyzer (Phase 2.1)
@@ -161,7 +226,23 @@ class EnhancedPipelineManager(PipelineManager):
             f"(dev:{dev_workers_min}-{dev_workers_max}, "
             f"qa:{qa_workers_min}-{qa_workers_max}, "
             f"cache:{enable_cache}, circuit_breaker:{enable_circuit_breaker}, "
-            f"dependency_analysis:{self.use_dependency_analysis})"
+            f"dependency_analysis:{self.use_dependency_analysis}, "
+            f"fair_scheduling:{enable_fair_scheduling})"
+        )
+    
+    def _create_queue(self, name: str) -> AsyncTaskQueue:
+        """Create a stage queue with the configured scheduling policy."""
+        if self.fair_scheduling_enabled:
+            return FairTaskQueue(
+                name,
+                max_in_flight_per_tenant=self.tenant_max_in_flight,
+                aging_rate=self.priority_aging_rate,
+                max_wait=self.max_queue_wait
+            )
+        return AsyncTaskQueue(
+            name,
+            aging_rate=self.priority_aging_rate,
+            max_wait=self.max_queue_wait
         )
     
     def _register_event_handlers(self):
@@ -366,6 +447,9 @@ class EnhancedPipelineManager(PipelineManager):
     # Enhanced Task Processing (with cache and circuit breakers)
     # ========================================================================
     
+    @traced("pipeline.dev", task_attributes)
+    @budget_stage("dev", _budget_project)
+    @with_deadline(_task_deadline)
     async def _process_dev_task_enhanced(self, task: QueueTask) -> Optional[QueueTask]:
         """
         Process dev task with caching and circuit breaker.
@@ -438,6 +522,9 @@ class EnhancedPipelineManager(PipelineManager):
             )
             raise
     
+    @traced("pipeline.fix", task_attributes)
+    @budget_stage("fix", _budget_project)
+    @with_deadline(_task_deadline)
     async def _process_fix_task_enhanced(self, task: QueueTask) -> Optional[QueueTask]:
         """
         Process fix task with circuit breaker.
@@ -558,6 +645,9 @@ class EnhancedPipelineManager(PipelineManager):
         
         return result
     
+    @traced("pipeline.qa", task_attributes)
+    @budget_stage("qa", _budget_project)
+    @with_deadline(_task_deadline)
     async def _process_qa_task_enhanced(self, task: QueueTask) -> Optional[QueueTask]:
         """
         Process QA task with circuit breaker and event routing.
@@ -672,6 +762,9 @@ class EnhancedPipelineManager(PipelineManager):
             )
             raise
     
+    @traced("pipeline.deploy", task_attributes)
+    @budget_stage("deploy", _budget_project)
+    @with_deadline(_task_deadline)
     async def _process_deploy_task_enhanced(self, task: QueueTask) -> None:
         """
         Process deploy task with circuit breaker.
@@ -875,6 +968,22 @@ class EnhancedPipelineManager(PipelineManager):
         
         logger.info("✅ EnhancedPipelineManager: Pipeline stopped")
     
+    async def wait_until_complete(self, check_interval: float = 0.5):
+        """
+        Wait until the unified, QA and deploy stages are all idle.
+
+        Events move tasks between stages, so a stage can refill after it
+        drained; completion requires every stage idle at the same check.
+
+        Args:
+            check_interval: How often to check (seconds)
+        """
+        logger.info("⏳ EnhancedPipelineManager: Waiting for pipeline to complete...")
+        queues = (self.unified_queue, self.qa_queue, self.deploy_queue)
+        while any(not queue.is_empty() or queue.in_progress_count() > 0 for queue in queues):
+            await asyncio.sleep(check_interval)
+        logger.info("✅ EnhancedPipelineManager: Pipeline completed all tasks")
+
     # ========================================================================
     # Task Submission with Priority Assignment
     # ========================================================================
@@ -886,7 +995,8 @@ class EnhancedPipelineManager(PipelineManager):
         websocket,
         project_desc: str,
         plan: Dict[str, Any],
-        priority: Optional[int] = None
+        priority: Optional[int] = None,
+        tenant_id: Optional[str] = None
     ):
         """
         Submit dev task with automatic priority assignment.
@@ -898,11 +1008,14 @@ class EnhancedPipelineManager(PipelineManager):
             project_desc: Project description
             plan: Full plan
             priority: Manual priority (None = auto-assign)
+            tenant_id: Owning tenant for fair scheduling (None = derive from plan)
         """
         # Auto-assign priority if not provided
         if priority is None:
             priority = self.priority_assigner.assign_priority(subtask)
         
+        plan_id = (plan.get("id") or plan.get("plan_id")) if isinstance(plan, dict) else None
+        
         task = QueueTask(
             task_id=task_id,
             task_type="dev",
@@ -911,9 +1024,14 @@ class EnhancedPipelineManager(PipelineManager):
                 "websocket": websocket,
                 "project_desc": project_desc,
                 "plan": plan,
-                "priority": priority
+                "priority": priority,
+                # Carried through QA/fix/deploy payloads for fair scheduling
+                "tenant_id": tenant_id
             },
-            priority=priority
+            priority=priority,
+            tenant_id=tenant_id,
+            # Join the plan's trace when submitted outside any span
+            trace_parent=current_context() or SpanContext.for_key(plan_id or task_id)
         )
         
         await self.unified_queue.put(task)
@@ -932,7 +1050,8 @@ class EnhancedPipelineManager(PipelineManager):
         self,
         plan: Dict[str, Any],
         websocket,
-        project_desc: str
+        project_desc: str,
+        tenant_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Analyze plan dependencies and submit tasks in dependency-ordered batches.
@@ -941,6 +1060,7 @@ class EnhancedPipelineManager(PipelineManager):
             plan: Complete plan dictionary with tasks
             websocket: WebSocket for updates
             project_desc: Project description
+            tenant_id: Owning tenant for fair scheduling (None = plan ID)
             
         Returns:
             Analysis statistics
@@ -989,7 +1109,8 @@ class EnhancedPipelineManager(PipelineManager):
             self.dependency_batches,
             websocket,
             project_desc,
-            plan
+            plan,
+            tenant_id=tenant_id
         )
         
         return {
@@ -1003,7 +1124,8 @@ class EnhancedPipelineManager(PipelineManager):
         batches: List,
         websocket,
         project_desc: str,
-        plan: Dict[str, Any]
+        plan: Dict[str, Any],
+        tenant_id: Optional[str] = None
     ):
         """
         Submit tasks in dependency-ordered batches.
@@ -1013,6 +1135,7 @@ class EnhancedPipelineManager(PipelineManager):
             websocket: WebSocket for updates
             project_desc: Project description
             plan: Full plan dictionary
+            tenant_id: Owning tenant for fair scheduling
         """
         for batch_idx, batch in enumerate(batches, 1):
             logger.info(
@@ -1045,7 +1168,8 @@ class EnhancedPipelineManager(PipelineManager):
                         websocket=websocket,
                         project_desc=project_desc,
                         plan=plan,
-                        priority=priority
+                        priority=priority,
+                        tenant_id=tenant_id
                     )
                 )
             
@@ -1116,7 +1240,17 @@ class EnhancedPipelineManager(PipelineManager):
                 'enabled': self.use_dependency_analysis,
                 'batches': len(self.dependency_batches),
                 'analyzer_stats': self.dependency_analyzer.get_stats()
-            }
+            },
+            'fair_scheduling': {
+                'enabled': self.fair_scheduling_enabled,
+                'tenant_max_in_flight': self.tenant_max_in_flight,
+                'unified': (
+                    self.unified_queue.get_tenant_stats()
+                    if isinstance(self.unified_queue, FairTaskQueue)
+                    else {}
+                )
+            },
+            'budget': get_budget_manager().get_stats()
         }
         
         return enhanced_stats
@@ -0,0 +1,378 @@
+"""
+Fair scheduling for pipeline queues.
+
+This module provides a drop-in replacement for AsyncTaskQueue that shares
+workers fairly between tenants (users / projects / plans):
+- Per-tenant priority sub-queues (priority order preserved within a tenant,
+  with optional priority aging and per-class max-wait, see AgingHeap)
+- Weighted deficit round-robin (DRR) between tenants
+- Optional per-tenant in-flight limits
+- Per-tenant statistics
+
+A tenant that submits a 200-task plan no longer starves a tenant that
+submits a single interactive task: the small tenant is served within one
+round of the active tenants.
+"""
+
+import asyncio
+import logging
+import math
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from utils.task_queue import AgingHeap, AsyncTaskQueue, QueueTask
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_TENANT = "default"
+
+
+def default_tenant_key(task: QueueTask) -> str:
+    """
+    Derive tenant ID from a queue task.
+
+    Lookup order: explicit task.tenant_id, payload tenant/owner/user ID,
+    then the plan/project ID carried by pipeline payloads.
+
+    Args:
+        task: Queue task
+
+    Returns:
+        Tenant identifier (DEFAULT_TENANT if none can be derived)
+    """
+    if task.tenant_id:
+        return task.tenant_id
+
+    payload = task.payload if isinstance(task.payload, dict) else {}
+    for key in ('tenant_id', 'owner_id', 'user_id', 'project_id'):
+        value = payload.get(key)
+        if value:
+            return str(value)
+
+    plan = payload.get('plan')
+    if isinstance(plan, dict):
+        plan_id = plan.get('id') or plan.get('plan_id')
+        if plan_id:
+            return str(plan_id)
+
+    return DEFAULT_TENANT
+
+
+class _TenantState:
+    """Per-tenant scheduling state."""
+
+    __slots__ = ('tenant_id', 'heap', 'weight', 'deficit', 'in_flight', 'max_in_flight',
+                 'enqueued', 'dequeued')
+
+    def __init__(self, tenant_id: str, weight: float, max_in_flight: Optional[int], heap: AgingHeap):
+        self.tenant_id = tenant_id
+        self.heap = heap
+        self.weight = weight
+        self.deficit = 0.0
+        self.in_flight = 0
+        self.max_in_flight = max_in_flight
+        self.enqueued = 0
+        self.dequeued = 0
+
+    def is_eligible(self) -> bool:
+        """Tenant has pending work and is below its in-flight limit."""
+        if not self.heap:
+            return False
+        return self.max_in_flight is None or self.in_flight < self.max_in_flight
+
+
+class FairPriorityQueue(asyncio.Queue):
+    """
+    asyncio.Queue with per-tenant sub-queues and weighted deficit round-robin.
+
+    Items are (priority, QueueTask) tuples, the same shape AsyncTaskQueue
+    puts into asyncio.PriorityQueue. Like PriorityQueue, this class only
+    overrides the storage hooks (_init/_put/_get), so blocking, maxsize and
+    join()/task_done() semantics come from asyncio.Queue.
+
+    Each task costs one unit; a tenant with weight w receives up to w
+    dequeues per round while it has eligible work.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        tenant_key: Callable[[QueueTask], str] = default_tenant_key,
+        default_weight: float = 1.0,
+        max_in_flight_per_tenant: Optional[int] = None,
+        aging_rate: float = 0.0,
+        max_wait: Optional[Dict[str, float]] = None
+    ):
+        self._tenant_key = tenant_key
+        self._default_weight = default_weight
+        self._default_max_in_flight = max_in_flight_per_tenant
+        self._aging_rate = aging_rate
+        self._max_wait = dict(max_wait or {})
+        super().__init__(maxsize)
+
+    # ------------------------------------------------------------------
+    # asyncio.Queue storage hooks
+    # ------------------------------------------------------------------
+
+    def _init(self, maxsize):
+        self._tenants: Dict[str, _TenantState] = {}
+        self._active: Deque[str] = deque()  # Round-robin ring of tenants with pending work
+        self._pending = 0
+
+    def _put(self, item):
+        priority, task = item
+        tenant_id = task.tenant_id or self._tenant_key(task)
+        task.tenant_id = tenant_id
+
+        state = self._get_state(tenant_id)
+        was_idle = not state.heap
+
+        state.heap.push(priority, item, task.task_type)
+        state.enqueued += 1
+        self._pending += 1
+
+        if was_idle:
+            state.deficit = 0.0
+            self._active.append(tenant_id)
+
+    def _get(self):
+        # Visit each active tenant at most twice: once to top up the deficit,
+        # once to spend it. Ineligible tenants (at in-flight limit) are skipped.
+        for _ in range(2 * len(self._active)):
+            tenant_id = self._active[0]
+            state = self._tenants[tenant_id]
+
+            if not state.is_eligible():
+                self._active.rotate(-1)
+                continue
+
+            if state.deficit < 1.0:
+                state.deficit += state.weight
+                if state.deficit < 1.0:
+                    self._active.rotate(-1)
+                    continue
+
+            return self._serve_front(state)
+
+        # Weights below 0.5 need more than two top-ups to reach one unit:
+        # add the rounds it takes the closest eligible tenant in one step
+        eligible = [self._tenants[t] for t in self._active if self._tenants[t].is_eligible()]
+        if not eligible:
+            raise asyncio.QueueEmpty
+
+        rounds = min(math.ceil((1.0 - state.deficit) / state.weight) for state in eligible)
+        for state in eligible:
+            state.deficit += rounds * state.weight
+
+        # First tenant in ring order that can spend (float rounding aside)
+        state = max(eligible, key=lambda s: s.deficit >= 1.0 - 1e-9)
+        while self._active[0] != state.tenant_id:
+            self._active.rotate(-1)
+        return self._serve_front(state)
+
+    def _serve_front(self, state: _TenantState):
+        """Dequeue one item from the tenant at the front of the ring."""
+        item = state.heap.pop()
+        state.deficit = max(state.deficit - 1.0, 0.0)
+        state.dequeued += 1
+        state.in_flight += 1
+        self._pending -= 1
+
+        if not state.heap:
+            # Tenant drained: leave the ring and forfeit leftover credit
+            self._active.popleft()
+            state.deficit = 0.0
+        elif state.deficit < 1.0:
+            self._active.rotate(-1)
+
+        return item
+
+    def qsize(self) -> int:
+        return self._pending
+
+    def empty(self) -> bool:
+        # "Empty" from a consumer's point of view: nothing is dispatchable.
+        # Work held back by in-flight limits waits for release().
+        return not any(self._tenants[t].is_eligible() for t in self._active)
+
+    # ------------------------------------------------------------------
+    # Tenant management
+    # ------------------------------------------------------------------
+
+    def _get_state(self, tenant_id: str) -> _TenantState:
+        state = self._tenants.get(tenant_id)
+        if state is None:
+            state = _TenantState(
+                tenant_id,
+                self._default_weight,
+                self._default_max_in_flight,
+                AgingHeap(self._aging_rate, self._max_wait)
+            )
+            self._tenants[tenant_id] = state
+        return state
+
+    def set_weight(self, tenant_id: str, weight: float):
+        """Set scheduling weight for a tenant (share is proportional to weight)."""
+        if weight <= 0:
+            raise ValueError("Tenant weight must be positive")
+        self._get_state(tenant_id).weight = weight
+
+    def set_max_in_flight(self, tenant_id: str, limit: Optional[int]):
+        """Set in-flight limit for a tenant (None = unlimited)."""
+        state = self._get_state(tenant_id)
+        state.max_in_flight = limit
+        if state.is_eligible():
+            self._wakeup_next(self._getters)
+
+    def release(self, tenant_id: Optional[str]):
+        """
+        Release one in-flight slot for a tenant.
+
+        Wakes a waiting consumer if the tenant still has pending work.
+        """
+        state = self._tenants.get(tenant_id) if tenant_id else None
+        if state is None or state.in_flight == 0:
+            return
+
+        state.in_flight -= 1
+        if state.is_eligible():
+            self._wakeup_next(self._getters)
+
+    @property
+    def deadline_promotions(self) -> int:
+        """Number of tasks served early because they exceeded max_wait."""
+        return sum(state.heap.deadline_promotions for state in self._tenants.values())
+
+    def remove_tenant_pending(self, tenant_id: str) -> int:
+        """
+        Drop all pending tasks of a tenant.
+
+        Returns:
+            Number of tasks removed
+        """
+        state = self._tenants.get(tenant_id)
+        if state is None or not state.heap:
+            return 0
+
+        count = len(state.heap)
+        state.heap.clear()
+        state.deficit = 0.0
+        self._pending -= count
+        self._active.remove(tenant_id)
+        for _ in range(count):
+            self.task_done()
+        return count
+
+    def tenant_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-tenant pending/in-flight/throughput counters."""
+        return {
+            tenant_id: {
+                'pending': len(state.heap),
+                'in_flight': state.in_flight,
+                'weight': state.weight,
+                'max_in_flight': state.max_in_flight,
+                'enqueued': state.enqueued,
+                'dequeued': state.dequeued
+            }
+            for tenant_id, state in self._tenants.items()
+        }
+
+
+class FairTaskQueue(AsyncTaskQueue):
+    """
+    AsyncTaskQueue that schedules fairly between tenants.
+
+    Drop-in replacement for AsyncTaskQueue: WorkerPool and
+    AutoScalingWorkerPool consume it unchanged. In-flight slots are
+    released when a task is marked done or re-queued for retry.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_size: int = 0,
+        tenant_key: Callable[[QueueTask], str] = default_tenant_key,
+        default_weight: float = 1.0,
+        max_in_flight_per_tenant: Optional[int] = None,
+        aging_rate: float = 0.0,
+        max_wait: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize fair task queue.
+
+        Args:
+            name: Queue name for logging and identification
+            max_size: Maximum queue size (0 = unlimited)
+            tenant_key: Function mapping a QueueTask to its tenant ID
+            default_weight: Scheduling weight for new tenants
+            max_in_flight_per_tenant: Default per-tenant in-flight limit (None = unlimited)
+            aging_rate: Priority levels gained per second of queue wait (0 = no aging)
+            max_wait: Per-task-type maximum queue wait in seconds
+        """
+        super().__init__(name, max_size, aging_rate=aging_rate, max_wait=max_wait)
+        self.queue = FairPriorityQueue(
+            maxsize=max_size,
+            tenant_key=tenant_key,
+            default_weight=default_weight,
+            max_in_flight_per_tenant=max_in_flight_per_tenant,
+            aging_rate=aging_rate,
+            max_wait=max_wait
+        )
+
+        logger.info(
+            f"⚖️ {self.name}: Fair scheduling enabled "
+            f"(weight={default_weight}, max_in_flight={max_in_flight_per_tenant})"
+        )
+
+    def set_tenant_weight(self, tenant_id: str, weight: float):
+        """Set scheduling weight for a tenant."""
+        self.queue.set_weight(tenant_id, weight)
+
+    def set_tenant_limit(self, tenant_id: str, max_in_flight: Optional[int]):
+        """Set in-flight limit for a tenant (None = unlimited)."""
+        self.queue.set_max_in_flight(tenant_id, max_in_flight)
+
+    def task_done(self, task_id: str, success: bool = True, processing_time: Optional[float] = None):
+        """Mark task as completed and release its tenant's in-flight slot."""
+        task = self.in_progress.get(task_id)
+        super().task_done(task_id, success=success, processing_time=processing_time)
+        if task is not None:
+            self.queue.release(task.tenant_id)
+
+    def task_retry(self, task: QueueTask) -> bool:
+        """Retry a failed task, releasing its in-flight slot before re-enqueue."""
+        if task.retries + 1 <= task.max_retries and task.task_id in self.in_progress:
+            self.queue.release(task.tenant_id)
+        return super().task_retry(task)
+
+    def clear_tenant(self, tenant_id: str) -> int:
+        """
+        Clear pending tasks for one tenant (does not affect in-progress tasks).
+
+        Returns:
+            Number of tasks removed
+        """
+        count = self.queue.remove_tenant_pending(tenant_id)
+        self._update_depth()
+        logger.warning(f"🗑️ {self.name}: Cleared {count} pending tasks for tenant {tenant_id}")
+        return count
+
+    def clear(self):
+        """Clear all pending tasks (does not affect in-progress tasks)."""
+        count = sum(
+            self.queue.remove_tenant_pending(tenant_id)
+            for tenant_id in list(self.queue.tenant_stats())
+        )
+        self._update_depth()
+        logger.warning(f"🗑️ {self.name}: Cleared {count} pending tasks")
+
+    def get_tenant_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-tenant scheduling statistics."""
+        return self.queue.tenant_stats()
+
+    def get_stats(self) -> dict:
+        """Get queue statistics including per-tenant breakdown."""
+        stats = super().get_stats()
+        stats['tenants'] = self.get_tenant_stats()
+        return stats
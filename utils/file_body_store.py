@@ -0,0 +1,236 @@
+"""
+Compressed, content-addressed S3 storage for large file bodies.
+
+Small files stay inline in their DynamoDB FILE# item. Larger ones are
+compressed (gzip unless zstd is configured) and stored in S3 under a key derived from their SHA-256, and the item keeps
+only a pointer:
+
+    body_bucket, body_key, body_codec, stored_size   (+ content_hash, size)
+
+Identical bodies share one object, so re-saving a file that another
+project or version already uploaded costs a HEAD request, not a PUT.
+Objects are never deleted with a project, since other items may point
+at them.
+
+Configuration (environment):
+- FILE_BODY_BUCKET: Bucket for offloaded bodies (falls back to
+  S3_BUCKET_NAME; offloading is off when neither is set)
+- FILE_INLINE_MAX_BYTES: Largest body kept inline (default: 32768)
+- FILE_BODY_CODEC: "gzip" (default) or "zstd". gzip is the default because
+  the Lambda agent workers read these bodies too (lambda/shared/python/
+  file_bodies.py); zstd needs the zstandard package on every reader.
+"""
+
+import os
+import gzip
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+
+import boto3
+from botocore.exceptions import ClientError
+
+from utils.dynamodb_executor import DynamoDBExecutor, get_dynamodb_executor
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODEC_EXTENSIONS = {"zstd": "zst", "gzip": "gz"}
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """Compress bytes with the named codec."""
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd codec requires the zstandard package")
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Decompress bytes written with the named codec."""
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd codec requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def is_offloaded(item: Dict) -> bool:
+    """Whether a FILE# item points at an S3 body instead of holding content."""
+    return "body_key" in item and "content" not in item
+
+
+class FileBodyStore:
+    """
+    Size-threshold policy and S3 storage for file bodies.
+
+    Blocking S3 calls run on the shared AWS executor, so uploads and
+    downloads of many bodies proceed concurrently.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        region: Optional[str] = None,
+        inline_max_bytes: int = 32 * 1024,
+        codec: Optional[str] = None,
+        prefix: str = "file-bodies/",
+        executor: Optional[DynamoDBExecutor] = None
+    ):
+        """
+        Initialize file body store.
+
+        Args:
+            bucket: S3 bucket for offloaded bodies
+            region: AWS region (defaults to env var AWS_REGION or us-east-1)
+            inline_max_bytes: Largest UTF-8 body kept inline in DynamoDB
+            codec: "gzip" (default) or "zstd"
+            prefix: Key prefix for body objects
+            executor: Executor for blocking calls (defaults to the global one)
+        """
+        self.bucket = bucket
+        self.inline_max_bytes = inline_max_bytes
+        self.codec = codec or "gzip"
+        if self.codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown codec: {self.codec}")
+        self.prefix = prefix
+        self._executor = executor or get_dynamodb_executor()
+
+        self.s3 = boto3.client(
+            "s3",
+            region_name=region or os.getenv("AWS_REGION", "us-east-1"),
+            config=self._executor.client_config
+        )
+
+        logger.info(
+            f"📦 FileBodyStore: Offloading bodies over {inline_max_bytes} bytes "
+            f"to s3://{bucket}/{prefix} ({self.codec})"
+        )
+
+    def should_offload(self, content: str) -> bool:
+        """Whether a body is too large to keep inline."""
+        # Cheap bound first: UTF-8 uses at most 4 bytes per character
+        if len(content) * 4 <= self.inline_max_bytes:
+            return False
+        return len(content.encode("utf-8")) > self.inline_max_bytes
+
+    def key_for(self, content_hash: str) -> str:
+        """Content-addressed object key for a body."""
+        return f"{self.prefix}{content_hash[:2]}/{content_hash}.{CODEC_EXTENSIONS[self.codec]}"
+
+    # ========================================================================
+    # Blocking Operations
+    # ========================================================================
+
+    def put(self, content: str, content_hash: str) -> Dict:
+        """
+        Store a body (blocking) unless an identical one already exists.
+
+        Args:
+            content: File content
+            content_hash: SHA-256 hex digest of the UTF-8 content
+
+        Returns:
+            Pointer attributes for the FILE# item
+        """
+        key = self.key_for(content_hash)
+        try:
+            head = self.s3.head_object(Bucket=self.bucket, Key=key)
+            stored_size = head["ContentLength"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("404", "NoSuchKey", "NotFound"):
+                raise
+            body = compress(content.encode("utf-8"), self.codec)
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=key,
+                Body=body,
+                ContentType="application/octet-stream",
+                Metadata={"codec": self.codec, "sha256": content_hash}
+            )
+            stored_size = len(body)
+
+        return {
+            "body_bucket": self.bucket,
+            "body_key": key,
+            "body_codec": self.codec,
+            "stored_size": stored_size
+        }
+
+    def get(self, item: Dict) -> str:
+        """
+        Read the body a FILE# item points at (blocking).
+
+        Raises:
+            ValueError: If the body does not match the item's content_hash
+        """
+        response = self.s3.get_object(Bucket=item.get("body_bucket", self.bucket), Key=item["body_key"])
+        content = decompress(response["Body"].read(), item.get("body_codec", "gzip")).decode("utf-8")
+        expected = item.get("content_hash")
+        if expected and hashlib.sha256(content.encode("utf-8")).hexdigest() != expected:
+            raise ValueError(f"Body {item['body_key']} does not match its content hash")
+        return content
+
+    # ========================================================================
+    # Concurrent Operations
+    # ========================================================================
+
+    async def put_many(self, files: Dict[str, Tuple[str, str]]) -> Dict[str, Dict]:
+        """
+        Store bodies concurrently.
+
+        Args:
+            files: file_path -> (content, content_hash)
+
+        Returns:
+            file_path -> pointer attributes
+        """
+        paths = list(files)
+        pointers = await asyncio.gather(*(
+            self._executor.run(self.put, *files[path]) for path in paths
+        ))
+        return dict(zip(paths, pointers))
+
+    async def get_many(self, items: Dict[str, Dict]) -> Dict[str, str]:
+        """
+        Read bodies concurrently.
+
+        Args:
+            items: file_path -> FILE# item with a body pointer
+
+        Returns:
+            file_path -> content
+        """
+        paths = list(items)
+        bodies = await asyncio.gather(*(self._executor.run(self.get, items[path]) for path in paths))
+        return dict(zip(paths, bodies))
+
+
+_file_body_store: Optional[FileBodyStore] = None
+
+
+def get_file_body_store() -> Optional[FileBodyStore]:
+    """Get or create the global file body store, or None when no bucket is configured."""
+    global _file_body_store
+    if _file_body_store is None:
+        bucket = os.getenv("FILE_BODY_BUCKET") or os.getenv("S3_BUCKET_NAME")
+        if not bucket:
+            return None
+        _file_body_store = FileBodyStore(
+            bucket=bucket,
+            inline_max_bytes=int(os.getenv("FILE_INLINE_MAX_BYTES", str(32 * 1024))),
+            codec=os.getenv("FILE_BODY_CODEC") or None
+        )
+    return _file_body_store
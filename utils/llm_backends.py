@@ -0,0 +1,138 @@
+"""
+Pluggable model backends for LLMClient.
+
+This module provides:
+- LLMBackend: Interface LLMClient uses to obtain model instances
+- GeminiBackend: google.generativeai (the production backend)
+- register_backend/create_backend: Select a backend by name (LLM_BACKEND),
+  optionally recording its responses for replay (LLM_RECORD_TO)
+
+A model instance only needs the subset of the Gemini SDK that LLMClient
+uses: `await model.generate_content_async(prompt)` returning an object with
+`.text` (and optionally `.usage_metadata`), and with `stream=True` an async
+iterable of chunks with `.text`.
+"""
+
+import os
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackend:
+    """
+    Base class for model backends.
+
+    Attributes:
+        name: Backend name (used in logs and stats)
+        min_request_interval: Minimum seconds between streaming requests
+        max_concurrent_requests: Concurrent streaming requests allowed
+        api_errors: Provider API exception types (logged as API errors on retry)
+    """
+
+    name = "base"
+    min_request_interval = 0.0
+    max_concurrent_requests = 1
+    api_errors: Tuple[Type[BaseException], ...] = ()
+
+    def create_model(self, model_name: str, temperature: Optional[float] = None) -> Any:
+        """
+        Create a model instance.
+
+        Args:
+            model_name: Model identifier
+            temperature: Sampling temperature (None = backend default)
+
+        Returns:
+            Object exposing generate_content_async(prompt, stream=False)
+        """
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics."""
+        return {"backend": self.name}
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via google.generativeai."""
+
+    name = "gemini"
+    # Conservative limits to prevent "too_many_pings" errors
+    min_request_interval = 5.0
+    max_concurrent_requests = 1
+
+    def __init__(self, api_key: str):
+        """
+        Initialize backend.
+
+        Args:
+            api_key: Gemini API key
+        """
+        import google.generativeai as genai
+        from google.api_core.exceptions import GoogleAPICallError
+
+        self._genai = genai
+        self.api_errors = (GoogleAPICallError,)
+        self.api_key = api_key
+        genai.configure(api_key=api_key)
+
+    def create_model(self, model_name: str, temperature: Optional[float] = None) -> Any:
+        """Create a Gemini GenerativeModel."""
+        config = self._genai.GenerationConfig(temperature=temperature) if temperature else None
+        return self._genai.GenerativeModel(model_name, generation_config=config)
+
+
+def _create_gemini() -> LLMBackend:
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("⚠️ Missing environment variables: GEMINI_API_KEY")
+    return GeminiBackend(api_key)
+
+
+def _create_simulator() -> LLMBackend:
+    from utils.llm_simulator import SimulatorBackend, SimulatorConfig
+    return SimulatorBackend(SimulatorConfig.from_env())
+
+
+_BACKENDS: Dict[str, Callable[[], LLMBackend]] = {
+    "gemini": _create_gemini,
+    "simulator": _create_simulator,
+}
+
+
+def register_backend(name: str, factory: Callable[[], LLMBackend]):
+    """
+    Register a backend factory.
+
+    Args:
+        name: Backend name (selectable via LLM_BACKEND)
+        factory: Callable returning a configured backend
+    """
+    _BACKENDS[name.lower()] = factory
+
+
+def create_backend(name: Optional[str] = None) -> LLMBackend:
+    """
+    Create a backend by name.
+
+    Args:
+        name: Backend name (default: LLM_BACKEND env var, else "gemini")
+
+    Returns:
+        Configured backend
+
+    Raises:
+        ValueError: If the backend is unknown or misconfigured
+    """
+    name = (name or os.getenv("LLM_BACKEND", "gemini")).lower()
+    factory = _BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown LLM backend '{name}' (available: {', '.join(sorted(_BACKENDS))})")
+    backend = factory()
+    record_to = os.getenv("LLM_RECORD_TO")
+    if record_to:
+        from utils.llm_simulator import RecordingBackend
+        backend = RecordingBackend(backend, record_to)
+    logger.info(f"🔌 Using LLM backend: {backend.name}")
+    return backend
@@ -7,12 +7,21 @@ import os
 import json
 import logging
 import asyncio
+import hashlib
+import random
+import re
 import time
-from typing import Optional, Callable, Dict, Any, AsyncGenerator
+from contextlib import aclosing
+from typing import Optional, Callable, Dict, Any, AsyncGenerator, AsyncIterator, Awaitable, List, Tuple, TypeVar
 from dotenv import load_dotenv
-import google.generativeai as genai
 from asyncio import Lock, Semaphore
-from google.api_core.exceptions import GoogleAPICallError
+from utils.metrics_registry import counter, histogram, LLM_BUCKETS
+from utils.tracing import current_span, traced
+from utils.token_counter import get_token_counter, CHARS_PER_TOKEN
+from utils.budget_manager import get_budget_manager, current_scope
+from utils.deadlines import deadline_scope, remaining, resolve_deadline, time_left
+from utils.quantile_sketch import RollingHistogram
+from utils.llm_backends import LLMBackend, create_backend
 
 # Load .env variables
 load_dotenv()
@@ -21,40 +30,323 @@ MODEL = os.getenv("MODEL", "gemini-2.5-flash")
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+T = TypeVar("T")
+
+# Retry backoff: exponential with equal jitter, capped
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+# Hedging: a second request is sent when the first has produced no first
+# token after the model's recent p95 (needs HEDGE_MIN_SAMPLES observations),
+# at most for HEDGE_MAX_RATIO of requests
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.5
+HEDGE_MAX_RATIO = 0.1
+HEDGE_WINDOW_SECONDS = 300
+
+# Scrapeable LLM metrics (mode is "single" or "stream")
+LLM_REQUESTS = counter(
+    "llm_requests_total", "LLM requests by final outcome", ("model", "mode", "outcome")
+)
+LLM_RETRIES = counter(
+    "llm_retries_total", "Failed LLM attempts that were retried", ("model", "mode")
+)
+LLM_LATENCY = histogram(
+    "llm_request_duration_seconds", "Duration of successful LLM attempts",
+    ("model", "mode"), buckets=LLM_BUCKETS
+)
+LLM_TTFT = histogram(
+    "llm_time_to_first_token_seconds", "Time from stream request to first chunk",
+    ("model",), buckets=LLM_BUCKETS
+)
+LLM_TOKENS = counter(
+    "llm_tokens_total", "LLM tokens by direction (estimated when usage is unavailable)",
+    ("model", "direction")
+)
+LLM_COALESCED = counter(
+    "llm_coalesced_requests_total", "LLM requests served by an identical in-flight call", ("mode",)
+)
+LLM_HEDGES = counter(
+    "llm_hedged_requests_total", "Hedge requests sent and which request won", ("model", "mode", "winner")
+)
+
+
+def _record_token_usage(model: str, response: Any, prompt_chars: int, response_chars: int,
+                        call_meta: Dict[str, Any]):
+    """Record reported token usage (or a char estimate) in the token counter and metrics."""
+    usage = get_token_counter().add_from_response(
+        response,
+        agent=call_meta.get("agent"),
+        prompt_name=call_meta.get("prompt_name"),
+        model=model,
+        project_id=call_meta.get("project_id") or call_meta.get("plan_id") or current_scope()[0],
+        prompt_chars=prompt_chars,
+        response_chars=response_chars
+    )
+    LLM_TOKENS.labels(model, "prompt").inc(usage.prompt_tokens)
+    LLM_TOKENS.labels(model, "completion").inc(usage.response_tokens)
+    LLM_TOKENS.labels(model, "cached").inc(usage.cached_tokens)
+    get_budget_manager().record(usage.total_tokens, project=call_meta.get("project_id"),
+                                stage=call_meta.get("stage"))
+
+def _llm_span_attributes(client, user_prompt, system_prompt=None, model=None, *args, metadata=None, **kwargs):
+    """Span attributes for an LLMClient call."""
+    call_meta = metadata or {}
+    return {
+        "llm.model": model or client.default_model,
+        "agent": call_meta.get("agent") or "",
+        "prompt_name": call_meta.get("prompt_name") or ""
+    }
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Server-requested retry delay (Retry-After header or Gemini retry_delay), if any."""
+    value = getattr(error, "retry_after", None)
+    if value is not None:
+        return float(value)
+
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    header = headers.get("Retry-After") or headers.get("retry-after")
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+
+    # Gemini 429s carry "retry_delay { seconds: N }" or "Please retry in N.Ns"
+    match = re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)", str(error)) or \
+        re.search(r"retry in ([\d.]+)\s*s", str(error), re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+def _backoff_delay(attempt: int, error: BaseException) -> float:
+    """Retry delay: Retry-After when given, else capped exponential backoff with equal jitter."""
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        return retry_after
+
+    error_str = str(error)
+    is_503_error = "503" in error_str or "Connection reset" in error_str or "IOCP" in error_str
+    ceiling = min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt) * (3 if is_503_error else 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+async def _open_stream(model_instance: Any, full_prompt: str) -> Tuple[Any, AsyncIterator, Any]:
+    """Start a streaming request and wait for its first chunk (None if the stream is empty)."""
+    stream = await model_instance.generate_content_async(full_prompt, stream=True)
+    iterator = stream.__aiter__()
+    try:
+        first = await iterator.__anext__()
+    except StopAsyncIteration:
+        first = None
+    return stream, iterator, first
+
+async def _iter_stream(first: Any, iterator: AsyncIterator,
+                       deadline_at: Optional[float] = None) -> AsyncGenerator[Any, None]:
+    """Yield the first chunk, then the rest, each wait bounded by deadline_at."""
+    if first is None:
+        return
+    yield first
+    while True:
+        try:
+            async with asyncio.timeout(time_left(deadline_at)):
+                chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        yield chunk
+
+def _request_key(mode: str, full_prompt: str, model: str, temperature: Optional[float],
+                 validate_json: bool = False) -> str:
+    """Single-flight key: hash of the prompt, model and generation parameters."""
+    raw = json.dumps([mode, model, temperature, validate_json, full_prompt])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class _SharedCall:
+    """One in-flight LLM call awaited by every identical concurrent request.
+
+    The call runs as its own task so a cancelled waiter does not cancel it for
+    the others; it is cancelled only when the last waiter goes away. It is then
+    abandoned: on_abandon drops it from the in-flight table at once, so a new
+    identical request starts a fresh call instead of joining a dying one.
+    """
+
+    def __init__(self, coro, on_abandon: Optional[Callable[[], None]] = None):
+        self.task = asyncio.ensure_future(coro)
+        self.waiters = 0
+        self.abandoned = False
+        self._on_abandon = on_abandon
+
+    async def wait(self) -> str:
+        self.waiters += 1
+        try:
+            return await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if self.task.cancelled() and not asyncio.current_task().cancelling():
+                # The shared call was cancelled, this waiter was not
+                raise LLMError("Shared LLM request was cancelled") from None
+            raise
+        finally:
+            self.waiters -= 1
+            if self.waiters == 0 and not self.task.done():
+                self.abandoned = True
+                if self._on_abandon:
+                    self._on_abandon()
+                self.task.cancel()
+
+class _StreamFanout:
+    """One in-flight streaming call replayed to every subscriber.
+
+    A pump task drives the source generator and buffers chunks; subscribers
+    that join late first receive the chunks already produced. The pump is
+    cancelled when the last subscriber stops consuming, and on_done runs at
+    that moment (as well as when the stream ends) so nobody joins it after.
+    Each subscriber waits for chunks only until its own deadline_at.
+    """
+
+    def __init__(self, source: AsyncGenerator[str, None], on_done: Optional[Callable[[], None]] = None):
+        self.chunks: List[str] = []
+        self._on_done = on_done
+        self.done = False
+        self.abandoned = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._pump(source))
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _pump(self, source: AsyncGenerator[str, None]):
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except asyncio.CancelledError:
+            self.error = LLMError("Streaming request cancelled")
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            if self._on_done:
+                self._on_done()
+            self._notify()
+            await source.aclose()
+
+    async def subscribe(self, callback: Optional[Callable[[str], None]] = None,
+                        deadline_at: Optional[float] = None) -> AsyncGenerator[str, None]:
+        """Yield every chunk of the shared stream (optionally mirrored to callback) until deadline_at."""
+        self.subscribers += 1
+        index = 0
+        try:
+            while True:
+                changed = self._changed
+                while index < len(self.chunks):
+                    chunk = self.chunks[index]
+                    index += 1
+                    if callback:
+                        try:
+                            if asyncio.iscoroutinefunction(callback):
+                                await callback(chunk)
+                            else:
+                                callback(chunk)
+                        except Exception:
+                            logger.exception("Callback raised while handling stream chunk; continuing.")
+                    yield chunk
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                try:
+                    async with asyncio.timeout(time_left(deadline_at)):
+                        await changed.wait()
+                except TimeoutError:
+                    raise DeadlineExceededError("LLM streaming deadline exceeded while waiting for shared stream") from None
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.task.done():
+                self.abandoned = True
+                if self._on_done:
+                    self._on_done()
+                self.task.cancel()
+
 class LLMError(Exception):
     """Custom error for LLM issues."""
     pass
 
+class BudgetExceededError(LLMError):
+    """Raised when the budget manager rejects an LLM call."""
+    pass
+
+class DeadlineExceededError(LLMError):
+    """Raised when an LLM call cannot complete before its deadline."""
+    pass
+
+def _admit_call(model: str, prompt_chars: int, call_meta: Dict[str, Any]) -> str:
+    """
+    Run budget admission for a call.
+
+    Returns:
+        Model to use (the degraded model when the budget is near its limit)
+
+    Raises:
+        BudgetExceededError: If the project/stage budget is exhausted
+    """
+    admission = get_budget_manager().admit(
+        estimated_tokens=prompt_chars // CHARS_PER_TOKEN,
+        project=call_meta.get("project_id"),
+        stage=call_meta.get("stage"),
+        model=model
+    )
+    current_span().set_attribute("llm.admission", admission.decision.value)
+    if admission.rejected:
+        raise BudgetExceededError(f"💸 LLM call rejected: {admission.reason}")
+    return admission.model or model
+
 class LLMClient:
-    """Manages Gemini LLM async usage across all agents with rate limiting."""
-
-    def __init__(self):
-        """Initializes the client and its own instance-specific model cache."""
-        # Check all required environment variables
-        required_vars = {
-            "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY"),
-            "MODEL": os.getenv("MODEL", "gemini-2.5-pro")
-        }
-        
-        missing = [key for key, value in required_vars.items() if not value]
-        if missing:
-            raise LLMError(f"⚠️ Missing environment variables: {', '.join(missing)}")
-        
-        self.api_key = required_vars["GEMINI_API_KEY"]
-        genai.configure(api_key=self.api_key)
-        self.default_model = required_vars["MODEL"]
+    """Manages LLM async usage across all agents with rate limiting."""
+
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        """
+        Initializes the client and its own instance-specific model cache.
+
+        Args:
+            backend: Model backend (default: selected by LLM_BACKEND, Gemini unless set)
+        """
+        self.default_model = os.getenv("MODEL", "gemini-2.5-pro")
+        if not self.default_model:
+            raise LLMError("⚠️ Missing environment variables: MODEL")
+        if backend is None:
+            try:
+                backend = create_backend()
+            except ValueError as e:
+                raise LLMError(str(e)) from e
+        self.backend = backend
+        self.api_key = getattr(backend, "api_key", None)
         
         self._model_cache: Dict[str, Any] = {}
         self._model_lock = Lock()
         
-        # Rate limiting to prevent "too_many_pings" errors
-        self._request_semaphore = Semaphore(1)  # Max 1 concurrent request (reduced for API stability)
-        self._min_request_interval = 5.0  # 5 seconds between requests (increased for API stability)
+        # Rate limiting to prevent "too_many_pings" errors (limits come from the backend)
+        self._request_semaphore = Semaphore(backend.max_concurrent_requests)
+        self._min_request_interval = backend.min_request_interval
         self._last_request_time = 0.0
         self._rate_limit_lock = Lock()
+
+        # Single-flight: identical concurrent requests share one call
+        self.single_flight = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() == "true"
+        self._inflight: Dict[str, _SharedCall] = {}
+        self._inflight_streams: Dict[str, _StreamFanout] = {}
+
+        # Hedging: first-token latency per (mode, model) drives the hedge delay
+        self.hedging = os.getenv("LLM_HEDGING", "false").lower() == "true"
+        self._first_token_latency: Dict[Tuple[str, str], RollingHistogram] = {}
+        self._hedge_eligible = 0
+        self._hedges_sent = 0
         
-        logger.info(f"✅ LLMClient initialized with default model: {self.default_model}")
-        logger.info(f"🚦 Rate limiting: Max 1 concurrent request, 5.0s interval")
+        logger.info(f"✅ LLMClient initialized with default model: {self.default_model} ({backend.name})")
+        logger.info(
+            f"🚦 Rate limiting: Max {backend.max_concurrent_requests} concurrent request(s), "
+            f"{self._min_request_interval}s interval"
+        )
 
     async def _get_model(self, model_name: str, temperature: Optional[float] = None):
         """Load/reuse model instance from the client's private cache."""
@@ -62,10 +354,68 @@ class LLMClient:
         async with self._model_lock:
             if cache_key not in self._model_cache:
                 logger.info(f"📦 Loading model {model_name} with temp={temperature}")
-                config = genai.GenerationConfig(temperature=temperature) if temperature else None
-                self._model_cache[cache_key] = genai.GenerativeModel(model_name, generation_config=config)
+                self._model_cache[cache_key] = self.backend.create_model(model_name, temperature)
             return self._model_cache[cache_key]
 
+    def _observe_first_token(self, model: str, mode: str, seconds: float):
+        """Record first-token latency (full response latency for single-shot calls)."""
+        key = (mode, model)
+        if key not in self._first_token_latency:
+            self._first_token_latency[key] = RollingHistogram(second_buckets=HEDGE_WINDOW_SECONDS, minute_buckets=1)
+        self._first_token_latency[key].record(seconds)
+
+    def _hedge_delay(self, model: str, mode: str) -> Optional[float]:
+        """Delay after which to hedge, or None if hedging is off, untrained or over its budget."""
+        if not self.hedging:
+            return None
+        histogram = self._first_token_latency.get((mode, model))
+        if histogram is None:
+            return None
+        recent = histogram.window(HEDGE_WINDOW_SECONDS)
+        if recent.count < HEDGE_MIN_SAMPLES:
+            return None
+        if self._hedges_sent >= HEDGE_MAX_RATIO * max(1, self._hedge_eligible):
+            return None
+        return max(HEDGE_MIN_DELAY, recent.quantile(0.95))
+
+    async def _hedged(self, factory: Callable[[], Awaitable[T]], model: str, mode: str) -> T:
+        """
+        Run factory(); if it has not finished by the hedge delay, race a second
+        copy and return whichever succeeds first (the loser is cancelled).
+        """
+        delay = self._hedge_delay(model, mode)
+        self._hedge_eligible += 1
+        primary = asyncio.ensure_future(factory())
+        if delay is None:
+            return await primary
+
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            self._hedges_sent += 1
+            hedge = asyncio.ensure_future(factory())
+            current_span().add_event("hedge", delay=round(delay, 3))
+            logger.info(f"🏇 Hedging {mode} request to {model} after {delay:.2f}s")
+
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    if finished.exception() is None:
+                        LLM_HEDGES.labels(model, mode, "hedge" if finished is hedge else "primary").inc()
+                        return finished.result()
+                    error = finished.exception()
+            raise error
+        finally:
+            for request in (primary, hedge):
+                if request is not None and not request.done():
+                    request.cancel()
+
+    @traced("llm.ask", _llm_span_attributes)
     async def ask_llm(self, user_prompt: str,
                       system_prompt: Optional[str] = None,
                       model: Optional[str] = None,
@@ -73,12 +423,71 @@ class LLMClient:
                       callback: Optional[Callable[[str], None]] = None,
                       max_retries: int = 3,
                       validate_json: bool = False,
-                      metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Single-shot async response for all agents."""
+                      metadata: Optional[Dict[str, Any]] = None,
+                      deadline: Optional[float] = None) -> str:
+        """Single-shot async response for all agents.
+
+        Identical concurrent requests (same prompt, model and parameters) await
+        one outstanding call; only the first caller's callback sees progress.
+
+        `deadline` (seconds) bounds the call together with any deadline set by
+        the caller's scope (e.g. the pipeline task); attempts and backoff stop
+        at the deadline with DeadlineExceededError.
+        """
+        with deadline_scope(deadline):
+            if not self.single_flight:
+                return await self._ask_llm_once(user_prompt, system_prompt, model, temperature,
+                                                callback, max_retries, validate_json, metadata)
+            return await self._ask_llm_coalesced(user_prompt, system_prompt, model, temperature,
+                                                 callback, max_retries, validate_json, metadata)
+
+    async def _ask_llm_coalesced(self, user_prompt: str,
+                                 system_prompt: Optional[str],
+                                 model: Optional[str],
+                                 temperature: Optional[float],
+                                 callback: Optional[Callable[[str], None]],
+                                 max_retries: int,
+                                 validate_json: bool,
+                                 metadata: Optional[Dict[str, Any]]) -> str:
+        """Join or start the single-flight call for this request."""
+        full_prompt = f"{system_prompt}\n\n{user_prompt}" if system_prompt else user_prompt
+        key = _request_key("single", full_prompt, model or self.default_model, temperature, validate_json)
+        call = self._inflight.get(key)
+        if call is None or call.abandoned:
+            def discard(*_):
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+
+            call = _SharedCall(self._ask_llm_once(user_prompt, system_prompt, model, temperature,
+                                                  callback, max_retries, validate_json, metadata),
+                               on_abandon=discard)
+            self._inflight[key] = call
+            call.task.add_done_callback(discard)
+        else:
+            LLM_COALESCED.labels("single").inc()
+            current_span().set_attribute("llm.coalesced", True)
+            logger.info(f"🔗 Joining in-flight LLM request {key[:12]}")
+        try:
+            # Each waiter honours its own deadline, even when joining another's call
+            async with asyncio.timeout(remaining()):
+                return await call.wait()
+        except TimeoutError:
+            raise DeadlineExceededError("LLM request deadline exceeded while waiting for shared call")
+
+    async def _ask_llm_once(self, user_prompt: str,
+                            system_prompt: Optional[str] = None,
+                            model: Optional[str] = None,
+                            temperature: Optional[float] = None,
+                            callback: Optional[Callable[[str], None]] = None,
+                            max_retries: int = 3,
+                            validate_json: bool = False,
+                            metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Run one single-shot request with retries and fallback."""
         full_prompt = f"{system_prompt}\n\n{user_prompt}" if system_prompt else user_prompt
         model_to_use = model or self.default_model
         call_meta = metadata or {}
         prompt_chars = len(full_prompt)
+        model_to_use = _admit_call(model_to_use, prompt_chars, call_meta)
         logger.info(
             "LLM request initiated",
             extra={
@@ -92,6 +501,10 @@ class LLMClient:
         )
 
         for attempt in range(max_retries):
+            left = remaining()
+            if left is not None and left <= 0:
+                LLM_REQUESTS.labels(model_to_use, "single", "deadline").inc()
+                raise DeadlineExceededError(f"LLM request deadline exceeded after {attempt} attempts")
             try:
                 if callback:
                     # support sync or async callback
@@ -101,7 +514,12 @@ class LLMClient:
                         callback(f"🚀 Requesting from {model_to_use} (attempt {attempt+1})")
 
                 model_instance = await self._get_model(model_to_use, temperature)
-                response = await model_instance.generate_content_async(full_prompt)
+                attempt_start = time.perf_counter()
+                async with asyncio.timeout(left):
+                    response = await self._hedged(
+                        lambda: model_instance.generate_content_async(full_prompt), model_to_use, "single"
+                    )
+                self._observe_first_token(model_to_use, "single", time.perf_counter() - attempt_start)
 
                 if not response or not getattr(response, "text", None):
                     raise LLMError("Empty response from LLM")
@@ -116,6 +534,10 @@ class LLMClient:
                         raise LLMError(f"Invalid JSON: {je}")
 
                 response_chars = len(text)
+                LLM_LATENCY.labels(model_to_use, "single").observe(time.perf_counter() - attempt_start)
+                LLM_REQUESTS.labels(model_to_use, "single", "success").inc()
+                _record_token_usage(model_to_use, response, prompt_chars, response_chars, call_meta)
+                current_span().set_attribute("llm.attempts", attempt + 1)
 
                 if callback:
                     if asyncio.iscoroutinefunction(callback):
@@ -137,7 +559,7 @@ class LLMClient:
                 return text
 
             except Exception as e:
-                wait_time = 2 ** attempt
+                wait_time = _backoff_delay(attempt, e)
                 logger.warning(f"❌ Attempt {attempt+1} failed: {e}")
                 if callback:
                     if asyncio.iscoroutinefunction(callback):
@@ -145,9 +567,25 @@ class LLMClient:
                     else:
                         callback(f"⚠️ Retry {attempt+1} failed: {str(e)}")
                 if attempt < max_retries - 1:
+                    left = remaining()
+                    if left is not None and wait_time >= left:
+                        LLM_REQUESTS.labels(model_to_use, "single", "deadline").inc()
+                        raise DeadlineExceededError(
+                            f"LLM request deadline exceeded: {left:.1f}s left, next retry in {wait_time:.1f}s"
+                        ) from e
+                    LLM_RETRIES.labels(model_to_use, "single").inc()
                     await asyncio.sleep(wait_time)
                 else:
+                    # A timeout is not an answer: only other failures fall back
+                    left = remaining()
+                    timed_out = left is not None and (left <= 0 or isinstance(e, TimeoutError))
+                    if timed_out or isinstance(e, DeadlineExceededError):
+                        LLM_REQUESTS.labels(model_to_use, "single", "deadline").inc()
+                        raise DeadlineExceededError(
+                            f"LLM request deadline exceeded after {max_retries} attempts"
+                        ) from e
                     # Use fallback only for non-streaming failures
+                    LLM_REQUESTS.labels(model_to_use, "single", "fallback").inc()
                     fallback = self.get_fallback_response(user_prompt, expects_json=validate_json)
                     logger.warning(
                         "LLM request fell back after retries",
@@ -179,13 +617,15 @@ class LLMClient:
         )
         return fallback
 
+    @traced("llm.stream", _llm_span_attributes)
     async def ask_llm_streaming(self, user_prompt: str,
                           system_prompt: Optional[str] = None,
                           model: Optional[str] = None,
                           temperature: Optional[float] = None,
                           callback: Optional[Callable[[str], None]] = None,
                           max_retries: int = 3,
-                          metadata: Optional[Dict[str, Any]] = None) -> AsyncGenerator[str, None]:
+                          metadata: Optional[Dict[str, Any]] = None,
+                          deadline: Optional[float] = None) -> AsyncGenerator[str, None]:
         """Stream output from Gemini API with real-time callbacks and rate limiting.
 
         Notes:
@@ -193,11 +633,61 @@ class LLMClient:
           We skip such chunks and continue streaming instead of crashing the whole generator.
         - The function supports sync and async callbacks.
         - Rate limiting prevents "too_many_pings" errors from Gemini API.
+        - Identical concurrent streams share one call; chunks are fanned out to
+          every consumer (late joiners first receive the chunks already produced).
+        - `deadline` (seconds, combined with the caller's scope) bounds every
+          chunk wait and retry; the stream raises DeadlineExceededError past it.
         """
+        # Generator bodies run in the consumer's context, so the deadline is
+        # resolved to an absolute time now instead of being scoped
+        deadline_at = resolve_deadline(deadline)
+
+        if not self.single_flight:
+            async for chunk in self._stream_once(user_prompt, system_prompt, model, temperature,
+                                                 callback, max_retries, metadata, deadline_at):
+                yield chunk
+            return
+
+        full_prompt = f"{system_prompt}\n\n{user_prompt}" if system_prompt else user_prompt
+        key = _request_key("stream", full_prompt, model or self.default_model, temperature)
+        fanout = self._inflight_streams.get(key)
+        if fanout is None or fanout.abandoned:
+            def discard():
+                if self._inflight_streams.get(key) is fanout:
+                    del self._inflight_streams[key]
+
+            fanout = _StreamFanout(
+                self._stream_once(user_prompt, system_prompt, model, temperature,
+                                  callback, max_retries, metadata, deadline_at),
+                on_done=discard
+            )
+            self._inflight_streams[key] = fanout
+            subscriber_callback = None  # the leader's callback is driven by the call itself
+        else:
+            LLM_COALESCED.labels("stream").inc()
+            current_span().set_attribute("llm.coalesced", True)
+            logger.info(f"🔗 Joining in-flight LLM stream {key[:12]}")
+            subscriber_callback = callback
+
+        # Closing this stream early leaves the fan-out right away, not at garbage collection
+        async with aclosing(fanout.subscribe(subscriber_callback, deadline_at)) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    async def _stream_once(self, user_prompt: str,
+                           system_prompt: Optional[str] = None,
+                           model: Optional[str] = None,
+                           temperature: Optional[float] = None,
+                           callback: Optional[Callable[[str], None]] = None,
+                           max_retries: int = 3,
+                           metadata: Optional[Dict[str, Any]] = None,
+                           deadline_at: Optional[float] = None) -> AsyncGenerator[str, None]:
+        """Run one streaming request with rate limiting and retries (bounded by deadline_at)."""
         full_prompt = f"{system_prompt}\n\n{user_prompt}" if system_prompt else user_prompt
         model_to_use = model or self.default_model
         call_meta = metadata or {}
         prompt_chars = len(full_prompt)
+        model_to_use = _admit_call(model_to_use, prompt_chars, call_meta)
         logger.info(
             "LLM streaming request initiated",
             extra={
@@ -222,6 +712,10 @@ class LLMClient:
                 self._last_request_time = time.time()
 
             for attempt in range(max_retries):
+                left = time_left(deadline_at)
+                if left is not None and left <= 0:
+                    LLM_REQUESTS.labels(model_to_use, "stream", "deadline").inc()
+                    raise DeadlineExceededError(f"LLM streaming deadline exceeded after {attempt} attempts")
                 try:
                     total_response_chars = 0
                     model_instance = await self._get_model(model_to_use, temperature)
@@ -232,9 +726,15 @@ class LLMClient:
                             callback(f"🌊 Starting stream from {model_to_use}...")
 
                     # request streaming response
-                    stream = await model_instance.generate_content_async(full_prompt, stream=True)
+                    attempt_start = time.perf_counter()
+                    first_chunk = True
+                    async with asyncio.timeout(left):
+                        stream, chunks, first = await self._hedged(
+                            lambda: _open_stream(model_instance, full_prompt), model_to_use, "stream"
+                        )
+                    self._observe_first_token(model_to_use, "stream", time.perf_counter() - attempt_start)
 
-                    async for chunk in stream:
+                    async for chunk in _iter_stream(first, chunks, deadline_at):
                         # Defensive access: chunk.text may raise ValueError if no valid Part is present.
                         try:
                             text = getattr(chunk, "text", None)
@@ -262,10 +762,17 @@ class LLMClient:
                         except Exception:
                             logger.exception("Callback raised while handling stream chunk; continuing.")
 
+                        if first_chunk:
+                            first_chunk = False
+                            LLM_TTFT.labels(model_to_use).observe(time.perf_counter() - attempt_start)
+                            current_span().add_event("first_token", attempt=attempt + 1)
                         total_response_chars += len(text)
                         yield text
 
                     # stream completed successfully
+                    LLM_LATENCY.labels(model_to_use, "stream").observe(time.perf_counter() - attempt_start)
+                    LLM_REQUESTS.labels(model_to_use, "stream", "success").inc()
+                    _record_token_usage(model_to_use, stream, prompt_chars, total_response_chars, call_meta)
                     if callback:
                         if asyncio.iscoroutinefunction(callback):
                             await callback("\n✅ Streaming completed.")
@@ -285,11 +792,9 @@ class LLMClient:
                     )
                     return  # successful completion
 
-                except (GoogleAPICallError, ValueError) as e:
-                    error_str = str(e)
-                    is_503_error = "503" in error_str or "Connection reset" in error_str or "IOCP" in error_str
-                    backoff_time = (2 ** attempt) * (3 if is_503_error else 1)  # 3x backoff for 503 errors
-                    
+                except (*self.backend.api_errors, ValueError) as e:
+                    backoff_time = _backoff_delay(attempt, e)
+
                     logger.exception("Streaming attempt %d failed with API/ValueError: %s", attempt + 1, e)
                     if callback:
                         if asyncio.iscoroutinefunction(callback):
@@ -297,9 +802,17 @@ class LLMClient:
                         else:
                             callback(f"\n❌ Streaming attempt {attempt + 1} failed: {e}")
                     if attempt < max_retries - 1:
-                        logger.warning(f"🔄 Retrying in {backoff_time}s (attempt {attempt + 2}/{max_retries})...")
+                        left = time_left(deadline_at)
+                        if left is not None and backoff_time >= left:
+                            LLM_REQUESTS.labels(model_to_use, "stream", "deadline").inc()
+                            raise DeadlineExceededError(
+                                f"LLM streaming deadline exceeded: {left:.1f}s left, next retry in {backoff_time:.1f}s"
+                            ) from e
+                        LLM_RETRIES.labels(model_to_use, "stream").inc()
+                        logger.warning(f"🔄 Retrying in {backoff_time:.1f}s (attempt {attempt + 2}/{max_retries})...")
                         await asyncio.sleep(backoff_time)
                     else:
+                        LLM_REQUESTS.labels(model_to_use, "stream", "error").inc()
                         logger.warning(
                             "LLM streaming request failed after retries",
                             extra={
@@ -314,10 +827,8 @@ class LLMClient:
                         )
                         raise LLMError(f"LLM streaming failed after {max_retries} attempts: {e}")
                 except Exception as e:
-                    error_str = str(e)
-                    is_503_error = "503" in error_str or "Connection reset" in error_str or "IOCP" in error_str
-                    backoff_time = (2 ** attempt) * (3 if is_503_error else 1)  # 3x backoff for 503 errors
-                    
+                    backoff_time = _backoff_delay(attempt, e)
+
                     logger.exception("Streaming attempt %d failed unexpectedly: %s", attempt + 1, e)
                     if callback:
                         if asyncio.iscoroutinefunction(callback):
@@ -325,9 +836,17 @@ class LLMClient:
                         else:
                             callback(f"\n❌ Streaming attempt {attempt + 1} failed: {e}")
                     if attempt < max_retries - 1:
-                        logger.warning(f"🔄 Retrying in {backoff_time}s (attempt {attempt + 2}/{max_retries})...")
+                        left = time_left(deadline_at)
+                        if left is not None and backoff_time >= left:
+                            LLM_REQUESTS.labels(model_to_use, "stream", "deadline").inc()
+                            raise DeadlineExceededError(
+                                f"LLM streaming deadline exceeded: {left:.1f}s left, next retry in {backoff_time:.1f}s"
+                            ) from e
+                        LLM_RETRIES.labels(model_to_use, "stream").inc()
+                        logger.warning(f"🔄 Retrying in {backoff_time:.1f}s (attempt {attempt + 2}/{max_retries})...")
                         await asyncio.sleep(backoff_time)
                     else:
+                        LLM_REQUESTS.labels(model_to_use, "stream", "error").inc()
                         raise LLMError(f"LLM streaming failed after {max_retries} attempts: {e}")
 
     def get_fallback_response(self, prompt: str, expects_json: bool = False) -> str:
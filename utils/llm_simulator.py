@@ -0,0 +1,437 @@
+"""
+Deterministic local LLM simulator for load testing.
+
+This module provides:
+- SimulatorBackend: LLMBackend serving simulated models, no network needed
+- SimulatorConfig: Latency distribution, token rate, response size, chunk
+  size, error/429 injection and recordings (LLM_SIM_* env vars)
+- LatencyDistribution: fixed/uniform/lognormal/exponential samplers
+- RecordingBackend: Wraps another backend and records its responses as
+  JSONL for later replay (LLM_RECORD_TO)
+
+Responses are replayed from recordings when a prompt matches, else
+generated by prompt shape: TOON plans for planning prompts, JSON for
+prompts asking for a JSON answer, fenced code blocks otherwise. Every request draws
+from an RNG seeded by (seed, model, prompt, occurrence), so a run is
+reproducible regardless of how concurrent requests interleave.
+"""
+
+import os
+import re
+import json
+import math
+import random
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from utils.llm_backends import LLMBackend
+from utils.token_counter import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Prompts asking for a JSON answer ("Return JSON:", "valid JSON", "respond with JSON"...)
+JSON_REQUEST = re.compile(
+    r"(?im)^\s*(?:return\s+)?json\s*:|\b(?:valid|only|strict)\s+json\b|"
+    r"\bjson\s+(?:object|only)\b|\brespond\s+(?:only\s+)?(?:with|in)\s+json\b"
+)
+
+
+class SimulatedServerError(Exception):
+    """Injected 503 error."""
+    pass
+
+
+class SimulatedRateLimitError(Exception):
+    """Injected 429 error (carries retry_after like a Retry-After header)."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"429 Resource has been exhausted (simulated). Please retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class LatencyDistribution:
+    """
+    Latency sampler.
+
+    Kinds and parameters:
+        fixed: a = seconds
+        uniform: a = low, b = high
+        lognormal: a = median, b = sigma
+        exponential: a = mean
+    """
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw a latency in seconds."""
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(max(self.a, 1e-9)), self.b)
+        if self.kind == "exponential":
+            return rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """
+        Parse a spec such as "0.2", "uniform:0.1,0.5" or "lognormal:0.8,0.4".
+
+        Raises:
+            ValueError: If the spec is malformed
+        """
+        kind, _, params = spec.partition(":")
+        if not params:
+            return cls("fixed", float(kind))
+        values = [float(v) for v in params.split(",")]
+        distribution = cls(kind.strip().lower(), values[0], values[1] if len(values) > 1 else 0.0)
+        distribution.sample(random.Random(0))  # validate kind
+        return distribution
+
+
+@dataclass
+class SimulatorConfig:
+    """Simulator settings (see from_env for the matching LLM_SIM_* variables)."""
+    seed: int = 0
+    first_token_latency: LatencyDistribution = field(default_factory=lambda: LatencyDistribution("fixed", 0.2))
+    tokens_per_second: float = 200.0
+    response_tokens: int = 400
+    chunk_tokens: int = 16
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    plan_tasks: int = 5
+    recordings: Optional[str] = None
+    time_scale: float = 1.0
+    min_request_interval: float = 0.0
+    max_concurrent_requests: int = 64
+
+    @classmethod
+    def from_env(cls) -> "SimulatorConfig":
+        """Build config from LLM_SIM_* environment variables."""
+        defaults = cls()
+        latency = os.getenv("LLM_SIM_LATENCY")
+        return cls(
+            seed=int(os.getenv("LLM_SIM_SEED", defaults.seed)),
+            first_token_latency=LatencyDistribution.parse(latency) if latency else defaults.first_token_latency,
+            tokens_per_second=float(os.getenv("LLM_SIM_TOKENS_PER_SECOND", defaults.tokens_per_second)),
+            response_tokens=int(os.getenv("LLM_SIM_RESPONSE_TOKENS", defaults.response_tokens)),
+            chunk_tokens=int(os.getenv("LLM_SIM_CHUNK_TOKENS", defaults.chunk_tokens)),
+            error_rate=float(os.getenv("LLM_SIM_ERROR_RATE", defaults.error_rate)),
+            rate_limit_rate=float(os.getenv("LLM_SIM_429_RATE", defaults.rate_limit_rate)),
+            retry_after=float(os.getenv("LLM_SIM_RETRY_AFTER", defaults.retry_after)),
+            plan_tasks=int(os.getenv("LLM_SIM_PLAN_TASKS", defaults.plan_tasks)),
+            recordings=os.getenv("LLM_SIM_RECORDINGS") or None,
+            time_scale=float(os.getenv("LLM_SIM_TIME_SCALE", defaults.time_scale)),
+            min_request_interval=float(os.getenv("LLM_SIM_REQUEST_INTERVAL", defaults.min_request_interval)),
+            max_concurrent_requests=int(os.getenv("LLM_SIM_CONCURRENCY", defaults.max_concurrent_requests))
+        )
+
+
+def _prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _usage(prompt: str, text: str) -> Dict[str, int]:
+    """Gemini-style usage metadata for a simulated call."""
+    return {
+        "prompt_token_count": max(1, len(prompt) // CHARS_PER_TOKEN),
+        "candidates_token_count": max(1, len(text) // CHARS_PER_TOKEN)
+    }
+
+
+class RecordingStore:
+    """
+    Recorded responses, loaded from JSONL.
+
+    Each line holds "response" plus one matcher: "prompt" (exact),
+    "prompt_sha256" or "match" (regex searched in the prompt). Exact
+    matches win; regexes are tried in file order.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._exact: Dict[str, str] = {}
+        self._patterns: List[Tuple[re.Pattern, str]] = []
+        if path:
+            self.load(path)
+
+    def load(self, path: str):
+        """Load recordings from a JSONL file."""
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    self.add(**json.loads(line))
+        logger.info(f"📼 Loaded {len(self)} LLM recordings from {path}")
+
+    def add(self, response: str, prompt: Optional[str] = None, prompt_sha256: Optional[str] = None,
+            match: Optional[str] = None, **_):
+        """Add a recording."""
+        if prompt is not None:
+            self._exact[_prompt_hash(prompt)] = response
+        elif prompt_sha256:
+            self._exact[prompt_sha256] = response
+        elif match:
+            self._patterns.append((re.compile(match, re.DOTALL), response))
+        else:
+            raise ValueError("Recording needs one of: prompt, prompt_sha256, match")
+
+    def find(self, prompt: str) -> Optional[str]:
+        """Recorded response for a prompt, if any."""
+        exact = self._exact.get(_prompt_hash(prompt))
+        if exact is not None:
+            return exact
+        for pattern, response in self._patterns:
+            if pattern.search(prompt):
+                return response
+        return None
+
+    def __len__(self) -> int:
+        return len(self._exact) + len(self._patterns)
+
+
+class ResponseGenerator:
+    """Synthesizes plausible responses from the shape of a prompt."""
+
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+
+    def generate(self, prompt: str, rng: random.Random) -> str:
+        """Generate a response sized around config.response_tokens."""
+        target_chars = max(1, int(self.config.response_tokens * rng.uniform(0.75, 1.25))) * CHARS_PER_TOKEN
+        if "PLAN<" in prompt or "TOON" in prompt:
+            return self.toon_plan(rng)
+        if JSON_REQUEST.search(prompt):
+            return self.json_review(rng)
+        return self.code_blocks(rng, target_chars)
+
+    def toon_plan(self, rng: random.Random) -> str:
+        """TOON plan with a dependency chain/fan-out of config.plan_tasks tasks."""
+        plan_id = f"{rng.getrandbits(32):08x}"
+        lines = [f"PLAN<{plan_id}>|Simulated Project|Plan generated by the LLM simulator"]
+        for i in range(1, self.config.plan_tasks + 1):
+            deps = [f"{rng.randint(1, i - 1):03d}"] if i > 1 else []
+            complexity = rng.choice(["low", "medium", "high"])
+            lines.append(
+                f"TASK<{i:03d}>|Component {i}|Implement simulated component {i}|"
+                f"{i}|[{','.join(deps)}]|{rng.choice([1.0, 2.0, 4.0])}|{complexity}|dev_agent"
+            )
+        return "\n".join(lines)
+
+    def json_review(self, rng: random.Random) -> str:
+        """QA-style JSON review (passing, with a confidence score)."""
+        confidence = round(rng.uniform(0.8, 1.0), 2)
+        return json.dumps({"passed": True, "confidence": confidence, "issues": [], "summary": "Simulated review"})
+
+    def code_blocks(self, rng: random.Random, target_chars: int) -> str:
+        """Fenced Python code blocks with file path comments, about target_chars long."""
+        files = rng.randint(1, 3)
+        per_file = max(1, target_chars // files)
+        parts = ["Here is the implementation."]
+        for f in range(files):
+            module = f"module_{rng.getrandbits(16):04x}"
+            body = [f'"""Simulated module {module}."""', ""]
+            i = 0
+            while sum(len(line) + 1 for line in body) < per_file:
+                body += [
+                    f"def handler_{i}(value):",
+                    f'    """Handle value {i}."""',
+                    f"    return value * {rng.randint(2, 99)}",
+                    ""
+                ]
+                i += 1
+            parts.append(f"```python\n# src/{module}.py\n" + "\n".join(body) + "```")
+        return "\n\n".join(parts)
+
+
+class SimulatedResponse:
+    """Single-shot response (mirrors GenerateContentResponse.text/usage_metadata)."""
+
+    def __init__(self, text: str, usage_metadata: Dict[str, int]):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class SimulatedStream:
+    """Streaming response paced by the simulated token rate."""
+
+    def __init__(self, chunks: List[str], first_delay: float, chunk_delay: float,
+                 usage_metadata: Dict[str, int]):
+        self._chunks = chunks
+        self._first_delay = first_delay
+        self._chunk_delay = chunk_delay
+        self.usage_metadata = usage_metadata
+
+    def __aiter__(self) -> AsyncIterator[SimulatedResponse]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[SimulatedResponse]:
+        for index, chunk in enumerate(self._chunks):
+            await asyncio.sleep(self._first_delay if index == 0 else self._chunk_delay)
+            yield SimulatedResponse(chunk, {})
+
+
+class SimulatedModel:
+    """Model instance served by SimulatorBackend."""
+
+    def __init__(self, backend: "SimulatorBackend", model_name: str):
+        self.backend = backend
+        self.model_name = model_name
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        """Simulate a Gemini generate_content_async call."""
+        return await self.backend.generate(self.model_name, prompt, stream)
+
+
+class SimulatorBackend(LLMBackend):
+    """Deterministic offline backend for load tests and benchmarks."""
+
+    name = "simulator"
+
+    def __init__(self, config: Optional[SimulatorConfig] = None):
+        """
+        Initialize simulator.
+
+        Args:
+            config: Simulator settings (default: SimulatorConfig())
+        """
+        self.config = config or SimulatorConfig()
+        self.min_request_interval = self.config.min_request_interval
+        self.max_concurrent_requests = self.config.max_concurrent_requests
+        self.recordings = RecordingStore(self.config.recordings)
+        self.generator = ResponseGenerator(self.config)
+        self._occurrences: Dict[Tuple[str, str], int] = {}
+        self.stats = {
+            "requests": 0, "streams": 0, "replayed": 0, "generated": 0,
+            "errors_injected": 0, "rate_limited": 0, "response_tokens": 0
+        }
+
+    def create_model(self, model_name: str, temperature: Optional[float] = None) -> SimulatedModel:
+        """Create a simulated model (temperature does not affect output)."""
+        return SimulatedModel(self, model_name)
+
+    def _rng(self, model_name: str, prompt: str) -> random.Random:
+        """RNG for the n-th occurrence of (model, prompt); retries draw fresh values."""
+        key = (model_name, _prompt_hash(prompt))
+        occurrence = self._occurrences.get(key, 0)
+        self._occurrences[key] = occurrence + 1
+        return random.Random(f"{self.config.seed}:{key[0]}:{key[1]}:{occurrence}")
+
+    async def generate(self, model_name: str, prompt: str, stream: bool = False):
+        """
+        Produce a simulated response.
+
+        Raises:
+            SimulatedRateLimitError: Injected 429 (raised immediately)
+            SimulatedServerError: Injected 503 (raised after the first-token latency)
+        """
+        config = self.config
+        rng = self._rng(model_name, prompt)
+        self.stats["streams" if stream else "requests"] += 1
+
+        if rng.random() < config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            raise SimulatedRateLimitError(config.retry_after)
+
+        first_delay = config.first_token_latency.sample(rng) * config.time_scale
+        if rng.random() < config.error_rate:
+            self.stats["errors_injected"] += 1
+            await asyncio.sleep(first_delay)
+            raise SimulatedServerError("503 Service Unavailable (simulated)")
+
+        text = self.recordings.find(prompt)
+        self.stats["replayed" if text is not None else "generated"] += 1
+        if text is None:
+            text = self.generator.generate(prompt, rng)
+        usage = _usage(prompt, text)
+        self.stats["response_tokens"] += usage["candidates_token_count"]
+
+        seconds_per_token = config.time_scale / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        if not stream:
+            await asyncio.sleep(first_delay + usage["candidates_token_count"] * seconds_per_token)
+            return SimulatedResponse(text, usage)
+
+        chunk_chars = max(1, config.chunk_tokens * CHARS_PER_TOKEN)
+        chunks = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+        return SimulatedStream(chunks, first_delay, config.chunk_tokens * seconds_per_token, usage)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get simulator statistics."""
+        return {"backend": self.name, "seed": self.config.seed, "recordings": len(self.recordings), **self.stats}
+
+
+class _RecordingModel:
+    """Model wrapper appending each completed response to a RecordingBackend."""
+
+    def __init__(self, model: Any, recorder: "RecordingBackend"):
+        self._model = model
+        self._recorder = recorder
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        response = await self._model.generate_content_async(prompt, stream=stream)
+        if not stream:
+            self._recorder.record(prompt, response.text)
+            return response
+        return _RecordingStream(response, prompt, self._recorder)
+
+
+class _RecordingStream:
+    """Stream wrapper recording the full text once the stream completes."""
+
+    def __init__(self, stream: Any, prompt: str, recorder: "RecordingBackend"):
+        self._stream = stream
+        self._prompt = prompt
+        self._recorder = recorder
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        parts = []
+        async for chunk in self._stream:
+            parts.append(getattr(chunk, "text", "") or "")
+            yield chunk
+        self._recorder.record(self._prompt, "".join(parts))
+
+
+class RecordingBackend(LLMBackend):
+    """Wraps a backend and appends completed responses to a JSONL recordings file."""
+
+    def __init__(self, inner: LLMBackend, path: str):
+        """
+        Initialize recorder.
+
+        Args:
+            inner: Backend serving the real responses
+            path: JSONL file to append recordings to
+        """
+        self.inner = inner
+        self.path = path
+        self.name = f"{inner.name}+recording"
+        self.min_request_interval = inner.min_request_interval
+        self.max_concurrent_requests = inner.max_concurrent_requests
+        self.recorded = 0
+
+    def create_model(self, model_name: str, temperature: Optional[float] = None) -> Any:
+        """Create a recording wrapper around the inner backend's model."""
+        return _RecordingModel(self.inner.create_model(model_name, temperature), self)
+
+    def record(self, prompt: str, response: str):
+        """Append a recording."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"prompt_sha256": _prompt_hash(prompt), "response": response}) + "\n")
+        self.recorded += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend statistics."""
+        return {**self.inner.get_stats(), "recorded": self.recorded}
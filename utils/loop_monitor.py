@@ -0,0 +1,251 @@
+"""
+Event-loop lag monitor and slow-callback detector.
+
+This module provides:
+- LoopMonitor: Samples event-loop lag with a periodic heartbeat task and
+  runs a watchdog thread that, when the loop has not ticked for longer
+  than the slow-callback threshold, captures the stack of the loop thread
+  and the coroutine that is blocking it
+- SlowCallback: One captured stall (task, coroutine, stack, duration)
+- get_loop_monitor: Global monitor configured from LOOP_MONITOR_* env vars
+
+Lag is exported as the event_loop_lag_seconds histogram and stalls as
+event_loop_slow_callbacks_total; recent stalls with their stacks are kept
+in memory for the /debug/loop endpoint. The stack is captured while the
+loop is still blocked, so it points at the blocking call itself (a
+subprocess.run, a synchronous boto3 call, a file copy), not at whatever
+runs after it.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import inspect
+import logging
+import threading
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from utils.metrics_registry import counter, histogram
+from utils.quantile_sketch import RollingHistogram
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = histogram(
+    "event_loop_lag_seconds", "Event-loop lag (heartbeat oversleep)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+SLOW_CALLBACKS = counter(
+    "event_loop_slow_callbacks_total", "Event-loop stalls longer than the slow-callback threshold"
+)
+
+
+@dataclass
+class SlowCallback:
+    """A stall of the event loop, captured while it was blocked."""
+    started_at: datetime
+    blocked_for: float
+    task: Optional[str] = None
+    coroutine: Optional[str] = None
+    location: Optional[str] = None
+    stack: List[str] = field(default_factory=list)
+    duration: Optional[float] = None  # set once the loop resumes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "blocked_for": round(self.blocked_for, 3),
+            "duration": round(self.duration, 3) if self.duration is not None else None,
+            "task": self.task,
+            "coroutine": self.coroutine,
+            "location": self.location,
+            "stack": self.stack
+        }
+
+
+def _innermost_coroutine(frame) -> Optional[Any]:
+    """The innermost coroutine frame on a thread's stack (the blocking coroutine)."""
+    while frame is not None:
+        if frame.f_code.co_flags & (inspect.CO_COROUTINE | inspect.CO_ITERABLE_COROUTINE):
+            return frame
+        frame = frame.f_back
+    return None
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag and reports callbacks that block the loop.
+
+    A heartbeat task sleeps for `interval` and records how late it wakes up
+    (the lag). A watchdog thread checks the heartbeat; once the loop has not
+    ticked for `slow_callback_threshold` seconds beyond the interval, it
+    captures the loop thread's stack and current task, once per stall.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        slow_callback_threshold: float = 0.25,
+        max_reports: int = 50,
+        stack_depth: int = 25
+    ):
+        """
+        Initialize loop monitor.
+
+        Args:
+            interval: Heartbeat interval in seconds
+            slow_callback_threshold: Blocking time (seconds) reported as a slow callback
+            max_reports: Recent slow callbacks kept in memory
+            stack_depth: Frames kept per captured stack
+        """
+        self.interval = interval
+        self.slow_callback_threshold = slow_callback_threshold
+        self.stack_depth = stack_depth
+        self.reports: Deque[SlowCallback] = deque(maxlen=max_reports)
+        self.lag = RollingHistogram()
+        self.slow_callbacks_total = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_tick = time.monotonic()
+        self._captured_tick: Optional[float] = None
+        self._pending: Optional[SlowCallback] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the monitor is attached to a loop."""
+        return self._heartbeat is not None and not self._heartbeat.done()
+
+    def start(self):
+        """Start monitoring the running event loop (call from within it)."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stopped.clear()
+        self._heartbeat = self._loop.create_task(self._run_heartbeat(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"🩺 LoopMonitor: Started "
+            f"(interval: {self.interval}s, slow callback: {self.slow_callback_threshold}s)"
+        )
+
+    async def stop(self):
+        """Stop the heartbeat task and the watchdog thread."""
+        self._stopped.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        if self._watchdog:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+            self._watchdog = None
+        logger.info("🩺 LoopMonitor: Stopped")
+
+    async def _run_heartbeat(self):
+        while True:
+            start = time.monotonic()
+            self._last_tick = start
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - start - self.interval)
+            LOOP_LAG.observe(lag)
+            self.lag.record(lag)
+
+            pending = self._pending
+            if pending is not None:
+                self._pending = None
+                pending.duration = lag
+                logger.warning(
+                    f"🐢 Event loop blocked for {lag:.3f}s by {pending.coroutine or pending.task} "
+                    f"at {pending.location}"
+                )
+
+    def _run_watchdog(self):
+        check_interval = min(self.interval, self.slow_callback_threshold) / 2
+        while not self._stopped.wait(check_interval):
+            tick = self._last_tick
+            blocked_for = time.monotonic() - tick - self.interval
+            if blocked_for >= self.slow_callback_threshold and self._captured_tick != tick:
+                self._captured_tick = tick
+                self._capture(blocked_for)
+
+    def _capture(self, blocked_for: float):
+        """Record what the loop thread is running right now (called from the watchdog)."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        report = SlowCallback(started_at=datetime.now(timezone.utc), blocked_for=blocked_for)
+
+        if frame is not None:
+            report.stack = [line.rstrip() for line in traceback.format_stack(frame, limit=self.stack_depth)]
+            report.location = f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+            coro_frame = _innermost_coroutine(frame)
+            if coro_frame is not None:
+                code = coro_frame.f_code
+                report.coroutine = getattr(code, "co_qualname", code.co_name)
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        if task is not None:
+            report.task = task.get_name()
+            if report.coroutine is None:
+                coro = task.get_coro()
+                report.coroutine = getattr(coro, "__qualname__", repr(coro))
+
+        self.reports.append(report)
+        self._pending = report
+        self.slow_callbacks_total += 1
+        SLOW_CALLBACKS.inc()
+
+    def snapshot(self, limit: int = 20) -> Dict[str, Any]:
+        """
+        Current lag statistics and the most recent slow callbacks.
+
+        Args:
+            limit: Slow callbacks to include (most recent first)
+
+        Returns:
+            Dictionary for the /debug/loop endpoint
+        """
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "slow_callback_threshold": self.slow_callback_threshold,
+            "lag": {"lifetime": self.lag.lifetime.snapshot(), **self.lag.snapshot()},
+            "slow_callbacks_total": self.slow_callbacks_total,
+            "slow_callbacks": [report.to_dict() for report in reversed(list(self.reports))][:limit]
+        }
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"LoopMonitor(running={self.running}, "
+            f"slow_callbacks={self.slow_callbacks_total})"
+        )
+
+
+_loop_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """Get or create the global loop monitor (configured from LOOP_MONITOR_* env vars)."""
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopMonitor(
+            interval=float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1")),
+            slow_callback_threshold=float(os.getenv("LOOP_MONITOR_SLOW_CALLBACK_THRESHOLD", "0.25")),
+            max_reports=int(os.getenv("LOOP_MONITOR_MAX_REPORTS", "50"))
+        )
+    return _loop_monitor
@@ -0,0 +1,418 @@
+"""
+Prometheus-style metrics registry.
+
+This module provides scrapeable metrics for the pipeline:
+- Counter: Monotonic totals (scrapers derive rates from these)
+- Gauge: Point-in-time values (queue depth, open connections)
+- Histogram: Cumulative-bucket distributions (queue wait, service time, TTFT)
+- MetricsRegistry: Holds metric families and renders the text exposition
+  format (version 0.0.4) served at /metrics
+
+Updates are plain attribute arithmetic on a cached child object, so hot
+paths pay one dict lookup (or none, if the child is kept) per update.
+Children are created under a lock; updates are not locked and assume the
+single asyncio event loop the pipeline runs on.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Content type for the text exposition format
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default buckets (seconds) for short operations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Buckets (seconds) for queue wait and task service time
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# Buckets (seconds) for LLM latency and time-to-first-token
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the text format."""
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Render a {name="value",...} label set (empty string if no labels)."""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+# ============================================================================
+# Metric Children
+# ============================================================================
+
+class CounterChild:
+    """A single counter time series."""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        """Increment by a non-negative amount."""
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        self.value += amount
+
+
+class GaugeChild:
+    """A single gauge time series."""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        """Set the current value."""
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        """Increase the value."""
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        """Decrease the value."""
+        self.value -= amount
+
+
+class HistogramChild:
+    """A single histogram time series with fixed bucket bounds."""
+
+    __slots__ = ('upper_bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # Per-bucket (non-cumulative) counts; last slot is +Inf
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record an observation."""
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> List[int]:
+        """Bucket counts as reported (cumulative, ending with +Inf)."""
+        total = 0
+        cumulative = []
+        for bucket_count in self.counts:
+            total += bucket_count
+            cumulative.append(total)
+        return cumulative
+
+
+# ============================================================================
+# Metric Families
+# ============================================================================
+
+class _MetricFamily:
+    """Base class for a named metric with optional labels."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        """
+        Get (or create) the child for a label set.
+
+        Callers on hot paths should keep the returned child and update it
+        directly instead of calling labels() per update.
+
+        Args:
+            *values: Label values in labelnames order
+            **kwargs: Label values by name (alternative to positional)
+
+        Returns:
+            Child time series
+        """
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+
+        child = self._children.get(values)
+        if child is not None:
+            return child
+
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name}: expected labels {self.labelnames}, got {values}"
+            )
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                child = self._children[values] = self._new_child()
+        return child
+
+    def _default_child(self):
+        """Child for metrics declared without labels."""
+        if self.labelnames:
+            raise ValueError(f"{self.name}: metric has labels, use labels()")
+        return self.labels()
+
+    def clear(self):
+        """Remove all children."""
+        with self._lock:
+            self._children.clear()
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """
+        Collect samples.
+
+        Returns:
+            List of (sample_name, labels, value)
+        """
+        raise NotImplementedError
+
+
+class Counter(_MetricFamily):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        if name.endswith("_total"):
+            name = name[:-len("_total")]
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Increment the unlabelled counter."""
+        self._default_child().inc(amount)
+
+    def samples(self):
+        return [
+            (f"{self.name}_total", dict(zip(self.labelnames, values)), child.value)
+            for values, child in list(self._children.items())
+        ]
+
+
+class Gauge(_MetricFamily):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def _new_child(self):
+        return GaugeChild()
+
+    def set(self, value: float):
+        """Set the unlabelled gauge."""
+        self._default_child().set(value)
+
+    def inc(self, amount: float = 1.0):
+        """Increase the unlabelled gauge."""
+        self._default_child().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        """Decrease the unlabelled gauge."""
+        self._default_child().dec(amount)
+
+    def samples(self):
+        return [
+            (self.name, dict(zip(self.labelnames, values)), child.value)
+            for values, child in list(self._children.items())
+        ]
+
+
+class Histogram(_MetricFamily):
+    """Distribution of observations in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        bounds = sorted(float(b) for b in buckets if b != math.inf)
+        if not bounds:
+            raise ValueError(f"{name}: histogram needs at least one bucket")
+        self.upper_bounds = tuple(bounds)
+
+    def _new_child(self):
+        return HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float):
+        """Record an observation on the unlabelled histogram."""
+        self._default_child().observe(value)
+
+    def samples(self):
+        result = []
+        bounds = [_format_value(b) for b in self.upper_bounds] + ["+Inf"]
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            for bound, cumulative in zip(bounds, child.cumulative_counts()):
+                result.append((f"{self.name}_bucket", {**labels, 'le': bound}, cumulative))
+            result.append((f"{self.name}_sum", labels, child.sum))
+            result.append((f"{self.name}_count", labels, child.count))
+        return result
+
+
+# ============================================================================
+# Registry
+# ============================================================================
+
+class MetricsRegistry:
+    """
+    Collection of metric families rendered together.
+
+    Registration is idempotent: asking for an existing name with the same
+    type and labels returns the existing family, so components can declare
+    their metrics in __init__ regardless of how many instances exist.
+    """
+
+    def __init__(self):
+        """Initialize empty registry."""
+        self._metrics: Dict[str, _MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        family = cls(name, documentation, labelnames, **kwargs)
+        with self._lock:
+            existing = self._metrics.get(family.name)
+            if existing is None:
+                self._metrics[family.name] = family
+                return family
+
+        if type(existing) is not cls or existing.labelnames != family.labelnames:
+            raise ValueError(
+                f"Metric '{family.name}' already registered as "
+                f"{existing.type_name}{list(existing.labelnames)}"
+            )
+        return existing
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_MetricFamily]:
+        """Look up a metric family by name."""
+        return self._metrics.get(name)
+
+    def get_sample_value(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """
+        Find the value of a single sample.
+
+        Args:
+            name: Sample name (e.g. 'llm_requests_total', 'queue_wait_seconds_count')
+            labels: Exact label set of the sample
+
+        Returns:
+            Sample value or None if not present
+        """
+        labels = labels or {}
+        for family in list(self._metrics.values()):
+            for sample_name, sample_labels, value in family.samples():
+                if sample_name == name and sample_labels == labels:
+                    return value
+        return None
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            Text with HELP/TYPE headers followed by samples
+        """
+        lines = []
+        for name in sorted(self._metrics):
+            family = self._metrics[name]
+            samples = family.samples()
+            if not samples:
+                continue
+            help_text = family.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {family.name} {help_text}")
+            lines.append(f"# TYPE {family.name} {family.type_name}")
+            for sample_name, labels, value in samples:
+                label_str = _format_labels(list(labels), list(labels.values()))
+                lines.append(f"{sample_name}{label_str} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Drop all recorded series (families stay registered)."""
+        for family in list(self._metrics.values()):
+            family.clear()
+
+
+# Process-wide default registry
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Get or create a counter in the default registry."""
+    return REGISTRY.counter(name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Get or create a gauge in the default registry."""
+    return REGISTRY.gauge(name, documentation, labelnames)
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    """Get or create a histogram in the default registry."""
+    return REGISTRY.histogram(name, documentation, labelnames, buckets)
+
+
+def generate_latest(registry: Optional[MetricsRegistry] = None) -> str:
+    """Render the default (or given) registry in text format."""
+    return (registry or REGISTRY).render()
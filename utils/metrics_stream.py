@@ -17,9 +17,10 @@ from typing import Dict, Any, List, Set, Optional, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field, asdict
 from enum import Enum
-import statistics
 from collections import deque
 
+from utils.quantile_sketch import RollingHistogram, DEFAULT_WINDOWS
+
 logger = logging.getLogger(__name__)
 
 
@@ -83,24 +84,31 @@ class MetricsCollector:
     Features:
     - Multiple metric sources
     - Automatic aggregation
-    - Time-windowed statistics
+    - Time-windowed statistics (1m/5m/1h percentiles from quantile sketches)
     - Memory-efficient storage
+    
+    Recording is O(1): latencies and queue depths go into per-second and
+    per-minute RollingHistogram buckets; percentiles are computed when
+    statistics are read, not on every record.
     """
     
     def __init__(
         self,
         window_size: int = 100,
-        retention_seconds: int = 3600
+        retention_seconds: int = 3600,
+        summary_window: int = 300
     ):
         """
         Initialize metrics collector.
         
         Args:
-            window_size: Number of recent metrics to keep per type
+            window_size: Number of recent raw metrics to keep per type
             retention_seconds: How long to retain metrics
+            summary_window: Window (seconds) for the flat avg/p50/p95/p99 stats
         """
         self.window_size = window_size
         self.retention_seconds = retention_seconds
+        self.summary_window = summary_window
         
         # Storage for recent metrics (using deque for efficient operations)
         self.metrics: Dict[MetricType, deque] = {
@@ -108,8 +116,15 @@ class MetricsCollector:
             for metric_type in MetricType
         }
         
-        # Aggregated statistics
-        self.stats: Dict[MetricType, Dict[str, Any]] = {}
+        # Latest metric and update time per type
+        self._latest: Dict[MetricType, Metric] = {}
+        self._updated_at: Dict[MetricType, datetime] = {}
+        
+        # Streaming aggregates
+        self.latency_histogram = RollingHistogram()
+        self.queue_depth_histogram = RollingHistogram()
+        self.total_success: Optional[int] = None
+        self.total_errors: Optional[int] = None
         
         logger.info(
             f"📊 MetricsCollector: Initialized "
@@ -127,76 +142,84 @@ class MetricsCollector:
         self.metrics[metric.metric_type].append(metric)
         
         # Update statistics
-        self._update_stats(metric.metric_type)
+        self._update_stats(metric)
         
         logger.debug(
             f"📈 Recorded {metric.metric_type.value} metric "
             f"(priority: {metric.priority.name})"
         )
     
-    def _update_stats(self, metric_type: MetricType):
-        """Update aggregated statistics for a metric type."""
-        metrics = list(self.metrics[metric_type])
+    def _update_stats(self, metric: Metric):
+        """Update streaming aggregates for a new metric (O(1))."""
+        metric_type = metric.metric_type
+        self._latest[metric_type] = metric
+        self._updated_at[metric_type] = datetime.now()
         
-        if not metrics:
-            return
-        
-        # Calculate basic stats
-        self.stats[metric_type] = {
-            'count': len(metrics),
-            'latest': metrics[-1].to_dict(),
-            'updated_at': datetime.now().isoformat()
+        data = metric.data
+        if metric_type == MetricType.PERFORMANCE:
+            if 'latency' in data:
+                self.latency_histogram.record(data['latency'])
+            if 'success_count' in data:
+                self.total_success = (self.total_success or 0) + data['success_count']
+            if 'error_count' in data:
+                self.total_errors = (self.total_errors or 0) + data['error_count']
+        elif metric_type == MetricType.QUEUE_STATUS:
+            self.queue_depth_histogram.record(data.get('depth', 0))
+    
+    def _build_stats(self, metric_type: MetricType) -> Dict[str, Any]:
+        """Build aggregated statistics for a metric type."""
+        latest = self._latest.get(metric_type)
+        if latest is None:
+            return {}
+        
+        stats = {
+            'count': len(self.metrics[metric_type]),
+            'latest': latest.to_dict(),
+            'updated_at': self._updated_at[metric_type].isoformat()
         }
         
         # Type-specific aggregations
         if metric_type == MetricType.PERFORMANCE:
-            self._aggregate_performance_stats(metrics)
+            stats.update(self._aggregate_performance_stats())
         elif metric_type == MetricType.QUEUE_STATUS:
-            self._aggregate_queue_stats(metrics)
+            stats.update(self._aggregate_queue_stats(latest))
+        
+        return stats
     
-    def _aggregate_performance_stats(self, metrics: List[Metric]):
+    def _aggregate_performance_stats(self) -> Dict[str, Any]:
         """Aggregate performance metrics."""
-        latencies = []
-        success_counts = []
-        error_counts = []
-        
-        for metric in metrics:
-            if 'latency' in metric.data:
-                latencies.append(metric.data['latency'])
-            if 'success_count' in metric.data:
-                success_counts.append(metric.data['success_count'])
-            if 'error_count' in metric.data:
-                error_counts.append(metric.data['error_count'])
-        
         perf_stats = {}
         
-        if latencies:
-            perf_stats['avg_latency'] = statistics.mean(latencies)
-            perf_stats['p50_latency'] = statistics.median(latencies)
-            perf_stats['p95_latency'] = sorted(latencies)[int(len(latencies) * 0.95)]
-        
-        if success_counts:
-            perf_stats['total_success'] = sum(success_counts)
-        
-        if error_counts:
-            perf_stats['total_errors'] = sum(error_counts)
-            total_requests = sum(success_counts) + sum(error_counts)
+        if self.latency_histogram.lifetime.count:
+            summary = self.latency_histogram.window(self.summary_window)
+            if summary.count:
+                perf_stats['avg_latency'] = summary.mean()
+                perf_stats['p50_latency'] = summary.quantile(0.50)
+                perf_stats['p95_latency'] = summary.quantile(0.95)
+                perf_stats['p99_latency'] = summary.quantile(0.99)
+            perf_stats['latency_windows'] = self.latency_histogram.snapshot(DEFAULT_WINDOWS)
+        
+        if self.total_success is not None:
+            perf_stats['total_success'] = self.total_success
+        
+        if self.total_errors is not None:
+            perf_stats['total_errors'] = self.total_errors
+            total_requests = (self.total_success or 0) + self.total_errors
             if total_requests > 0:
-                perf_stats['error_rate'] = sum(error_counts) / total_requests
+                perf_stats['error_rate'] = self.total_errors / total_requests
         
-        self.stats[MetricType.PERFORMANCE].update(perf_stats)
+        return perf_stats
     
-    def _aggregate_queue_stats(self, metrics: List[Metric]):
+    def _aggregate_queue_stats(self, latest: Metric) -> Dict[str, Any]:
         """Aggregate queue status metrics."""
-        latest = metrics[-1].data
+        summary = self.queue_depth_histogram.window(self.summary_window)
         
-        queue_stats = {
-            'current_depth': latest.get('depth', 0),
-            'avg_depth': statistics.mean([m.data.get('depth', 0) for m in metrics]),
-            'peak_depth': max([m.data.get('depth', 0) for m in metrics]),
+        return {
+            'current_depth': latest.data.get('depth', 0),
+            'avg_depth': summary.mean() or 0,
+            'peak_depth': summary.max if summary.count else 0,
+            'depth_windows': self.queue_depth_histogram.snapshot(DEFAULT_WINDOWS)
         }
-        
-        self.stats[MetricType.QUEUE_STATUS].update(queue_stats)
     
     def get_recent_metrics(
         self,
@@ -231,10 +254,10 @@ class MetricsCollector:
             Statistics dictionary
         """
         if metric_type:
-            return self.stats.get(metric_type, {})
+            return self._build_stats(metric_type)
         
         return {
-            mt.value: self.stats.get(mt, {})
+            mt.value: self._build_stats(mt)
             for mt in MetricType
         }
     
@@ -0,0 +1,71 @@
+"""
+Cursor pagination shared by every store.
+
+This module provides:
+- Page: One page of results plus an opaque cursor for the next one
+- encode_cursor / decode_cursor: Opaque, URL-safe cursor tokens for a
+  keyset position (the sort key values of the last row of a page)
+
+Stores resume a listing from the decoded position (WHERE (sort, id) <
+(last_sort, last_id)) instead of skipping rows with OFFSET, so reading a
+page costs the same however deep into the listing it is.
+"""
+
+import json
+import base64
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Generic, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of results and the cursor for the next one (None at the end)."""
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(position: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Encode a keyset position (column -> value) as an opaque cursor token."""
+    if not position:
+        return None
+    typed = {name: _encode_value(value) for name, value in position.items()}
+    raw = json.dumps(typed, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], required: Iterable[str] = ()) -> Optional[Dict[str, Any]]:
+    """
+    Decode a cursor token back into a keyset position.
+
+    Args:
+        cursor: Token from a previous Page.next_cursor (None: first page)
+        required: Names the position must contain
+
+    Raises:
+        ValueError: If the token is malformed or lacks a required name
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        typed = json.loads(raw)
+        if not isinstance(typed, dict) or not set(required) <= typed.keys():
+            raise TypeError("cursor does not hold a keyset position")
+        return {name: _decode_value(value) for name, value in typed.items()}
+    except Exception as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from e
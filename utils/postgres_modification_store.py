@@ -0,0 +1,435 @@
+"""
+PostgreSQL adapter for ModificationPlan storage.
+
+One row per plan in the modifications table (database/schema.sql,
+migration 004) on the shared asyncpg pool. Columns hold what is filtered
+or updated on its own (status, affected files, approval and execution
+timestamps); the rest of the analysis is kept in impact_analysis (JSONB).
+
+Status changes, approvals and rejections are single UPDATE statements, and
+list_modifications_page pages by keyset on (requested_at, id) using
+idx_modifications_project_requested_at.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import asyncpg
+
+from database.connection import DatabaseManager, get_db, to_db_timestamp, from_db_timestamp
+from models.modification_plan import ModificationPlan, ModificationStatus
+from utils.pagination import Page, encode_cursor, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+# ModificationPlan fields stored in impact_analysis
+ANALYSIS_FIELDS = (
+    'changes', 'risk_level', 'risk_score', 'estimated_hours', 'complexity',
+    'summary', 'detailed_explanation', 'impact_description',
+    'recommendations', 'testing_requirements'
+)
+
+MODIFICATION_COLUMNS = """
+    id, project_id, request, requested_at, impact_analysis, affected_files,
+    status, approved_at, approved_by, started_at, applied_at, error_message
+"""
+
+# ============================================================================
+# Statements
+# ============================================================================
+
+UPSERT_MODIFICATION = """
+    INSERT INTO modifications (""" + MODIFICATION_COLUMNS + """, requested_by) VALUES (
+        $1, $2, $3, $4, $5::jsonb, $6::text[], $7, $8, $9, $10, $11, $12, 'system'
+    )
+    ON CONFLICT (id) DO UPDATE SET
+        request = EXCLUDED.request,
+        impact_analysis = EXCLUDED.impact_analysis,
+        affected_files = EXCLUDED.affected_files,
+        status = EXCLUDED.status,
+        approved_at = EXCLUDED.approved_at,
+        approved_by = EXCLUDED.approved_by,
+        started_at = EXCLUDED.started_at,
+        applied_at = EXCLUDED.applied_at,
+        error_message = EXCLUDED.error_message
+    WHERE modifications.project_id = EXCLUDED.project_id
+"""
+
+SELECT_MODIFICATION = (
+    "SELECT " + MODIFICATION_COLUMNS + " FROM modifications WHERE project_id = $1 AND id = $2"
+)
+
+MODIFICATION_EXISTS = "SELECT EXISTS (SELECT 1 FROM modifications WHERE project_id = $1 AND id = $2)"
+
+DELETE_MODIFICATION = "DELETE FROM modifications WHERE project_id = $1 AND id = $2"
+
+LIST_BY_PROJECT = """
+    SELECT """ + MODIFICATION_COLUMNS + """ FROM modifications
+    WHERE project_id = $1
+    ORDER BY requested_at DESC, id DESC
+    LIMIT $2
+"""
+
+LIST_BY_PROJECT_AFTER = """
+    SELECT """ + MODIFICATION_COLUMNS + """ FROM modifications
+    WHERE project_id = $1 AND (requested_at, id) < ($2, $3)
+    ORDER BY requested_at DESC, id DESC
+    LIMIT $4
+"""
+
+LIST_BY_STATUS = """
+    SELECT """ + MODIFICATION_COLUMNS + """ FROM modifications
+    WHERE status = $1
+    ORDER BY requested_at DESC, id DESC
+    LIMIT $2
+"""
+
+UPDATE_STATUS = """
+    UPDATE modifications SET
+        status = $3,
+        started_at = CASE WHEN $3 = 'in_progress' THEN COALESCE(started_at, $4) ELSE started_at END,
+        applied_at = CASE WHEN $3 = 'completed' THEN $4 ELSE applied_at END,
+        error_message = CASE WHEN $3 = 'failed' THEN $5 ELSE error_message END
+    WHERE project_id = $1 AND id = $2
+"""
+
+APPROVE = """
+    UPDATE modifications SET status = 'approved', approved_at = $3, approved_by = $4
+    WHERE project_id = $1 AND id = $2
+"""
+
+REJECT = "UPDATE modifications SET status = 'rejected' WHERE project_id = $1 AND id = $2"
+
+
+class PostgresModificationStore:
+    """
+    PostgreSQL adapter for ModificationPlan.
+
+    Same interface as DynamoDBModificationStore. Plans reference their
+    project (ON DELETE CASCADE), so the project must be stored first.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        """
+        Initialize the PostgreSQL modification store.
+
+        Args:
+            db: Database manager whose pool to use (defaults to the global one)
+        """
+        self.db = db or get_db()
+        logger.info("PostgresModificationStore initialized")
+
+    # ========================================================================
+    # Serialization
+    # ========================================================================
+
+    @staticmethod
+    def _modification_params(modification: ModificationPlan) -> Tuple:
+        """Parameters of UPSERT_MODIFICATION for a plan."""
+        data = modification.to_dict()
+        return (
+            modification.id,
+            modification.project_id,
+            modification.request,
+            to_db_timestamp(modification.created_at),
+            json.dumps({name: data[name] for name in ANALYSIS_FIELDS}),
+            modification.affected_files,
+            modification.status.value,
+            to_db_timestamp(modification.approved_at),
+            modification.approved_by,
+            to_db_timestamp(modification.started_at),
+            to_db_timestamp(modification.completed_at),
+            modification.error_message
+        )
+
+    @staticmethod
+    def _row_to_modification(row: asyncpg.Record) -> ModificationPlan:
+        """Build a ModificationPlan from a modifications row."""
+        def isoformat(value: Optional[datetime]) -> Optional[str]:
+            value = from_db_timestamp(value)
+            return value.isoformat() if value else None
+
+        return ModificationPlan.from_dict({
+            **json.loads(row['impact_analysis'] or '{}'),
+            'id': row['id'],
+            'project_id': row['project_id'],
+            'request': row['request'],
+            'affected_files': list(row['affected_files'] or []),
+            'status': row['status'],
+            'created_at': isoformat(row['requested_at']),
+            'approved_at': isoformat(row['approved_at']),
+            'approved_by': row['approved_by'],
+            'started_at': isoformat(row['started_at']),
+            'completed_at': isoformat(row['applied_at']),
+            'error_message': row['error_message']
+        })
+
+    def _parse_modifications(self, rows: List[asyncpg.Record]) -> List[ModificationPlan]:
+        """Convert rows to ModificationPlans, skipping unparsable ones."""
+        modifications = []
+        for row in rows:
+            try:
+                modifications.append(self._row_to_modification(row))
+            except Exception as e:
+                logger.warning(f"Failed to parse modification row {row['id']}: {e}")
+        return modifications
+
+    # ========================================================================
+    # Public API
+    # ========================================================================
+
+    async def save_modification(self, modification: ModificationPlan) -> bool:
+        """
+        Save a modification plan.
+
+        Args:
+            modification: The ModificationPlan to save
+
+        Returns:
+            bool: True if save was successful, False otherwise
+        """
+        try:
+            result = await self.db.execute(UPSERT_MODIFICATION, *self._modification_params(modification))
+            if result != 'INSERT 0 1':
+                logger.error(f"Modification {modification.id} belongs to another project")
+                return False
+
+            logger.info(f"Successfully saved modification {modification.id} for project {modification.project_id}")
+            return True
+
+        except asyncpg.ForeignKeyViolationError:
+            logger.error(f"Cannot save modification {modification.id}: project {modification.project_id} not found")
+            return False
+        except Exception as e:
+            logger.error(f"Unexpected error saving modification {modification.id}: {e}", exc_info=True)
+            return False
+
+    async def load_modification(self, project_id: str, modification_id: str) -> Optional[ModificationPlan]:
+        """
+        Load a modification plan.
+
+        Args:
+            project_id: The ID of the project
+            modification_id: The ID of the modification
+
+        Returns:
+            ModificationPlan if found, None otherwise
+        """
+        try:
+            row = await self.db.fetchrow(SELECT_MODIFICATION, project_id, modification_id)
+            if row is None:
+                logger.warning(f"Modification {modification_id} not found for project {project_id}")
+                return None
+
+            modification = self._row_to_modification(row)
+            logger.info(f"Successfully loaded modification {modification_id}")
+            return modification
+
+        except Exception as e:
+            logger.error(f"Unexpected error loading modification {modification_id}: {e}", exc_info=True)
+            return None
+
+    async def update_modification(self, modification: ModificationPlan) -> bool:
+        """
+        Update a modification plan (alias for save_modification).
+
+        Args:
+            modification: The ModificationPlan to update
+
+        Returns:
+            bool: True if update was successful, False otherwise
+        """
+        return await self.save_modification(modification)
+
+    async def delete_modification(self, project_id: str, modification_id: str) -> bool:
+        """
+        Delete a modification plan.
+
+        Args:
+            project_id: The ID of the project
+            modification_id: The ID of the modification
+
+        Returns:
+            bool: True if deletion was successful, False otherwise
+        """
+        try:
+            await self.db.execute(DELETE_MODIFICATION, project_id, modification_id)
+            logger.info(f"Successfully deleted modification {modification_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Unexpected error deleting modification {modification_id}: {e}", exc_info=True)
+            return False
+
+    async def list_modifications_by_project(self, project_id: str, limit: int = 100) -> List[ModificationPlan]:
+        """
+        List the most recent modifications of a project.
+
+        Args:
+            project_id: The ID of the project
+            limit: Maximum number of results to return
+
+        Returns:
+            List of ModificationPlan objects
+        """
+        return (await self.list_modifications_page(project_id, limit=limit)).items
+
+    async def list_modifications_page(
+        self,
+        project_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page[ModificationPlan]:
+        """
+        One page of a project's modifications, newest first.
+
+        Args:
+            project_id: The ID of the project
+            limit: Maximum number of modifications in the page
+            cursor: next_cursor of the previous page
+
+        Returns:
+            Page of ModificationPlan objects (next_cursor is None on the last page)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        position = decode_cursor(cursor, required=('requested_at', 'id'))
+        try:
+            if position:
+                rows = await self.db.fetch(
+                    LIST_BY_PROJECT_AFTER, project_id,
+                    to_db_timestamp(position['requested_at']), position['id'], limit + 1
+                )
+            else:
+                rows = await self.db.fetch(LIST_BY_PROJECT, project_id, limit + 1)
+        except Exception as e:
+            logger.error(f"Failed to list modifications for project {project_id}: {e}", exc_info=True)
+            return Page()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor({'requested_at': from_db_timestamp(last['requested_at']), 'id': last['id']})
+
+        modifications = self._parse_modifications(rows)
+        logger.info(f"Found {len(modifications)} modifications for project {project_id}")
+        return Page(items=modifications, next_cursor=next_cursor)
+
+    async def list_modifications_by_status(self, status: str, limit: int = 100) -> List[ModificationPlan]:
+        """
+        List the most recent modifications with a specific status.
+
+        Args:
+            status: The status to filter by
+            limit: Maximum number of results to return
+
+        Returns:
+            List of ModificationPlan objects
+        """
+        try:
+            rows = await self.db.fetch(LIST_BY_STATUS, ModificationStatus(status).value, limit)
+            modifications = self._parse_modifications(rows)
+
+            logger.info(f"Found {len(modifications)} modifications with status {status}")
+            return modifications
+
+        except Exception as e:
+            logger.error(f"Unexpected error listing modifications by status: {e}", exc_info=True)
+            return []
+
+    async def update_modification_status(
+        self,
+        project_id: str,
+        modification_id: str,
+        status: ModificationStatus,
+        error_message: Optional[str] = None
+    ) -> bool:
+        """
+        Update the status of a modification plan.
+
+        Sets started_at on the first IN_PROGRESS, completed_at on COMPLETED
+        and the error message on FAILED, in the same statement.
+
+        Args:
+            project_id: The ID of the project
+            modification_id: The ID of the modification
+            status: The new status
+            error_message: Optional error message if status is FAILED
+
+        Returns:
+            bool: True if update was successful, False otherwise
+        """
+        try:
+            result = await self.db.execute(
+                UPDATE_STATUS, project_id, modification_id, ModificationStatus(status).value,
+                to_db_timestamp(datetime.utcnow()), error_message
+            )
+            if result != 'UPDATE 1':
+                logger.error(f"Cannot update status for non-existent modification {modification_id}")
+                return False
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to update modification status: {e}", exc_info=True)
+            return False
+
+    async def approve_modification(self, project_id: str, modification_id: str, approved_by: str) -> bool:
+        """
+        Approve a modification plan.
+
+        Args:
+            project_id: The ID of the project
+            modification_id: The ID of the modification
+            approved_by: User ID who approved the modification
+
+        Returns:
+            bool: True if approval was successful, False otherwise
+        """
+        try:
+            result = await self.db.execute(
+                APPROVE, project_id, modification_id, to_db_timestamp(datetime.utcnow()), approved_by
+            )
+            return result == 'UPDATE 1'
+
+        except Exception as e:
+            logger.error(f"Failed to approve modification {modification_id}: {e}", exc_info=True)
+            return False
+
+    async def reject_modification(self, project_id: str, modification_id: str) -> bool:
+        """
+        Reject a modification plan.
+
+        Args:
+            project_id: The ID of the project
+            modification_id: The ID of the modification
+
+        Returns:
+            bool: True if rejection was successful, False otherwise
+        """
+        try:
+            return await self.db.execute(REJECT, project_id, modification_id) == 'UPDATE 1'
+
+        except Exception as e:
+            logger.error(f"Failed to reject modification {modification_id}: {e}", exc_info=True)
+            return False
+
+    async def modification_exists(self, project_id: str, modification_id: str) -> bool:
+        """
+        Check if a modification exists.
+
+        Args:
+            project_id: The ID of the project
+            modification_id: The ID of the modification
+
+        Returns:
+            bool: True if modification exists, False otherwise
+        """
+        try:
+            return await self.db.fetchval(MODIFICATION_EXISTS, project_id, modification_id)
+        except Exception as e:
+            logger.error(f"Failed to check modification {modification_id}: {e}", exc_info=True)
+            return False
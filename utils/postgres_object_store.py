@@ -0,0 +1,210 @@
+"""
+PostgreSQL object store for codebase snapshots.
+
+PostgresObjectStore keeps the trees and file bodies of codebase snapshots
+(utils.codebase_versions) in codebase_objects, and the manifests that
+reference them in codebase_manifests (database/schema.sql, migration 005),
+so every API host sharing the database sees the same snapshots. It has
+the BlobStore interface SnapshotStore and PlannerAgent use: put / exists /
+get / get_text for objects, get_manifest / write_manifest /
+delete_manifests for references, and gc for unreferenced objects.
+
+The interface is blocking, as snapshot work runs in worker threads
+(asyncio.to_thread). From a worker thread, queries run on the asyncpg pool
+through the event loop the store was created on; a blocking call made on
+an event loop thread, or with no loop to use, runs on a short-lived
+connection instead.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Mapping, Optional, TypeVar, Union
+
+import asyncpg
+
+from database.connection import DatabaseManager, get_db
+from utils.blob_store import blob_hash
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# ============================================================================
+# Statements
+# ============================================================================
+
+# A put of an existing object restarts its gc grace period
+INSERT_OBJECT = """
+    INSERT INTO codebase_objects (hash, data) VALUES ($1, $2)
+    ON CONFLICT (hash) DO UPDATE SET created_at = CURRENT_TIMESTAMP
+"""
+
+OBJECT_EXISTS = "SELECT EXISTS (SELECT 1 FROM codebase_objects WHERE hash = $1)"
+
+SELECT_OBJECT = "SELECT data FROM codebase_objects WHERE hash = $1"
+
+SELECT_MANIFEST = "SELECT path, hash FROM codebase_manifests WHERE name = $1"
+
+DELETE_MANIFEST = "DELETE FROM codebase_manifests WHERE name = $1"
+
+INSERT_MANIFEST_ENTRY = "INSERT INTO codebase_manifests (name, path, hash) VALUES ($1, $2, $3)"
+
+# Every manifest under a prefix ($1 ends with "/"); returns the number of manifests
+DELETE_MANIFESTS = """
+    WITH deleted AS (
+        DELETE FROM codebase_manifests WHERE starts_with(name, $1) RETURNING name
+    )
+    SELECT COUNT(DISTINCT name) FROM deleted
+"""
+
+DELETE_UNREFERENCED_OBJECTS = """
+    DELETE FROM codebase_objects o
+    WHERE o.created_at <= CURRENT_TIMESTAMP - make_interval(secs => $1)
+      AND NOT EXISTS (SELECT 1 FROM codebase_manifests m WHERE m.hash = o.hash)
+"""
+
+
+class PostgresObjectStore:
+    """
+    Content-addressed objects and named manifests in PostgreSQL.
+
+    Tables:
+    - codebase_objects: SHA-256 hash -> bytes (TOAST compresses large values)
+    - codebase_manifests: (name, path) -> hash; a manifest keeps the objects
+      it lists alive, and its hashes reference stored objects (foreign key)
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Initialize the object store.
+
+        Args:
+            db: Database manager whose pool to use (defaults to the global one)
+            loop: Event loop the pool runs on (defaults to the running loop, if any)
+        """
+        self.db = db or get_db()
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+        self._loop = loop
+
+    # ========================================================================
+    # Query Execution
+    # ========================================================================
+
+    async def _on_pool(self, operation: Callable[[asyncpg.Connection], Awaitable[T]]) -> T:
+        async with self.db.acquire() as conn:
+            return await operation(conn)
+
+    async def _on_connection(self, operation: Callable[[asyncpg.Connection], Awaitable[T]]) -> T:
+        conn = await asyncpg.connect(self.db.database_url)
+        try:
+            return await operation(conn)
+        finally:
+            await conn.close()
+
+    def _run(self, operation: Callable[[asyncpg.Connection], Awaitable[T]]) -> T:
+        """Run operation(conn) to completion from blocking code."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loop is not None and not self._loop.is_closed():
+                # Worker thread: run the query on the pool's loop
+                return asyncio.run_coroutine_threadsafe(self._on_pool(operation), self._loop).result()
+            return asyncio.run(self._on_connection(operation))
+        # Blocking call on an event loop thread: the pool cannot be used
+        # from here, so query on a short-lived connection in a thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self._on_connection(operation)).result()
+
+    # ========================================================================
+    # Objects
+    # ========================================================================
+
+    def put(self, content: Union[str, bytes]) -> str:
+        """
+        Store content unless an identical object exists.
+
+        Returns:
+            SHA-256 hex digest of the content
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        content_hash = blob_hash(data)
+        self._run(lambda conn: conn.execute(INSERT_OBJECT, content_hash, data))
+        return content_hash
+
+    def exists(self, content_hash: str) -> bool:
+        """Whether an object is stored."""
+        return self._run(lambda conn: conn.fetchval(OBJECT_EXISTS, content_hash))
+
+    def get(self, content_hash: str) -> bytes:
+        """
+        Read an object.
+
+        Raises:
+            KeyError: If the object is not stored
+            ValueError: If the stored bytes do not match the hash
+        """
+        data = self._run(lambda conn: conn.fetchval(SELECT_OBJECT, content_hash))
+        if data is None:
+            raise KeyError(content_hash)
+        if blob_hash(data) != content_hash:
+            raise ValueError(f"Object {content_hash} does not match its content hash")
+        return data
+
+    def get_text(self, content_hash: str) -> str:
+        """Read an object as UTF-8 text."""
+        return self.get(content_hash).decode("utf-8")
+
+    def gc(self, grace_seconds: float = 3600.0) -> int:
+        """
+        Delete objects no manifest lists that were stored more than grace_seconds ago.
+
+        Returns:
+            Number of objects deleted
+        """
+        result = self._run(lambda conn: conn.execute(DELETE_UNREFERENCED_OBJECTS, float(grace_seconds)))
+        deleted = int(result.split()[-1])
+        if deleted:
+            logger.info(f"🧹 PostgresObjectStore: Deleted {deleted} unreferenced objects")
+        return deleted
+
+    # ========================================================================
+    # Manifests
+    # ========================================================================
+
+    def get_manifest(self, name: str) -> Optional[Dict[str, str]]:
+        """A named manifest (path -> hash), or None if it does not exist (or is empty)."""
+        rows = self._run(lambda conn: conn.fetch(SELECT_MANIFEST, name))
+        return {row["path"]: row["hash"] for row in rows} or None
+
+    def write_manifest(self, name: str, manifest: Mapping[str, str]) -> None:
+        """
+        (Re)write a named manifest of already stored objects.
+
+        Raises:
+            KeyError: If a hash in the manifest is not stored
+        """
+        entries = [(name, path, content_hash) for path, content_hash in manifest.items()]
+
+        async def write(conn: asyncpg.Connection) -> None:
+            async with conn.transaction():
+                await conn.execute(DELETE_MANIFEST, name)
+                await conn.executemany(INSERT_MANIFEST_ENTRY, entries)
+
+        try:
+            self._run(write)
+        except asyncpg.ForeignKeyViolationError as e:
+            raise KeyError(f"Manifest {name} references an object that is not stored: {e.detail}") from e
+
+    def delete_manifests(self, prefix: str) -> int:
+        """
+        Delete every manifest whose name starts with prefix + "/".
+
+        Returns:
+            Number of manifests deleted
+        """
+        return self._run(lambda conn: conn.fetchval(DELETE_MANIFESTS, prefix.rstrip("/") + "/"))
@@ -0,0 +1,815 @@
+"""
+PostgreSQL adapter for ProjectContext storage.
+
+Stores project metadata and history in project_contexts and one row per
+file in project_files (database/schema.sql, migration 004), on the shared
+asyncpg pool (database.connection).
+
+- Every statement is a constant SQL string, so asyncpg prepares it once per
+  connection and reuses the plan from its statement cache.
+- save_context runs in one transaction and writes only the files whose
+  content hash changed; new projects and large deltas are bulk loaded
+  with COPY.
+- add_modification / add_deployment append to the JSONB history arrays in
+  place (jsonb || jsonb) without loading the project.
+- list_contexts_page pages by keyset on (updated_at, id), so a deep page
+  costs the same as the first one; list_history_page filters and pages
+  the history arrays in SQL.
+- load_context(lazy=True) reads only file paths, sizes and hashes; bodies
+  are fetched on first access.
+
+Codebase snapshots (utils.codebase_versions) are kept in codebase_objects
+and codebase_manifests through PostgresObjectStore, so they are shared by
+every host using the database.
+"""
+
+import json
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import asyncpg
+
+from database.connection import DatabaseManager, get_db, to_db_timestamp, from_db_timestamp
+from models.lazy_codebase import FileEntry, LazyCodebase, codebase_hash
+from models.project_context import (
+    ProjectContext, ProjectType, ProjectStatus, Modification, Deployment
+)
+from utils.codebase_versions import snapshot_manifest_prefix
+from utils.postgres_object_store import DELETE_MANIFESTS, PostgresObjectStore
+from utils.pagination import Page, encode_cursor, decode_cursor
+from utils.project_history import (
+    HistoryEvent, check_history_type, decode_history_cursor, event_from_dict, history_position
+)
+
+logger = logging.getLogger(__name__)
+
+# Changed files at or above this count go through COPY instead of executemany
+COPY_THRESHOLD = 32
+
+FILE_COLUMNS = ('project_id', 'path', 'content', 'content_hash', 'size')
+
+PROJECT_COLUMNS = """
+    id, name, type, status, owner_id, description, repository_url,
+    dependencies, modifications, deployments, environment_vars, deployment_config,
+    test_coverage, security_score, performance_score,
+    created_at, updated_at, last_deployed_at
+"""
+
+# ============================================================================
+# Statements
+# ============================================================================
+
+UPSERT_PROJECT = """
+    INSERT INTO project_contexts (""" + PROJECT_COLUMNS + """) VALUES (
+        $1, $2, $3, $4, $5, $6, $7,
+        $8::jsonb, $9::jsonb, $10::jsonb, $11::jsonb, $12::jsonb,
+        $13::float8, $14::float8, $15::float8,
+        $16, $17, $18
+    )
+    ON CONFLICT (id) DO UPDATE SET
+        name = EXCLUDED.name,
+        type = EXCLUDED.type,
+        status = EXCLUDED.status,
+        owner_id = EXCLUDED.owner_id,
+        description = EXCLUDED.description,
+        repository_url = EXCLUDED.repository_url,
+        dependencies = EXCLUDED.dependencies,
+        modifications = EXCLUDED.modifications,
+        deployments = EXCLUDED.deployments,
+        environment_vars = EXCLUDED.environment_vars,
+        deployment_config = EXCLUDED.deployment_config,
+        test_coverage = EXCLUDED.test_coverage,
+        security_score = EXCLUDED.security_score,
+        performance_score = EXCLUDED.performance_score,
+        last_deployed_at = EXCLUDED.last_deployed_at
+    RETURNING updated_at
+"""
+
+SELECT_PROJECT = "SELECT " + PROJECT_COLUMNS + " FROM project_contexts WHERE id = $1"
+
+PROJECT_EXISTS = "SELECT EXISTS (SELECT 1 FROM project_contexts WHERE id = $1)"
+
+DELETE_PROJECT = "DELETE FROM project_contexts WHERE id = $1"
+
+APPEND_MODIFICATION = """
+    UPDATE project_contexts
+    SET modifications = COALESCE(modifications, '[]'::jsonb) || $2::jsonb
+    WHERE id = $1
+"""
+
+APPEND_DEPLOYMENT = """
+    UPDATE project_contexts
+    SET deployments = COALESCE(deployments, '[]'::jsonb) || $2::jsonb,
+        last_deployed_at = $3
+    WHERE id = $1
+"""
+
+# One page of history, newest first by (timestamp, type, id). $2 type filter,
+# $3 status filter, $4-$6 keyset position of the previous page (all nullable)
+SELECT_HISTORY_PAGE = """
+    SELECT h.type, h.entry::text AS entry
+    FROM project_contexts p
+    CROSS JOIN LATERAL (
+        SELECT 'modification' AS type, m.entry
+        FROM jsonb_array_elements(COALESCE(p.modifications, '[]'::jsonb)) AS m(entry)
+        WHERE $2::text IS NULL OR $2::text = 'modification'
+        UNION ALL
+        SELECT 'deployment' AS type, d.entry
+        FROM jsonb_array_elements(COALESCE(p.deployments, '[]'::jsonb)) AS d(entry)
+        WHERE $2::text IS NULL OR $2::text = 'deployment'
+    ) AS h
+    WHERE p.id = $1
+      AND ($3::text IS NULL OR h.entry->>'status' = $3::text)
+      AND ($4::timestamp IS NULL OR
+           ((h.entry->>'timestamp')::timestamp, h.type, h.entry->>'id') < ($4::timestamp, $5::text, $6::text))
+    ORDER BY (h.entry->>'timestamp')::timestamp DESC, h.type DESC, h.entry->>'id' DESC
+    LIMIT $7
+"""
+
+SELECT_FILE_HASHES = "SELECT path, content_hash FROM project_files WHERE project_id = $1"
+
+SELECT_FILE_ENTRIES = "SELECT path, size, content_hash FROM project_files WHERE project_id = $1"
+
+SELECT_FILES = "SELECT path, content FROM project_files WHERE project_id = $1"
+
+SELECT_FILE_BODIES = "SELECT path, content FROM project_files WHERE project_id = $1 AND path = ANY($2::text[])"
+
+DELETE_FILES = "DELETE FROM project_files WHERE project_id = $1 AND path = ANY($2::text[])"
+
+UPSERT_FILE = """
+    INSERT INTO project_files (project_id, path, content, content_hash, size)
+    VALUES ($1, $2, $3, $4, $5)
+    ON CONFLICT (project_id, path) DO UPDATE SET
+        content = EXCLUDED.content,
+        content_hash = EXCLUDED.content_hash,
+        size = EXCLUDED.size,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+CREATE_FILE_STAGING = """
+    CREATE TEMP TABLE IF NOT EXISTS project_files_staging
+        (LIKE project_files INCLUDING DEFAULTS) ON COMMIT DELETE ROWS
+"""
+
+MERGE_FILE_STAGING = """
+    INSERT INTO project_files (project_id, path, content, content_hash, size)
+    SELECT project_id, path, content, content_hash, size FROM project_files_staging
+    ON CONFLICT (project_id, path) DO UPDATE SET
+        content = EXCLUDED.content,
+        content_hash = EXCLUDED.content_hash,
+        size = EXCLUDED.size,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# update_context_fields: field -> SQL type of its column
+FIELD_TYPES = {
+    'name': 'text',
+    'type': 'text',
+    'status': 'text',
+    'owner_id': 'text',
+    'description': 'text',
+    'repository_url': 'text',
+    'dependencies': 'jsonb',
+    'modifications': 'jsonb',
+    'deployments': 'jsonb',
+    'environment_vars': 'jsonb',
+    'deployment_config': 'jsonb',
+    'test_coverage': 'float8',
+    'security_score': 'float8',
+    'performance_score': 'float8',
+    'created_at': 'timestamptz',
+    'last_deployed_at': 'timestamptz'
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if is_dataclass(value):
+        return asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def to_json(value: Any) -> str:
+    """Serialize a model value (dataclasses, enums, datetimes) for a JSONB parameter."""
+    return json.dumps(value, default=_json_default)
+
+
+def _timestamp(value: Union[datetime, str, None]) -> Optional[datetime]:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return to_db_timestamp(value)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    value = from_db_timestamp(value)
+    return value.isoformat() if value else None
+
+
+class PostgresProjectStore:
+    """
+    PostgreSQL adapter for ProjectContext.
+
+    Tables:
+    - project_contexts: metadata, configuration, metrics and the
+      modification/deployment history as JSONB arrays
+    - project_files: (project_id, path) -> content, content_hash, size
+    - codebase_objects / codebase_manifests: codebase snapshots
+      (see snapshot_objects)
+
+    Same interface as ProjectContextStore and DynamoDBProjectStore.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        """
+        Initialize the PostgreSQL project store.
+
+        Args:
+            db: Database manager whose pool to use (defaults to the global one)
+        """
+        self.db = db or get_db()
+        logger.info("PostgresProjectStore initialized")
+
+    def snapshot_objects(self) -> PostgresObjectStore:
+        """
+        Object store for codebase snapshots, in this store's database.
+
+        Call it on the event loop the pool runs on; the returned store is
+        then usable from worker threads.
+        """
+        return PostgresObjectStore(self.db)
+
+    # ========================================================================
+    # Serialization
+    # ========================================================================
+
+    @staticmethod
+    def _project_params(context: ProjectContext) -> Tuple:
+        """Parameters of UPSERT_PROJECT for a context."""
+        data = context.to_dict(include_codebase=False)
+        return (
+            context.id,
+            context.name,
+            data['type'],
+            data['status'],
+            context.owner_id,
+            context.description,
+            context.repository_url,
+            to_json(data['dependencies']),
+            to_json(data['modifications']),
+            to_json(data['deployments']),
+            to_json(data['environment_vars']),
+            to_json(data['deployment_config']),
+            float(context.test_coverage),
+            float(context.security_score),
+            float(context.performance_score),
+            to_db_timestamp(context.created_at),
+            to_db_timestamp(context.updated_at),
+            to_db_timestamp(context.last_deployed_at)
+        )
+
+    @staticmethod
+    def _row_to_context(row: asyncpg.Record, codebase=None) -> ProjectContext:
+        """Build a ProjectContext from a project_contexts row."""
+        return ProjectContext.from_dict({
+            'id': row['id'],
+            'name': row['name'],
+            'type': row['type'],
+            'status': row['status'],
+            'owner_id': row['owner_id'],
+            'description': row['description'] or '',
+            'repository_url': row['repository_url'],
+            'dependencies': json.loads(row['dependencies'] or '[]'),
+            'modifications': json.loads(row['modifications'] or '[]'),
+            'deployments': json.loads(row['deployments'] or '[]'),
+            'environment_vars': json.loads(row['environment_vars'] or '{}'),
+            'deployment_config': json.loads(row['deployment_config'] or '{}'),
+            'test_coverage': float(row['test_coverage'] or 0.0),
+            'security_score': float(row['security_score'] or 0.0),
+            'performance_score': float(row['performance_score'] or 0.0),
+            'created_at': _isoformat(row['created_at']),
+            'updated_at': _isoformat(row['updated_at']),
+            'last_deployed_at': _isoformat(row['last_deployed_at']),
+            'codebase': codebase if codebase is not None else {}
+        })
+
+    # ========================================================================
+    # Files
+    # ========================================================================
+
+    async def _save_files(self, conn: asyncpg.Connection, project_id: str, codebase) -> Tuple[int, int]:
+        """
+        Write the files whose content hash changed and delete removed ones.
+
+        Runs inside the caller's transaction.
+
+        Returns:
+            (files written, files deleted)
+        """
+        stored = {row['path']: row['content_hash'] for row in await conn.fetch(SELECT_FILE_HASHES, project_id)}
+        hashes = {path: codebase_hash(codebase, path) for path in codebase}
+        changed = [path for path, digest in hashes.items() if stored.get(path) != digest]
+        deleted = [path for path in stored if path not in hashes]
+
+        if isinstance(codebase, LazyCodebase):
+            await codebase.prefetch(changed)
+        records = []
+        for path in changed:
+            content = codebase[path]
+            records.append((project_id, path, content, hashes[path], len(content.encode('utf-8'))))
+
+        if deleted:
+            await conn.execute(DELETE_FILES, project_id, deleted)
+        if not records:
+            pass
+        elif not stored:
+            # New project: nothing to conflict with, COPY straight into the table
+            await conn.copy_records_to_table('project_files', records=records, columns=FILE_COLUMNS)
+        elif len(records) >= COPY_THRESHOLD:
+            await conn.execute(CREATE_FILE_STAGING)
+            await conn.copy_records_to_table('project_files_staging', records=records, columns=FILE_COLUMNS)
+            await conn.execute(MERGE_FILE_STAGING)
+        else:
+            await conn.executemany(UPSERT_FILE, records)
+
+        return len(records), len(deleted)
+
+    async def _fetch_bodies(self, project_id: str, paths: List[str]) -> Dict[str, str]:
+        rows = await self.db.fetch(SELECT_FILE_BODIES, project_id, paths)
+        return {row['path']: row['content'] for row in rows}
+
+    async def _fetch_bodies_direct(self, project_id: str, paths: List[str]) -> Dict[str, str]:
+        """Read bodies on a dedicated connection (for blocking reads on the pool's loop)."""
+        conn = await asyncpg.connect(self.db.database_url)
+        try:
+            rows = await conn.fetch(SELECT_FILE_BODIES, project_id, paths)
+            return {row['path']: row['content'] for row in rows}
+        finally:
+            await conn.close()
+
+    def _lazy_codebase(self, project_id: str, rows: List[asyncpg.Record]) -> LazyCodebase:
+        """LazyCodebase over project_files rows (path, size, content_hash)."""
+        entries = {
+            row['path']: FileEntry(size=row['size'], content_hash=row['content_hash'])
+            for row in rows
+        }
+        loop = asyncio.get_running_loop()
+
+        def load(paths: List[str]) -> Dict[str, str]:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                # Worker thread: run the query on the pool's loop
+                return asyncio.run_coroutine_threadsafe(self._fetch_bodies(project_id, paths), loop).result()
+            # Blocking read on an event loop thread: the pool cannot be used
+            # from here, so read on a short-lived connection in a thread
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return executor.submit(asyncio.run, self._fetch_bodies_direct(project_id, paths)).result()
+
+        async def load_async(paths: List[str]) -> Dict[str, str]:
+            return await self._fetch_bodies(project_id, paths)
+
+        return LazyCodebase(entries, load, load_async)
+
+    # ========================================================================
+    # Public API
+    # ========================================================================
+
+    async def save_context(self, context: ProjectContext) -> bool:
+        """
+        Save a project context and its changed files in one transaction.
+
+        Args:
+            context: The ProjectContext to save
+
+        Returns:
+            bool: True if save was successful, False otherwise
+        """
+        try:
+            context.updated_at = datetime.utcnow()
+
+            async with self.db.acquire() as conn:
+                async with conn.transaction():
+                    updated_at = await conn.fetchval(UPSERT_PROJECT, *self._project_params(context))
+                    written, deleted = await self._save_files(conn, context.id, context.codebase)
+
+            context.updated_at = from_db_timestamp(updated_at)
+            logger.info(
+                f"Successfully saved context for project {context.id} ({context.name}): "
+                f"{written} files written, {deleted} deleted"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to save context for project {context.id}: {e}", exc_info=True)
+            return False
+
+    async def load_context(self, project_id: str, lazy: bool = False) -> Optional[ProjectContext]:
+        """
+        Load a project context.
+
+        Args:
+            project_id: The ID of the project to load
+            lazy: Return the codebase as a LazyCodebase (paths, sizes and
+                  hashes only; bodies are read on first access or prefetch)
+
+        Returns:
+            ProjectContext if found, None otherwise
+        """
+        try:
+            async with self.db.acquire() as conn:
+                row = await conn.fetchrow(SELECT_PROJECT, project_id)
+                if row is None:
+                    logger.warning(f"Project {project_id} not found")
+                    return None
+
+                if lazy:
+                    codebase = self._lazy_codebase(project_id, await conn.fetch(SELECT_FILE_ENTRIES, project_id))
+                else:
+                    codebase = {file['path']: file['content'] for file in await conn.fetch(SELECT_FILES, project_id)}
+
+            context = self._row_to_context(row, codebase)
+            logger.info(f"Successfully loaded context for project {project_id} ({context.name})")
+            return context
+
+        except Exception as e:
+            logger.error(f"Failed to load context for project {project_id}: {e}", exc_info=True)
+            return None
+
+    async def update_context(self, context_or_id, context=None) -> bool:
+        """
+        Update a project context (alias for save_context).
+
+        Supports update_context(context) and update_context(project_id, context).
+
+        Args:
+            context_or_id: Either a ProjectContext object or a project_id string
+            context: The ProjectContext object (if first arg is project_id)
+
+        Returns:
+            bool: True if update was successful, False otherwise
+        """
+        return await self.save_context(context if context is not None else context_or_id)
+
+    async def update_context_fields(self, project_id: str, updates: Dict) -> bool:
+        """
+        Update specific fields of a project context with one UPDATE.
+
+        Files are not read or written unless "codebase" is among the updates.
+
+        Args:
+            project_id: The ID of the project to update
+            updates: Dictionary of fields to update
+
+        Returns:
+            bool: True if update was successful, False otherwise
+        """
+        try:
+            if 'codebase' in updates:
+                context = await self.load_context(project_id)
+                if context is None:
+                    return False
+                for key, value in updates.items():
+                    if key == 'type' and isinstance(value, str):
+                        value = ProjectType(value)
+                    elif key == 'status' and isinstance(value, str):
+                        value = ProjectStatus(value)
+                    setattr(context, key, value)
+                return await self.save_context(context)
+
+            assignments, params = [], [project_id]
+            for key, value in updates.items():
+                sql_type = FIELD_TYPES.get(key)
+                if sql_type is None:
+                    logger.warning(f"Ignoring unknown field '{key}' in update")
+                    continue
+                if key == 'type':
+                    value = ProjectType(value).value
+                elif key == 'status':
+                    value = ProjectStatus(value).value
+                elif sql_type == 'jsonb':
+                    value = to_json(value)
+                elif sql_type == 'timestamptz':
+                    value = _timestamp(value)
+                elif sql_type == 'float8':
+                    value = float(value)
+                params.append(value)
+                assignments.append(f"{key} = ${len(params)}::{sql_type}")
+
+            if not assignments:
+                return await self.context_exists(project_id)
+
+            result = await self.db.execute(
+                f"UPDATE project_contexts SET {', '.join(assignments)} WHERE id = $1", *params
+            )
+            if result != 'UPDATE 1':
+                logger.error(f"Cannot update non-existent project {project_id}")
+                return False
+
+            logger.info(f"Updated fields {list(updates)} for project {project_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to update context for project {project_id}: {e}", exc_info=True)
+            return False
+
+    async def delete_context(self, project_id: str) -> bool:
+        """
+        Delete a project context with its files and modification plans.
+
+        Args:
+            project_id: The ID of the project to delete
+
+        Returns:
+            bool: True if deletion was successful, False otherwise
+        """
+        try:
+            async with self.db.acquire() as conn:
+                async with conn.transaction():
+                    result = await conn.execute(DELETE_PROJECT, project_id)
+                    if result != 'DELETE 1':
+                        logger.warning(f"Project {project_id} not found")
+                        return False
+                    # Releases the project's snapshot objects (PostgresObjectStore.gc frees them)
+                    await conn.fetchval(DELETE_MANIFESTS, snapshot_manifest_prefix(project_id) + "/")
+
+            logger.info(f"Successfully deleted context for project {project_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to delete context for project {project_id}: {e}", exc_info=True)
+            return False
+
+    async def context_exists(self, project_id: str) -> bool:
+        """
+        Check if a project context exists.
+
+        Args:
+            project_id: The ID of the project to check
+
+        Returns:
+            bool: True if context exists, False otherwise
+        """
+        try:
+            return await self.db.fetchval(PROJECT_EXISTS, project_id)
+        except Exception as e:
+            logger.error(f"Failed to check project {project_id}: {e}", exc_info=True)
+            return False
+
+    # ========================================================================
+    # Listing
+    # ========================================================================
+
+    @staticmethod
+    def _filter_clause(
+        owner_id: Optional[str],
+        status: Optional[Union[ProjectStatus, str]]
+    ) -> Tuple[List[str], List]:
+        """WHERE conditions and parameters for the listing filters."""
+        conditions, params = [], []
+        if owner_id:
+            params.append(owner_id)
+            conditions.append(f"owner_id = ${len(params)}")
+        if status:
+            params.append(ProjectStatus(status).value)
+            conditions.append(f"status = ${len(params)}")
+        return conditions, params
+
+    @staticmethod
+    def _where(conditions: List[str]) -> str:
+        return f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    async def list_contexts(
+        self,
+        owner_id: Optional[str] = None,
+        status: Optional[Union[ProjectStatus, str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[ProjectContext]:
+        """
+        List project contexts, most recently updated first.
+
+        Codebases are not loaded for list operations (use load_context).
+        Prefer list_contexts_page for deep pages: OFFSET still reads the
+        skipped rows.
+
+        Args:
+            owner_id: Optional owner ID to filter by
+            status: Optional status to filter by
+            limit: Maximum number of contexts to return (None: all)
+            offset: Number of matching contexts to skip
+
+        Returns:
+            List of ProjectContext objects
+        """
+        try:
+            conditions, params = self._filter_clause(owner_id, status)
+            query = f"SELECT {PROJECT_COLUMNS} FROM project_contexts{self._where(conditions)} ORDER BY updated_at DESC, id DESC"
+            if limit is not None:
+                params.append(limit)
+                query += f" LIMIT ${len(params)}"
+            if offset:
+                params.append(offset)
+                query += f" OFFSET ${len(params)}"
+
+            contexts = [self._row_to_context(row) for row in await self.db.fetch(query, *params)]
+            logger.info(f"Listed {len(contexts)} project contexts" +
+                       (f" for owner {owner_id}" if owner_id else ""))
+            return contexts
+
+        except Exception as e:
+            logger.error(f"Failed to list contexts: {e}", exc_info=True)
+            return []
+
+    async def count_contexts(
+        self,
+        owner_id: Optional[str] = None,
+        status: Optional[Union[ProjectStatus, str]] = None
+    ) -> int:
+        """
+        Count project contexts matching the listing filters.
+
+        Args:
+            owner_id: Optional owner ID to filter by
+            status: Optional status to filter by
+
+        Returns:
+            Number of matching contexts
+        """
+        conditions, params = self._filter_clause(owner_id, status)
+        return await self.db.fetchval(f"SELECT COUNT(*) FROM project_contexts{self._where(conditions)}", *params)
+
+    async def list_contexts_page(
+        self,
+        owner_id: Optional[str] = None,
+        status: Optional[Union[ProjectStatus, str]] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page[ProjectContext]:
+        """
+        One page of project contexts, most recently updated first.
+
+        Resumes after the (updated_at, id) position in the cursor using
+        idx_project_contexts_updated_at_id, so no skipped rows are read.
+
+        Args:
+            owner_id: Optional owner ID to filter by
+            status: Optional status to filter by
+            limit: Maximum number of projects in the page
+            cursor: next_cursor of the previous page
+
+        Returns:
+            Page of ProjectContext objects (next_cursor is None on the last page)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        position = decode_cursor(cursor, required=('updated_at', 'id'))
+        conditions, params = self._filter_clause(owner_id, status)
+        if position:
+            params += [to_db_timestamp(position['updated_at']), position['id']]
+            conditions.append(f"(updated_at, id) < (${len(params) - 1}, ${len(params)})")
+        params.append(limit + 1)
+        query = (
+            f"SELECT {PROJECT_COLUMNS} FROM project_contexts{self._where(conditions)} "
+            f"ORDER BY updated_at DESC, id DESC LIMIT ${len(params)}"
+        )
+
+        try:
+            rows = await self.db.fetch(query, *params)
+        except Exception as e:
+            logger.error(f"Failed to list contexts: {e}", exc_info=True)
+            return Page()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor({'updated_at': from_db_timestamp(last['updated_at']), 'id': last['id']})
+        return Page(items=[self._row_to_context(row) for row in rows], next_cursor=next_cursor)
+
+    # ========================================================================
+    # History
+    # ========================================================================
+
+    async def list_history_page(
+        self,
+        project_id: str,
+        kind: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Optional[Page[HistoryEvent]]:
+        """
+        One page of a project's modifications and deployments, newest first.
+
+        Type and status filters, ordering and the limit run in the query,
+        so only the page's events are returned.
+
+        Args:
+            project_id: The ID of the project
+            kind: Only 'modification' or only 'deployment' events (None: both)
+            status: Only events with this status
+            limit: Maximum number of events in the page
+            cursor: next_cursor of the previous page
+
+        Returns:
+            Page of Modification / Deployment objects, or None if the project does not exist
+
+        Raises:
+            ValueError: If kind or the cursor is invalid
+        """
+        check_history_type(kind)
+        position = decode_history_cursor(cursor) or {}
+
+        try:
+            rows = await self.db.fetch(
+                SELECT_HISTORY_PAGE, project_id, kind, status,
+                position.get('timestamp'), position.get('type'), position.get('id'), limit + 1
+            )
+            if not rows and not await self.db.fetchval(PROJECT_EXISTS, project_id):
+                logger.warning(f"Project {project_id} not found")
+                return None
+        except Exception as e:
+            logger.error(f"Failed to list history of project {project_id}: {e}", exc_info=True)
+            return Page()
+
+        events = [event_from_dict(row['type'], json.loads(row['entry'])) for row in rows[:limit]]
+        next_cursor = encode_cursor(history_position(events[-1])) if len(rows) > limit else None
+        return Page(items=events, next_cursor=next_cursor)
+
+    async def add_modification(self, project_id: str, modification: Dict) -> bool:
+        """
+        Add a modification record to a project's history.
+
+        Appends to the JSONB array in place (no project load or file writes).
+
+        Args:
+            project_id: The ID of the project
+            modification: Dictionary containing modification details
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            mod = Modification(
+                id=modification.get('id', str(datetime.utcnow().timestamp())),
+                timestamp=modification.get('timestamp', datetime.utcnow()),
+                description=modification['description'],
+                affected_files=modification.get('affected_files', []),
+                requested_by=modification.get('requested_by', 'system'),
+                status=modification.get('status', 'applied'),
+                base_snapshot=modification.get('base_snapshot'),
+                snapshot=modification.get('snapshot')
+            )
+
+            if await self.db.execute(APPEND_MODIFICATION, project_id, to_json([mod])) != 'UPDATE 1':
+                logger.warning(f"Project {project_id} not found")
+                return False
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to add modification to project {project_id}: {e}", exc_info=True)
+            return False
+
+    async def add_deployment(self, project_id: str, deployment: Dict) -> bool:
+        """
+        Add a deployment record to a project's history.
+
+        Appends to the JSONB array in place (no project load or file writes).
+
+        Args:
+            project_id: The ID of the project
+            deployment: Dictionary containing deployment details
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            dep = Deployment(
+                id=deployment.get('id', str(datetime.utcnow().timestamp())),
+                timestamp=deployment.get('timestamp', datetime.utcnow()),
+                environment=deployment['environment'],
+                platform=deployment['platform'],
+                url=deployment.get('url'),
+                status=deployment.get('status', 'success')
+            )
+
+            result = await self.db.execute(
+                APPEND_DEPLOYMENT, project_id, to_json([dep]), to_db_timestamp(dep.timestamp)
+            )
+            if result != 'UPDATE 1':
+                logger.warning(f"Project {project_id} not found")
+                return False
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to add deployment to project {project_id}: {e}", exc_info=True)
+            return False
@@ -0,0 +1,251 @@
+"""
+PostgreSQL storage for project templates.
+
+PostgresTemplateStore keeps templates in the templates table
+(database/schema.sql, migration 004) on the shared asyncpg pool and is a
+drop-in TemplateLibrary: storage methods are replaced, while
+apply_template and variable substitution are inherited.
+"""
+
+import json
+import logging
+from typing import Dict, List, Optional, Union
+
+import asyncpg
+
+from database.connection import DatabaseManager, get_db, to_db_timestamp, from_db_timestamp
+from models.template import ProjectTemplate
+from utils.template_library import TemplateLibrary
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_COLUMNS = """
+    id, name, description, category, files, required_vars, optional_vars,
+    tech_stack, estimated_setup_time, complexity, tags, author, version,
+    created_at, updated_at
+"""
+
+# ============================================================================
+# Statements
+# ============================================================================
+
+UPSERT_TEMPLATE = """
+    INSERT INTO templates (""" + TEMPLATE_COLUMNS + """) VALUES (
+        $1, $2, $3, $4, $5::jsonb, $6::text[], $7::text[],
+        $8::text[], $9, $10, $11::text[], $12, $13, $14, $15
+    )
+    ON CONFLICT (id) DO UPDATE SET
+        name = EXCLUDED.name,
+        description = EXCLUDED.description,
+        category = EXCLUDED.category,
+        files = EXCLUDED.files,
+        required_vars = EXCLUDED.required_vars,
+        optional_vars = EXCLUDED.optional_vars,
+        tech_stack = EXCLUDED.tech_stack,
+        estimated_setup_time = EXCLUDED.estimated_setup_time,
+        complexity = EXCLUDED.complexity,
+        tags = EXCLUDED.tags,
+        author = EXCLUDED.author,
+        version = EXCLUDED.version
+"""
+
+SELECT_TEMPLATE = "SELECT " + TEMPLATE_COLUMNS + " FROM templates WHERE id = $1"
+
+LIST_TEMPLATES = "SELECT " + TEMPLATE_COLUMNS + " FROM templates ORDER BY name, id"
+
+LIST_TEMPLATES_BY_CATEGORY = "SELECT " + TEMPLATE_COLUMNS + " FROM templates WHERE category = $1 ORDER BY name, id"
+
+TEMPLATE_EXISTS = "SELECT EXISTS (SELECT 1 FROM templates WHERE id = $1)"
+
+DELETE_TEMPLATE = "DELETE FROM templates WHERE id = $1"
+
+SELECT_CATEGORIES = "SELECT DISTINCT category FROM templates ORDER BY category"
+
+
+class PostgresTemplateStore(TemplateLibrary):
+    """
+    TemplateLibrary backed by the templates table.
+
+    Template files are small and always applied together, so they stay in
+    the files JSONB column of the template's row.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        """
+        Initialize the PostgreSQL template store.
+
+        Args:
+            db: Database manager whose pool to use (defaults to the global one)
+        """
+        # No storage_root or blob store: TemplateLibrary.__init__ is not called
+        self.db = db or get_db()
+        logger.info("PostgresTemplateStore initialized")
+
+    @staticmethod
+    def _row_to_template(row: asyncpg.Record) -> ProjectTemplate:
+        """Build a ProjectTemplate from a templates row."""
+        return ProjectTemplate.from_dict({
+            'id': row['id'],
+            'name': row['name'],
+            'description': row['description'] or '',
+            'category': row['category'],
+            'files': json.loads(row['files'] or '{}'),
+            'required_vars': list(row['required_vars'] or []),
+            'optional_vars': list(row['optional_vars'] or []),
+            'tech_stack': list(row['tech_stack'] or []),
+            'estimated_setup_time': row['estimated_setup_time'],
+            'complexity': row['complexity'],
+            'tags': list(row['tags'] or []),
+            'author': row['author'],
+            'version': row['version'],
+            'created_at': from_db_timestamp(row['created_at']).isoformat(),
+            'updated_at': from_db_timestamp(row['updated_at']).isoformat()
+        })
+
+    async def save_template(self, template: Union[ProjectTemplate, Dict]) -> str:
+        """
+        Save a template.
+
+        Args:
+            template: ProjectTemplate object or dictionary
+
+        Returns:
+            str: Template ID if successful, None otherwise
+        """
+        try:
+            if isinstance(template, dict):
+                if 'id' not in template:
+                    template['id'] = self._generate_template_id(template.get('name', 'template'))
+                template = ProjectTemplate.from_dict(template)
+
+            await self.db.execute(
+                UPSERT_TEMPLATE,
+                template.id,
+                template.name,
+                template.description,
+                template.category,
+                json.dumps(template.files),
+                template.required_vars,
+                template.optional_vars,
+                template.tech_stack,
+                template.estimated_setup_time,
+                template.complexity,
+                template.tags,
+                template.author,
+                template.version,
+                to_db_timestamp(template.created_at),
+                to_db_timestamp(template.updated_at)
+            )
+
+            logger.info(f"Successfully saved template {template.id} ({template.name})")
+            return template.id
+
+        except Exception as e:
+            logger.error(f"Failed to save template: {e}", exc_info=True)
+            return None
+
+    async def load_template(self, template_id: str) -> Optional[ProjectTemplate]:
+        """
+        Load a template.
+
+        Args:
+            template_id: The ID of the template to load
+
+        Returns:
+            ProjectTemplate if found, None otherwise
+        """
+        try:
+            row = await self.db.fetchrow(SELECT_TEMPLATE, template_id)
+            if row is None:
+                logger.warning(f"Template {template_id} not found")
+                return None
+
+            template = self._row_to_template(row)
+            logger.info(f"Successfully loaded template {template_id} ({template.name})")
+            return template
+
+        except Exception as e:
+            logger.error(f"Failed to load template {template_id}: {e}", exc_info=True)
+            return None
+
+    async def list_templates(self, category: Optional[str] = None) -> List[ProjectTemplate]:
+        """
+        List all templates, optionally filtered by category.
+
+        Args:
+            category: Optional category to filter by (e.g., 'api', 'web_app')
+
+        Returns:
+            List of ProjectTemplate objects
+        """
+        try:
+            if category:
+                rows = await self.db.fetch(LIST_TEMPLATES_BY_CATEGORY, category)
+            else:
+                rows = await self.db.fetch(LIST_TEMPLATES)
+
+            templates = []
+            for row in rows:
+                try:
+                    templates.append(self._row_to_template(row))
+                except Exception as e:
+                    logger.warning(f"Failed to parse template {row['id']}: {e}")
+
+            logger.info(f"Listed {len(templates)} templates" +
+                       (f" in category '{category}'" if category else ""))
+            return templates
+
+        except Exception as e:
+            logger.error(f"Failed to list templates: {e}", exc_info=True)
+            return []
+
+    async def delete_template(self, template_id: str) -> bool:
+        """
+        Delete a template.
+
+        Args:
+            template_id: The ID of the template to delete
+
+        Returns:
+            bool: True if deletion was successful, False otherwise
+        """
+        try:
+            if await self.db.execute(DELETE_TEMPLATE, template_id) != 'DELETE 1':
+                logger.warning(f"Template {template_id} not found")
+                return False
+
+            logger.info(f"Successfully deleted template {template_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to delete template {template_id}: {e}", exc_info=True)
+            return False
+
+    async def template_exists(self, template_id: str) -> bool:
+        """
+        Check if a template exists.
+
+        Args:
+            template_id: The ID of the template to check
+
+        Returns:
+            bool: True if template exists, False otherwise
+        """
+        try:
+            return await self.db.fetchval(TEMPLATE_EXISTS, template_id)
+        except Exception as e:
+            logger.error(f"Failed to check template {template_id}: {e}", exc_info=True)
+            return False
+
+    async def get_categories(self) -> List[str]:
+        """
+        Get all unique template categories.
+
+        Returns:
+            List of category names
+        """
+        try:
+            return [row['category'] for row in await self.db.fetch(SELECT_CATEGORIES)]
+        except Exception as e:
+            logger.error(f"Failed to get categories: {e}", exc_info=True)
+            return []
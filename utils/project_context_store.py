@@ -1,14 +1,66 @@
+import copy
 import json
 import logging
 import os
+import shutil
+import sqlite3
+import asyncio
+import tempfile
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 
 from models.project_context import ProjectContext, ProjectType, ProjectStatus
+from models.lazy_codebase import FileEntry, LazyCodebase
+from utils.blob_store import BlobStore, get_blob_store
+from utils.codebase_versions import snapshot_manifest_prefix
+from utils.pagination import Page, encode_cursor, decode_cursor
+from utils.project_history import HistoryEvent, history_page
 
 logger = logging.getLogger(__name__)
 
+INDEX_FILENAME = ".context_index.sqlite3"
+DEFAULT_CACHE_SIZE = 128
+
+# One write lock per project directory, shared by every store instance in the
+# process (the PM agent and the API each construct their own store).
+_project_locks: Dict[str, threading.Lock] = {}
+_project_locks_guard = threading.Lock()
+
+
+def _project_lock(project_dir: Path) -> threading.Lock:
+    """Get the process-wide write lock for a project directory."""
+    key = str(project_dir.absolute())
+    with _project_locks_guard:
+        lock = _project_locks.get(key)
+        if lock is None:
+            lock = _project_locks[key] = threading.Lock()
+        return lock
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """
+    Write a file atomically: temp file in the same directory, fsync, rename.
+
+    Readers see either the old file or the complete new one, never a
+    partial write.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
 
 class ProjectContextStore:
     """
@@ -19,22 +71,65 @@ class ProjectContextStore:
     
     Storage structure:
     - generated_code/projects/{project_id}/context.json
+        Compact metadata plus a file manifest {path: {hash, size}}
+    - generated_code/blobs/
+        File bodies in the shared content-addressed blob store
+        (utils.blob_store), referenced once per manifest entry, so
+        identical files across projects and versions are stored once
+    - generated_code/projects/.context_index.sqlite3
+        Index of owner_id/status/updated_at for listing without opening
+        every context.json; list_contexts_page pages it by keyset
+    
+    Every file is written to a temp file and renamed into place. Recently
+    used contexts are kept in a bounded LRU that is validated against the
+    context.json stat, so saves from other store instances are picked up.
+    Context files from older versions (codebase inline) still load.
+    
+    load_context(lazy=True) returns a LazyCodebase that reads bodies on
+    first access; files that were never read are saved back by hash.
     """
     
-    def __init__(self, storage_root: Optional[Path] = None):
+    def __init__(
+        self,
+        storage_root: Optional[Path] = None,
+        cache_size: Optional[int] = None,
+        blob_store: Optional[BlobStore] = None
+    ):
         """
         Initialize the ProjectContextStore.
         
         Args:
             storage_root: Root directory for storing project contexts.
                          Defaults to generated_code/projects/
+            cache_size: Maximum number of contexts kept in memory
+                       (defaults to env var PROJECT_CONTEXT_CACHE_SIZE or 128)
+            blob_store: Store for file bodies (defaults to the global blob
+                        store, or one under storage_root/.blobs when a
+                        storage_root is given)
         """
         if storage_root is None:
             from config import PROJECTS_ROOT
             storage_root = PROJECTS_ROOT
+            blob_store = blob_store or get_blob_store()
         
         self.storage_root = Path(storage_root)
         self.storage_root.mkdir(parents=True, exist_ok=True)
+        self.blob_store = blob_store or BlobStore(self.storage_root / ".blobs")
+        
+        if cache_size is None:
+            cache_size = int(os.getenv("PROJECT_CONTEXT_CACHE_SIZE", str(DEFAULT_CACHE_SIZE)))
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[Tuple[int, int, int], ProjectContext]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        self.index_path = self.storage_root / INDEX_FILENAME
+        index_is_new = not self.index_path.exists()
+        self._index_lock = threading.Lock()
+        self._index = sqlite3.connect(str(self.index_path), check_same_thread=False, timeout=30)
+        self._init_index()
+        if index_is_new:
+            self._rebuild_index()
+        
         logger.info(f"ProjectContextStore initialized with storage root: {self.storage_root}")
     
     def _get_project_dir(self, project_id: str) -> Path:
@@ -45,13 +140,351 @@ class ProjectContextStore:
         """Get the context.json file path for a specific project."""
         return self._get_project_dir(project_id) / "context.json"
     
+    def _get_files_dir(self, project_id: str) -> Path:
+        """Get the directory of per-project file bodies (layout before the blob store)."""
+        return self._get_project_dir(project_id) / "files"
+    
+    # ========================================================================
+    # Index
+    # ========================================================================
+    
+    def _init_index(self) -> None:
+        """Create the index schema if needed."""
+        with self._index_lock, self._index:
+            self._index.execute("PRAGMA journal_mode=WAL")
+            self._index.execute(
+                """
+                CREATE TABLE IF NOT EXISTS contexts (
+                    project_id TEXT PRIMARY KEY,
+                    name TEXT,
+                    owner_id TEXT,
+                    status TEXT,
+                    type TEXT,
+                    updated_at TEXT
+                )
+                """
+            )
+            # Listing order is (updated_at DESC, project_id DESC); every
+            # filter has an index ending in that key so pages are read in order
+            for name in ("idx_contexts_owner", "idx_contexts_status", "idx_contexts_updated"):
+                self._index.execute(f"DROP INDEX IF EXISTS {name}")
+            self._index.execute(
+                "CREATE INDEX IF NOT EXISTS idx_contexts_owner_page ON contexts (owner_id, updated_at, project_id)"
+            )
+            self._index.execute(
+                "CREATE INDEX IF NOT EXISTS idx_contexts_status_page ON contexts (status, updated_at, project_id)"
+            )
+            self._index.execute(
+                "CREATE INDEX IF NOT EXISTS idx_contexts_owner_status_page "
+                "ON contexts (owner_id, status, updated_at, project_id)"
+            )
+            self._index.execute(
+                "CREATE INDEX IF NOT EXISTS idx_contexts_updated_page ON contexts (updated_at, project_id)"
+            )
+    
+    @staticmethod
+    def _index_row(data: Dict) -> Tuple:
+        """Index columns for a serialized context."""
+        return (
+            data["id"],
+            data.get("name"),
+            data.get("owner_id", "default_user"),
+            data.get("status"),
+            data.get("type"),
+            data.get("updated_at")
+        )
+    
+    def _index_upsert(self, data: Dict) -> None:
+        """Insert or replace a context's index row."""
+        with self._index_lock, self._index:
+            self._index.execute(
+                "INSERT OR REPLACE INTO contexts "
+                "(project_id, name, owner_id, status, type, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                self._index_row(data)
+            )
+    
+    def _index_delete(self, project_id: str) -> None:
+        """Remove a context's index row."""
+        with self._index_lock, self._index:
+            self._index.execute("DELETE FROM contexts WHERE project_id = ?", (project_id,))
+    
+    def _rebuild_index(self) -> int:
+        """Rebuild the index from the context.json files on disk."""
+        rows = []
+        for project_dir in self.storage_root.iterdir():
+            context_file = project_dir / "context.json"
+            if not project_dir.is_dir() or not context_file.exists():
+                continue
+            try:
+                with open(context_file, 'r', encoding='utf-8') as f:
+                    rows.append(self._index_row(json.load(f)))
+            except Exception as e:
+                logger.warning(f"Failed to index context from {context_file}: {e}")
+        
+        with self._index_lock, self._index:
+            self._index.execute("DELETE FROM contexts")
+            self._index.executemany(
+                "INSERT OR REPLACE INTO contexts "
+                "(project_id, name, owner_id, status, type, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        logger.info(f"Indexed {len(rows)} project contexts in {self.index_path}")
+        return len(rows)
+    
+    @staticmethod
+    def _filter_clause(owner_id: Optional[str], status: Optional[Union[ProjectStatus, str]]) -> Tuple[str, List]:
+        """WHERE clause and parameters for the listing filters."""
+        conditions, params = [], []
+        if owner_id:
+            conditions.append("owner_id = ?")
+            params.append(owner_id)
+        if status:
+            conditions.append("status = ?")
+            params.append(ProjectStatus(status).value)
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+    
+    def _query_ids(
+        self,
+        owner_id: Optional[str],
+        status: Optional[Union[ProjectStatus, str]],
+        limit: Optional[int],
+        offset: int
+    ) -> List[str]:
+        """Project IDs matching the filters, most recently updated first."""
+        where, params = self._filter_clause(owner_id, status)
+        sql = f"SELECT project_id FROM contexts{where} ORDER BY updated_at DESC, project_id DESC"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit if limit is not None else -1, offset]
+        with self._index_lock:
+            return [row[0] for row in self._index.execute(sql, params)]
+    
+    def _query_page(
+        self,
+        owner_id: Optional[str],
+        status: Optional[Union[ProjectStatus, str]],
+        limit: int,
+        position: Optional[Dict]
+    ) -> List[Tuple[str, str]]:
+        """(project_id, updated_at) of up to limit rows after a keyset position."""
+        where, params = self._filter_clause(owner_id, status)
+        if position:
+            where += (" AND " if where else " WHERE ") + "(updated_at, project_id) < (?, ?)"
+            params += [position["updated_at"], position["id"]]
+        sql = (
+            f"SELECT project_id, updated_at FROM contexts{where} "
+            "ORDER BY updated_at DESC, project_id DESC LIMIT ?"
+        )
+        with self._index_lock:
+            return [tuple(row) for row in self._index.execute(sql, params + [limit])]
+    
+    # ========================================================================
+    # Files and Cache
+    # ========================================================================
+    
+    @staticmethod
+    def _signature(stat: os.stat_result) -> Tuple[int, int, int]:
+        """Identity of a context.json version (atomic renames change the inode)."""
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    
+    def _cache_get(self, project_id: str, signature: Tuple[int, int, int]) -> Optional[ProjectContext]:
+        """Copy of a cached context if it is still current."""
+        with self._cache_lock:
+            entry = self._cache.get(project_id)
+            if entry is None or entry[0] != signature:
+                return None
+            self._cache.move_to_end(project_id)
+            return copy.deepcopy(entry[1])
+    
+    def _cache_put(self, project_id: str, signature: Tuple[int, int, int], context: ProjectContext) -> None:
+        """Cache a copy of a context, evicting the least recently used."""
+        if self.cache_size <= 0:
+            return
+        if isinstance(context.codebase, LazyCodebase):
+            # Only materialized contexts: eager loads are served from the cache
+            self._cache_drop(project_id)
+            return
+        with self._cache_lock:
+            self._cache[project_id] = (signature, copy.deepcopy(context))
+            self._cache.move_to_end(project_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def _cache_drop(self, project_id: str) -> None:
+        """Forget a cached context."""
+        with self._cache_lock:
+            self._cache.pop(project_id, None)
+    
+    def _read_metadata(self, project_id: str) -> Optional[Dict]:
+        """Parse a project's context.json, or None if it does not exist."""
+        try:
+            with open(self._get_context_file(project_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def _read_body(self, project_id: str, content_hash: str) -> str:
+        """Read one file body from the blob store (or the older files/ layout)."""
+        try:
+            return self.blob_store.get_text(content_hash)
+        except KeyError:
+            legacy = self._get_files_dir(project_id) / content_hash
+            if not legacy.exists():
+                raise
+            return legacy.read_bytes().decode("utf-8")
+    
+    def _read_codebase(self, project_id: str, manifest: Dict[str, Dict]) -> Dict[str, str]:
+        """Read the file bodies listed in a manifest."""
+        return {path: self._read_body(project_id, entry["hash"]) for path, entry in manifest.items()}
+    
+    def _lazy_codebase(self, project_id: str, manifest: Dict[str, Dict]) -> LazyCodebase:
+        """A codebase view that reads bodies from the blob store on first access."""
+        hashes = {path: entry["hash"] for path, entry in manifest.items()}
+        
+        def load(paths: List[str]) -> Dict[str, str]:
+            return {path: self._read_body(project_id, hashes[path]) for path in paths}
+        
+        return LazyCodebase(
+            {path: FileEntry(size=entry["size"], content_hash=entry["hash"]) for path, entry in manifest.items()},
+            load
+        )
+    
+    def _save_sync(self, context: ProjectContext) -> None:
+        """Store bodies, then metadata, then index (blocking)."""
+        context_data = context.to_dict(include_codebase=False)
+        codebase = context.codebase
+        
+        # Files of a lazy codebase that were never read keep their stored entry
+        # (the blob store skips bodies it already holds)
+        manifest: Dict[str, Dict] = {}
+        for path in codebase:
+            if isinstance(codebase, LazyCodebase) and not codebase.is_loaded(path):
+                content_hash = codebase.content_hash(path)
+                if self.blob_store.exists(content_hash):
+                    manifest[path] = {"hash": content_hash, "size": codebase.size(path)}
+                    continue
+            body = codebase[path].encode("utf-8")
+            manifest[path] = {"hash": self.blob_store.put(body), "size": len(body)}
+        context_data["files"] = manifest
+        
+        project_dir = self._get_project_dir(context.id)
+        
+        with _project_lock(project_dir):
+            project_dir.mkdir(parents=True, exist_ok=True)
+            previous = self._read_metadata(context.id) or {}
+            self.blob_store.retain(entry["hash"] for entry in manifest.values())
+            
+            context_file = self._get_context_file(context.id)
+            try:
+                atomic_write(
+                    context_file,
+                    json.dumps(context_data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+                )
+            except BaseException:
+                self.blob_store.release(entry["hash"] for entry in manifest.values())
+                raise
+            self._index_upsert(context_data)
+            self._cache_put(context.id, self._signature(context_file.stat()), context)
+            
+            # Only now that the new manifest is in place can old references go
+            self.blob_store.release(entry["hash"] for entry in previous.get("files", {}).values())
+            shutil.rmtree(self._get_files_dir(context.id), ignore_errors=True)
+    
+    def _load_sync(self, project_id: str, lazy: bool = False) -> Optional[ProjectContext]:
+        """Load a context from the cache or disk (blocking)."""
+        context_file = self._get_context_file(project_id)
+        try:
+            signature = self._signature(context_file.stat())
+        except FileNotFoundError:
+            return None
+        
+        context = self._cache_get(project_id, signature)
+        if context is not None:
+            return context
+        
+        context_data = self._read_metadata(project_id)
+        if context_data is None:
+            return None
+        if lazy and "codebase" not in context_data:
+            # Not cached: the view holds no bodies yet
+            context = ProjectContext.from_dict(context_data)
+            context.codebase = self._lazy_codebase(project_id, context_data.get("files", {}))
+            return context
+        if "codebase" not in context_data:
+            context_data["codebase"] = self._read_codebase(project_id, context_data.get("files", {}))
+        
+        context = ProjectContext.from_dict(context_data)
+        self._cache_put(project_id, signature, context)
+        return context
+    
+    def _list_sync(
+        self,
+        owner_id: Optional[str],
+        status: Optional[Union[ProjectStatus, str]],
+        limit: Optional[int],
+        offset: int
+    ) -> List[ProjectContext]:
+        """Load metadata for one page of the index (blocking)."""
+        return self._read_listing(self._query_ids(owner_id, status, limit, offset))
+    
+    def _list_page_sync(
+        self,
+        owner_id: Optional[str],
+        status: Optional[Union[ProjectStatus, str]],
+        limit: int,
+        position: Optional[Dict]
+    ) -> Page[ProjectContext]:
+        """Load metadata for the page after a keyset position (blocking)."""
+        rows = self._query_page(owner_id, status, limit + 1, position)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor({"updated_at": rows[-1][1], "id": rows[-1][0]})
+        return Page(items=self._read_listing([project_id for project_id, _ in rows]), next_cursor=next_cursor)
+    
+    def _read_listing(self, project_ids: List[str]) -> List[ProjectContext]:
+        """Metadata-only contexts for listed IDs, skipping unreadable ones."""
+        contexts = []
+        for project_id in project_ids:
+            try:
+                context_data = self._read_metadata(project_id)
+                if context_data is None:
+                    continue
+                context_data.pop("codebase", None)
+                contexts.append(ProjectContext.from_dict(context_data))
+            except Exception as e:
+                logger.warning(f"Failed to load context for project {project_id}: {e}")
+        return contexts
+    
+    def _delete_sync(self, project_id: str) -> bool:
+        """Remove a context's metadata, bodies and index row (blocking)."""
+        project_dir = self._get_project_dir(project_id)
+        with _project_lock(project_dir):
+            context_file = self._get_context_file(project_id)
+            if not context_file.exists():
+                return False
+            
+            context_data = self._read_metadata(project_id) or {}
+            context_file.unlink()
+            self._index_delete(project_id)
+            self._cache_drop(project_id)
+            
+            self.blob_store.release(entry["hash"] for entry in context_data.get("files", {}).values())
+            self.blob_store.delete_manifests(snapshot_manifest_prefix(project_id))
+            shutil.rmtree(self._get_files_dir(project_id), ignore_errors=True)
+            return True
+    
+    # ========================================================================
+    # Public API
+    # ========================================================================
+    
     async def save_context(self, context: ProjectContext) -> bool:
         """
         Save a project context to storage.
         
         Args:
             context: The ProjectContext to save
-            
+        
         Returns:
             bool: True if save was successful, False otherwise
         """
@@ -59,51 +492,37 @@ class ProjectContextStore:
             # Update the updated_at timestamp
             context.updated_at = datetime.utcnow()
             
-            # Create project directory if it doesn't exist
-            project_dir = self._get_project_dir(context.id)
-            project_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Serialize context to JSON
-            context_data = context.to_dict()
-            context_file = self._get_context_file(context.id)
-            
-            # Write to file with pretty formatting
-            with open(context_file, 'w', encoding='utf-8') as f:
-                json.dump(context_data, f, indent=2, ensure_ascii=False)
+            await asyncio.to_thread(self._save_sync, context)
             
             logger.info(f"Successfully saved context for project {context.id} ({context.name})")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Failed to save context for project {context.id}: {e}", exc_info=True)
             return False
     
-    async def load_context(self, project_id: str) -> Optional[ProjectContext]:
+    async def load_context(self, project_id: str, lazy: bool = False) -> Optional[ProjectContext]:
         """
         Load a project context from storage.
         
         Args:
             project_id: The ID of the project to load
-            
+            lazy: Return the codebase as a LazyCodebase (paths and sizes only;
+                  bodies are read on first access or prefetch)
+        
         Returns:
             ProjectContext if found, None otherwise
         """
         try:
-            context_file = self._get_context_file(project_id)
+            context = await asyncio.to_thread(self._load_sync, project_id, lazy)
             
-            if not context_file.exists():
+            if context is None:
                 logger.warning(f"Context file not found for project {project_id}")
                 return None
             
-            # Read and parse JSON
-            with open(context_file, 'r', encoding='utf-8') as f:
-                context_data = json.load(f)
-            
-            # Deserialize to ProjectContext
-            context = ProjectContext.from_dict(context_data)
             logger.info(f"Successfully loaded context for project {project_id} ({context.name})")
             return context
-            
+        
         except Exception as e:
             logger.error(f"Failed to load context for project {project_id}: {e}", exc_info=True)
             return None
@@ -119,7 +538,7 @@ class ProjectContextStore:
         Args:
             context_or_id: Either a ProjectContext object or a project_id string
             context: The ProjectContext object (if first arg is project_id)
-            
+        
         Returns:
             bool: True if update was successful, False otherwise
         """
@@ -134,7 +553,7 @@ class ProjectContextStore:
             
             # Simply save the updated context
             return await self.save_context(ctx)
-            
+        
         except Exception as e:
             logger.error(f"Failed to update context: {e}", exc_info=True)
             return False
@@ -146,7 +565,7 @@ class ProjectContextStore:
         Args:
             project_id: The ID of the project to update
             updates: Dictionary of fields to update
-            
+        
         Returns:
             bool: True if update was successful, False otherwise
         """
@@ -172,59 +591,111 @@ class ProjectContextStore:
             
             # Save updated context
             return await self.save_context(context)
-            
+        
         except Exception as e:
             logger.error(f"Failed to update context for project {project_id}: {e}", exc_info=True)
             return False
     
-    async def list_contexts(self, owner_id: Optional[str] = None) -> List[ProjectContext]:
+    async def list_contexts(
+        self,
+        owner_id: Optional[str] = None,
+        status: Optional[Union[ProjectStatus, str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[ProjectContext]:
         """
-        List all project contexts, optionally filtered by owner.
+        List project contexts, most recently updated first.
+        
+        Filtering and pagination run against the index, so only the
+        returned page's context.json files are read. Codebases are not
+        loaded for list operations (use load_context).
         
         Args:
             owner_id: Optional owner ID to filter by
-            
+            status: Optional status to filter by
+            limit: Maximum number of contexts to return (None: all)
+            offset: Number of matching contexts to skip
+        
         Returns:
             List of ProjectContext objects
         """
-        contexts = []
-        
         try:
-            # Iterate through all project directories
-            if not self.storage_root.exists():
-                return contexts
-            
-            for project_dir in self.storage_root.iterdir():
-                if not project_dir.is_dir():
-                    continue
-                
-                context_file = project_dir / "context.json"
-                if not context_file.exists():
-                    continue
-                
-                try:
-                    # Load context
-                    with open(context_file, 'r', encoding='utf-8') as f:
-                        context_data = json.load(f)
-                    
-                    # Filter by owner if specified
-                    if owner_id and context_data.get('owner_id') != owner_id:
-                        continue
-                    
-                    context = ProjectContext.from_dict(context_data)
-                    contexts.append(context)
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to load context from {context_file}: {e}")
-                    continue
-            
-            logger.info(f"Listed {len(contexts)} project contexts" + 
+            contexts = await asyncio.to_thread(self._list_sync, owner_id, status, limit, offset)
+            logger.info(f"Listed {len(contexts)} project contexts" +
                        (f" for owner {owner_id}" if owner_id else ""))
             return contexts
-            
+        
         except Exception as e:
             logger.error(f"Failed to list contexts: {e}", exc_info=True)
-            return contexts
+            return []
+    
+    async def count_contexts(
+        self,
+        owner_id: Optional[str] = None,
+        status: Optional[Union[ProjectStatus, str]] = None
+    ) -> int:
+        """
+        Count project contexts matching the listing filters.
+        
+        Args:
+            owner_id: Optional owner ID to filter by
+            status: Optional status to filter by
+        
+        Returns:
+            Number of matching contexts
+        """
+        where, params = self._filter_clause(owner_id, status)
+        
+        def count() -> int:
+            with self._index_lock:
+                return self._index.execute(f"SELECT COUNT(*) FROM contexts{where}", params).fetchone()[0]
+        
+        return await asyncio.to_thread(count)
+    
+    async def list_contexts_page(
+        self,
+        owner_id: Optional[str] = None,
+        status: Optional[Union[ProjectStatus, str]] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Page[ProjectContext]:
+        """
+        One page of project contexts, most recently updated first.
+        
+        Resumes after the (updated_at, project_id) position in the cursor
+        on the index, so a deep page reads no more rows than the first one.
+        
+        Args:
+            owner_id: Optional owner ID to filter by
+            status: Optional status to filter by
+            limit: Maximum number of projects in the page
+            cursor: next_cursor of the previous page
+        
+        Returns:
+            Page of ProjectContext objects (next_cursor is None on the last page)
+        
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        position = decode_cursor(cursor, required=("updated_at", "id"))
+        try:
+            return await asyncio.to_thread(self._list_page_sync, owner_id, status, limit, position)
+        
+        except Exception as e:
+            logger.error(f"Failed to list contexts: {e}", exc_info=True)
+            return Page()
+    
+    async def rebuild_index(self) -> int:
+        """
+        Rebuild the listing index from the context files on disk.
+        
+        Runs automatically when the index file is missing; call it after
+        editing or copying project directories by hand.
+        
+        Returns:
+            Number of contexts indexed
+        """
+        return await asyncio.to_thread(self._rebuild_index)
     
     async def delete_context(self, project_id: str) -> bool:
         """
@@ -232,22 +703,18 @@ class ProjectContextStore:
         
         Args:
             project_id: The ID of the project to delete
-            
+        
         Returns:
             bool: True if deletion was successful, False otherwise
         """
         try:
-            context_file = self._get_context_file(project_id)
-            
-            if not context_file.exists():
+            if not await asyncio.to_thread(self._delete_sync, project_id):
                 logger.warning(f"Context file not found for project {project_id}")
                 return False
             
-            # Delete the context file
-            context_file.unlink()
             logger.info(f"Successfully deleted context for project {project_id}")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Failed to delete context for project {project_id}: {e}", exc_info=True)
             return False
@@ -258,13 +725,44 @@ class ProjectContextStore:
         
         Args:
             project_id: The ID of the project to check
-            
+        
         Returns:
             bool: True if context exists, False otherwise
         """
         context_file = self._get_context_file(project_id)
         return context_file.exists()
     
+    async def list_history_page(
+        self,
+        project_id: str,
+        kind: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Optional[Page[HistoryEvent]]:
+        """
+        One page of a project's modifications and deployments, newest first.
+        
+        Reads only the project's context.json (no file bodies).
+        
+        Args:
+            project_id: The ID of the project
+            kind: Only 'modification' or only 'deployment' events (None: both)
+            status: Only events with this status
+            limit: Maximum number of events in the page
+            cursor: next_cursor of the previous page
+        
+        Returns:
+            Page of Modification / Deployment objects, or None if the project does not exist
+        
+        Raises:
+            ValueError: If kind or the cursor is invalid
+        """
+        context = await self.load_context(project_id, lazy=True)
+        if context is None:
+            return None
+        return history_page(context.modifications, context.deployments, kind, status, limit, cursor)
+    
     async def add_modification(self, project_id: str, modification: Dict) -> bool:
         """
         Add a modification record to a project's history.
@@ -272,7 +770,7 @@ class ProjectContextStore:
         Args:
             project_id: The ID of the project
             modification: Dictionary containing modification details
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
@@ -288,12 +786,14 @@ class ProjectContextStore:
                 description=modification['description'],
                 affected_files=modification.get('affected_files', []),
                 requested_by=modification.get('requested_by', 'system'),
-                status=modification.get('status', 'applied')
+                status=modification.get('status', 'applied'),
+                base_snapshot=modification.get('base_snapshot'),
+                snapshot=modification.get('snapshot')
             )
             
             context.modifications.append(mod)
             return await self.save_context(context)
-            
+        
         except Exception as e:
             logger.error(f"Failed to add modification to project {project_id}: {e}", exc_info=True)
             return False
@@ -305,7 +805,7 @@ class ProjectContextStore:
         Args:
             project_id: The ID of the project
             deployment: Dictionary containing deployment details
-            
+        
         Returns:
             bool: True if successful, False otherwise
         """
@@ -328,7 +828,7 @@ class ProjectContextStore:
             context.last_deployed_at = dep.timestamp
             
             return await self.save_context(context)
-            
+        
         except Exception as e:
             logger.error(f"Failed to add deployment to project {project_id}: {e}", exc_info=True)
             return False
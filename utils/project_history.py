@@ -0,0 +1,175 @@
+"""
+Cursor pagination over a project's modification and deployment history.
+
+History events are ordered newest first by (timestamp, type, id); a
+cursor holds that position of the last event of a page. Timestamps are
+compared as naive UTC (the models' convention), so timezone-aware event
+or cursor timestamps order with naive ones instead of failing. Stores that keep
+history inside the project record (file, DynamoDB) page it in memory with
+history_page; PostgresProjectStore runs the same ordering and filters in
+SQL over its JSONB arrays.
+"""
+
+import heapq
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from models.project_context import Modification, Deployment
+from utils.pagination import Page, encode_cursor, decode_cursor
+
+MODIFICATION = "modification"
+DEPLOYMENT = "deployment"
+HISTORY_TYPES = (MODIFICATION, DEPLOYMENT)
+
+# Keyset of a history event: newest first, ties broken by type then id
+HISTORY_POSITION = ("timestamp", "type", "id")
+
+HistoryEvent = Union[Modification, Deployment]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def event_type(event: HistoryEvent) -> str:
+    """'modification' or 'deployment'."""
+    return MODIFICATION if isinstance(event, Modification) else DEPLOYMENT
+
+
+def history_position(event: HistoryEvent) -> Dict[str, Any]:
+    """Keyset position of an event (what a cursor encodes)."""
+    return {"timestamp": _naive_utc(event.timestamp), "type": event_type(event), "id": event.id}
+
+
+def _sort_key(event: HistoryEvent) -> Tuple[datetime, str, str]:
+    return (_naive_utc(event.timestamp), event_type(event), event.id)
+
+
+def check_history_type(kind: Optional[str]) -> None:
+    """
+    Validate a history type filter.
+
+    Raises:
+        ValueError: If kind is neither None nor one of HISTORY_TYPES
+    """
+    if kind is not None and kind not in HISTORY_TYPES:
+        raise ValueError(f"Invalid history type {kind!r} (expected one of {', '.join(HISTORY_TYPES)})")
+
+
+def decode_history_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Decode a history cursor into its keyset position (timestamp in naive UTC).
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    position = decode_cursor(cursor, required=HISTORY_POSITION)
+    if position and not isinstance(position["timestamp"], datetime):
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}")
+    if position:
+        position["timestamp"] = _naive_utc(position["timestamp"])
+    return position
+
+
+def event_from_dict(kind: str, data: Dict) -> HistoryEvent:
+    """Build a Modification or Deployment from its serialized form."""
+    timestamp = data["timestamp"]
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+
+    if kind == MODIFICATION:
+        return Modification(
+            id=data["id"],
+            timestamp=timestamp,
+            description=data["description"],
+            affected_files=list(data.get("affected_files", [])),
+            requested_by=data.get("requested_by", "system"),
+            status=data["status"],
+            base_snapshot=data.get("base_snapshot"),
+            snapshot=data.get("snapshot")
+        )
+    return Deployment(
+        id=data["id"],
+        timestamp=timestamp,
+        environment=data["environment"],
+        platform=data["platform"],
+        url=data.get("url"),
+        status=data.get("status", "pending")
+    )
+
+
+def event_to_dict(event: HistoryEvent) -> Dict[str, Any]:
+    """API representation of a history event."""
+    if isinstance(event, Modification):
+        return {
+            "type": MODIFICATION,
+            "id": event.id,
+            "timestamp": event.timestamp.isoformat(),
+            "description": event.description,
+            "affected_files": event.affected_files,
+            "requested_by": event.requested_by,
+            "status": event.status
+        }
+    return {
+        "type": DEPLOYMENT,
+        "id": event.id,
+        "timestamp": event.timestamp.isoformat(),
+        "environment": event.environment,
+        "platform": event.platform,
+        "url": event.url,
+        "status": event.status
+    }
+
+
+def history_page(
+    modifications: Iterable[Modification],
+    deployments: Iterable[Deployment],
+    kind: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Page[HistoryEvent]:
+    """
+    One page of in-memory history, newest first.
+
+    Selects the page with a bounded heap (O(n log limit)) rather than
+    sorting the whole history.
+
+    Args:
+        modifications: The project's modifications
+        deployments: The project's deployments
+        kind: Only 'modification' or only 'deployment' events (None: both)
+        status: Only events with this status
+        limit: Maximum number of events in the page
+        cursor: next_cursor of the previous page
+
+    Returns:
+        Page of Modification / Deployment objects (next_cursor is None on the last page)
+
+    Raises:
+        ValueError: If kind or the cursor is invalid
+    """
+    check_history_type(kind)
+    position = decode_history_cursor(cursor)
+    after = (position["timestamp"], position["type"], position["id"]) if position else None
+
+    sources = []
+    if kind in (None, MODIFICATION):
+        sources.append(modifications)
+    if kind in (None, DEPLOYMENT):
+        sources.append(deployments)
+
+    candidates = (
+        event for event in chain.from_iterable(sources)
+        if (status is None or event.status == status) and (after is None or _sort_key(event) < after)
+    )
+    events = heapq.nlargest(limit + 1, candidates, key=_sort_key)
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = encode_cursor(history_position(events[-1]))
+    return Page(items=events, next_cursor=next_cursor)
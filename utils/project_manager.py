@@ -12,19 +12,24 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import logging
 
+from utils.blob_store import BlobStore, get_blob_store
+
 logger = logging.getLogger(__name__)
 
 class ProjectManager:
     """Manages project organization, archiving, and file storage."""
     
-    def __init__(self, projects_root: Path):
+    def __init__(self, projects_root: Path, blob_store: Optional[BlobStore] = None):
         """
         Initialize the project manager.
         
         Args:
             projects_root: Root directory for all projects
+            blob_store: Store that archived files are deduplicated into
+                        (defaults to the global blob store)
         """
         self.projects_root = Path(projects_root)
+        self.blob_store = blob_store or get_blob_store()
         self.current_dir = self.projects_root / "current"
         self.archived_dir = self.projects_root / "archived"
         
@@ -111,9 +116,11 @@ class ProjectManager:
         archived_path = self.archived_dir / archived_name
         
         try:
-            # Copy current directory to archived
+            # Store current files once and hardlink the read-only archive to them
             if self.current_dir.exists() and any(self.current_dir.iterdir()):
-                shutil.copytree(self.current_dir, archived_path, dirs_exist_ok=True)
+                manifest = self.blob_store.import_tree(self.current_dir)
+                self.blob_store.write_manifest(f"projects/archived/{archived_name}", manifest)
+                self.blob_store.materialize(manifest, archived_path, mode="hardlink")
                 
                 # Update metadata
                 archived_project = {
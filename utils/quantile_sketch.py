@@ -0,0 +1,263 @@
+"""
+Streaming quantile sketches with time-bucketed rollups.
+
+This module provides constant-time, mergeable latency statistics:
+- LogHistogram: Log-bucketed histogram (HDR/DDSketch style) with bounded
+  relative error; record is O(1), two histograms merge by adding counts
+- RollingHistogram: Per-second and per-minute histogram rings with
+  retention, answering p50/p95/p99 over 1m/5m/1h windows
+"""
+
+import math
+import time
+from typing import Callable, Dict, List, Optional
+
+# Standard reporting windows (label -> seconds)
+DEFAULT_WINDOWS = {
+    '1m': 60,
+    '5m': 300,
+    '1h': 3600
+}
+
+# Values at or below this are counted in the zero bucket
+MIN_TRACKED_VALUE = 1e-9
+
+
+class LogHistogram:
+    """
+    Mergeable quantile sketch with logarithmic buckets.
+
+    A value v lands in bucket ceil(log_gamma(v)) where
+    gamma = (1 + a) / (1 - a), so any reported quantile is within relative
+    error a of a true sample value. Memory grows with the dynamic range of
+    the data (a few hundred buckets for ns..hours), not with sample count.
+    """
+
+    __slots__ = (
+        'relative_accuracy', '_gamma', '_log_gamma', 'buckets',
+        'zero_count', 'count', 'total', 'min', 'max'
+    )
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        """
+        Initialize histogram.
+
+        Args:
+            relative_accuracy: Maximum relative error of quantiles (default: 1%)
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float, count: int = 1):
+        """Record a value (negative values are clamped to zero)."""
+        if value <= MIN_TRACKED_VALUE:
+            value = max(value, 0.0)
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'LogHistogram'):
+        """Merge another histogram with the same accuracy into this one."""
+        if other.count == 0:
+            return
+        if other._gamma != self._gamma:
+            raise ValueError("Cannot merge histograms with different accuracy")
+
+        for index, bucket_count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate the q-quantile (0.0 to 1.0).
+
+        Returns:
+            Estimated value or None if empty
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Bucket midpoint (in relative terms) minimises worst-case error
+                estimate = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+
+        return self.max
+
+    def mean(self) -> Optional[float]:
+        """Mean of recorded values (None if empty)."""
+        return self.total / self.count if self.count else None
+
+    def reset(self):
+        """Clear all recorded values."""
+        self.buckets.clear()
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def snapshot(self, quantiles: tuple = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        """
+        Summarize the histogram.
+
+        Returns:
+            Dictionary with count, mean, min, max and pXX keys
+        """
+        if self.count == 0:
+            return {'count': 0}
+
+        summary = {
+            'count': self.count,
+            'mean': self.mean(),
+            'min': self.min,
+            'max': self.max
+        }
+        for q in quantiles:
+            summary[f"p{round(q * 100):d}"] = self.quantile(q)
+        return summary
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"LogHistogram(count={self.count}, buckets={len(self.buckets)}, "
+            f"accuracy={self.relative_accuracy})"
+        )
+
+
+class RollingHistogram:
+    """
+    Time-bucketed LogHistograms for windowed percentiles.
+
+    Keeps a ring of per-second histograms (for short windows) and a ring of
+    per-minute histograms (for long windows). Recording touches one bucket
+    in each ring, so cost is O(1); window queries merge at most
+    max(second_buckets, minute_buckets) histograms.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        second_buckets: int = 300,
+        minute_buckets: int = 60,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize rolling histogram.
+
+        Args:
+            relative_accuracy: Quantile relative error
+            second_buckets: Seconds of per-second retention (default: 5 minutes)
+            minute_buckets: Minutes of per-minute retention (default: 1 hour)
+            clock: Time source in seconds (injectable for tests)
+        """
+        self.relative_accuracy = relative_accuracy
+        self.second_buckets = second_buckets
+        self.minute_buckets = minute_buckets
+        self._clock = clock
+
+        self._seconds: List[LogHistogram] = [
+            LogHistogram(relative_accuracy) for _ in range(second_buckets)
+        ]
+        self._second_epochs: List[int] = [-1] * second_buckets
+        self._minutes: List[LogHistogram] = [
+            LogHistogram(relative_accuracy) for _ in range(minute_buckets)
+        ]
+        self._minute_epochs: List[int] = [-1] * minute_buckets
+
+        # All-time totals
+        self.lifetime = LogHistogram(relative_accuracy)
+
+    def record(self, value: float):
+        """Record a value at the current time."""
+        now = int(self._clock())
+
+        slot = now % self.second_buckets
+        if self._second_epochs[slot] != now:
+            self._seconds[slot].reset()
+            self._second_epochs[slot] = now
+        self._seconds[slot].record(value)
+
+        minute = now // 60
+        slot = minute % self.minute_buckets
+        if self._minute_epochs[slot] != minute:
+            self._minutes[slot].reset()
+            self._minute_epochs[slot] = minute
+        self._minutes[slot].record(value)
+
+        self.lifetime.record(value)
+
+    def window(self, seconds: int) -> LogHistogram:
+        """
+        Merge buckets covering the last `seconds` seconds.
+
+        Windows up to second_buckets use per-second resolution; longer
+        windows use per-minute buckets (including the current minute).
+        """
+        now = int(self._clock())
+        merged = LogHistogram(self.relative_accuracy)
+
+        if seconds <= self.second_buckets:
+            oldest = now - seconds
+            for hist, epoch in zip(self._seconds, self._second_epochs):
+                if oldest < epoch <= now:
+                    merged.merge(hist)
+        else:
+            current = now // 60
+            oldest = current - min(math.ceil(seconds / 60), self.minute_buckets)
+            for hist, epoch in zip(self._minutes, self._minute_epochs):
+                if oldest < epoch <= current:
+                    merged.merge(hist)
+
+        return merged
+
+    def snapshot(self, windows: Optional[Dict[str, int]] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Summaries per reporting window.
+
+        Args:
+            windows: label -> seconds (default: DEFAULT_WINDOWS)
+
+        Returns:
+            label -> LogHistogram.snapshot()
+        """
+        windows = windows or DEFAULT_WINDOWS
+        return {
+            label: self.window(seconds).snapshot()
+            for label, seconds in windows.items()
+        }
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return (
+            f"RollingHistogram(lifetime_count={self.lifetime.count}, "
+            f"seconds={self.second_buckets}, minutes={self.minute_buckets})"
+        )
@@ -0,0 +1,190 @@
+"""
+Startup-time profiling.
+
+This module provides:
+- StartupProfiler: Times every module import (self and cumulative time)
+  through a sys.meta_path hook, plus named startup phases
+- start_startup_profile / get_startup_profiler: Global profiler, enabled
+  by main.py when STARTUP_PROFILE=true (reported at /debug/startup)
+
+It can also profile importing any module from the command line, e.g. a
+Lambda worker:
+
+    python -m utils.startup_profile main
+    python -m utils.startup_profile lambda.dev_agent.worker --limit 40
+
+Only standard-library imports are used here, so enabling the profiler
+does not itself add to startup time.
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import importlib
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """
+    Measures import time per module and named startup phases.
+
+    Installs a meta path finder that delegates to the other finders and
+    wraps each found loader's exec_module, so the time spent executing a
+    module body is recorded. Self time excludes imports nested inside it;
+    cumulative time includes them (like python -X importtime).
+    """
+
+    def __init__(self):
+        """Initialize profiler (not yet installed)."""
+        self.started_at = time.perf_counter()
+        self.imports: Dict[str, Dict[str, float]] = {}
+        self.phases: List[Dict[str, Any]] = []
+        self._stack: List[List[float]] = []  # [start, nested time] per module being imported
+        self._installed = False
+
+    # ========================================================================
+    # Import Hook
+    # ========================================================================
+
+    def install(self):
+        """Start timing imports."""
+        if not self._installed:
+            sys.meta_path.insert(0, self)
+            self._installed = True
+
+    def uninstall(self):
+        """Stop timing imports."""
+        if self._installed:
+            sys.meta_path.remove(self)
+            self._installed = False
+
+    def find_spec(self, fullname, path, target=None):
+        """Find the spec with the remaining finders and time its loader."""
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        # Built-in and frozen importers are shared classes; they are fast anyway
+        if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+            self._wrap(loader, fullname)
+        return spec
+
+    def _wrap(self, loader, fullname: str):
+        exec_module = loader.exec_module
+        profiler = self
+
+        def timed_exec_module(module):
+            frame = [time.perf_counter(), 0.0]
+            profiler._stack.append(frame)
+            try:
+                return exec_module(module)
+            finally:
+                profiler._stack.pop()
+                cumulative = time.perf_counter() - frame[0]
+                if profiler._stack:
+                    profiler._stack[-1][1] += cumulative
+                profiler.imports[fullname] = {
+                    "self": cumulative - frame[1],
+                    "cumulative": cumulative,
+                    "nested": bool(profiler._stack)
+                }
+
+        loader.exec_module = timed_exec_module
+
+    # ========================================================================
+    # Reporting
+    # ========================================================================
+
+    def mark(self, phase: str):
+        """Record that a startup phase finished (time since profiler start)."""
+        elapsed = time.perf_counter() - self.started_at
+        self.phases.append({"phase": phase, "elapsed_ms": round(elapsed * 1000, 1)})
+        logger.info(f"⏱️ Startup phase '{phase}' at {elapsed * 1000:.0f}ms")
+
+    def report(self, limit: int = 25) -> Dict[str, Any]:
+        """
+        Summarize startup time.
+
+        Args:
+            limit: Modules to list per ranking
+
+        Returns:
+            Dictionary with total time, phases and the slowest imports by
+            cumulative and by self time
+        """
+        def rows(key: str) -> List[Dict[str, Any]]:
+            ranked = sorted(self.imports.items(), key=lambda item: item[1][key], reverse=True)
+            return [
+                {
+                    "module": name,
+                    "self_ms": round(times["self"] * 1000, 2),
+                    "cumulative_ms": round(times["cumulative"] * 1000, 2)
+                }
+                for name, times in ranked[:limit]
+            ]
+
+        top_level = sum(times["cumulative"] for times in self.imports.values() if not times["nested"])
+        return {
+            "elapsed_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+            "import_ms": round(sum(t["self"] for t in self.imports.values()) * 1000, 1),
+            "top_level_import_ms": round(top_level * 1000, 1),
+            "modules_imported": len(self.imports),
+            "phases": self.phases,
+            "slowest_cumulative": rows("cumulative"),
+            "slowest_self": rows("self")
+        }
+
+    def log_report(self, limit: int = 15):
+        """Log the slowest imports by cumulative time."""
+        report = self.report(limit)
+        logger.info(
+            f"⏱️ Startup: {report['elapsed_ms']:.0f}ms total, "
+            f"{report['import_ms']:.0f}ms in {report['modules_imported']} module imports"
+        )
+        for row in report["slowest_cumulative"]:
+            logger.info(f"   {row['cumulative_ms']:8.1f}ms  {row['self_ms']:8.1f}ms  {row['module']}")
+
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def start_startup_profile() -> StartupProfiler:
+    """Create and install the global startup profiler (idempotent)."""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+    return _profiler
+
+
+def get_startup_profiler() -> Optional[StartupProfiler]:
+    """The global startup profiler, or None when profiling is off."""
+    return _profiler
+
+
+def main(argv: Optional[List[str]] = None):
+    """Profile importing a module and print the report as JSON."""
+    parser = argparse.ArgumentParser(description="Report import time per module")
+    parser.add_argument("module", help="Module to import, e.g. main")
+    parser.add_argument("--limit", default=25, type=int, help="Modules per ranking")
+    args = parser.parse_args(argv)
+
+    profiler = start_startup_profile()
+    importlib.import_module(args.module)
+    profiler.mark("import")
+    profiler.uninstall()
+    print(json.dumps(profiler.report(args.limit), indent=2))
+
+
+if __name__ == "__main__":
+    main()
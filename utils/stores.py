@@ -0,0 +1,91 @@
+"""
+Storage backend selection for projects and templates.
+
+PROJECT_STORE_BACKEND (config.py) picks where the API and the PM agent
+keep their data:
+- "file" (default): ProjectContextStore / TemplateLibrary, JSON files
+  under generated_code/
+- "postgres": PostgresProjectStore / PostgresTemplateStore on the asyncpg
+  pool of database.connection (DATABASE_URL)
+
+get_shared_project_store / get_shared_template_library return one instance
+per process, created on first use rather than at import, so importing the
+API or constructing an agent touches no storage. The API routes take them
+as FastAPI dependencies (override them in app.dependency_overrides).
+"""
+
+import threading
+from typing import Any, Callable, Dict
+
+from config import PROJECT_STORE_BACKEND
+
+BACKENDS = ("file", "postgres")
+
+_shared: Dict[str, Any] = {}
+_shared_lock = threading.Lock()
+
+
+def _backend(backend=None) -> str:
+    backend = (backend or PROJECT_STORE_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PROJECT_STORE_BACKEND {backend!r} (expected one of {', '.join(BACKENDS)})")
+    return backend
+
+
+def get_project_store(backend=None):
+    """
+    Create the project store of the configured backend.
+
+    Args:
+        backend: Override PROJECT_STORE_BACKEND
+
+    Returns:
+        ProjectContextStore or PostgresProjectStore
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if _backend(backend) == "postgres":
+        from utils.postgres_project_store import PostgresProjectStore
+        return PostgresProjectStore()
+
+    from utils.project_context_store import ProjectContextStore
+    return ProjectContextStore()
+
+
+def get_template_library(backend=None):
+    """
+    Create the template library of the configured backend.
+
+    Args:
+        backend: Override PROJECT_STORE_BACKEND
+
+    Returns:
+        TemplateLibrary or PostgresTemplateStore
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if _backend(backend) == "postgres":
+        from utils.postgres_template_store import PostgresTemplateStore
+        return PostgresTemplateStore()
+
+    from utils.template_library import TemplateLibrary
+    return TemplateLibrary()
+
+
+def _get_shared(name: str, factory: Callable[[], Any]) -> Any:
+    with _shared_lock:
+        if name not in _shared:
+            _shared[name] = factory()
+        return _shared[name]
+
+
+def get_shared_project_store():
+    """Get or create the process-wide project store of the configured backend."""
+    return _get_shared("project_store", get_project_store)
+
+
+def get_shared_template_library():
+    """Get or create the process-wide template library of the configured backend."""
+    return _get_shared("template_library", get_template_library)
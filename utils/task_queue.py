@@ -3,16 +3,53 @@ Async task queue for parallel processing pipeline.
 
 This module provides a priority-based async queue with metrics tracking,
 designed for managing Dev/QA/Fix tasks in a parallel pipeline.
+
+Optional priority aging lets a task's effective priority improve with
+queue wait, and per-class maximum waits guarantee that no task type
+(e.g. dev behind sustained fix traffic) is starved.
 """
 
 import asyncio
-from typing import Any, Optional
+import heapq
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 import logging
 
+from utils.metrics_registry import counter, gauge, histogram, TASK_BUCKETS
+from utils.tracing import SpanContext, current_context
+
 logger = logging.getLogger(__name__)
 
+# Lowest priority a task can be demoted to by retries (1=highest, 10=lowest)
+MIN_PRIORITY = 10
+
+# Queue-wait samples kept per task class for percentile stats
+WAIT_SAMPLE_SIZE = 1000
+
+# Scrapeable queue metrics (shared by all queues, labelled by queue name)
+QUEUE_ENQUEUED = counter(
+    "pipeline_queue_enqueued_total", "Tasks enqueued", ("queue", "task_type")
+)
+QUEUE_COMPLETED = counter(
+    "pipeline_queue_completed_total", "Tasks marked done", ("queue", "status")
+)
+QUEUE_RETRIES = counter(
+    "pipeline_queue_retries_total", "Tasks re-enqueued for retry", ("queue",)
+)
+QUEUE_DEPTH = gauge(
+    "pipeline_queue_depth", "Pending tasks in queue", ("queue",)
+)
+QUEUE_IN_PROGRESS = gauge(
+    "pipeline_queue_in_progress", "Tasks dequeued but not yet done", ("queue",)
+)
+QUEUE_WAIT = histogram(
+    "pipeline_queue_wait_seconds", "Time from enqueue to dequeue",
+    ("queue", "task_type"), buckets=TASK_BUCKETS
+)
+
 
 @dataclass
 class QueueTask:
@@ -27,6 +64,10 @@ class QueueTask:
         created_at: Timestamp when task was created
         started_at: Timestamp when processing started
         retries: Number of retry attempts
+        tenant_id: Owning tenant (user/project/plan) for fair scheduling
+        enqueued_at: Timestamp when task was last put on a queue
+        trace_parent: Span context of the producer (links queue wait and processing spans)
+        deadline: Absolute wall-clock deadline (epoch seconds) for processing, if any
     """
     task_id: str
     task_type: str
@@ -36,6 +77,10 @@ class QueueTask:
     started_at: Optional[datetime] = None
     retries: int = 0
     max_retries: int = 3
+    tenant_id: Optional[str] = None
+    enqueued_at: Optional[datetime] = None
+    trace_parent: Optional[SpanContext] = None
+    deadline: Optional[float] = None
     
     def __lt__(self, other):
         """
@@ -54,10 +99,148 @@ class QueueTask:
             "priority": self.priority,
             "created_at": self.created_at.isoformat(),
             "started_at": self.started_at.isoformat() if self.started_at else None,
-            "retries": self.retries
+            "retries": self.retries,
+            "tenant_id": self.tenant_id
         }
 
 
+class AgingHeap:
+    """
+    Priority heap with linear priority aging and per-class maximum wait.
+    
+    Effective priority is ``priority - aging_rate * wait``. Because every
+    queued item ages at the same rate, ordering by
+    ``priority + aging_rate * enqueue_time`` is equivalent at any instant,
+    so the sort key is fixed at push time and the heap is never re-heapified.
+    
+    Per-class FIFOs track the oldest item of each task class; an item whose
+    wait exceeds its class's max_wait is served ahead of the heap order.
+    Entries served through one structure are lazily skipped in the other.
+    """
+    
+    def __init__(
+        self,
+        aging_rate: float = 0.0,
+        max_wait: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize aging heap.
+        
+        Args:
+            aging_rate: Priority levels gained per second of queue wait (0 = no aging)
+            max_wait: Per-class maximum queue wait in seconds (class -> seconds)
+        """
+        self.aging_rate = aging_rate
+        self.max_wait = dict(max_wait or {})
+        self._heap: List[list] = []
+        self._by_class: Dict[str, Deque[list]] = {}
+        self._origin = time.monotonic()
+        self._seq = 0
+        self._size = 0
+        self.deadline_promotions = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def push(self, priority: int, item: Any, item_class: str = "default"):
+        """Add item with given base priority and class."""
+        now = time.monotonic() - self._origin
+        self._seq += 1
+        # Entry: [sort_key, seq, enqueue_time, item_class, item, served]
+        entry = [priority + self.aging_rate * now, self._seq, now, item_class, item, False]
+        heapq.heappush(self._heap, entry)
+        if item_class in self.max_wait:
+            self._by_class.setdefault(item_class, deque()).append(entry)
+        self._size += 1
+    
+    def pop(self) -> Any:
+        """Remove and return the next item (IndexError if empty)."""
+        if self._size == 0:
+            raise IndexError("pop from empty AgingHeap")
+        
+        entry = self._pop_overdue()
+        if entry is None:
+            while True:
+                entry = heapq.heappop(self._heap)
+                if not entry[5]:
+                    break
+        
+        entry[5] = True
+        self._size -= 1
+        if self._size == 0:
+            # Drop lazily-deleted leftovers
+            self._heap.clear()
+            self._by_class.clear()
+        return entry[4]
+    
+    def _pop_overdue(self) -> Optional[list]:
+        """Return the longest-overdue class head, if any class exceeded max_wait."""
+        if not self._by_class:
+            return None
+        
+        now = time.monotonic() - self._origin
+        overdue = None
+        worst = 0.0
+        for item_class, fifo in self._by_class.items():
+            while fifo and fifo[0][5]:
+                fifo.popleft()
+            if not fifo:
+                continue
+            lateness = (now - fifo[0][2]) - self.max_wait[item_class]
+            if lateness > worst:
+                worst = lateness
+                overdue = fifo
+        
+        if overdue is None:
+            return None
+        self.deadline_promotions += 1
+        return overdue.popleft()
+    
+    def items(self) -> List[Any]:
+        """List queued items (unordered)."""
+        return [entry[4] for entry in self._heap if not entry[5]]
+    
+    def clear(self):
+        """Remove all items."""
+        self._heap.clear()
+        self._by_class.clear()
+        self._size = 0
+
+
+class AgingPriorityQueue(asyncio.Queue):
+    """
+    asyncio.Queue backed by an AgingHeap.
+    
+    Accepts the same (priority, QueueTask) tuples as asyncio.PriorityQueue;
+    the task's task_type is its class for max-wait guarantees.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = 0,
+        aging_rate: float = 0.0,
+        max_wait: Optional[Dict[str, float]] = None
+    ):
+        self._aging_rate = aging_rate
+        self._max_wait = max_wait
+        super().__init__(maxsize)
+    
+    def _init(self, maxsize):
+        self._queue = AgingHeap(self._aging_rate, self._max_wait)
+    
+    def _put(self, item):
+        priority, task = item
+        self._queue.push(priority, item, task.task_type)
+    
+    def _get(self):
+        return self._queue.pop()
+    
+    @property
+    def deadline_promotions(self) -> int:
+        """Number of tasks served early because they exceeded max_wait."""
+        return self._queue.deadline_promotions
+
+
 class AsyncTaskQueue:
     """
     Async queue with priority support and comprehensive metrics.
@@ -66,16 +249,41 @@ class AsyncTaskQueue:
     like pending tasks, completed tasks, failed tasks, and processing times.
     """
     
-    def __init__(self, name: str, max_size: int = 0):
+    def __init__(
+        self,
+        name: str,
+        max_size: int = 0,
+        aging_rate: float = 0.0,
+        max_wait: Optional[Dict[str, float]] = None
+    ):
         """
         Initialize async task queue.
         
         Args:
             name: Queue name for logging and identification
             max_size: Maximum queue size (0 = unlimited)
+            aging_rate: Priority levels gained per second of queue wait (0 = no aging)
+            max_wait: Per-task-type maximum queue wait in seconds
         """
         self.name = name
-        self.queue = asyncio.PriorityQueue(maxsize=max_size)
+        self.aging_rate = aging_rate
+        self.max_wait = dict(max_wait or {})
+        if aging_rate or self.max_wait:
+            self.queue = AgingPriorityQueue(
+                maxsize=max_size,
+                aging_rate=aging_rate,
+                max_wait=self.max_wait
+            )
+        else:
+            self.queue = asyncio.PriorityQueue(maxsize=max_size)
+        
+        # Recent queue-wait samples per task type (seconds)
+        self.wait_times: Dict[str, Deque[float]] = {}
+        
+        # Registry series for this queue
+        self._depth_metric = QUEUE_DEPTH.labels(name)
+        self._in_progress_metric = QUEUE_IN_PROGRESS.labels(name)
+        self._retries_metric = QUEUE_RETRIES.labels(name)
         
         # Metrics
         self.processed_count = 0
@@ -104,6 +312,9 @@ class AsyncTaskQueue:
             asyncio.TimeoutError: If timeout is exceeded
             asyncio.QueueFull: If queue is full and no timeout specified
         """
+        task.enqueued_at = datetime.now()
+        if task.trace_parent is None:
+            task.trace_parent = current_context()
         try:
             if timeout:
                 await asyncio.wait_for(
@@ -113,6 +324,9 @@ class AsyncTaskQueue:
             else:
                 await self.queue.put((task.priority, task))
             
+            QUEUE_ENQUEUED.labels(self.name, task.task_type).inc()
+            self._update_depth()
+            
             logger.info(
                 f"📥 {self.name}: Enqueued task {task.task_id} "
                 f"(type: {task.task_type}, priority: {task.priority}, "
@@ -155,6 +369,8 @@ class AsyncTaskQueue:
             # Mark as in progress
             task.started_at = datetime.now()
             self.in_progress[task.task_id] = task
+            self._record_wait(task)
+            self._update_depth()
             
             logger.debug(
                 f"📤 {self.name}: Dequeued task {task.task_id} "
@@ -203,6 +419,9 @@ class AsyncTaskQueue:
                 f"(total_failed: {self.failed_count})"
             )
         
+        QUEUE_COMPLETED.labels(self.name, "success" if success else "failed").inc()
+        self._in_progress_metric.set(len(self.in_progress))
+        
         if processing_time:
             self.total_processing_time += processing_time
         
@@ -224,9 +443,11 @@ class AsyncTaskQueue:
         if task.retries <= task.max_retries:
             self.retry_count += 1
             self.in_progress.pop(task.task_id, None)
+            self._retries_metric.inc()
+            self._in_progress_metric.set(len(self.in_progress))
             
-            # Re-enqueue with lower priority
-            task.priority += 1
+            # Re-enqueue with lower priority (bounded; aging recovers it)
+            task.priority = min(task.priority + 1, MIN_PRIORITY)
             asyncio.create_task(self.put(task))
             
             logger.info(
@@ -241,6 +462,44 @@ class AsyncTaskQueue:
             )
             return False
     
+    def _record_wait(self, task: QueueTask):
+        """Record queue wait of a dequeued task under its task type."""
+        if task.enqueued_at is None:
+            return
+        wait = (task.started_at - task.enqueued_at).total_seconds()
+        samples = self.wait_times.get(task.task_type)
+        if samples is None:
+            samples = self.wait_times[task.task_type] = deque(maxlen=WAIT_SAMPLE_SIZE)
+        samples.append(wait)
+        QUEUE_WAIT.labels(self.name, task.task_type).observe(wait)
+    
+    def _update_depth(self):
+        """Publish pending and in-progress counts to the metrics registry."""
+        self._depth_metric.set(self.queue.qsize())
+        self._in_progress_metric.set(len(self.in_progress))
+    
+    def get_wait_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get queue-wait percentiles per task type.
+        
+        Returns:
+            dict: task_type -> {count, p50, p95, p99, max} over recent samples
+        """
+        stats = {}
+        for task_type, samples in self.wait_times.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            last = len(ordered) - 1
+            stats[task_type] = {
+                "count": len(ordered),
+                "p50": round(ordered[int(last * 0.50)], 3),
+                "p95": round(ordered[int(last * 0.95)], 3),
+                "p99": round(ordered[int(last * 0.99)], 3),
+                "max": round(ordered[-1], 3)
+            }
+        return stats
+    
     def is_empty(self) -> bool:
         """Check if queue is empty."""
         return self.queue.empty()
@@ -283,7 +542,10 @@ class AsyncTaskQueue:
             "total_processed": total_tasks,
             "success_rate": round(success_rate, 2),
             "avg_processing_time": round(avg_processing_time, 2),
-            "total_processing_time": round(self.total_processing_time, 2)
+            "total_processing_time": round(self.total_processing_time, 2),
+            "aging_rate": self.aging_rate,
+            "deadline_promotions": getattr(self.queue, "deadline_promotions", 0),
+            "wait_times": self.get_wait_stats()
         }
     
     def get_in_progress_tasks(self) -> list:
@@ -323,6 +585,7 @@ class AsyncTaskQueue:
             except asyncio.QueueEmpty:
                 break
         
+        self._update_depth()
         logger.warning(f"🗑️ {self.name}: Cleared {count} pending tasks")
     
     def __repr__(self) -> str:
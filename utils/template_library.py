@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Union
 
 from models.template import ProjectTemplate
+from utils.blob_store import BlobStore, get_blob_store
 
 logger = logging.getLogger(__name__)
 
@@ -19,22 +20,31 @@ class TemplateLibrary:
     
     Storage structure:
     - generated_code/templates/{template_id}/template.json
+        Template metadata with "file_hashes" (filename -> sha256)
+    - File contents live in the shared blob store (utils.blob_store) under
+      the manifest templates/{template_id}; template.json files written
+      with inline "files" still load
     """
     
-    def __init__(self, storage_root: Optional[Path] = None):
+    def __init__(self, storage_root: Optional[Path] = None, blob_store: Optional[BlobStore] = None):
         """
         Initialize the TemplateLibrary.
         
         Args:
             storage_root: Root directory for storing templates.
                          Defaults to generated_code/templates/
+            blob_store: Store for template file contents (defaults to the
+                        global blob store, or one under storage_root/.blobs
+                        when a storage_root is given)
         """
         if storage_root is None:
             from config import GENERATED_CODE_ROOT
             storage_root = GENERATED_CODE_ROOT / "templates"
+            blob_store = blob_store or get_blob_store()
         
         self.storage_root = Path(storage_root)
         self.storage_root.mkdir(parents=True, exist_ok=True)
+        self.blob_store = blob_store or BlobStore(self.storage_root / ".blobs")
         logger.info(f"TemplateLibrary initialized with storage root: {self.storage_root}")
     
     def _get_template_dir(self, template_id: str) -> Path:
@@ -45,6 +55,20 @@ class TemplateLibrary:
         """Get the template.json file path for a specific template."""
         return self._get_template_dir(template_id) / "template.json"
     
+    def _manifest_name(self, template_id: str) -> str:
+        """Blob store manifest holding a template's files."""
+        return f"templates/{template_id}"
+    
+    def _read_template_data(self, template_file: Path) -> Dict:
+        """Read template.json, resolving file hashes to contents."""
+        with open(template_file, 'r', encoding='utf-8') as f:
+            template_data = json.load(f)
+        
+        file_hashes = template_data.pop('file_hashes', None)
+        if file_hashes is not None:
+            template_data['files'] = self.blob_store.read_files(file_hashes)
+        return template_data
+    
     def _generate_template_id(self, name: str) -> str:
         """
         Generate a unique template ID from name.
@@ -90,8 +114,11 @@ class TemplateLibrary:
             template_dir = self._get_template_dir(template_obj.id)
             template_dir.mkdir(parents=True, exist_ok=True)
             
-            # Serialize template to JSON
+            # Store files in the blob store; template.json keeps their hashes
             template_data = template_obj.to_dict()
+            template_data['file_hashes'] = self.blob_store.put_manifest(
+                self._manifest_name(template_obj.id), template_data.pop('files')
+            )
             template_file = self._get_template_file(template_obj.id)
             
             # Write to file with pretty formatting
@@ -123,8 +150,7 @@ class TemplateLibrary:
                 return None
             
             # Read and parse JSON
-            with open(template_file, 'r', encoding='utf-8') as f:
-                template_data = json.load(f)
+            template_data = self._read_template_data(template_file)
             
             # Deserialize to ProjectTemplate
             template = ProjectTemplate.from_dict(template_data)
@@ -180,13 +206,12 @@ class TemplateLibrary:
                     continue
                 
                 try:
-                    # Load template
+                    # Filter by category before reading any file contents
                     with open(template_file, 'r', encoding='utf-8') as f:
-                        template_data = json.load(f)
+                        if category and json.load(f).get('category') != category:
+                            continue
                     
-                    # Filter by category if specified
-                    if category and template_data.get('category') != category:
-                        continue
+                    template_data = self._read_template_data(template_file)
                     
                     template = ProjectTemplate.from_dict(template_data)
                     templates.append(template)
@@ -294,8 +319,9 @@ class TemplateLibrary:
                 logger.warning(f"Template file not found for template {template_id}")
                 return False
             
-            # Delete the template file
+            # Delete the template file and release its file contents
             template_file.unlink()
+            self.blob_store.delete_manifest(self._manifest_name(template_id))
             logger.info(f"Successfully deleted template {template_id}")
             return True
             
@@ -1,14 +1,47 @@
 """
 Token usage tracking for cost optimization and monitoring.
+
+Usage is recorded from the token counts reported by the model response
+(prompt, candidate and cached tokens), falling back to a character-based
+estimate only when the response carries no usage metadata.
+
+Aggregation is incremental and fixed-memory:
+- Lifetime totals per agent, prompt_name, model and project
+- A ring of per-minute buckets for rolling windows (1m/5m/1h)
+- A bounded deque of recent calls for debugging
+Key cardinality per dimension is capped; overflow is counted under "other".
+Lifetime aggregates are periodically persisted to JSON and reloaded on start.
 """
 
+import os
+import json
+import time
+import atexit
 import logging
-from typing import Optional, Dict, List
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Rough chars-per-token ratio used when the API reports no usage metadata
+CHARS_PER_TOKEN = 4
+
+# Dimensions aggregated for every call
+DIMENSIONS = ("agent", "prompt_name", "model", "project")
+
+# Key used once a dimension reaches its cardinality cap
+OVERFLOW_KEY = "other"
+
+# Rolling reporting windows (label -> seconds)
+DEFAULT_WINDOWS = {
+    '1m': 60,
+    '5m': 300,
+    '1h': 3600
+}
+
 
 @dataclass
 class TokenUsage:
@@ -18,6 +51,10 @@ class TokenUsage:
     prompt_tokens: int = 0
     response_tokens: int = 0
     timestamp: datetime = field(default_factory=datetime.now)
+    model: Optional[str] = None
+    project_id: Optional[str] = None
+    cached_tokens: int = 0
+    estimated: bool = False
     
     @property
     def total_tokens(self) -> int:
@@ -29,82 +66,373 @@ class TokenUsage:
         return {
             "agent": self.agent,
             "prompt_name": self.prompt_name,
+            "model": self.model,
+            "project_id": self.project_id,
             "prompt_tokens": self.prompt_tokens,
             "response_tokens": self.response_tokens,
+            "cached_tokens": self.cached_tokens,
             "total_tokens": self.total_tokens,
+            "estimated": self.estimated,
             "timestamp": self.timestamp.isoformat()
         }
 
 
+def extract_usage(response: Any) -> Optional[Dict[str, int]]:
+    """
+    Read token counts from a model response's usage metadata.
+
+    Args:
+        response: SDK response (Gemini GenerateContentResponse or similar)
+
+    Returns:
+        Dict with prompt/response/cached token counts, or None if unavailable
+    """
+    try:
+        usage = getattr(response, "usage_metadata", None)
+    except Exception:
+        return None  # Some SDK response objects raise until fully resolved
+    if usage is None:
+        return None
+
+    def read(*names: str) -> Optional[int]:
+        for name in names:
+            value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+            if isinstance(value, int):
+                return value
+        return None
+
+    prompt_tokens = read("prompt_token_count", "input_tokens", "prompt_tokens")
+    response_tokens = read("candidates_token_count", "output_tokens", "completion_tokens")
+    if prompt_tokens is None and response_tokens is None:
+        return None
+    return {
+        "prompt_tokens": prompt_tokens or 0,
+        "response_tokens": response_tokens or 0,
+        "cached_tokens": read("cached_content_token_count", "cache_read_input_tokens") or 0
+    }
+
+
+class _Aggregate:
+    """Running token totals."""
+
+    __slots__ = ('calls', 'prompt', 'response', 'cached', 'estimated_calls')
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt = 0
+        self.response = 0
+        self.cached = 0
+        self.estimated_calls = 0
+
+    def add(self, usage: TokenUsage):
+        self.calls += 1
+        self.prompt += usage.prompt_tokens
+        self.response += usage.response_tokens
+        self.cached += usage.cached_tokens
+        if usage.estimated:
+            self.estimated_calls += 1
+
+    def merge(self, other: '_Aggregate'):
+        self.calls += other.calls
+        self.prompt += other.prompt
+        self.response += other.response
+        self.cached += other.cached
+        self.estimated_calls += other.estimated_calls
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "prompt": self.prompt,
+            "response": self.response,
+            "cached": self.cached,
+            "total": self.prompt + self.response,
+            "calls": self.calls,
+            "estimated_calls": self.estimated_calls
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, int]) -> '_Aggregate':
+        agg = cls()
+        agg.calls = data.get("calls", 0)
+        agg.prompt = data.get("prompt", 0)
+        agg.response = data.get("response", 0)
+        agg.cached = data.get("cached", 0)
+        agg.estimated_calls = data.get("estimated_calls", 0)
+        return agg
+
+
+class _Breakdown:
+    """Totals plus per-dimension aggregates with capped cardinality."""
+
+    __slots__ = ('totals', 'by', 'max_keys')
+
+    def __init__(self, max_keys: int):
+        self.totals = _Aggregate()
+        self.by: Dict[str, Dict[str, _Aggregate]] = {dim: {} for dim in DIMENSIONS}
+        self.max_keys = max_keys
+
+    def _bucket(self, dimension: str, key: str) -> _Aggregate:
+        keys = self.by[dimension]
+        agg = keys.get(key)
+        if agg is None:
+            if len(keys) >= self.max_keys:
+                key = OVERFLOW_KEY
+                agg = keys.get(key)
+            if agg is None:
+                agg = keys[key] = _Aggregate()
+        return agg
+
+    def add(self, usage: TokenUsage):
+        self.totals.add(usage)
+        self._bucket("agent", usage.agent or "unknown").add(usage)
+        self._bucket("prompt_name", usage.prompt_name or "unknown").add(usage)
+        self._bucket("model", usage.model or "unknown").add(usage)
+        self._bucket("project", usage.project_id or "unknown").add(usage)
+
+    def merge(self, other: '_Breakdown'):
+        self.totals.merge(other.totals)
+        for dimension, keys in other.by.items():
+            for key, agg in keys.items():
+                self._bucket(dimension, key).merge(agg)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "totals": self.totals.to_dict(),
+            **{
+                dimension: {key: agg.to_dict() for key, agg in keys.items()}
+                for dimension, keys in self.by.items()
+            }
+        }
+
+
 class TokenCounter:
     """Global token usage tracker."""
     
-    def __init__(self):
-        self.usages: List[TokenUsage] = []
-        self._total_prompt_tokens = 0
-        self._total_response_tokens = 0
+    def __init__(
+        self,
+        recent_size: int = 1000,
+        window_minutes: int = 60,
+        max_keys_per_dimension: int = 500,
+        persist_path: Optional[str] = None,
+        persist_interval: float = 60.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize token counter.
+
+        Args:
+            recent_size: Recent calls kept for inspection
+            window_minutes: Minutes of per-minute buckets (longest rolling window)
+            max_keys_per_dimension: Distinct agents/prompts/models/projects tracked
+            persist_path: JSON file for lifetime aggregates (None = no persistence)
+            persist_interval: Minimum seconds between automatic saves
+            clock: Time source in seconds (injectable for tests)
+        """
+        self.usages: Deque[TokenUsage] = deque(maxlen=recent_size)
+        self.window_minutes = window_minutes
+        self.max_keys = max_keys_per_dimension
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.persist_interval = persist_interval
+        self._clock = clock
+
+        self._lifetime = _Breakdown(max_keys_per_dimension)
+        self._minutes: List[Optional[_Breakdown]] = [None] * window_minutes
+        self._minute_epochs: List[int] = [-1] * window_minutes
+        self._last_persist = clock()
+        self._dirty = False
+
+        if self.persist_path:
+            self.load()
     
     def add_usage(self, usage: TokenUsage):
         """Record a token usage entry."""
         self.usages.append(usage)
-        self._total_prompt_tokens += usage.prompt_tokens
-        self._total_response_tokens += usage.response_tokens
+        self._lifetime.add(usage)
+
+        minute = int(self._clock()) // 60
+        slot = minute % self.window_minutes
+        if self._minute_epochs[slot] != minute:
+            self._minutes[slot] = _Breakdown(self.max_keys)
+            self._minute_epochs[slot] = minute
+        self._minutes[slot].add(usage)
+        self._dirty = True
         
         logger.info(
             f"📊 Token Usage | {usage.agent}/{usage.prompt_name}: "
             f"Prompt={usage.prompt_tokens}, Response={usage.response_tokens}, "
-            f"Total={usage.total_tokens}"
+            f"Cached={usage.cached_tokens}, Total={usage.total_tokens}"
+            f"{' (estimated)' if usage.estimated else ''}"
         )
     
-    def add_from_metadata(self, agent: str, prompt_name: str, prompt_chars: int, response_chars: int):
+        if self.persist_path and self._clock() - self._last_persist >= self.persist_interval:
+            self.save()
+
+    def add_from_metadata(self, agent: str, prompt_name: str, prompt_chars: int, response_chars: int,
+                          model: Optional[str] = None, project_id: Optional[str] = None):
         """
         Add usage from character counts (approximate token estimation).
         Rule of thumb: 1 token ≈ 4 characters for English text.
         """
-        prompt_tokens = prompt_chars // 4
-        response_tokens = response_chars // 4
-        
         usage = TokenUsage(
             agent=agent,
             prompt_name=prompt_name,
-            prompt_tokens=prompt_tokens,
-            response_tokens=response_tokens
+            prompt_tokens=prompt_chars // CHARS_PER_TOKEN,
+            response_tokens=response_chars // CHARS_PER_TOKEN,
+            model=model,
+            project_id=project_id,
+            estimated=True
+        )
+        self.add_usage(usage)
+        return usage
+
+    def add_from_response(
+        self,
+        response: Any,
+        agent: Optional[str] = None,
+        prompt_name: Optional[str] = None,
+        model: Optional[str] = None,
+        project_id: Optional[str] = None,
+        prompt_chars: int = 0,
+        response_chars: int = 0
+    ) -> TokenUsage:
+        """
+        Add usage reported by a model response.
+
+        Falls back to a character estimate when the response has no usage
+        metadata (e.g. mocked clients or interrupted streams).
+
+        Returns:
+            The recorded TokenUsage
+        """
+        counts = extract_usage(response)
+        if counts is None:
+            return self.add_from_metadata(
+                agent or "unknown", prompt_name or "unknown",
+                prompt_chars, response_chars, model=model, project_id=project_id
+            )
+
+        usage = TokenUsage(
+            agent=agent or "unknown",
+            prompt_name=prompt_name or "unknown",
+            model=model,
+            project_id=project_id,
+            **counts
         )
         self.add_usage(usage)
+        return usage
     
     @property
     def total_tokens(self) -> int:
         """Total tokens used across all calls."""
-        return self._total_prompt_tokens + self._total_response_tokens
+        return self._lifetime.totals.prompt + self._lifetime.totals.response
     
     @property
     def total_prompt_tokens(self) -> int:
         """Total prompt tokens used."""
-        return self._total_prompt_tokens
+        return self._lifetime.totals.prompt
     
     @property
     def total_response_tokens(self) -> int:
         """Total response tokens used."""
-        return self._total_response_tokens
+        return self._lifetime.totals.response
     
-    def get_stats(self) -> Dict:
-        """Get overall statistics."""
-        agent_stats = {}
-        for usage in self.usages:
-            if usage.agent not in agent_stats:
-                agent_stats[usage.agent] = {"prompt": 0, "response": 0, "total": 0, "calls": 0}
-            agent_stats[usage.agent]["prompt"] += usage.prompt_tokens
-            agent_stats[usage.agent]["response"] += usage.response_tokens
-            agent_stats[usage.agent]["total"] += usage.total_tokens
-            agent_stats[usage.agent]["calls"] += 1
+    @property
+    def total_cached_tokens(self) -> int:
+        """Total prompt tokens served from the model's context cache."""
+        return self._lifetime.totals.cached
+
+    def get_window(self, seconds: int) -> Dict[str, Any]:
+        """
+        Aggregates over the last `seconds` seconds (minute resolution).
+
+        Returns:
+            Dictionary with totals and per-dimension breakdowns
+        """
+        current = int(self._clock()) // 60
+        oldest = current - min(-(-seconds // 60), self.window_minutes)
+        merged = _Breakdown(self.max_keys)
+        for breakdown, epoch in zip(self._minutes, self._minute_epochs):
+            if breakdown is not None and oldest < epoch <= current:
+                merged.merge(breakdown)
+        return merged.to_dict()
+
+    def get_stats(self, windows: Optional[Dict[str, int]] = None) -> Dict:
+        """
+        Get overall statistics.
+
+        Cost is proportional to the number of tracked keys and window
+        buckets, not to the number of recorded calls.
+        """
+        lifetime = self._lifetime
+        window_stats = {}
+        for label, seconds in (windows or DEFAULT_WINDOWS).items():
+            totals = self.get_window(seconds)["totals"]
+            totals["tokens_per_minute"] = round(totals["total"] / (seconds / 60), 2)
+            window_stats[label] = totals
         
         return {
-            "total_prompt_tokens": self._total_prompt_tokens,
-            "total_response_tokens": self._total_response_tokens,
+            "total_prompt_tokens": lifetime.totals.prompt,
+            "total_response_tokens": lifetime.totals.response,
+            "total_cached_tokens": lifetime.totals.cached,
             "total_tokens": self.total_tokens,
-            "agent_breakdown": agent_stats,
-            "total_calls": len(self.usages)
+            "agent_breakdown": {k: v.to_dict() for k, v in lifetime.by["agent"].items()},
+            "prompt_breakdown": {k: v.to_dict() for k, v in lifetime.by["prompt_name"].items()},
+            "model_breakdown": {k: v.to_dict() for k, v in lifetime.by["model"].items()},
+            "project_breakdown": {k: v.to_dict() for k, v in lifetime.by["project"].items()},
+            "total_calls": lifetime.totals.calls,
+            "estimated_calls": lifetime.totals.estimated_calls,
+            "windows": window_stats
         }
+
+    def save(self) -> bool:
+        """
+        Persist lifetime aggregates (atomic replace).
+
+        Returns:
+            True if written
+        """
+        self._last_persist = self._clock()
+        if not self.persist_path or not self._dirty:
+            return False
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.persist_path.with_suffix(self.persist_path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps({
+                "saved_at": datetime.now().isoformat(),
+                "lifetime": self._lifetime.to_dict()
+            }), encoding="utf-8")
+            os.replace(tmp_path, self.persist_path)
+            self._dirty = False
+            return True
+        except OSError as e:
+            logger.error(f"❌ Failed to persist token usage to {self.persist_path}: {e}")
+            return False
+
+    def load(self) -> bool:
+        """
+        Restore lifetime aggregates saved by save().
+
+        Returns:
+            True if a snapshot was loaded
+        """
+        if not self.persist_path or not self.persist_path.exists():
+            return False
+        try:
+            data = json.loads(self.persist_path.read_text(encoding="utf-8"))["lifetime"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable token usage file {self.persist_path}: {e}")
+            return False
+
+        restored = _Breakdown(self.max_keys)
+        restored.totals = _Aggregate.from_dict(data.get("totals", {}))
+        for dimension in DIMENSIONS:
+            for key, values in data.get(dimension, {}).items():
+                restored._bucket(dimension, key).merge(_Aggregate.from_dict(values))
+        self._lifetime = restored
+        logger.info(
+            f"📂 Token usage restored from {self.persist_path} "
+            f"({restored.totals.calls} calls)"
+        )
+        return True
     
     def print_summary(self):
         """Print a formatted summary of token usage."""
@@ -117,6 +445,7 @@ class TokenCounter:
         logger.info(f"Total Tokens: {stats['total_tokens']:,}")
         logger.info(f"  - Prompt: {stats['total_prompt_tokens']:,}")
         logger.info(f"  - Response: {stats['total_response_tokens']:,}")
+        logger.info(f"  - Cached: {stats['total_cached_tokens']:,}")
         logger.info("-" * 60)
         
         for agent, data in stats['agent_breakdown'].items():
@@ -129,8 +458,10 @@ class TokenCounter:
     def reset(self):
         """Reset all counters."""
         self.usages.clear()
-        self._total_prompt_tokens = 0
-        self._total_response_tokens = 0
+        self._lifetime = _Breakdown(self.max_keys)
+        self._minutes = [None] * self.window_minutes
+        self._minute_epochs = [-1] * self.window_minutes
+        self._dirty = True
         logger.info("🔄 Token counter reset")
 
 
@@ -139,10 +470,12 @@ _token_counter: Optional[TokenCounter] = None
 
 
 def get_token_counter() -> TokenCounter:
-    """Get or create global token counter."""
+    """Get or create global token counter (persisted to TOKEN_USAGE_PATH if set)."""
     global _token_counter
     if _token_counter is None:
-        _token_counter = TokenCounter()
+        _token_counter = TokenCounter(persist_path=os.getenv("TOKEN_USAGE_PATH"))
+        if _token_counter.persist_path:
+            atexit.register(_token_counter.save)
         logger.info("✨ Token counter initialized")
     return _token_counter
 
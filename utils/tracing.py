@@ -0,0 +1,722 @@
+"""
+Lightweight span tracing for the plan -> dev -> QA -> deploy pipeline.
+
+This module provides:
+- Span/SpanContext: Timed, attributed units of work linked by trace and parent IDs
+- Tracer: Starts spans and propagates the active span through a ContextVar,
+  so nested awaits (agent -> LLM client) and tasks created inside a span
+  inherit it automatically
+- traced: Decorator for coroutine and async-generator methods
+- InMemorySpanExporter: Bounded per-trace store with timeline, critical path
+  and text flame views (one trace per plan)
+- JsonlSpanExporter: Appends OTLP/JSON (ExportTraceServiceRequest) lines to
+  a local file, loadable by the OpenTelemetry collector's file receiver
+
+Work that crosses a queue carries its SpanContext on the QueueTask, and plan
+traces use a trace ID derived from the plan ID so every stage of a plan lands
+in the same trace even when the producer had no active span.
+"""
+
+import os
+import json
+import time
+import uuid
+import atexit
+import hashlib
+import inspect
+import logging
+import functools
+import threading
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Service name reported in exported resource attributes
+SERVICE_NAME = "software-developer-agentic-ai"
+
+# Span status codes (OTLP values)
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def trace_id_for(key: str) -> str:
+    """Deterministic 128-bit trace ID (32 hex chars) for a plan/project key."""
+    return hashlib.sha256(str(key).encode()).hexdigest()[:32]
+
+
+def _new_span_id() -> str:
+    """Random 64-bit span ID (16 hex chars)."""
+    return uuid.uuid4().hex[:16]
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """Identifies a span (or just a trace) across task and queue boundaries."""
+    trace_id: str
+    span_id: Optional[str] = None
+
+    @classmethod
+    def for_key(cls, key: str) -> 'SpanContext':
+        """Context that roots new spans in the trace of a plan/project key."""
+        return cls(trace_id=trace_id_for(key))
+
+
+class Span:
+    """A timed unit of work."""
+
+    __slots__ = (
+        'trace_id', 'span_id', 'parent_id', 'name', 'start_ns', 'end_ns',
+        'attributes', 'events', 'status', 'status_message', '_tracer'
+    )
+
+    def __init__(
+        self,
+        tracer: Optional['Tracer'],
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def context(self) -> SpanContext:
+        """SpanContext for propagating this span as a parent."""
+        return SpanContext(self.trace_id, self.span_id)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Duration in milliseconds (None while running)."""
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any):
+        """Set an attribute."""
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        """Record a timestamped point event (e.g. first token)."""
+        self.events.append({
+            'name': name,
+            'time_ns': time.time_ns(),
+            'attributes': attributes
+        })
+
+    def set_error(self, error: BaseException):
+        """Mark the span as failed."""
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None):
+        """Finish the span and hand it to the exporters (idempotent)."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        if self.status == STATUS_UNSET:
+            self.status = STATUS_OK
+        if self._tracer is not None:
+            self._tracer._on_end(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat dictionary form."""
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': self.duration_ms,
+            'attributes': self.attributes,
+            'events': self.events,
+            'status': self.status,
+            'status_message': self.status_message
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON span representation."""
+        span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,  # SPAN_KIND_INTERNAL
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns or self.start_ns),
+            'attributes': _otlp_attributes(self.attributes),
+            'status': {'code': self.status}
+        }
+        if self.parent_id:
+            span['parentSpanId'] = self.parent_id
+        if self.status_message:
+            span['status']['message'] = self.status_message
+        if self.events:
+            span['events'] = [
+                {
+                    'timeUnixNano': str(event['time_ns']),
+                    'name': event['name'],
+                    'attributes': _otlp_attributes(event['attributes'])
+                }
+                for event in self.events
+            ]
+        return span
+
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"Span(name='{self.name}', trace={self.trace_id[:8]}, duration_ms={self.duration_ms})"
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert a dict to OTLP KeyValue list."""
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {'boolValue': value}
+        elif isinstance(value, int):
+            typed = {'intValue': str(value)}
+        elif isinstance(value, float):
+            typed = {'doubleValue': value}
+        else:
+            typed = {'stringValue': str(value)}
+        result.append({'key': key, 'value': typed})
+    return result
+
+
+class _NoopSpan:
+    """Span stand-in used when tracing is disabled."""
+
+    trace_id = span_id = parent_id = None
+    context = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def add_event(self, name: str, **attributes):
+        pass
+
+    def set_error(self, error: BaseException):
+        pass
+
+    def end(self, end_ns: Optional[int] = None):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# ============================================================================
+# Exporters
+# ============================================================================
+
+class InMemorySpanExporter:
+    """
+    Keeps finished spans of recent traces for timeline views.
+
+    Memory is bounded: at most max_traces traces (least recently updated
+    evicted first) and max_spans_per_trace spans per trace.
+    """
+
+    def __init__(self, max_traces: int = 200, max_spans_per_trace: int = 5000):
+        """
+        Initialize exporter.
+
+        Args:
+            max_traces: Traces retained
+            max_spans_per_trace: Spans retained per trace (later spans dropped)
+        """
+        self.max_traces = max_traces
+        self.max_spans_per_trace = max_spans_per_trace
+        self._traces: 'OrderedDict[str, List[Span]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.dropped_spans = 0
+
+    def export(self, span: Span):
+        """Store a finished span."""
+        with self._lock:
+            spans = self._traces.get(span.trace_id)
+            if spans is None:
+                spans = self._traces[span.trace_id] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            else:
+                self._traces.move_to_end(span.trace_id)
+
+            if len(spans) < self.max_spans_per_trace:
+                spans.append(span)
+            else:
+                self.dropped_spans += 1
+
+    def flush(self):
+        """Nothing buffered."""
+
+    def shutdown(self):
+        """Nothing to release."""
+
+    def clear(self):
+        """Drop all stored traces."""
+        with self._lock:
+            self._traces.clear()
+
+    def _resolve(self, key: str) -> str:
+        """Accept a trace ID or the plan/project key it was derived from."""
+        return key if key in self._traces else trace_id_for(key)
+
+    def trace_ids(self) -> List[str]:
+        """Stored trace IDs, most recently updated last."""
+        return list(self._traces)
+
+    def get_spans(self, key: str) -> List[Span]:
+        """Finished spans of a trace ordered by start time."""
+        with self._lock:
+            spans = list(self._traces.get(self._resolve(key), []))
+        return sorted(spans, key=lambda s: s.start_ns)
+
+    def timeline(self, key: str) -> Dict[str, Any]:
+        """
+        Timeline of a trace.
+
+        Args:
+            key: Trace ID or plan/project key
+
+        Returns:
+            Dictionary with trace_id, duration_ms, spans (each with depth,
+            offset_ms and duration_ms) and critical_path span names
+        """
+        spans = self.get_spans(key)
+        if not spans:
+            return {'trace_id': self._resolve(key), 'duration_ms': 0.0, 'spans': [], 'critical_path': []}
+
+        by_id = {s.span_id: s for s in spans}
+        trace_start = spans[0].start_ns
+        trace_end = max(s.end_ns for s in spans)
+
+        def depth(span: Span) -> int:
+            level = 0
+            parent = by_id.get(span.parent_id)
+            while parent is not None and level < 64:
+                level += 1
+                parent = by_id.get(parent.parent_id)
+            return level
+
+        return {
+            'trace_id': spans[0].trace_id,
+            'duration_ms': round((trace_end - trace_start) / 1e6, 3),
+            'spans': [
+                {
+                    'name': s.name,
+                    'span_id': s.span_id,
+                    'parent_id': s.parent_id,
+                    'depth': depth(s),
+                    'offset_ms': round((s.start_ns - trace_start) / 1e6, 3),
+                    'duration_ms': round(s.duration_ms, 3),
+                    'status': 'error' if s.status == STATUS_ERROR else 'ok',
+                    'attributes': s.attributes
+                }
+                for s in spans
+            ],
+            'critical_path': [s.name for s in self.critical_path(key)]
+        }
+
+    def critical_path(self, key: str) -> List[Span]:
+        """
+        Chain of spans that determined the trace's end time.
+
+        Starting from the root that finished last, repeatedly follows the
+        child that finished last.
+
+        Returns:
+            Spans from root to leaf
+        """
+        spans = self.get_spans(key)
+        if not spans:
+            return []
+
+        known = {s.span_id for s in spans}
+        children: Dict[Optional[str], List[Span]] = {}
+        for s in spans:
+            parent = s.parent_id if s.parent_id in known else None
+            children.setdefault(parent, []).append(s)
+
+        path = []
+        current = max(children[None], key=lambda s: s.end_ns)
+        while current is not None:
+            path.append(current)
+            kids = children.get(current.span_id)
+            current = max(kids, key=lambda s: s.end_ns) if kids else None
+        return path
+
+    def render(self, key: str, width: int = 60) -> str:
+        """
+        Text flame/timeline view of a trace.
+
+        Args:
+            key: Trace ID or plan/project key
+            width: Bar width in characters
+
+        Returns:
+            One line per span: indented name, bar positioned on the trace
+            time axis, and duration
+        """
+        view = self.timeline(key)
+        if not view['spans']:
+            return f"(no spans for {key})"
+
+        total = view['duration_ms'] or 1.0
+        critical = set(view['critical_path'])
+        lines = [f"trace {view['trace_id']}  total {total:.1f}ms"]
+        for s in view['spans']:
+            start = int(s['offset_ms'] / total * width)
+            length = max(1, int(s['duration_ms'] / total * width))
+            bar = " " * start + ("#" if s['name'] in critical else "=") * length
+            label = ("  " * s['depth'] + s['name'])[:40]
+            marker = " !" if s['status'] == 'error' else ""
+            lines.append(f"{label:<40} |{bar:<{width}}| {s['duration_ms']:.1f}ms{marker}")
+        return "\n".join(lines)
+
+
+class JsonlSpanExporter:
+    """
+    Buffers spans and appends them to a file as OTLP/JSON lines.
+
+    Each line is one ExportTraceServiceRequest (resourceSpans -> scopeSpans
+    -> spans), the format used by the OpenTelemetry collector file exporter.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64, max_delay_seconds: float = 5.0):
+        """
+        Initialize exporter.
+
+        Args:
+            path: Output file (parent directories are created)
+            batch_size: Spans buffered before a write
+            max_delay_seconds: Maximum age of the oldest buffered span before a write
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self._buffer: List[Span] = []
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        """Buffer a finished span, writing the batch when full or stale."""
+        with self._lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append(span)
+            due = (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.max_delay_seconds
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered spans."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+
+        request = {
+            'resourceSpans': [{
+                'resource': {'attributes': _otlp_attributes({'service.name': SERVICE_NAME})},
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [span.to_otlp() for span in batch]
+                }]
+            }]
+        }
+        try:
+            with self.path.open('a', encoding='utf-8') as f:
+                f.write(json.dumps(request, default=str) + "\n")
+        except OSError as e:
+            logger.error(f"❌ Failed to write {len(batch)} spans to {self.path}: {e}")
+
+    def shutdown(self):
+        """Flush remaining spans."""
+        self.flush()
+
+
+# ============================================================================
+# Tracer
+# ============================================================================
+
+class Tracer:
+    """
+    Creates spans and tracks the active one per asyncio task.
+
+    The active span lives in a ContextVar, so asyncio.create_task() and
+    awaited calls inherit it without passing it explicitly.
+    """
+
+    def __init__(self, enabled: bool = True, exporters: Optional[List[Any]] = None):
+        """
+        Initialize tracer.
+
+        Args:
+            enabled: When False, span() yields a no-op span (near-zero cost)
+            exporters: Objects with export(span)/flush()/shutdown(); an
+                       InMemorySpanExporter is always added as self.memory
+        """
+        self.enabled = enabled
+        self.memory = InMemorySpanExporter()
+        self.exporters: List[Any] = [self.memory] + list(exporters or [])
+
+    def add_exporter(self, exporter: Any):
+        """Register an additional exporter."""
+        self.exporters.append(exporter)
+
+    def _on_end(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.error(f"❌ Span exporter {type(exporter).__name__} failed: {e}")
+
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None
+    ):
+        """
+        Start a span without making it current (caller must end() it).
+
+        Args:
+            name: Span name (e.g. 'dev.execute_task')
+            parent: Parent context (default: the current span)
+            attributes: Initial attributes
+            start_ns: Start time in Unix nanoseconds (default: now)
+
+        Returns:
+            Span (or a no-op span when disabled)
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current is not None else None
+
+        if parent is not None:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        else:
+            trace_id, parent_id = uuid.uuid4().hex, None
+
+        return Span(self, name, trace_id, parent_id, attributes, start_ns)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Span]:
+        """
+        Run a block inside a new current span.
+
+        Exceptions mark the span as failed and propagate.
+        """
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+
+        span = self.start_span(name, parent, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def record_span(
+        self,
+        name: str,
+        start_ns: int,
+        end_ns: int,
+        parent: Optional[SpanContext] = None,
+        attributes: Optional[Dict[str, Any]] = None
+    ):
+        """Record an already-finished interval (e.g. queue wait) as a span."""
+        if not self.enabled:
+            return
+        self.start_span(name, parent, attributes, start_ns=start_ns).end(end_ns)
+
+    def flush(self):
+        """Flush all exporters."""
+        for exporter in self.exporters:
+            exporter.flush()
+
+    def shutdown(self):
+        """Flush and release all exporters."""
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+def _tracer_from_env() -> Tracer:
+    """Build the default tracer (TRACING_ENABLED, TRACE_EXPORT_PATH)."""
+    enabled = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    tracer = Tracer(enabled=enabled)
+    export_path = os.getenv("TRACE_EXPORT_PATH")
+    if enabled and export_path:
+        tracer.add_exporter(JsonlSpanExporter(export_path))
+        logger.info(f"🔭 Tracing: exporting spans to {export_path}")
+    return tracer
+
+
+_tracer = _tracer_from_env()
+atexit.register(_tracer.shutdown)
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer."""
+    return _tracer
+
+
+def current_span():
+    """Active span (a no-op span if none)."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def current_context() -> Optional[SpanContext]:
+    """Context of the active span, for carrying across queues."""
+    span = _current_span.get()
+    return span.context if span is not None else None
+
+
+def span(name: str, parent: Optional[SpanContext] = None, attributes: Optional[Dict[str, Any]] = None):
+    """Context manager for a span on the default tracer."""
+    return _tracer.span(name, parent, attributes)
+
+
+def bind_trace(key: str):
+    """
+    Move the current root span into the trace for a plan/project key.
+
+    Call before creating child spans, once the key is known (e.g. right
+    after a plan ID is generated). Non-root spans only get a trace.key
+    attribute.
+    """
+    span = _current_span.get()
+    if span is None:
+        return
+    span.set_attribute("trace.key", key)
+    if span.parent_id is None:
+        span.trace_id = trace_id_for(key)
+
+
+def task_attributes(owner: Any, task: Any, *args, **kwargs) -> Dict[str, Any]:
+    """traced() attributes for methods taking a Task or QueueTask first."""
+    task_id = getattr(task, "id", None) or getattr(task, "task_id", None)
+    return {"task.id": str(task_id)} if task_id is not None else {}
+
+
+def traced(name: Optional[str] = None, attributes: Optional[Callable[..., Dict[str, Any]]] = None):
+    """
+    Decorator that runs a coroutine or async generator inside a span.
+
+    Args:
+        name: Span name (default: function qualname)
+        attributes: Optional callable receiving the call arguments and
+                    returning span attributes
+
+    Returns:
+        Decorator
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        def start(args, kwargs):
+            attrs = None
+            if attributes is not None:
+                try:
+                    attrs = attributes(*args, **kwargs)
+                except Exception:
+                    attrs = None
+            return _tracer.start_span(span_name, attributes=attrs)
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def gen_wrapper(*args, **kwargs):
+                if not _tracer.enabled:
+                    async for item in func(*args, **kwargs):
+                        yield item
+                    return
+
+                span = start(args, kwargs)
+                agen = func(*args, **kwargs)
+                try:
+                    while True:
+                        # Current only while the generator body runs, not while the consumer does
+                        token = _current_span.set(span)
+                        try:
+                            item = await agen.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            _current_span.reset(token)
+                        yield item
+                except GeneratorExit:
+                    raise  # Consumer stopped early; not a failure
+                except BaseException as e:
+                    span.set_error(e)
+                    raise
+                finally:
+                    await agen.aclose()
+                    span.end()
+            return gen_wrapper
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return await func(*args, **kwargs)
+            span = start(args, kwargs)
+            token = _current_span.set(span)
+            try:
+                return await func(*args, **kwargs)
+            except BaseException as e:
+                span.set_error(e)
+                raise
+            finally:
+                _current_span.reset(token)
+                span.end()
+        return wrapper
+
+    return decorator
+
+
+def get_timeline(key: str) -> Dict[str, Any]:
+    """Timeline (see InMemorySpanExporter.timeline) for a trace ID or plan key."""
+    return _tracer.memory.timeline(key)
+
+
+def render_timeline(key: str, width: int = 60) -> str:
+    """Text flame view for a trace ID or plan key."""
+    return _tracer.memory.render(key, width)
@@ -24,6 +24,8 @@ class UnifiedWorkerPool(AutoScalingWorkerPool):
     - Priority queue: Fixes (priority=5) > New Dev (priority=1-4)
     - Better resource utilization (no idle fix workers)
     - Automatic task type detection and routing
+    - Starvation protection via the queue's priority aging and
+      per-class max wait (configured on the AsyncTaskQueue)
     """
     
     def __init__(
@@ -147,6 +149,7 @@ class UnifiedWorkerPool(AutoScalingWorkerPool):
         
         return {
             **base_stats,
+            'queue_wait': self.task_queue.get_wait_stats(),
             'task_breakdown': {
                 'dev_tasks': self.dev_tasks_processed,
                 'fix_tasks': self.fix_tasks_processed,
@@ -10,9 +10,24 @@ from typing import Callable, Optional, Any
 import logging
 from datetime import datetime
 from utils.task_queue import AsyncTaskQueue, QueueTask
+from utils.metrics_registry import gauge, histogram, TASK_BUCKETS
+from utils.tracing import SpanContext, get_tracer
+from utils.cancellation import ScopeCancelledError, get_cancellation_registry, scopes_for_task
 
 logger = logging.getLogger(__name__)
 
+# Scrapeable worker metrics (labelled by pool name)
+TASK_SERVICE_TIME = histogram(
+    "pipeline_task_service_seconds", "Time spent processing a task",
+    ("pool", "outcome"), buckets=TASK_BUCKETS
+)
+POOL_WORKERS = gauge(
+    "pipeline_pool_workers", "Running workers in pool", ("pool",)
+)
+POOL_BUSY_WORKERS = gauge(
+    "pipeline_pool_busy_workers", "Workers currently processing a task", ("pool",)
+)
+
 
 class WorkerPool:
     """
@@ -58,6 +73,14 @@ class WorkerPool:
         self.total_failed = 0
         self.total_processing_time = 0.0
         
+        # Registry series for this pool
+        self._service_metrics = {
+            outcome: TASK_SERVICE_TIME.labels(name, outcome)
+            for outcome in ("success", "retried", "failed", "cancelled")
+        }
+        self._workers_metric = POOL_WORKERS.labels(name)
+        self._busy_metric = POOL_BUSY_WORKERS.labels(name)
+        
         logger.info(
             f"🏗️ {self.name}: Initialized worker pool with {worker_count} workers"
         )
@@ -89,14 +112,49 @@ class WorkerPool:
                     f"👷 {self.name} Worker-{worker_id}: Processing task {task.task_id}"
                 )
                 
+                # Untraced producers: group this task's spans under its own trace
+                tracer = get_tracer()
+                trace_parent = task.trace_parent or SpanContext.for_key(task.task_id)
+                span_attributes = {
+                    "task.id": task.task_id,
+                    "task.type": task.task_type,
+                    "pool": self.name
+                }
+                if task.enqueued_at and task.started_at:
+                    tracer.record_span(
+                        "queue.wait",
+                        start_ns=int(task.enqueued_at.timestamp() * 1e9),
+                        end_ns=int(task.started_at.timestamp() * 1e9),
+                        parent=trace_parent,
+                        attributes={**span_attributes, "queue": self.task_queue.name}
+                    )
+                
+                # Work for a stopped plan or closed connection is dropped
+                registry = get_cancellation_registry()
+                scopes = scopes_for_task(task)
+                cancel_reason = registry.is_cancelled(scopes)
+                if cancel_reason:
+                    logger.info(
+                        f"🛑 {self.name} Worker-{worker_id}: "
+                        f"Skipping task {task.task_id} ({cancel_reason})"
+                    )
+                    self._service_metrics["cancelled"].observe(0.0)
+                    self.task_queue.task_done(task.task_id, success=False, processing_time=0.0)
+                    continue
+                
                 # Process the task
                 processing_start = datetime.now()
                 success = False
+                outcome = "failed"
                 result = None
+                self._busy_metric.inc()
                 
                 try:
-                    result = await self.process_func(task)
+                    with tracer.span("task.process", parent=trace_parent, attributes=span_attributes):
+                        # Child task: cancelling the task's scopes spares this worker
+                        result = await registry.run(self.process_func(task), scopes)
                     success = True
+                    outcome = "success"
                     self.total_processed += 1
                     
                     logger.info(
@@ -104,6 +162,13 @@ class WorkerPool:
                         f"Completed task {task.task_id}"
                     )
                     
+                except ScopeCancelledError as e:
+                    outcome = "cancelled"
+                    logger.info(
+                        f"🛑 {self.name} Worker-{worker_id}: "
+                        f"Task {task.task_id} cancelled ({e})"
+                    )
+                    
                 except Exception as e:
                     logger.error(
                         f"❌ {self.name} Worker-{worker_id}: "
@@ -113,6 +178,7 @@ class WorkerPool:
                     
                     # Attempt retry if available
                     if self.task_queue.task_retry(task):
+                        outcome = "retried"
                         logger.info(
                             f"🔄 {self.name} Worker-{worker_id}: "
                             f"Task {task.task_id} re-queued for retry"
@@ -120,9 +186,13 @@ class WorkerPool:
                     else:
                         self.total_failed += 1
                 
+                finally:
+                    self._busy_metric.dec()
+                
                 # Calculate processing time
                 processing_time = (datetime.now() - processing_start).total_seconds()
                 self.total_processing_time += processing_time
+                self._service_metrics[outcome].observe(processing_time)
                 
                 # Mark task as done in queue
                 self.task_queue.task_done(
@@ -186,6 +256,7 @@ class WorkerPool:
             asyncio.create_task(self._worker(i))
             for i in range(self.worker_count)
         ]
+        self._workers_metric.set(self.worker_count)
         
         logger.info(
             f"🚀 {self.name}: Started {self.worker_count} workers"
@@ -240,6 +311,7 @@ class WorkerPool:
         
         self.is_running = False
         self.workers = []
+        self._workers_metric.set(0)
         
         # Log final statistics
         stats = self.get_stats()
@@ -359,6 +431,7 @@ class WorkerPool:
                 self.workers.append(worker)
             
             self.worker_count = new_worker_count
+            self._workers_metric.set(new_worker_count)
             logger.info(
                 f"📈 {self.name}: Scaled up by {new_workers} workers "
                 f"(total: {new_worker_count})"
@@ -371,6 +444,7 @@ class WorkerPool:
                 worker.cancel()
             
             self.worker_count = new_worker_count
+            self._workers_metric.set(new_worker_count)
             logger.info(
                 f"📉 {self.name}: Scaled down by {workers_to_remove} workers "
                 f"(total: {new_worker_count})"